@@ -1,29 +1,40 @@
-import csv
-import pymysql
-
-#Connection with DW
-ssl_config = {
-    'ca': './Datasets/ca.pem',
-    'cert': './Datasets/client-cert.pem',
-    'key': './Datasets/client-key.pem'
-}
 """
-mydb = pymysql.connect(
-    host='',
-    port=,
-    user='',
-    password='',
-    database='',
-    ssl_ca = ssl_config['ca'],
-    ssl_cert = ssl_config['cert'],
-    ssl_key = ssl_config['key'])
+This script imports the TechJobs skill dataset (techjobs_skill.csv) into the DWH.
+
+Every row of the CSV is an employee: its id, its attributes and one 0/1 column per skill. The file is split into
+byte ranges of whole lines, which a pool of processes parses with pandas into typed columns. A worker turns the
+0/1 skill block of its rows into (EmployeeID, skill column) pairs with np.nonzero, no Python code runs per cell.
+The skills are resolved with one bulk insert and one SELECT, the employees and their skills are written per
+range within one transaction, with large multi-row inserts or LOAD DATA LOCAL INFILE.
 """
+import os
+import io
+import csv
+import time
+import tempfile
+from itertools import repeat
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from dotenv import load_dotenv, find_dotenv
+from sqlalchemy import create_engine  # Requires pymysql
 
-#File to upload
-file_name = './Datasets/techjobs_skill.csv'
-batch_size = 1000  # Number of rows to insert in each batch
+# Employee columns of the CSV (after the id in the first column), in the column order of DIM_TJB_Employee
+EMPLOYEE_COLUMNS = (
+    'Age', 'EdLevel', 'Employment', 'Gender', 'MainBranch', 'YearsCode', 'Country', 'PreviousSalary',
+    'ComputerSkills', 'Employed'
+)
+
+# Numeric employee columns, values that are not numbers are stored as NULL
+NUMERIC_COLUMNS = ('Employment', 'YearsCode', 'PreviousSalary', 'ComputerSkills', 'Employed')
+
+# Number of bytes of the CSV parsed per task, the ranges are extended to the end of their last line
+CHUNK_SIZE = 8 * 1024 * 1024
 
-#Create different tables in the DW
+# Number of rows per multi-row INSERT
+INSERT_BATCH_SIZE = 20000
+
+# Create different tables in the DW
 create_table_employees = '''CREATE TABLE IF NOT EXISTS DIM_TJB_Employee (
     EmployeeID INT PRIMARY KEY,
     Age VARCHAR(5),
@@ -38,107 +49,278 @@ create_table_employees = '''CREATE TABLE IF NOT EXISTS DIM_TJB_Employee (
     Employed INT
 ); '''
 
-create_table_skills = '''CREATE TABLE DIM_TJB_Skills (
+create_table_skills = '''CREATE TABLE IF NOT EXISTS DIM_TJB_Skills (
     SkillID INT AUTO_INCREMENT PRIMARY KEY,
     SkillName VARCHAR(100) UNIQUE
 ); '''
 
-create_table_relationships = '''CREATE TABLE Fact_EmployeeSkills (
+create_table_relationships = '''CREATE TABLE IF NOT EXISTS Fact_TJB_EmployeeSkills (
     EmployeeID INT,
     SkillID INT,
-    FOREIGN KEY (EmployeeID) REFERENCES DWH2.DIM_TJB_Employee(EmployeeID),
-    FOREIGN KEY (SkillID) REFERENCES DWH2.DIM_TJB_Skills(SkillID)
+    PRIMARY KEY (EmployeeID, SkillID),
+    FOREIGN KEY (EmployeeID) REFERENCES DIM_TJB_Employee(EmployeeID),
+    FOREIGN KEY (SkillID) REFERENCES DIM_TJB_Skills(SkillID)
 ); '''
 
-cursor = mydb.cursor()
-
-#Uncomment this code below to create tables if neccesary
-# try:
-#     cursor.execute(create_table_relationships)
-#     mydb.commit()
-# except:
-#     print('Error Occured while creating Table!')
-
-#Start retrieving data from csv file
-with open(file_name, newline='\n') as csvfile:
-    csvreader = csv.reader(csvfile, delimiter=',')
-    header = next(csvreader)
-
-    # Identify skill columns
-    non_skill_columns = ['Age', 'EdLevel', 'Employment', 'Gender', 'MainBranch', 'YearsCode', 'Country', 'PreviousSalary', 'ComputerSkills', 'Employed']
-    skill_columns = [col for col in header if col not in non_skill_columns]
-
-    # Insert skills names into DIM_TJB_Skills if not exists
-    skill_ids = {}
-    for skill in skill_columns:
-        cursor.execute('SELECT SkillID FROM DWH2.DIM_TJB_Skills WHERE SkillName = %s', (skill,))
-        result = cursor.fetchone()
-        if result is None:
-            cursor.execute('INSERT INTO DWH2.DIM_TJB_Skills (SkillName) VALUES (%s)', (skill,))
-            mydb.commit()
-            skill_id = cursor.lastrowid
-        else:
-            skill_id = result[0]
-        skill_ids[skill] = skill_id
-
-    # Batch processing to insert employee data efficiently
-    batch_data_employee = []
-    batch_data_skills = []
-    row_number = 0
-    for row in csvreader:
-        row_number += 1
-        if len(row) < len(header):
-            print(f"Skipping row {row_number}: insufficient columns")
-            continue
 
+def read_header(file_name: str) -> tuple[int, list[str], list[str]]:
+    """
+    This function reads the header of the CSV, the first column is the id.
+
+    :param file_name: The path of the CSV.
+    :return: The offset of the first row, the names of all columns (the id column named EmployeeID) and the names
+             of the skill columns.
+    """
+    with open(file_name, 'rb') as file:
+        header = next(csv.reader([file.readline().decode('utf-8-sig')]))
+        header_end = file.tell()
+
+    missing = [column for column in EMPLOYEE_COLUMNS if column not in header[1:]]
+    if missing:
+        raise ValueError(f"{file_name} is missing the employee columns {missing}")
+    skill_columns = [column for column in header[1:] if column not in EMPLOYEE_COLUMNS]
+
+    return header_end, ['EmployeeID', *header[1:]], skill_columns
+
+
+def byte_ranges(file_name: str, start: int, chunk_size: int = CHUNK_SIZE) -> list[tuple[int, int]]:
+    """
+    This function splits a file into byte ranges of whole lines.
+
+    :param file_name: The path of the file.
+    :param start: The offset to start at, e.g. after the header line.
+    :param chunk_size: The minimum number of bytes per range, the last one may be smaller.
+    :return: The ranges, as (start, end) with the end exclusive.
+    """
+    ranges = []
+    size = os.path.getsize(file_name)
+    with open(file_name, 'rb') as file:
+        while start < size:
+            file.seek(min(start + chunk_size, size))
+            file.readline()
+            end = min(file.tell(), size)
+            ranges.append((start, end))
+            start = end
+
+    return ranges
+
+
+def parse_range(file_name: str, start: int, end: int, columns: list[str], skill_columns: list[str]) -> tuple:
+    """
+    This function parses a byte range of the CSV into employee rows and (EmployeeID, skill column) pairs.
+    Rows with missing or non-numeric skill values are skipped.
+
+    :param file_name: The path of the CSV.
+    :param start: The start of the range, the start of a line.
+    :param end: The end of the range, the end of a line.
+    :param columns: The names of all columns, the id column is named EmployeeID.
+    :param skill_columns: The names of the skill columns.
+    :return: The employee rows in the column order of DIM_TJB_Employee, the EmployeeIDs and skill column positions
+             of the pairs and the number of skipped rows.
+    """
+    with open(file_name, 'rb') as file:
+        file.seek(start)
+        data = file.read(end - start)
+
+    # Parse the skill block as numbers, values that are not numbers are parsed column by column
+    options = {'header': None, 'names': columns, 'keep_default_na': False, 'na_values': [''], 'on_bad_lines': 'skip'}
+    try:
+        dtypes = {**dict.fromkeys(columns, str), **dict.fromkeys(skill_columns, np.float32)}
+        chunk = pd.read_csv(io.BytesIO(data), dtype=dtypes, **options)
+        skills = chunk[skill_columns]
+    except ValueError:
+        chunk = pd.read_csv(io.BytesIO(data), dtype=str, **options)
+        skills = chunk[skill_columns].apply(pd.to_numeric, errors='coerce')
+
+    # The skill block as a 0/1 matrix, incomplete rows are skipped
+    employee_ids = pd.to_numeric(chunk['EmployeeID'], errors='coerce')
+    valid = skills.notna().all(axis=1).to_numpy() & employee_ids.notna().to_numpy()
+    chunk = chunk[valid]
+    matrix = skills.to_numpy()[valid].astype(np.int8)
+    employee_ids = employee_ids.to_numpy()[valid].astype(np.int64)
+
+    # Long form of the skill block, one pair per 1
+    rows, positions = np.nonzero(matrix)
+
+    # Employee rows with NULL for missing and non-numeric values
+    employees = chunk[list(EMPLOYEE_COLUMNS)].copy()
+    for column in NUMERIC_COLUMNS:
+        employees[column] = pd.to_numeric(employees[column], errors='coerce')
+    employees.insert(0, 'EmployeeID', employee_ids)
+    employees = employees.astype(object).where(employees.notna(), None)
+
+    return (
+        list(employees.itertuples(index=False, name=None)),
+        employee_ids[rows],
+        positions.astype(np.int32),
+        int((~valid).sum())
+    )
+
+
+def skill_ids(connection, skill_columns: list[str]) -> np.ndarray:
+    """
+    This function inserts the missing skills and returns the SkillID of every skill column.
+
+    DWH table: DIM_TJB_Skills
+
+    :param connection: The DWH connection to use.
+    :param skill_columns: The names of the skill columns.
+    :return: The SkillIDs, indexed by the position of the skill column.
+    """
+    connection.exec_driver_sql(
+        "INSERT IGNORE INTO DIM_TJB_Skills (SkillName) VALUES (%s)", [(skill,) for skill in skill_columns]
+    )
+    found = {
+        name.casefold(): skill_id for skill_id, name in connection.exec_driver_sql(
+            f"SELECT SkillID, SkillName FROM DIM_TJB_Skills "
+            f"WHERE SkillName IN ({', '.join(['%s'] * len(skill_columns))})",
+            tuple(skill_columns)
+        )
+    }
+    return np.array([found[skill.casefold()] for skill in skill_columns], dtype=np.int64)
+
+
+def _write_range(connection, employees: list[tuple], pairs: np.ndarray, batch_size: int, staging_dir: str | None):
+    """
+    This function writes the employees and skill pairs of a range.
+
+    DWH tables: DIM_TJB_Employee, Fact_TJB_EmployeeSkills
+
+    :param connection: The DWH connection to use.
+    :param employees: The employee rows in the column order of DIM_TJB_Employee.
+    :param pairs: The (EmployeeID, SkillID) pairs as a two column array.
+    :param batch_size: The number of rows per multi-row INSERT.
+    :param staging_dir: Directory to write the pairs to for LOAD DATA LOCAL INFILE, None inserts them.
+    """
+    # Employees imported before are updated, not replaced, their skill rows reference them
+    columns = ('EmployeeID', *EMPLOYEE_COLUMNS)
+    query = (
+        f"INSERT INTO DIM_TJB_Employee ({', '.join(columns)}) VALUES ({', '.join(['%s'] * len(columns))}) "
+        f"ON DUPLICATE KEY UPDATE {', '.join(f'{column} = VALUES({column})' for column in EMPLOYEE_COLUMNS)}"
+    )
+    for start in range(0, len(employees), batch_size):
+        connection.exec_driver_sql(query, employees[start:start + batch_size])
+
+    if not len(pairs):
+        return
+
+    # Load the pairs from a file, skill rows imported before are skipped
+    if staging_dir:
+        with tempfile.NamedTemporaryFile('w', dir=staging_dir, suffix='.tsv', delete=False) as file:
+            np.savetxt(file, pairs, fmt='%d', delimiter='\t')
         try:
-            # Assume EmployeeID is provided in the CSV (adjust the index if necessary)
-            EmployeeID = int(row[0])
-            Age = row[1]
-            EdLevel = row[2]
-            Employment = row[3]
-            Gender = row[4]
-            MainBranch = row[5]
-            YearsCode = row[6]
-            Country = row[7]
-            PreviousSalary = float(row[8])
-            ComputerSkills = row[9]
-            Employed = bool(int(row[10]))
-
-            # Add employee data to batch
-            batch_data_employee.append((EmployeeID, Age, EdLevel, Employment, Gender, MainBranch, YearsCode, Country, PreviousSalary, ComputerSkills, Employed))
-
-            # Handle skills as columns with binary values
-            for i, skill in enumerate(skill_columns, start=len(non_skill_columns) + 1):
-                if row[i] == '1':  # Employee knows this skill
-                    skill_id = skill_ids[skill]
-                    batch_data_skills.append((EmployeeID, skill_id))
-
-            if len(batch_data_employee) >= batch_size:
-                sql_query_employee = "REPLACE INTO DWH2.DIM_TJB_Employee (EmployeeID, Age, EdLevel, Employment, Gender, MainBranch, YearsCode, Country, PreviousSalary, ComputerSkills, Employed) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)"
-                cursor.executemany(sql_query_employee, batch_data_employee)
-                mydb.commit()
-                batch_data_employee = []
-
-            if len(batch_data_skills) >= batch_size:
-                sql_query_skills = "INSERT IGNORE INTO DWH2.Fact_TJB_EmployeeSkills (EmployeeID, SkillID) VALUES (%s, %s)"
-                cursor.executemany(sql_query_skills, batch_data_skills)
-                mydb.commit()
-                batch_data_skills = []
-
-        except IndexError as e:
-            print(f"Error processing row {row_number}: {e}")
-            continue
-
-    # Insert any remaining data
-    if batch_data_employee:
-        sql_query_employee = "REPLACE INTO DWH2.DIM_TJB_Employee (EmployeeID, Age, EdLevel, Employment, Gender, MainBranch, YearsCode, Country, PreviousSalary, ComputerSkills, Employed) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)"
-        cursor.executemany(sql_query_employee, batch_data_employee)
-        mydb.commit()
-
-    if batch_data_skills:
-        sql_query_skills = "INSERT IGNORE INTO DWH2.Fact_TJB_EmployeeSkills (EmployeeID, SkillID) VALUES (%s, %s)"
-        cursor.executemany(sql_query_skills, batch_data_skills)
-        mydb.commit()
-
-mydb.close()
+            connection.exec_driver_sql(
+                "LOAD DATA LOCAL INFILE %s IGNORE INTO TABLE Fact_TJB_EmployeeSkills (EmployeeID, SkillID)",
+                (file.name,)
+            )
+        finally:
+            os.remove(file.name)
+        return
+
+    query = "INSERT IGNORE INTO Fact_TJB_EmployeeSkills (EmployeeID, SkillID) VALUES (%s, %s)"
+    for start in range(0, len(pairs), batch_size):
+        connection.exec_driver_sql(query, pairs[start:start + batch_size].tolist())
+
+
+def import_skill_matrix(
+        file_name: str,
+        dwh_connection_url: str,
+        schema_name: str = 'DWH2',
+        connect_args: dict | None = None,
+        create_tables: bool = False,
+        processes: int | None = None,
+        chunk_size: int = CHUNK_SIZE,
+        batch_size: int = INSERT_BATCH_SIZE,
+        staging_dir: str | None = None
+       ) -> dict:
+    """
+    This function imports the employees and their skills of the TechJobs skill CSV into the DWH.
+
+    :param file_name: The path of the CSV, its first column is the EmployeeID.
+    :param dwh_connection_url: The connection string of the DWH.
+    :param schema_name: The name of the DWH schema.
+    :param connect_args: Arguments of the DWH connections, e.g. {'ssl': {'ca': ..., 'cert': ..., 'key': ...}}.
+    :param create_tables: Whether to create the tables if they do not exist.
+    :param processes: The number of processes parsing the CSV, the number of CPUs if None.
+    :param chunk_size: The number of bytes of the CSV parsed per task.
+    :param batch_size: The number of rows per multi-row INSERT.
+    :param staging_dir: Directory to write the skill pairs to for LOAD DATA LOCAL INFILE, None inserts them.
+    :return: The number of imported employees, skill pairs and skipped rows.
+    """
+    header_end, columns, skill_columns = read_header(file_name)
+
+    # Add charset to connection string to avoid encoding issues, staging requires LOAD DATA LOCAL INFILE
+    connect_args = dict(connect_args or {})
+    if staging_dir:
+        connect_args['local_infile'] = True
+    dwh = create_engine(f'{dwh_connection_url}/{schema_name}?charset=utf8mb4', connect_args=connect_args)
+
+    with dwh.begin() as connection:
+        if create_tables:
+            for statement in (create_table_employees, create_table_skills, create_table_relationships):
+                connection.exec_driver_sql(statement)
+        skill_id_array = skill_ids(connection, skill_columns)
+
+    # Parse the ranges in parallel and write them in the order of the file
+    stats = {'employees': 0, 'skills': 0, 'skipped': 0}
+    start = time.perf_counter()
+    ranges = byte_ranges(file_name, header_end, chunk_size)
+    with ProcessPoolExecutor(processes) as pool:
+        results = pool.map(
+            parse_range,
+            repeat(file_name),
+            [range_start for range_start, _ in ranges],
+            [range_end for _, range_end in ranges],
+            repeat(columns),
+            repeat(skill_columns)
+        )
+        for done, (employees, employee_ids, positions, skipped) in enumerate(results, start=1):
+            pairs = np.column_stack((employee_ids, skill_id_array[positions]))
+            with dwh.begin() as connection:
+                _write_range(connection, employees, pairs, batch_size, staging_dir)
+
+            stats['employees'] += len(employees)
+            stats['skills'] += len(pairs)
+            stats['skipped'] += skipped
+            print(f"Progress: {done}/{len(ranges)} ranges, {stats['employees']} employees")
+
+    seconds = time.perf_counter() - start
+    print(
+        f"{stats['employees']} employees with {stats['skills']} skills in {seconds:.1f}s "
+        f"({stats['employees'] / max(seconds, 1e-9):.1f} employees/s), {stats['skipped']} rows skipped"
+    )
+    return stats
+
+
+# Load environment variables
+load_dotenv(find_dotenv())
+
+# Connection string
+mysql_url = os.getenv("DATABASE_DWH")
+dwh_schema_name = 'DWH2'
+
+# Connection with DW
+ssl_config = {
+    'ca': './Datasets/ca.pem',
+    'cert': './Datasets/client-cert.pem',
+    'key': './Datasets/client-key.pem'
+}
+
+# File to upload
+file_name = './Datasets/techjobs_skill.csv'
+
+# Create the tables if necessary
+create_tables = False
+
+# Directory to write the skill pairs to for LOAD DATA LOCAL INFILE (None inserts them)
+staging_directory = None
+
+if __name__ == "__main__":
+    import_skill_matrix(
+        file_name,
+        mysql_url,
+        dwh_schema_name,
+        connect_args={'ssl': ssl_config},
+        create_tables=create_tables,
+        staging_dir=staging_directory
+    )
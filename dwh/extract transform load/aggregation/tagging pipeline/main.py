@@ -1,10 +1,10 @@
 import os
 import pymongo
-import pandas as pd
 import json
 import logging
 from bson import ObjectId
 from dotenv import load_dotenv
+from dwh.linkedin_data import extraction
 from preprocess import preprocess_data
 from generate import generate_attributes
 from postprocess import postprocess_data
@@ -65,16 +65,9 @@ def load_profiles(mongo_client, mongo_collection_name, skip, limit):
         ]
     }
 
-    # Projection to include only the necessary fields
-    projection = {
-        "_id": 1,
-        "experiences": 1,
-        "education": 1
-    }
-
-    # Load profiles using the query, projection, skip, and limit
-    profiles = list(collection.find(query, projection).skip(skip).limit(limit))
-    return pd.DataFrame(profiles)
+    # Load profiles using the query, skip, and limit, decoded into Arrow with only the fields used by preprocess
+    profiles = extraction.arrow_table(collection, query, extraction.TAGGING_FIELDS, skip, limit)
+    return profiles.to_pandas()
 
 
 def save_results(client, mongo_collection_name, df):
@@ -0,0 +1,19 @@
+"""
+Pytest configuration of the ETL scripts.
+
+The scripts import each other as the dwh package (e.g. dwh.linkedin_data.profiles.convert), whose modules
+live in this directory. The package is registered here, so the tests run from the repository root with:
+    python -m pytest "dwh/extract transform load"
+"""
+import os
+import sys
+import types
+
+# Directory holding the modules of the dwh package
+ETL_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+
+# Register the package, keeping the directories of a dwh package that has been imported already
+if ETL_DIRECTORY not in list(getattr(sys.modules.get('dwh'), '__path__', [])):
+    package = types.ModuleType('dwh')
+    package.__path__ = [ETL_DIRECTORY, *getattr(sys.modules.get('dwh'), '__path__', [])]
+    sys.modules['dwh'] = package
@@ -5,8 +5,18 @@ VALUES
 ('PRF', 'KGL_LIN_PRF_USA', 'LinkedIn Profiles', 'https://www.this-is-where-we-got-them.com', NOW(),
  'Kaggle dataset with LinkedIn profiles from the US.');
 
+# Remember the id of the new datasource for its partitions
+SET @idOrigin = LAST_INSERT_ID();
+
 # To verify the data was added correctly, you can run the following query:
 # SELECT * FROM DWH.DIM_Origin;
 
 # Don't forget to commit the transaction!
 # COMMIT;
+
+# Add the partition of the new datasource to the tables partitioned by idOrigin (after the commit, ALTER TABLE commits
+# implicitly). The profiles of a datasource without its partition cannot be imported.
+CALL DWH.ETL_AddOriginPartition(@idOrigin);
+
+# To verify the partitions were added, you can run the following query:
+# SELECT TABLE_NAME, PARTITION_NAME FROM information_schema.PARTITIONS WHERE TABLE_SCHEMA = 'DWH' AND PARTITION_NAME IS NOT NULL;
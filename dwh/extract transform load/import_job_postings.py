@@ -1,49 +1,498 @@
+"""
+This script samples job postings from a techmap JSON lines dump (one job posting per line) into the MongoDB
+collection KGL_JPS.
+
+The dump is memory-mapped and split into byte ranges ending at a newline, the ranges are scanned by a pool of
+processes. Only the lines selected by the sampling are parsed, with orjson if it is installed:
+    systematic  Every sample_interval-th line. If it is None, the interval is derived from desired_samples and
+                a count of the lines (a newline count per range, nothing is parsed).
+    reservoir   desired_samples lines drawn uniformly. Every line gets a random key and the smallest keys win,
+                so every range keeps its own smallest keys and the ranges are merged in any order.
+    stratified  desired_samples lines split over the strata (e.g. country and source) by their share of the
+                lines, drawn uniformly within every stratum like the reservoir sampling.
+The random keys are seeded per range, a sample of the same dump with the same seed is the same.
+The parsed documents are written by several threads with unordered insert_many, the _id of the dump is kept
+as original_id.
+"""
 import os
+import re
+import json
+import mmap
+import time
+import heapq
+import random
 import dotenv
+from collections import Counter
+from itertools import accumulate
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from pymongo import MongoClient
-import json
+from pymongo.errors import BulkWriteError
+
+# Parse the selected lines with orjson if it is installed, it is several times faster than json
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
+# Supported sampling methods
+SAMPLING_METHODS = ('systematic', 'reservoir', 'stratified')
+
+# Number of bytes per scanned range, the ranges are extended to the end of their last line
+CHUNK_SIZE = 64 * 1024 * 1024
+
+# Minimum number of seconds between two progress lines
+PROGRESS_INTERVAL = 10.0
+
+# Memory map of the dump in the worker processes
+_worker_map = None
+
+
+def _init_worker(filename: str):
+    """
+    This function memory-maps the dump once per worker process.
+
+    :param filename: The path of the dump.
+    """
+    global _worker_map
+    with open(filename, 'rb') as file:
+        _worker_map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def chunk_ranges(file_map, chunk_size: int = CHUNK_SIZE) -> list[tuple[int, int]]:
+    """
+    This function splits a memory-mapped file into byte ranges of whole lines.
+
+    :param file_map: The memory map of the file.
+    :param chunk_size: The minimum number of bytes per range, the last one may be smaller.
+    :return: The ranges, as (start, end) with the end exclusive.
+    """
+    ranges = []
+    start = 0
+    size = len(file_map)
+    while start < size:
+        newline = file_map.find(b'\n', min(start + chunk_size, size) - 1)
+        end = size if newline == -1 else newline + 1
+        ranges.append((start, end))
+        start = end
+
+    return ranges
+
+
+def _lines(file_map, start: int, end: int):
+    """
+    This function yields the byte ranges of the lines of a range, without their newline.
+
+    :param file_map: The memory map of the file.
+    :param start: The start of the range, the start of a line.
+    :param end: The end of the range, the end of a line.
+    """
+    position = start
+    while position < end:
+        newline = file_map.find(b'\n', position, end)
+        if newline == -1:
+            newline = end
+        yield position, newline
+        position = newline + 1
+
+
+def _count_lines(start: int, end: int) -> int:
+    """
+    This function counts the lines of a range, like _lines.
+
+    :param start: The start of the range.
+    :param end: The end of the range.
+    """
+    lines = _worker_map[start:end].count(b'\n')
+    if end > start and _worker_map[end - 1] != ord('\n'):
+        lines += 1  # The last line of the file without a newline
+    return lines
+
+
+def _document(start: int, end: int) -> dict:
+    """
+    This function parses a line into the document written to MongoDB.
+
+    :param start: The start of the line.
+    :param end: The end of the line.
+    """
+    document = _loads(_worker_map[start:end])
+
+    # Rename the '_id' field to 'original_id'
+    if '_id' in document:
+        document['original_id'] = document.pop('_id')
+    return document
+
+
+def _stratum(start: int, end: int, patterns: tuple) -> tuple:
+    """
+    This function reads the stratum of a line without parsing it, the first value of every field is used.
+
+    :param start: The start of the line.
+    :param end: The end of the line.
+    :param patterns: The compiled patterns of the string fields of the stratum.
+    :return: The values of the fields, '' for missing fields.
+    """
+    values = []
+    for pattern in patterns:
+        match = pattern.search(_worker_map, start, end)
+        values.append(match.group(1).decode('utf-8', 'replace') if match else '')
+    return tuple(values)
+
+
+def _scan_chunk(start: int, end: int, seed: int, capacity: int, stratify_by: tuple = ()) -> tuple:
+    """
+    This function draws the random keys of the lines of a range and keeps the lines with the smallest keys.
+
+    :param start: The start of the range.
+    :param end: The end of the range.
+    :param seed: The seed of the sample, the keys of a range only depend on it and the start of the range.
+    :param capacity: The maximum number of lines kept.
+    :param stratify_by: The fields of the strata, nothing is read from the lines if empty.
+    :return: The number of lines per stratum, the kept lines as (key, stratum, start, end) and the key up to
+             which all lines are kept (1.0 if no line was dropped).
+    """
+    patterns = tuple(
+        re.compile(rb'"' + re.escape(field.encode()) + rb'"\s*:\s*"((?:[^"\\]|\\.)*)"') for field in stratify_by
+    )
+    rng = random.Random(f'{seed}:{start}')
+    strata = Counter()
+    heap = []  # Lines with the smallest keys, as (-key, stratum, start, end)
+    dropped = False
+
+    for line_start, line_end in _lines(_worker_map, start, end):
+        if line_end == line_start:
+            continue
+
+        stratum = _stratum(line_start, line_end, patterns)
+        strata[stratum] += 1
+        key = rng.random()
+        if len(heap) < capacity:
+            heapq.heappush(heap, (-key, stratum, line_start, line_end))
+        else:
+            dropped = True
+            if -key > heap[0][0]:
+                heapq.heapreplace(heap, (-key, stratum, line_start, line_end))
+
+    complete_below = -heap[0][0] if dropped and heap else 1.0
+    candidates = [(-key, stratum, line_start, line_end) for key, stratum, line_start, line_end in heap]
+    return strata, candidates, complete_below
+
+
+def _parse_ranges(ranges: list[tuple]) -> tuple[list[dict], int]:
+    """
+    This function parses selected lines.
+
+    :param ranges: The selected lines, as (start, end).
+    :return: The documents and the number of lines that could not be parsed.
+    """
+    documents = []
+    errors = 0
+    for start, end in ranges:
+        try:
+            documents.append(_document(start, end))
+        except ValueError as e:
+            print(f"Error decoding JSON at byte {start}: {e}")
+            errors += 1
+
+    return documents, errors
+
+
+def _parse_systematic(start: int, end: int, first_line: int, interval: int) -> tuple[list[dict], int]:
+    """
+    This function parses every interval-th line of the dump within a range.
+
+    :param start: The start of the range.
+    :param end: The end of the range.
+    :param first_line: The index of the first line of the range in the dump.
+    :param interval: The sampling interval in lines.
+    :return: The documents and the number of lines that could not be parsed.
+    """
+    documents = []
+    errors = 0
+    for line, (line_start, line_end) in enumerate(_lines(_worker_map, start, end), start=first_line):
+        if line % interval:
+            continue
+        try:
+            documents.append(_document(line_start, line_end))
+        except ValueError as e:
+            print(f"Error decoding JSON on line {line}: {e}")
+            errors += 1
+
+    return documents, errors
+
+
+def _allocate(strata: Counter, samples: int) -> dict:
+    """
+    This function splits the samples over the strata by their share of the lines (largest remainder).
+
+    :param strata: The number of lines per stratum.
+    :param samples: The number of samples.
+    :return: The number of samples per stratum.
+    """
+    total = sum(strata.values())
+    if not total:
+        return {}
+
+    shares = {stratum: min(samples * count / total, count) for stratum, count in strata.items()}
+    quotas = {stratum: int(share) for stratum, share in shares.items()}
+    left = min(samples, total) - sum(quotas.values())
+    for stratum in sorted(shares, key=lambda s: shares[s] - quotas[s], reverse=True)[:left]:
+        quotas[stratum] += 1
+
+    return quotas
+
+
+def _select(candidates: list[tuple], strata: Counter, samples: int, method: str) -> list[tuple]:
+    """
+    This function selects the lines with the smallest keys, per stratum for stratified sampling.
+
+    :param candidates: The kept lines of all ranges, as (key, stratum, start, end).
+    :param strata: The number of lines per stratum.
+    :param samples: The number of samples.
+    :param method: 'reservoir' or 'stratified'.
+    """
+    candidates = sorted(candidates)
+    if method == 'reservoir':
+        return candidates[:samples]
+
+    quotas = _allocate(strata, samples)
+    selected = []
+    for candidate in candidates:
+        if quotas.get(candidate[1], 0) > 0:
+            quotas[candidate[1]] -= 1
+            selected.append(candidate)
+
+    return selected
+
+
+def _progress(futures: list, stage: str, interval: float = PROGRESS_INTERVAL):
+    """
+    This function yields futures as they complete and prints how many are done at most once per interval.
+
+    :param futures: The futures of a stage.
+    :param stage: The name of the stage shown in the progress lines.
+    :param interval: Minimum number of seconds between two progress lines.
+    """
+    logged = time.perf_counter()
+    for done, future in enumerate(as_completed(futures), start=1):
+        now = time.perf_counter()
+        if now - logged >= interval or done == len(futures):
+            print(f"{stage}: {done}/{len(futures)}")
+            logged = now
+        yield future
+
+
+def _sample_systematic(pool, chunks: list[tuple], desired_samples: int, sample_interval: int | None) -> list:
+    """
+    This function starts parsing a systematic sample of the dump.
+
+    :param pool: The process pool.
+    :param chunks: The ranges of the dump.
+    :param desired_samples: The number of samples, used if sample_interval is None.
+    :param sample_interval: The sampling interval in lines.
+    :return: The futures of the parsed documents.
+    """
+    # The index of the first line of every range
+    counts = [0] * len(chunks)
+    futures = {pool.submit(_count_lines, start, end): i for i, (start, end) in enumerate(chunks)}
+    for future in _progress(list(futures), 'Counting lines'):
+        counts[futures[future]] = future.result()
+    first_lines = [0, *accumulate(counts)]
+
+    interval = sample_interval or max(first_lines[-1] // desired_samples, 1)
+    print(f"{first_lines[-1]} lines, sampling every {interval}. line")
+
+    return [
+        pool.submit(_parse_systematic, start, end, first_line, interval)
+        for (start, end), first_line in zip(chunks, first_lines)
+    ]
+
+
+def _sample_random(
+        pool,
+        chunks: list[tuple],
+        size: int,
+        method: str,
+        desired_samples: int,
+        stratify_by: tuple,
+        seed: int,
+        batch_size: int
+       ) -> list:
+    """
+    This function starts parsing a reservoir or stratified sample of the dump.
+
+    Every range keeps about twice its share of the samples. If a range dropped a line whose key might have been
+    selected, it is scanned again keeping more lines, so the sample is the same as with unlimited capacity.
+
+    :param pool: The process pool.
+    :param chunks: The ranges of the dump.
+    :param size: The size of the dump in bytes.
+    :param method: 'reservoir' or 'stratified'.
+    :param desired_samples: The number of samples.
+    :param stratify_by: The fields of the strata, only used for stratified sampling.
+    :param seed: The seed of the random keys.
+    :param batch_size: The number of lines parsed per task.
+    :return: The futures of the parsed documents.
+    """
+    stratify_by = tuple(stratify_by) if method == 'stratified' else ()
+    capacities = {chunk: 2 * desired_samples * (chunk[1] - chunk[0]) // size + 100 for chunk in chunks}
+    scans = {}
+    strata = None
+    pending = chunks
+
+    while True:
+        futures = {
+            pool.submit(_scan_chunk, start, end, seed, capacities[(start, end)], stratify_by): (start, end)
+            for start, end in pending
+        }
+        for future in _progress(list(futures), 'Scanning lines'):
+            scans[futures[future]] = future.result()
+
+        # The line counts of a range do not change if it is scanned again
+        if strata is None:
+            strata = sum((chunk_strata for chunk_strata, _, _ in scans.values()), Counter())
+        candidates = [candidate for _, chunk_candidates, _ in scans.values() for candidate in chunk_candidates]
+        selected = _select(candidates, strata, desired_samples, method)
+
+        # Scan the ranges again that may have dropped a line with a key below the largest selected one
+        largest = max((key for key, *_ in selected), default=0.0)
+        pending = [chunk for chunk, (_, _, complete_below) in scans.items() if complete_below < largest]
+        if not pending:
+            break
+        for chunk in pending:
+            capacities[chunk] *= 4
+
+    if stratify_by:
+        print(f"{sum(strata.values())} lines in {len(strata)} strata")
+    else:
+        print(f"{sum(strata.values())} lines")
+
+    # Parse the selected lines in the order of the dump
+    ranges = sorted((start, end) for _, _, start, end in selected)
+    return [pool.submit(_parse_ranges, ranges[i:i + batch_size]) for i in range(0, len(ranges), batch_size)]
+
+
+def _write_batch(collection, documents: list[dict]) -> int:
+    """
+    This function writes documents with an unordered insert_many, the other documents are written if some fail.
+
+    :param collection: The MongoDB collection.
+    :param documents: The documents to write.
+    :return: The number of written documents.
+    """
+    try:
+        return len(collection.insert_many(documents, ordered=False).inserted_ids)
+    except BulkWriteError as e:
+        print(f"Error: {len(e.details['writeErrors'])} of {len(documents)} job postings not written")
+        print(e.details['writeErrors'][0].get('errmsg'))
+        return e.details['nInserted']
+
+
+def sample_file(
+        filename: str,
+        collection,
+        method: str = 'systematic',
+        desired_samples: int = 35000,
+        sample_interval: int | None = None,
+        stratify_by: tuple = ('sourceCC', 'source'),
+        processes: int | None = None,
+        writers: int = 4,
+        batch_size: int = 1000,
+        chunk_size: int = CHUNK_SIZE,
+        seed: int = 0
+       ) -> int:
+    """
+    This function samples the job postings of a JSON lines dump into a MongoDB collection.
+
+    :param filename: The path of the dump.
+    :param collection: The MongoDB collection to write the sample to.
+    :param method: The sampling method, one of SAMPLING_METHODS.
+    :param desired_samples: The number of samples.
+    :param sample_interval: The interval of systematic sampling in lines, derived from desired_samples if None.
+    :param stratify_by: The top-level string fields of the strata of stratified sampling.
+    :param processes: The number of processes scanning and parsing the dump, the number of CPUs if None.
+    :param writers: The number of threads writing to MongoDB.
+    :param batch_size: The number of documents per insert_many.
+    :param chunk_size: The number of bytes per scanned range.
+    :param seed: The seed of reservoir and stratified sampling.
+    :return: The number of written documents.
+    """
+    if method not in SAMPLING_METHODS:
+        raise ValueError(f"Unknown sampling method {method}, expected one of {SAMPLING_METHODS}")
+
+    size = os.path.getsize(filename)
+    if not size:
+        return 0
+    with open(filename, 'rb') as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as file_map:
+        chunks = chunk_ranges(file_map, chunk_size)
+
+    start = time.perf_counter()
+    written = 0
+    errors = 0
+    with ProcessPoolExecutor(processes, initializer=_init_worker, initargs=(filename,)) as pool, \
+            ThreadPoolExecutor(writers, thread_name_prefix='writer') as writer_pool:
+        if method == 'systematic':
+            parsing = _sample_systematic(pool, chunks, desired_samples, sample_interval)
+        else:
+            parsing = _sample_random(pool, chunks, size, method, desired_samples, stratify_by, seed, batch_size)
+
+        # Write full batches while the remaining lines are parsed
+        writes = []
+        batch = []
+        for future in _progress(parsing, 'Parsing samples'):
+            documents, failed = future.result()
+            errors += failed
+            batch.extend(documents)
+            while len(batch) >= batch_size:
+                writes.append(writer_pool.submit(_write_batch, collection, batch[:batch_size]))
+                batch = batch[batch_size:]
+
+        # Write the remaining documents
+        if batch:
+            writes.append(writer_pool.submit(_write_batch, collection, batch))
+
+        for future in _progress(writes, 'Writing batches'):
+            written += future.result()
+
+    seconds = time.perf_counter() - start
+    print(f"{written} job postings written in {seconds:.1f}s, {errors} lines could not be parsed")
+    return written
+
 
 # Load environment variables
 dotenv.load_dotenv(dotenv.find_dotenv())
 
 # MongoDB setup
-client = MongoClient(os.getenv("MongoClientURI"))
-mongodb = client['raw_data']
-collection = mongodb['KGL_JPS']
+mongo_url = os.getenv("MongoClientURI")
+mongo_collection_name = 'KGL_JPS'
 
 # File and sampling setup
-
 filename = 'techmap-jobs-dump-2021-09.json'
-total_lines = 3470024
+sampling_method = 'systematic'  # One of SAMPLING_METHODS
 desired_samples = 35000
-my_script_counter = 0
-interval = total_lines // desired_samples
-
-# Sampling and loading data
-with open(filename, 'r', encoding='utf-8') as file:
-    selected_objects = []
-    for i, line in enumerate(file):
-        # Print progress
-        my_script_counter += 1
-        print(f"Progress: {my_script_counter}")
-
-        # Insert in batches to manage memory usage
-        if i % interval == 0:
-            try:
-                json_data = json.loads(line.strip())
-                # Rename the '_id' field to 'original_id'
-                if '_id' in json_data:
-                    json_data['original_id'] = json_data.pop('_id')
-                selected_objects.append(json_data)
-                # Insert in batches to manage memory usage
-                if len(selected_objects) >= 1000:
-                    collection.insert_many(selected_objects)
-                    selected_objects = []
-            except json.JSONDecodeError as e:
-                print(f"Error decoding JSON on line {i}: {e}")
-
-    # Insert any remaining documents in the batch
-    if selected_objects:
-        collection.insert_many(selected_objects)
-
-print("Data loading complete.")
+sample_interval = None  # Derived from desired_samples and the line count if None
+stratify_by = ('sourceCC', 'source')  # Country and source of the job postings
+sampling_seed = 0
+
+# Number of processes scanning the dump (None uses all CPUs), of threads writing to MongoDB and documents per write
+processes = None
+writers = 4
+batch_size = 1000
+
+if __name__ == "__main__":
+    with MongoClient(mongo_url) as client:
+        sample_file(
+            filename,
+            client['raw_data'][mongo_collection_name],
+            sampling_method,
+            desired_samples,
+            sample_interval,
+            stratify_by,
+            processes,
+            writers,
+            batch_size,
+            seed=sampling_seed
+        )
+
+    print("Data loading complete.")
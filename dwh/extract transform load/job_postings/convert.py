@@ -0,0 +1,216 @@
+"""
+This module contains functions to convert job postings (techmap dump documents sampled into KGL_JPS) to DWH tables.
+
+The dump is sampled line by line with import_job_postings.py, so its MongoDB extended JSON values are plain
+dictionaries in KGL_JPS: the techmap _id (original_id) is {'$oid': ...} and the dates are {'$date': ...}.
+Every converter returns a compact record (a named tuple) whose fields match the column order of the target table.
+"""
+import datetime
+from typing import NamedTuple
+# The posting locations are members of the location dimension of the LinkedIn companies
+from dwh.linkedin_data.companies.convert import Location
+
+# Fields of the postings holding their skills, as paths of nested fields (a list or a comma separated text)
+SKILL_FIELDS = (
+    ('skills',),
+    ('position', 'skills'),
+    ('json', 'schemaOrg', 'skills')
+)
+
+# Maximum length of the name of a DIM_PRF_Trait member, longer "skills" are sentences of the posting text
+TRAIT_NAME_LENGTH = 71
+
+# Maximum lengths of the text columns of FACT_JPS_Posting, longer values are cut so a batch does not fail on them
+COLUMN_LENGTHS = {
+    'source': 45,
+    'locale': 10,
+    'title': 255,
+    'company': 255,
+    'workType': 45,
+    'contractType': 45,
+    'careerLevel': 45
+}
+
+# Fields of the postings read by the converters (position includes its skills), the html of the postings is not read
+PROJECTION = {
+    'original_id': 1,
+    'sourceCC': 1,
+    'source': 1,
+    'locale': 1,
+    'name': 1,
+    'url': 1,
+    'text': 1,
+    'dateCreated': 1,
+    'position': 1,
+    'orgAddress': 1,
+    'orgCompany': 1,
+    'skills': 1,
+    'json.schemaOrg.skills': 1
+}
+
+
+class Posting(NamedTuple):
+    """
+    A row of the FACT_JPS_Posting table (without the id).
+    """
+    idLocation: int | None
+    idCompany: int | None
+    sourceCountry: str | None
+    source: str | None
+    locale: str | None
+    title: str | None
+    company: str | None
+    workType: str | None
+    contractType: str | None
+    careerLevel: str | None
+    datePosted: datetime.date | None
+    url: int
+    text: str | None
+    originalId: str | None
+    mongoCollectionId: object
+    idOrigin: int
+
+
+def _nested(document: dict, path: tuple):
+    """
+    This function returns the value of a nested field, None if a field on the path is missing.
+
+    :param document: The document to read.
+    :param path: The names of the nested fields.
+    """
+    value = document
+    for field in path:
+        if not isinstance(value, dict):
+            return None
+        value = value.get(field)
+    return value
+
+
+def _cut(value, column: str) -> str | None:
+    """
+    This function cuts a text to the length of its column.
+
+    :param value: The text, None or any other value is returned as None.
+    :param column: The column of FACT_JPS_Posting, see COLUMN_LENGTHS.
+    """
+    return value.strip()[:COLUMN_LENGTHS[column]] or None if isinstance(value, str) else None
+
+
+def object_id(value) -> str | None:
+    """
+    This function returns the hex string of an ObjectId, also of its extended JSON form {'$oid': ...}.
+
+    :param value: The ObjectId.
+    """
+    if isinstance(value, dict):
+        value = value.get('$oid')
+    return str(value) if value is not None else None
+
+
+def convert_date(value) -> datetime.date | None:
+    """
+    This function converts a date of a posting to a Python datetime.date object.
+    Dates are datetime objects, ISO strings or their extended JSON forms {'$date': ...} (ISO string or milliseconds).
+
+    :param value: The date to convert.
+    :return: A date object or None if there is no valid date.
+    """
+    if isinstance(value, dict):
+        value = value.get('$date')
+        if isinstance(value, dict):
+            value = int(value.get('$numberLong', 0)) or None
+
+    if isinstance(value, datetime.datetime):
+        return value.date()
+    if isinstance(value, (int, float)):
+        return datetime.datetime.fromtimestamp(value / 1000, tz=datetime.timezone.utc).date()
+    if isinstance(value, str):
+        try:
+            return datetime.date.fromisoformat(value[:10])
+        except ValueError:
+            return None
+    return None
+
+
+def location(document: dict) -> Location | None:
+    """
+    This function converts the address of the organisation of a posting to the DIM_LIN_Location table.
+    Like the company locations, the country name is only kept if there is no country code.
+
+    :param document: The document to convert.
+    :return: The location or None if the posting has no address.
+    """
+    address = document.get('orgAddress')
+    if not address:
+        return None
+
+    country_letters = (address.get('countryCode') or '').strip().upper() or None
+    if country_letters and len(country_letters) > 2:
+        country_letters = None
+    country_name = None if country_letters else (address.get('country') or '').strip() or None
+    state = address.get('state') or None
+    city = address.get('city') or None
+
+    # Addresses without any of the key fields (e.g. only a geo point) are not a location
+    if not any((country_letters, country_name, state, city)):
+        return None
+
+    # Create and return the record
+    return Location(countryLetters=country_letters, countryName=country_name, state=state, city=city)
+
+
+def skills(document: dict) -> list[str]:
+    """
+    This function collects the skills of a posting, every skill only once (case-insensitive).
+
+    :param document: The document to convert.
+    """
+    result = {}
+    for path in SKILL_FIELDS:
+        value = _nested(document, path)
+        if isinstance(value, str):
+            value = value.split(',')
+        for skill in value if isinstance(value, list) else []:
+            skill = skill.strip() if isinstance(skill, str) else None
+            if skill and len(skill) <= TRAIT_NAME_LENGTH:
+                result.setdefault(skill.casefold(), skill)
+
+    return list(result.values())
+
+
+def posting(
+        document: dict,
+        dimension_key_location: int | None,
+        company_id: int | None,
+        dimension_key_origin: int
+       ) -> Posting:
+    """
+    This function converts a job posting to the FACT_JPS_Posting table.
+
+    :param document: The document to convert.
+    :param dimension_key_location: The ID of the location dimension entry.
+    :param company_id: The ID of the company in FACT_CMP_Company, None if it is unknown.
+    :param dimension_key_origin: The ID of the origin in the DWH.
+    """
+    position = document.get('position') or {}
+    company = document.get('orgCompany') or {}
+
+    # Create and return the record
+    return Posting(
+        idLocation=dimension_key_location,
+        idCompany=company_id,
+        sourceCountry=(document.get('sourceCC') or '').upper()[:2] or None,
+        source=_cut(document.get('source'), 'source'),
+        locale=_cut(document.get('locale'), 'locale'),
+        title=_cut(document.get('name') or position.get('name'), 'title'),
+        company=_cut(company.get('name'), 'company'),
+        workType=_cut(position.get('workType'), 'workType'),
+        contractType=_cut(position.get('contractType'), 'contractType'),
+        careerLevel=_cut(position.get('careerLevel'), 'careerLevel'),
+        datePosted=convert_date(document.get('dateCreated')),
+        url=1 if document.get('url') else 0,
+        text=document.get('text'),
+        originalId=object_id(document.get('original_id')),
+        mongoCollectionId=document.get('_id'),
+        idOrigin=dimension_key_origin
+    )
@@ -0,0 +1,91 @@
+-- Tables of the job postings (KGL_JPS), imported by import_script_job_postings.py.
+-- Run after dwh_schema_linkedin.sql: the postings share the location dimension DIM_LIN_Location with the companies
+-- and the skills of DIM_PRF_Trait (type 'skill') with the profiles, so candidates are matched against postings by
+-- joining REL_JPS_Posting_Trait and REL_PRF_Person_Trait on idTrait. Add the origin of the postings with
+-- dwh_add_datasource.sql (abbreviation 'JPS', mongoCollectionName 'KGL_JPS').
+SET @OLD_UNIQUE_CHECKS=@@UNIQUE_CHECKS, UNIQUE_CHECKS=0;
+SET @OLD_FOREIGN_KEY_CHECKS=@@FOREIGN_KEY_CHECKS, FOREIGN_KEY_CHECKS=0;
+SET @OLD_SQL_MODE=@@SQL_MODE, SQL_MODE='ONLY_FULL_GROUP_BY,STRICT_TRANS_TABLES,NO_ZERO_IN_DATE,NO_ZERO_DATE,ERROR_FOR_DIVISION_BY_ZERO,NO_ENGINE_SUBSTITUTION';
+
+USE `DWH` ;
+
+-- -----------------------------------------------------
+-- Table `DWH`.`FACT_JPS_Posting`
+-- -----------------------------------------------------
+CREATE TABLE IF NOT EXISTS `DWH`.`FACT_JPS_Posting` (
+  `id` INT NOT NULL AUTO_INCREMENT,
+  `idOrigin` INT NOT NULL,
+  `idLocation` INT NULL COMMENT 'orgAddress attribute as DIM_LIN_Location (countryCode, country if there is no code, state, city)',
+  `idCompany` INT NULL COMMENT 'FACT_CMP_Company of the orgCompany attribute, resolved by its url or name (links.py)',
+  `mongoCollectionId` CHAR(24) NOT NULL COMMENT 'ObjectId for matching mongoDB document',
+  `originalId` CHAR(24) NULL COMMENT 'original_id attribute, the _id of the posting in the techmap dump',
+  `sourceCountry` CHAR(2) NULL COMMENT 'sourceCC attribute',
+  `source` VARCHAR(45) NULL COMMENT 'source attribute',
+  `locale` VARCHAR(10) NULL COMMENT 'locale attribute',
+  `title` VARCHAR(255) NULL COMMENT 'name attribute, position.name if there is none',
+  `company` VARCHAR(255) NULL COMMENT 'orgCompany.name attribute',
+  `workType` VARCHAR(45) NULL COMMENT 'position.workType attribute',
+  `contractType` VARCHAR(45) NULL COMMENT 'position.contractType attribute',
+  `careerLevel` VARCHAR(45) NULL COMMENT 'position.careerLevel attribute',
+  `datePosted` DATE NULL COMMENT 'dateCreated attribute',
+  `url` TINYINT NULL COMMENT 'url attribute\n\nhas link= 1\nno link= 0',
+  `textLength` INT UNSIGNED NULL COMMENT 'length of the text attribute, the text is in TXT_JPS_Posting',
+  PRIMARY KEY (`id`),
+  INDEX `fk_FACT_JPS_Posting_DIM_Origin1_idx` (`idOrigin` ASC) ,
+  INDEX `fk_FACT_JPS_Posting_DIM_LIN_Location1_idx` (`idLocation` ASC) ,
+  INDEX `fk_FACT_JPS_Posting_FACT_CMP_Company1_idx` (`idCompany` ASC) ,
+  INDEX `mongoCollectionId_idx` (`mongoCollectionId` ASC) ,
+  CONSTRAINT `fk_FACT_JPS_Posting_DIM_Origin1`
+    FOREIGN KEY (`idOrigin`)
+    REFERENCES `DWH`.`DIM_Origin` (`id`)
+    ON DELETE NO ACTION
+    ON UPDATE NO ACTION,
+  CONSTRAINT `fk_FACT_JPS_Posting_DIM_LIN_Location1`
+    FOREIGN KEY (`idLocation`)
+    REFERENCES `DWH`.`DIM_LIN_Location` (`id`)
+    ON DELETE NO ACTION
+    ON UPDATE NO ACTION,
+  CONSTRAINT `fk_FACT_JPS_Posting_FACT_CMP_Company1`
+    FOREIGN KEY (`idCompany`)
+    REFERENCES `DWH`.`FACT_CMP_Company` (`id`)
+    ON DELETE NO ACTION
+    ON UPDATE NO ACTION)
+ENGINE = InnoDB;
+
+
+-- -----------------------------------------------------
+-- Table `DWH`.`TXT_JPS_Posting`
+-- -----------------------------------------------------
+CREATE TABLE IF NOT EXISTS `DWH`.`TXT_JPS_Posting` (
+  `idPosting` INT NOT NULL,
+  `text` MEDIUMTEXT NOT NULL COMMENT 'text attribute of FACT_JPS_Posting',
+  PRIMARY KEY (`idPosting`))
+ENGINE = InnoDB
+ROW_FORMAT = COMPRESSED
+KEY_BLOCK_SIZE = 8;
+
+
+-- -----------------------------------------------------
+-- Table `DWH`.`REL_JPS_Posting_Trait`
+-- -----------------------------------------------------
+CREATE TABLE IF NOT EXISTS `DWH`.`REL_JPS_Posting_Trait` (
+  `idPosting` INT NOT NULL,
+  `idTrait` INT NOT NULL COMMENT 'DIM_PRF_Trait of type skill',
+  PRIMARY KEY (`idPosting`, `idTrait`),
+  INDEX `fk_REL_JPS_Posting_Trait_DIM_PRF_Trait1_idx` (`idTrait` ASC) ,
+  CONSTRAINT `fk_REL_JPS_Posting_Trait_FACT_JPS_Posting1`
+    FOREIGN KEY (`idPosting`)
+    REFERENCES `DWH`.`FACT_JPS_Posting` (`id`)
+    ON DELETE NO ACTION
+    ON UPDATE NO ACTION,
+  CONSTRAINT `fk_REL_JPS_Posting_Trait_DIM_PRF_Trait1`
+    FOREIGN KEY (`idTrait`)
+    REFERENCES `DWH`.`DIM_PRF_Trait` (`id`)
+    ON DELETE NO ACTION
+    ON UPDATE NO ACTION)
+ENGINE = InnoDB;
+
+
+SET SQL_MODE=@OLD_SQL_MODE;
+SET FOREIGN_KEY_CHECKS=@OLD_FOREIGN_KEY_CHECKS;
+SET UNIQUE_CHECKS=@OLD_UNIQUE_CHECKS;
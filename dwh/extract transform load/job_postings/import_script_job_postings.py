@@ -0,0 +1,199 @@
+"""
+This script is used to import the job postings sampled into the MongoDB collection KGL_JPS into the DWH.
+
+The postings are read in ascending _id order and written batch by batch, every batch within one transaction
+together with its checkpoint (ETL_Checkpoint). An interrupted import resumes after the last committed batch,
+a failed batch stops the import, so the checkpoint never skips postings. Postings sampled into KGL_JPS later
+get larger _ids and are imported by the next run.
+
+Create the tables with dwh_schema_job_postings.sql and the origin of the postings with dwh_add_datasource.sql first.
+"""
+import os
+import time
+from dotenv import load_dotenv, find_dotenv
+from pymongo import MongoClient
+from sqlalchemy import create_engine  # Requires pymysql
+
+# Import batch conversion functions
+from dwh.job_postings import insert
+from dwh.job_postings import convert as conv
+from dwh.linkedin_data import metrics
+from dwh.linkedin_data import sharding
+from dwh.linkedin_data.keys import KeyAllocator
+from dwh.linkedin_data.links import CompanyIndex
+from dwh.linkedin_data.dimensions import DimensionCache
+from dwh.linkedin_data.checkpoints import CheckpointStore
+
+
+def insert_collection_documents(
+        collection_str: str,
+        id_origin: int,
+        dwh_connection_url: str,
+        mongo_connection_url: str,
+        schema_name: str = 'DWH',
+        batch_size: int = 1000,
+        resume: bool = True,
+        link_companies: bool = True,
+        mongo_client=None
+       ) -> bool:
+    """
+    This function imports the job postings of a collection into the DWH.
+
+    :param collection_str: The name of the MongoDB collection.
+    :param id_origin: The ID of the DIM_Origin table from the dwh.
+    :param dwh_connection_url: The connection string of the DWH.
+    :param mongo_connection_url: The connection string of the MongoDB.
+    :param schema_name: The name of the DWH schema.
+    :param batch_size: Number of postings written per transaction.
+    :param resume: Whether to continue after the last committed _id, False imports the whole collection again
+                   (delete the postings of the origin first).
+    :param link_companies: Whether to link the postings to the imported companies (FACT_JPS_Posting.idCompany).
+    :param mongo_client: The MongoDB client to read from, a new one is created from mongo_connection_url if None.
+    :return: Whether all postings have been imported.
+    """
+    # !!!UNENCRYPTED CONNECTION ONLY USE ON LAN!!!
+    # Add charset to connection string to avoid encoding issues
+    dwh = create_engine(f'{dwh_connection_url}/{schema_name}?charset=utf8mb4')  # echo=True for debugging
+    metrics.instrument_engine(dwh)  # Count the round trips and written rows
+
+    # Get the collection details
+    if mongo_client is None:
+        mongo_client = MongoClient(mongo_connection_url)
+    collection = mongo_client["raw_data"][collection_str]
+
+    # Continue after the last committed posting
+    checkpoint_store = CheckpointStore(dwh)
+    if not resume:
+        checkpoint_store.clear(collection_str)
+    query = sharding.range_filter(after=checkpoint_store.last_id(collection_str))
+
+    # Resolve the dimensions and companies in memory
+    key_allocator = KeyAllocator(dwh)
+    dimension_cache = DimensionCache(dwh, key_allocator)
+    dimension_cache.warm(insert.DIMENSION_TABLES)
+    company_index = None
+    if link_companies:
+        company_index = CompanyIndex(dwh)
+        print(f"Company index: {company_index.load()} companies")
+
+    # Initialize the progress, logged at most every few seconds together with an ETA
+    failed = False
+    postings = 0
+    start = time.perf_counter()
+    progress = metrics.Progress(collection_str, collection.count_documents(query))
+
+    # Get the collection cursor, sorted by _id so the checkpoints are meaningful, without the html of the postings
+    cursor = collection.find(query, conv.PROJECTION).sort('_id', 1).batch_size(batch_size)
+    documents = progress.track(metrics.timed_iter(cursor, 'mongo.read'))
+
+    batch = []
+    for doc in documents:
+        batch.append(doc)
+
+        if len(batch) >= batch_size:
+            count = _insert_batch(
+                collection_str, batch, id_origin, dwh, key_allocator, dimension_cache, checkpoint_store, company_index
+            )
+            if count is None:
+                failed = True
+                break
+            postings += count
+            batch = []
+
+    # Insert the remaining documents
+    if batch and not failed:
+        count = _insert_batch(
+            collection_str, batch, id_origin, dwh, key_allocator, dimension_cache, checkpoint_store, company_index
+        )
+        failed = count is None
+        postings += count or 0
+
+    progress.finish()
+    if not failed:
+        checkpoint_store.finish(collection_str)
+
+    # Show the throughput and how the dimensions and companies were resolved
+    seconds = time.perf_counter() - start
+    print(f"{collection_str}: {postings} postings in {seconds:.1f}s ({postings / max(seconds, 1e-9):.1f} postings/s)")
+    print(dimension_cache.report())
+    if company_index is not None:
+        print(company_index.report(items='postings'))
+
+    return not failed
+
+
+def _insert_batch(
+        collection_str: str,
+        batch: list[dict],
+        id_origin: int,
+        dwh,
+        key_allocator,
+        dimension_cache,
+        checkpoint_store: CheckpointStore,
+        company_index=None
+       ) -> int | None:
+    """
+    This function inserts a batch of documents with its checkpoint and reports errors instead of raising them.
+
+    :param collection_str: The name of the MongoDB collection.
+    :param batch: The documents to insert.
+    :param id_origin: The ID of the DIM_Origin table from the dwh.
+    :param dwh: The DWH engine to use.
+    :param key_allocator: The key allocator used to assign the keys.
+    :param dimension_cache: The dimension cache used to resolve the dimension members.
+    :param checkpoint_store: The checkpoint store the last _id of the batch is recorded in.
+    :param company_index: The company index used to link the postings to their companies, None skips them.
+    :return: The number of postings inserted, None if the batch failed.
+    """
+    try:
+        return insert.insert_documents(
+            batch, id_origin, dwh, key_allocator, dimension_cache,
+            lambda connection: checkpoint_store.save(connection, collection_str, None, batch[-1]['_id']),
+            company_index
+        )
+    except Exception as e:
+        print(f"Error: {collection_str} batch {batch[0]['_id']} - {batch[-1]['_id']}")
+        print(e)
+        metrics.inc('errors_total', stage='batch')
+        return None
+
+
+# Load environment variables
+load_dotenv(find_dotenv())
+
+# Connection strings
+mysql_url = os.getenv("DATABASE_DWH")
+mongo_url = os.getenv("MongoClientURI")
+
+# Define the schema name, collection name, and the origin ID (added with dwh_add_datasource.sql)
+dwh_schema_name = 'DWH'
+mongo_collection_name = "KGL_JPS"
+dwh_id_origin = 0
+
+# Number of postings written per transaction
+batch_size = 1000
+
+# Continue after the last committed posting (False imports the whole collection again, delete its postings first)
+resume = True
+
+# Link the postings to the imported companies (run import_script_companies.py first)
+link_companies = True
+
+# Port of the /metrics endpoint scraped by Prometheus (None disables it)
+metrics_port = 9110
+
+if __name__ == "__main__":
+    # Serve the metrics while the import is running
+    if metrics_port:
+        metrics.serve(metrics_port)
+
+    insert_collection_documents(
+        mongo_collection_name,
+        dwh_id_origin,
+        mysql_url,
+        mongo_url,
+        dwh_schema_name,
+        batch_size,
+        resume,
+        link_companies
+    )
@@ -0,0 +1,181 @@
+"""
+This module holds the functions used to import whole batches of job postings into the DWH at once.
+
+A batch of documents is converted into rows per table first, with the posting keys assigned on the client side
+by the key allocator and the locations and skills resolved through the dimension cache of the LinkedIn importers.
+The postings share DIM_LIN_Location with the companies and DIM_PRF_Trait with the profiles, so the skills of
+postings and persons are joined by their trait id, e.g.
+SELECT ... FROM REL_JPS_Posting_Trait pt JOIN REL_PRF_Person_Trait ct ON pt.idTrait = ct.idTrait
+"""
+from collections import defaultdict
+# Import conversion functions
+from dwh.job_postings import convert as conv
+from dwh.linkedin_data import metrics
+from dwh.linkedin_data import texts
+
+# Columns written per table, the rows of a batch are tuples in this order
+# (the converter puts the text at the position of its length column, see texts.TEXTS)
+COLUMNS = {
+    'FACT_JPS_Posting': (
+        'id', 'idLocation', 'idCompany', 'sourceCountry', 'source', 'locale', 'title', 'company', 'workType',
+        'contractType', 'careerLevel', 'datePosted', 'url', 'textLength', 'originalId', 'mongoCollectionId', 'idOrigin'
+    ),
+    'TXT_JPS_Posting': ('idPosting', 'text'),
+    'REL_JPS_Posting_Trait': ('idPosting', 'idTrait')
+}
+
+# Fact and relation tables in the order they have to be written (referenced tables first)
+WRITE_ORDER = (
+    'FACT_JPS_Posting',
+    'TXT_JPS_Posting',
+    'REL_JPS_Posting_Trait'
+)
+
+# Dimension tables resolved through the dimension cache
+DIMENSION_TABLES = ('DIM_LIN_Location', 'DIM_PRF_Trait')
+
+
+def dimension_keys(document: dict) -> dict[str, list[tuple]]:
+    """
+    This function collects the natural keys of all dimension members referenced by a document.
+
+    DWH tables: DIM_LIN_Location, DIM_PRF_Trait
+
+    :param document: The document to convert.
+    :return: A dictionary mapping the dimension tables to the natural keys.
+    """
+    keys = defaultdict(list)
+    posting_location = conv.location(document)
+    if posting_location:
+        keys['DIM_LIN_Location'].append(posting_location)
+    for skill in conv.skills(document):
+        keys['DIM_PRF_Trait'].append(('skill', skill))
+
+    return keys
+
+
+def convert_document(
+        document: dict,
+        posting_id: int,
+        origin_id: int,
+        dimension_ids: dict,
+        rows: dict,
+        company_index=None
+       ):
+    """
+    This function converts a document into rows and appends them to the rows of the batch.
+
+    :param document: The document to convert.
+    :param posting_id: The ID reserved for the posting.
+    :param origin_id: The ID of the DIM_Origin table from the dwh.
+    :param dimension_ids: The resolved dimension ids per table and natural key.
+    :param rows: The rows of the batch per table.
+    :param company_index: The company index used to link the postings to their companies, None skips them.
+    """
+    # Posting, its location and company
+    posting_location = conv.location(document)
+    location_id = dimension_ids['DIM_LIN_Location'][posting_location] if posting_location else None
+    company_id = None
+    if company_index is not None:
+        company = document.get('orgCompany') or {}
+        company_id = company_index.resolve(company.get('url'), company.get('name'))
+    rows['FACT_JPS_Posting'].append((posting_id, *conv.posting(document, location_id, company_id, origin_id)))
+
+    # Skills, every skill is only added once per posting
+    trait_ids = {dimension_ids['DIM_PRF_Trait'][('skill', skill)] for skill in conv.skills(document)}
+    rows['REL_JPS_Posting_Trait'].extend((posting_id, trait_id) for trait_id in sorted(trait_ids))
+
+
+def write_rows(connection, table: str, rows: list[tuple]):
+    """
+    This function writes rows into a table with a single multi-row INSERT.
+
+    :param connection: The DWH connection to use.
+    :param table: The name of the table.
+    :param rows: The rows to insert, in the column order of the table.
+    """
+    if rows:
+        columns = COLUMNS[table]
+        query = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join(['%s'] * len(columns))})"
+        with metrics.timer(f'write.{table}'):
+            connection.exec_driver_sql(query, rows)
+
+
+def convert_documents(
+        documents: list[dict],
+        origin_id: int,
+        key_allocator,
+        dimension_cache,
+        company_index=None
+       ) -> tuple[int, dict]:
+    """
+    This function converts a batch of documents into rows per table with all keys assigned.
+    The documents are not checked against the DWH, the import resumes after the checkpoint of its last batch.
+
+    :param documents: The documents to convert.
+    :param origin_id: The ID of the DIM_Origin table from the dwh.
+    :param key_allocator: The key allocator used to assign the keys.
+    :param dimension_cache: The dimension cache used to resolve the dimension members.
+    :param company_index: The company index used to link the postings to their companies, None skips them.
+    :return: The number of converted postings and their rows per table.
+    """
+    # Collect the natural keys of all dimension members used by the batch
+    keys = defaultdict(list)
+    for doc in documents:
+        for table, table_keys in dimension_keys(doc).items():
+            keys[table].extend(table_keys)
+
+    # Resolve the dimensions once for the whole batch
+    with metrics.timer('dimensions'):
+        dimension_ids = {table: dimension_cache.resolve_many(table, table_keys) for table, table_keys in keys.items()}
+    dimension_ids.setdefault('DIM_LIN_Location', {})
+    dimension_ids.setdefault('DIM_PRF_Trait', {})
+
+    # Convert the documents into rows
+    with metrics.timer('convert'):
+        rows = defaultdict(list)
+        posting_ids = key_allocator.reserve('FACT_JPS_Posting', len(documents))
+        for posting_id, doc in zip(posting_ids, documents):
+            convert_document(doc, posting_id, origin_id, dimension_ids, rows, company_index)
+
+        # Move the texts out of the posting rows into their text table
+        rows['FACT_JPS_Posting'], rows['TXT_JPS_Posting'] = texts.split_rows(
+            'FACT_JPS_Posting', COLUMNS['FACT_JPS_Posting'], rows['FACT_JPS_Posting']
+        )
+
+    return len(documents), rows
+
+
+def insert_documents(
+        documents: list[dict],
+        origin_id: int,
+        dwh_engine,
+        key_allocator,
+        dimension_cache,
+        checkpoint=None,
+        company_index=None
+       ) -> int:
+    """
+    This function converts a batch of documents and inserts them into the DWH within one transaction.
+    Every table is written with a single statement per batch.
+
+    :param documents: The documents to insert.
+    :param origin_id: The ID of the DIM_Origin table from the dwh.
+    :param dwh_engine: The DWH engine to use.
+    :param key_allocator: The key allocator used to assign the keys.
+    :param dimension_cache: The dimension cache used to resolve the dimension members.
+    :param checkpoint: Function called with the connection before the batch is committed (optional).
+    :param company_index: The company index used to link the postings to their companies, None skips them.
+    :return: The number of postings inserted.
+    """
+    count, rows = convert_documents(documents, origin_id, key_allocator, dimension_cache, company_index)
+
+    with dwh_engine.begin() as connection:
+        for table in WRITE_ORDER:
+            write_rows(connection, table, rows[table])
+
+        # Record the progress within the same transaction
+        if checkpoint is not None:
+            checkpoint(connection)
+
+    return count
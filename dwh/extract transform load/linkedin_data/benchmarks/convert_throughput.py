@@ -0,0 +1,92 @@
+"""
+This script measures how many rows per second the profile converters produce.
+
+It compares the one-row DataFrames the converters used to return with the records they return now
+and with the batch variants, on the same set of synthetic documents.
+"""
+import time
+import pandas as pd
+from dwh.linkedin_data.profiles import convert as conv
+from dwh.linkedin_data.benchmarks.generate import Generator
+
+
+def convert_records(documents: list[dict]) -> int:
+    """
+    This function converts the documents one record at a time and returns the number of rows.
+
+    :param documents: The documents to convert.
+    """
+    rows = 0
+    for doc in documents:
+        conv.location(doc)
+        conv.person(doc, 1, 1)
+        rows += 2
+        for experience in doc.get('experiences') or []:
+            conv.experience(experience)
+            rows += 1
+        for education in doc.get('education') or []:
+            conv.education(education)
+            rows += 1
+        for certification in doc.get('certifications') or []:
+            conv.certification(certification)
+            rows += 1
+    return rows
+
+
+def convert_dataframes(documents: list[dict]) -> int:
+    """
+    This function converts the documents into one-row DataFrames, like the converters used to.
+
+    :param documents: The documents to convert.
+    """
+    rows = 0
+    for doc in documents:
+        pd.DataFrame([conv.location(doc)._asdict()])
+        pd.DataFrame([conv.person(doc, 1, 1)._asdict()])
+        rows += 2
+        for experience in doc.get('experiences') or []:
+            pd.DataFrame([conv.experience(experience)._asdict()])
+            rows += 1
+        for education in doc.get('education') or []:
+            pd.DataFrame([conv.education(education)._asdict()])
+            rows += 1
+        for certification in doc.get('certifications') or []:
+            pd.DataFrame([conv.certification(certification)._asdict()])
+            rows += 1
+    return rows
+
+
+def convert_batches(documents: list[dict]) -> int:
+    """
+    This function converts the documents into column arrays with the batch variants.
+
+    :param documents: The documents to convert.
+    """
+    locations = conv.locations_batch(documents)
+    persons = conv.persons_batch(documents, {}, 1)
+    experiences = conv.experiences_batch(documents)
+    education = conv.education_batch(documents)
+    certifications = conv.certifications_batch(documents)
+    return sum(len(next(iter(columns.values()))) for columns in (
+        locations, persons, experiences, education, certifications
+    ))
+
+
+# Number of synthetic documents and the seed used to create them
+document_count = 20000
+seed = 42
+
+if __name__ == "__main__":
+    sample = Generator(seed).profiles(document_count)
+
+    results = {}
+    for name, run in (('dataframes', convert_dataframes), ('records', convert_records), ('batches', convert_batches)):
+        start = time.perf_counter()
+        rows = run(sample)
+        seconds = time.perf_counter() - start
+        results[name] = rows / seconds
+        print(f"{name}: {rows} rows in {seconds:.2f}s ({results[name]:,.0f} rows/s)")
+
+    # Compare against the DataFrame converters
+    for name, rate in results.items():
+        print(f"{name}: {rate / results['dataframes']:.1f}x DataFrames")
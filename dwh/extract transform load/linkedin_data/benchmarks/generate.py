@@ -0,0 +1,358 @@
+"""
+This module generates synthetic LinkedIn profile and company documents for the benchmarks.
+
+The documents have the shapes the converters expect (profiles/convert.py, companies/convert.py) and are
+generated from a seed, so every run and every commit is measured on exactly the same data. Names, skills,
+companies etc. are drawn from vocabularies with a skewed distribution, so the dimension tables see the
+same mix of frequent and rare members as with the real collections.
+"""
+import random
+from bson import ObjectId
+
+# Number of items per document as (minimum, maximum), drawn uniformly
+SIZES = {
+    'experiences': (1, 8),
+    'education': (0, 3),
+    'volunteer_work': (0, 2),
+    'certifications': (0, 3),
+    'languages': (0, 3),
+    'skills': (0, 30),
+    'interests': (0, 5),
+    'groups': (0, 5),
+    'recommendations': (0, 3),
+    'activities': (0, 5),
+    'articles': (0, 2),
+    'accomplishment_organisations': (0, 1),
+    'accomplishment_publications': (0, 1),
+    'accomplishment_honors_awards': (0, 2),
+    'accomplishment_patents': (0, 1),
+    'accomplishment_test_scores': (0, 1),
+    'accomplishment_courses': (0, 3),
+    'accomplishment_projects': (0, 2),
+    'people_also_viewed': (0, 5),
+    'similarly_named_profiles': (0, 3),
+    'summary_words': (0, 120),
+    'description_words': (0, 60),
+    # Companies
+    'updates': (0, 10),
+    'similar_companies': (0, 10),
+    'specialities': (0, 8),
+    'locations': (1, 4)
+}
+
+# Number of distinct values per vocabulary, which is the size of the dimension tables
+VOCABULARY_SIZES = {
+    'first_name': 2000,
+    'last_name': 5000,
+    'title': 3000,
+    'company': 20000,
+    'school': 4000,
+    'degree': 30,
+    'field': 300,
+    'skill': 10000,
+    'interest': 2000,
+    'group': 8000,
+    'language': 60,
+    'industry': 150,
+    'city': 3000,
+    'word': 5000
+}
+
+# Countries with their letters and states
+COUNTRIES = (
+    ('US', 'United States of America', ('California', 'New York', 'Texas', 'Washington', 'Florida')),
+    ('IN', 'India', ('Karnataka', 'Maharashtra', 'Delhi', 'Tamil Nadu')),
+    ('CA', 'Canada', ('Ontario', 'Quebec', 'British Columbia')),
+    ('SG', 'Singapore', (None,)),
+    ('IL', 'Israel', ('Tel Aviv District', 'Central District')),
+    ('BR', 'Brazil', ('São Paulo', 'Rio de Janeiro')),
+    ('JP', 'Japan', ('Tokyo', 'Osaka')),
+    ('DK', 'Denmark', ('Capital Region', 'Central Denmark'))
+)
+
+
+class Generator:
+    """
+    This class generates reproducible profile and company documents.
+
+    Usage:
+        documents = Generator(seed=42).profiles(10000)
+    """
+
+    def __init__(self, seed: int = 42, sizes: dict | None = None, vocabulary_sizes: dict | None = None):
+        """
+        :param seed: The seed of the random number generator.
+        :param sizes: Number of items per document, missing values are taken from SIZES.
+        :param vocabulary_sizes: Number of distinct values per vocabulary, missing values are taken from VOCABULARY_SIZES.
+        """
+        self._rng = random.Random(seed)
+        self._sizes = {**SIZES, **(sizes or {})}
+        self._vocabularies = {}
+
+        # Skewed weights (Zipf with s = 1), a few values are frequent and most of them are rare
+        for name, size in {**VOCABULARY_SIZES, **(vocabulary_sizes or {})}.items():
+            weights = [1 / (rank + 1) for rank in range(size)]
+            cumulative = []
+            total = 0.0
+            for weight in weights:
+                total += weight
+                cumulative.append(total)
+            self._vocabularies[name] = ([f'{name.capitalize()} {rank}' for rank in range(size)], cumulative)
+
+    def word(self, vocabulary: str) -> str:
+        """
+        This function draws a value from a vocabulary.
+
+        :param vocabulary: The name of the vocabulary.
+        """
+        values, cumulative = self._vocabularies[vocabulary]
+        return self._rng.choices(values, cum_weights=cumulative)[0]
+
+    def count(self, attribute: str) -> int:
+        """
+        This function draws the number of items of an attribute.
+
+        :param attribute: The name of the attribute.
+        """
+        minimum, maximum = self._sizes[attribute]
+        return self._rng.randint(minimum, maximum)
+
+    def text(self, attribute: str = 'description_words') -> str | None:
+        """
+        This function generates a text, or None for an empty one.
+
+        :param attribute: The attribute holding the number of words.
+        """
+        words = self.count(attribute)
+        if not words:
+            return None
+        values, cumulative = self._vocabularies['word']
+        return ' '.join(self._rng.choices(values, cum_weights=cumulative, k=words))
+
+    def date(self, start_year: int = 1980, end_year: int = 2023) -> dict | None:
+        """
+        This function generates a date in the format of the documents, sometimes incomplete or missing.
+
+        :param start_year: The first possible year.
+        :param end_year: The last possible year.
+        """
+        draw = self._rng.random()
+        if draw < 0.05:
+            return None
+        date = {'day': self._rng.randint(1, 28), 'month': self._rng.randint(1, 12), 'year': self._rng.randint(start_year, end_year)}
+        if draw < 0.1:
+            del date['day']
+        return date
+
+    def location(self) -> dict:
+        """
+        This function generates a location of a profile.
+        """
+        letters, name, states = self._rng.choice(COUNTRIES)
+        return {'country': letters, 'country_full_name': name, 'state': self._rng.choice(states), 'city': self.word('city')}
+
+    def qualification(self, institution: str) -> dict:
+        """
+        This function generates an experience-like item with a duration.
+
+        :param institution: The vocabulary of the institution (company or school).
+        """
+        starts_at = self.date()
+        return {
+            'starts_at': starts_at,
+            'ends_at': self.date(starts_at['year'] if starts_at else 1980) if self._rng.random() < 0.7 else None,
+            'company': self.word(institution),
+            'company_linkedin_profile_url': None,
+            'title': self.word('title'),
+            'description': self.text(),
+            'location': self.word('city'),
+            'logo_url': None
+        }
+
+    def profile(self, index: int) -> dict:
+        """
+        This function generates a profile document.
+
+        :param index: The number of the document, used to derive its _id.
+        """
+        rng = self._rng
+        first_name, last_name = self.word('first_name'), self.word('last_name')
+        salary = rng.randint(30, 200) * 1000 if rng.random() < 0.3 else None
+
+        return {
+            '_id': ObjectId(f'{index:024x}'),
+            'public_identifier': f'{first_name}-{last_name}-{index}'.lower().replace(' ', '-'),
+            'profile_pic_url': 'https://example.com/p.jpg' if rng.random() < 0.6 else None,
+            'background_cover_image_url': 'https://example.com/b.jpg' if rng.random() < 0.3 else None,
+            'first_name': first_name,
+            'last_name': last_name,
+            'full_name': f'{first_name} {last_name}',
+            'occupation': f"{self.word('title')} at {self.word('company')}",
+            'headline': self.word('title'),
+            'summary': self.text('summary_words'),
+            **self.location(),
+            'experiences': [self.qualification('company') for _ in range(self.count('experiences'))],
+            'education': [
+                {
+                    **self.qualification('school'),
+                    'school': self.word('school'),
+                    'degree_name': self.word('degree') if rng.random() < 0.8 else None,
+                    'field_of_study': self.word('field') if rng.random() < 0.8 else None
+                }
+                for _ in range(self.count('education'))
+            ],
+            'languages': [self.word('language') for _ in range(self.count('languages'))],
+            'accomplishment_organisations': [
+                {
+                    'org_name': self.word('company'), 'title': self.word('title'), 'description': self.text(),
+                    'starts_at': self.date(), 'ends_at': self.date()
+                }
+                for _ in range(self.count('accomplishment_organisations'))
+            ],
+            'accomplishment_publications': [
+                {
+                    'name': self.text(), 'publisher': self.word('company'), 'published_on': self.date(),
+                    'description': self.text(), 'url': None
+                }
+                for _ in range(self.count('accomplishment_publications'))
+            ],
+            'accomplishment_honors_awards': [
+                {'title': self.word('title'), 'issuer': self.word('company'), 'issued_on': self.date(), 'description': self.text()}
+                for _ in range(self.count('accomplishment_honors_awards'))
+            ],
+            'accomplishment_patents': [
+                {
+                    'title': self.text(), 'issuer': 'US', 'issued_on': self.date(), 'description': self.text(),
+                    'application_number': f'US{rng.randint(10 ** 6, 10 ** 7)}' if rng.random() < 0.5 else None,
+                    'patent_number': f'{rng.randint(10 ** 6, 10 ** 7)}' if rng.random() < 0.5 else None,
+                    'url': None
+                }
+                for _ in range(self.count('accomplishment_patents'))
+            ],
+            'accomplishment_courses': [
+                {'name': self.word('field'), 'number': f'CS{rng.randint(100, 999)}' if rng.random() < 0.5 else None}
+                for _ in range(self.count('accomplishment_courses'))
+            ],
+            'accomplishment_projects': [
+                {'starts_at': self.date(), 'ends_at': self.date(), 'title': self.word('title'), 'description': self.text(), 'url': None}
+                for _ in range(self.count('accomplishment_projects'))
+            ],
+            'accomplishment_test_scores': [
+                {'name': self.word('field'), 'score': str(rng.randint(1, 100)), 'date_on': self.date(), 'description': self.text()}
+                for _ in range(self.count('accomplishment_test_scores'))
+            ],
+            'volunteer_work': [
+                {**self.qualification('company'), 'cause': self.word('interest') if rng.random() < 0.5 else None}
+                for _ in range(self.count('volunteer_work'))
+            ],
+            'certifications': [
+                {
+                    'starts_at': self.date(), 'ends_at': None, 'name': self.word('skill'), 'authority': self.word('company'),
+                    'license_number': str(rng.randint(10 ** 5, 10 ** 6)) if rng.random() < 0.3 else None,
+                    'display_source': 'example.com' if rng.random() < 0.3 else None, 'url': None
+                }
+                for _ in range(self.count('certifications'))
+            ],
+            'connections': rng.randint(0, 500),
+            'people_also_viewed': [
+                {'link': f'https://example.com/in/{rng.randint(0, 10 ** 6)}', 'name': self.word('last_name'),
+                 'summary': self.word('title'), 'location': self.word('city')}
+                for _ in range(self.count('people_also_viewed'))
+            ],
+            'recommendations': [self.text() or self.word('word') for _ in range(self.count('recommendations'))],
+            'activities': [
+                {'title': self.text(), 'link': 'https://example.com/post', 'activity_status': rng.choice(['Liked by', 'Shared by'])}
+                for _ in range(self.count('activities'))
+            ],
+            'similarly_named_profiles': [
+                {'name': f'{first_name} {self.word("last_name")}', 'link': 'https://example.com/in/x',
+                 'summary': self.word('title'), 'location': self.word('city')}
+                for _ in range(self.count('similarly_named_profiles'))
+            ],
+            'articles': [
+                {'title': self.text(), 'link': 'https://example.com/article', 'published_date': self.date(),
+                 'author': f'{first_name} {last_name}', 'image_url': None}
+                for _ in range(self.count('articles'))
+            ],
+            'groups': [
+                {'profile_pic_url': None, 'name': self.word('group'), 'url': None}
+                for _ in range(self.count('groups'))
+            ],
+            'inferred_salary': {'min': salary, 'max': salary + 20000} if salary else None,
+            'gender': rng.choice(['male', 'female', None]),
+            'birth_date': None,
+            'industry': self.word('industry'),
+            'interests': [self.word('interest') for _ in range(self.count('interests'))],
+            'skills': [self.word('skill') for _ in range(self.count('skills'))],
+            'personal_emails': [],
+            'personal_numbers': []
+        }
+
+    def company(self, index: int) -> dict:
+        """
+        This function generates a company document.
+
+        :param index: The number of the document, used to derive its _id.
+        """
+        rng = self._rng
+
+        def company_location():
+            letters, _, states = rng.choice(COUNTRIES)
+            return {
+                'country': letters, 'city': self.word('city'), 'postal_code': str(rng.randint(10000, 99999)),
+                'line_1': None, 'is_hq': False, 'state': rng.choice(states)
+            }
+
+        size_a = rng.choice([1, 11, 51, 201, 501, 1001, 5001, 10001])
+        hq = company_location()
+
+        return {
+            '_id': ObjectId(f'{index:024x}'),
+            'linkedin_internal_id': str(index),
+            'description': self.text('summary_words'),
+            'website': 'https://example.com' if rng.random() < 0.8 else None,
+            'industry': self.word('industry'),
+            'company_size': [size_a, size_a * 5 - 1 if size_a < 10001 else None],
+            'company_size_on_linkedin': rng.randint(1, size_a * 2),
+            'hq': {**hq, 'is_hq': True} if rng.random() < 0.9 else None,
+            'company_type': rng.choice(['PRIVATELY_HELD', 'PUBLIC_COMPANY', 'NON_PROFIT', 'SELF_EMPLOYED']),
+            'founded_year': rng.randint(1900, 2023) if rng.random() < 0.7 else None,
+            'specialities': [self.word('skill') for _ in range(self.count('specialities'))],
+            'locations': [company_location() for _ in range(self.count('locations'))],
+            'name': self.word('company'),
+            'tagline': self.word('title') if rng.random() < 0.3 else None,
+            'universal_name_id': f'company-{index}',
+            'profile_pic_url': 'https://example.com/c.jpg' if rng.random() < 0.8 else None,
+            'background_cover_image_url': 'https://example.com/cb.jpg' if rng.random() < 0.5 else None,
+            'search_id': str(index),
+            'similar_companies': [
+                {'name': self.word('company'), 'link': 'https://example.com/company', 'industry': self.word('industry'),
+                 'location': self.word('city')}
+                for _ in range(self.count('similar_companies'))
+            ],
+            'affiliated_companies': [],
+            'updates': [
+                {'article_link': None, 'image': 'https://example.com/u.jpg' if rng.random() < 0.5 else None,
+                 'posted_on': self.date(2015), 'text': self.text(), 'total_likes': rng.randint(0, 5000)}
+                for _ in range(self.count('updates'))
+            ],
+            'follower_count': rng.randint(0, 10 ** 6)
+        }
+
+    def profiles(self, count: int, start: int = 0) -> list[dict]:
+        """
+        This function generates profile documents with consecutive _ids.
+
+        :param count: The number of documents.
+        :param start: The number of the first document.
+        """
+        return [self.profile(index) for index in range(start, start + count)]
+
+    def companies(self, count: int, start: int = 0) -> list[dict]:
+        """
+        This function generates company documents with consecutive _ids.
+
+        :param count: The number of documents.
+        :param start: The number of the first document.
+        """
+        return [self.company(index) for index in range(start, start + count)]
@@ -0,0 +1,241 @@
+"""
+This script benchmarks the importers end to end without the production MongoDB and DWH.
+
+The documents are generated from a seed (benchmarks/generate.py) and served by the in-process MongoDB
+stand-in (benchmarks/mongo.py), the rows are written into a local MySQL benchmark schema. Every import
+mode runs in a fresh process, so the peak memory of one mode does not hide the one of the next.
+
+The results (docs/s, DB round trips per document, rows per document and peak RSS) are written as JSON,
+named after the current commit, so two commits can be compared with a diff of their result files.
+
+The benchmark schema is created by benchmarks/schema.py (from dwh_schema_linkedin.sql alone, with DIM_Date and the
+origin of the benchmark collection), either beforehand or by this script when benchmark_create_schema is set. Its
+fact, relation and dimension tables are emptied before every run, so never point this script at the DWH.
+"""
+import os
+import json
+import time
+import resource
+import tempfile
+import platform
+import subprocess
+import multiprocessing
+import concurrent.futures
+from dotenv import load_dotenv, find_dotenv
+from sqlalchemy import create_engine  # Requires pymysql
+from dwh.linkedin_data import metrics
+from dwh.linkedin_data import partitions
+from dwh.linkedin_data.benchmarks import schema
+from dwh.linkedin_data.profiles import bulk
+from dwh.linkedin_data.companies import bulk as companies_bulk
+from dwh.linkedin_data.companies import insert as companies_insert
+from dwh.linkedin_data.benchmarks.generate import Generator
+from dwh.linkedin_data.benchmarks.mongo import MongoClient
+
+# Arguments of insert_collection_documents per profile import mode
+MODES = {
+    'rows': {'bulk_batch_size': None},
+    'bulk': {'bulk_batch_size': 500},
+    'pipeline': {
+        'bulk_batch_size': 500,
+        'pipeline_settings': {'converters': 2, 'writers': {'REL_PRF_Person_Trait': 2, 'FACT_PRF_Qualification': 2}}
+    },
+    'staging': {'bulk_batch_size': 500, 'staging_dir': True}  # A temporary directory is used
+}
+
+
+def peak_rss() -> float:
+    """
+    This function returns the peak resident set size of the current process in MB.
+    """
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return usage / 1024 ** 2 if platform.system() == 'Darwin' else usage / 1024  # Bytes on macOS, KB on Linux
+
+
+def reset(dwh_engine, tables: tuple):
+    """
+    This function empties the given tables and the key ranges of the benchmark schema.
+
+    :param dwh_engine: The DWH engine of the benchmark schema.
+    :param tables: The tables to empty.
+    """
+    with dwh_engine.begin() as connection:
+        connection.exec_driver_sql("SET SESSION foreign_key_checks = 0")
+        for table in (*tables, 'ETL_KeyRange', 'ETL_Checkpoint'):
+            connection.exec_driver_sql(f"TRUNCATE TABLE {table}")
+        connection.exec_driver_sql("SET SESSION foreign_key_checks = 1")
+
+
+def result(documents: int, seconds: float, baseline_rss: float) -> dict:
+    """
+    This function summarises a run from the metrics of the process.
+
+    :param documents: The number of imported documents.
+    :param seconds: The duration of the import.
+    :param baseline_rss: The peak RSS in MB before the import, after the documents have been generated.
+    """
+    round_trips = metrics.REGISTRY.total('round_trips_total')
+    rows = metrics.REGISTRY.total('rows_total')
+    return {
+        'documents': documents,
+        'seconds': round(seconds, 3),
+        'docs_per_sec': round(documents / seconds, 1) if seconds else None,
+        'round_trips': int(round_trips),
+        'round_trips_per_doc': round(round_trips / documents, 2) if documents else None,
+        'rows': int(rows),
+        'rows_per_doc': round(rows / documents, 2) if documents else None,
+        'errors': int(metrics.REGISTRY.total('errors_total')),
+        'baseline_rss_mb': round(baseline_rss, 1),
+        'peak_rss_mb': round(peak_rss(), 1)
+    }
+
+
+def run_profiles(mode: str, settings: dict, dwh_connection_url: str, schema_name: str) -> dict:
+    """
+    This function imports the synthetic profiles with one of the MODES, meant to run in its own process.
+
+    :param mode: The name of the import mode.
+    :param settings: The benchmark settings.
+    :param dwh_connection_url: The connection string of the DWH server.
+    :param schema_name: The name of the benchmark schema.
+    """
+    # Imported here, the import script reads its configuration when it is loaded
+    from dwh.linkedin_data.import_script_profiles import insert_collection_documents
+
+    # Generate the documents before measuring the baseline memory
+    client = MongoClient()
+    generator = Generator(settings['seed'], settings.get('sizes'), settings.get('vocabulary_sizes'))
+    client['raw_data'][settings['collection']].insert_many(generator.profiles(settings['profiles']))
+    baseline_rss = peak_rss()
+
+    dwh = create_engine(f'{dwh_connection_url}/{schema_name}?charset=utf8mb4')
+    reset(dwh, (*bulk.WRITE_ORDER, *bulk.DIMENSION_TABLES, 'DIM_PRF_Related'))
+    partitions.add_partition(dwh, settings['id_origin'])
+    dwh.dispose()
+
+    arguments = dict(MODES[mode])
+    with tempfile.TemporaryDirectory() as directory:
+        if arguments.get('staging_dir'):
+            arguments['staging_dir'] = directory
+
+        start = time.perf_counter()
+        insert_collection_documents(
+            settings['collection'],
+            settings['id_origin'],
+            dwh_connection_url,
+            None,
+            schema_name,
+            mongo_client=client,
+            **arguments
+        )
+        seconds = time.perf_counter() - start
+
+    return result(settings['profiles'], seconds, baseline_rss)
+
+
+def run_companies(settings: dict, dwh_connection_url: str, schema_name: str) -> dict:
+    """
+    This function imports the synthetic companies row by row like import_script_companies.py.
+
+    :param settings: The benchmark settings.
+    :param dwh_connection_url: The connection string of the DWH server.
+    :param schema_name: The name of the benchmark schema.
+    """
+    generator = Generator(settings['seed'], settings.get('sizes'), settings.get('vocabulary_sizes'))
+    documents = generator.companies(settings['companies'])
+    baseline_rss = peak_rss()
+
+    dwh = create_engine(f'{dwh_connection_url}/{schema_name}?charset=utf8mb4')
+    reset(dwh, (*companies_bulk.WRITE_ORDER, *companies_bulk.DIMENSION_TABLES))
+    metrics.instrument_engine(dwh)
+
+    start = time.perf_counter()
+    for doc in documents:
+        hq_location_id = companies_insert.hq_location(doc, dwh)
+        company_id = companies_insert.company(doc, hq_location_id, settings['id_origin'], dwh)
+        companies_insert.updates(doc, company_id, dwh)
+        companies_insert.similar_companies(doc, company_id, dwh)
+        companies_insert.specialties(doc, company_id, dwh)
+        companies_insert.locations(doc, company_id, dwh)
+    seconds = time.perf_counter() - start
+
+    return result(len(documents), seconds, baseline_rss)
+
+
+def current_commit() -> str:
+    """
+    This function returns the current git commit, or 'unknown' outside of a repository.
+    """
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+# Load environment variables
+load_dotenv(find_dotenv())
+
+# Connection string of the local MySQL server and the benchmark schema
+mysql_url = os.getenv("DATABASE_BENCHMARK", os.getenv("DATABASE_DWH"))
+benchmark_schema_name = 'DWH_BENCHMARK'
+
+# Benchmark settings, sizes and vocabulary_sizes override the defaults of benchmarks/generate.py
+benchmark_settings = {
+    'seed': 42,
+    'profiles': 5000,
+    'companies': 1000,
+    'collection': 'KGL_LIN_PRF_BMK',  # At most 15 characters, the mongoCollectionName of DIM_Origin
+    'id_origin': 1,
+    'sizes': {},
+    'vocabulary_sizes': {}
+}
+
+# Profile import modes to run and whether to run the company import as well
+benchmark_modes = ['rows', 'bulk', 'pipeline', 'staging']
+benchmark_companies = True
+
+# Whether to (re)create the benchmark schema with benchmarks/schema.py before the runs
+benchmark_create_schema = True
+
+# Directory the result files are written to
+output_directory = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+
+if __name__ == "__main__":
+    report = {
+        'commit': current_commit(),
+        'started': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'settings': benchmark_settings,
+        'results': {}
+    }
+
+    if benchmark_create_schema:
+        schema.create(
+            mysql_url, benchmark_schema_name, benchmark_settings['id_origin'], benchmark_settings['collection']
+        )
+
+    # Run every mode in a fresh process
+    context = multiprocessing.get_context('spawn')
+    runs = [(f'profiles.{mode}', run_profiles, (mode,)) for mode in benchmark_modes]
+    if benchmark_companies:
+        runs.append(('companies.rows', run_companies, ()))
+
+    for name, run, arguments in runs:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+            try:
+                report['results'][name] = executor.submit(
+                    run, *arguments, benchmark_settings, mysql_url, benchmark_schema_name
+                ).result()
+            except Exception as e:
+                report['results'][name] = {'error': repr(e)}
+        print(f"{name}: {report['results'][name]}")
+
+    # Write the report, named after the commit so runs of different commits can be compared
+    os.makedirs(output_directory, exist_ok=True)
+    path = os.path.join(output_directory, f"{report['commit']}_{time.strftime('%Y%m%d_%H%M%S')}.json")
+    with open(path, 'w', encoding='utf-8') as file:
+        json.dump(report, file, indent=2)
+    print(json.dumps(report, indent=2))
+    print(f"Written to {path}")
@@ -0,0 +1,159 @@
+"""
+This module holds an in-process stand-in for the parts of pymongo used by the importers.
+
+It keeps the documents of every collection in a list and supports the queries the importers send:
+the _id range filters of sharding.range_filter, sorting, counting and the $sample aggregation used
+to find the split points. The documents are returned as they are stored, so unlike pymongo the
+benchmarks do not include decoding BSON.
+"""
+import random
+
+# Comparison operators of the supported filters
+OPERATORS = {
+    '$gt': lambda value, bound: value > bound,
+    '$gte': lambda value, bound: value >= bound,
+    '$lt': lambda value, bound: value < bound,
+    '$lte': lambda value, bound: value <= bound,
+    '$ne': lambda value, bound: value != bound,
+    '$in': lambda value, bound: value in bound
+}
+
+
+def matches(document: dict, query: dict | None) -> bool:
+    """
+    This function checks whether a document matches a filter of top level fields.
+
+    :param document: The document to check.
+    :param query: The filter, e.g. {'_id': {'$gte': lower, '$lt': upper}}.
+    """
+    for field, condition in (query or {}).items():
+        value = document.get(field)
+        if isinstance(condition, dict):
+            if not all(OPERATORS[operator](value, bound) for operator, bound in condition.items()):
+                return False
+        elif value != condition:
+            return False
+    return True
+
+
+class Cursor:
+    """
+    This class iterates over the documents matching a filter, like pymongo.cursor.Cursor.
+    """
+
+    def __init__(self, documents: list[dict], query: dict | None):
+        """
+        :param documents: The documents of the collection.
+        :param query: The filter of the cursor.
+        """
+        self._documents = documents
+        self._query = query
+        self._sort = None
+        self._skip = 0
+        self._limit = 0
+
+    def sort(self, key: str, direction: int = 1):
+        self._sort = (key, direction)
+        return self
+
+    def skip(self, count: int):
+        self._skip = count
+        return self
+
+    def limit(self, count: int):
+        self._limit = count
+        return self
+
+    def batch_size(self, size: int):
+        # All documents are in memory already
+        return self
+
+    def __iter__(self):
+        documents = [doc for doc in self._documents if matches(doc, self._query)]
+        if self._sort:
+            key, direction = self._sort
+            documents.sort(key=lambda doc: doc.get(key), reverse=direction < 0)
+        end = self._skip + self._limit if self._limit else None
+        return iter(documents[self._skip:end])
+
+
+class Collection:
+    """
+    This class holds the documents of a collection, like pymongo.collection.Collection.
+    """
+
+    def __init__(self, name: str, documents: list[dict] | None = None):
+        """
+        :param name: The name of the collection.
+        :param documents: The documents of the collection.
+        """
+        self.name = name
+        self._documents = list(documents or [])
+        self._rng = random.Random(0)
+
+    def insert_many(self, documents: list[dict]):
+        self._documents.extend(documents)
+
+    def find(self, query: dict | None = None, projection=None) -> Cursor:
+        return Cursor(self._documents, query)
+
+    def count_documents(self, query: dict) -> int:
+        return sum(1 for doc in self._documents if matches(doc, query))
+
+    def estimated_document_count(self) -> int:
+        return len(self._documents)
+
+    def aggregate(self, pipeline: list[dict]):
+        """
+        This function runs an aggregation of $match, $sample, $project and $limit stages.
+
+        :param pipeline: The stages of the aggregation.
+        """
+        documents = self._documents
+        for stage in pipeline:
+            (operator, argument), = stage.items()
+            if operator == '$match':
+                documents = [doc for doc in documents if matches(doc, argument)]
+            elif operator == '$sample':
+                documents = self._rng.sample(documents, min(argument['size'], len(documents)))
+            elif operator == '$project':
+                fields = [field for field, include in argument.items() if include]
+                documents = [{field: doc.get(field) for field in fields if field in doc} for doc in documents]
+            elif operator == '$limit':
+                documents = documents[:argument]
+            else:
+                raise NotImplementedError(f"Aggregation stage {operator} is not supported")
+        return iter(documents)
+
+
+class Database(dict):
+    """
+    This class holds the collections of a database, like pymongo.database.Database.
+    """
+
+    def __missing__(self, name: str) -> Collection:
+        collection = self[name] = Collection(name)
+        return collection
+
+
+class MongoClient(dict):
+    """
+    This class holds the databases of the stand-in, like pymongo.MongoClient.
+
+    Usage:
+        client = MongoClient()
+        client['raw_data']['KGL_LIN_PRF_USA'].insert_many(Generator().profiles(1000))
+    """
+
+    def __missing__(self, name: str) -> Database:
+        database = self[name] = Database()
+        return database
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        pass
@@ -0,0 +1,104 @@
+"""
+This script creates the benchmark schema of loader_benchmark.py and staging_throughput.py on a local MySQL.
+
+The schema is created from dwh_schema_linkedin.sql alone, with `DWH` replaced by the name of the benchmark
+schema. The migrations are only for DWH schemas created from an earlier version of that file, a fresh schema
+already has their changes and fails on them. DIM_Date is loaded like date_dimension.py does it and the origin
+of the benchmark collection is added with its partitions like dwh_add_datasource.sql does it.
+
+An existing benchmark schema of the same name is dropped first, so never point this script at the DWH.
+"""
+import os
+import re
+import time
+from dotenv import load_dotenv, find_dotenv
+from sqlalchemy import create_engine  # Requires pymysql
+from dwh.linkedin_data import date_dimension
+from dwh.linkedin_data import partitions
+
+# The schema file of the DWH
+SCHEMA_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'dwh_schema_linkedin.sql')
+
+
+def statements(script: str):
+    """
+    This function splits a MySQL script into its statements, following its DELIMITER commands like the mysql client.
+
+    :param script: The text of the script.
+    :return: A generator of the statements without their delimiter.
+    """
+    delimiter = ';'
+    lines = []
+    for line in script.splitlines():
+        stripped = line.strip()
+
+        # Client commands and comments between statements are not sent to the server
+        if not lines and (not stripped or stripped.startswith(('--', '#'))):
+            continue
+        if stripped.upper().startswith('DELIMITER '):
+            delimiter = stripped.split()[1]
+            continue
+
+        lines.append(line)
+        if stripped.endswith(delimiter):
+            lines[-1] = line.rstrip()[:-len(delimiter)]
+            yield '\n'.join(lines).strip()
+            lines = []
+
+    if '\n'.join(lines).strip():
+        yield '\n'.join(lines).strip()
+
+
+def create(dwh_connection_url: str, schema_name: str, id_origin: int, collection: str):
+    """
+    This function (re)creates the benchmark schema, loads DIM_Date and adds the origin with its partitions.
+
+    :param dwh_connection_url: The connection string of the MySQL server, without a schema.
+    :param schema_name: The name of the benchmark schema.
+    :param id_origin: The ID of the origin the benchmark imports its documents with.
+    :param collection: The name of the benchmark collection, stored as the mongoCollectionName of the origin.
+    """
+    if schema_name.upper() == 'DWH':
+        raise ValueError("The benchmark schema must not be the DWH")
+
+    with open(SCHEMA_FILE, encoding='utf-8') as file:
+        script = re.sub(r'`DWH`', f'`{schema_name}`', file.read())
+
+    # The script switches to the schema with USE, so all statements run on the same connection
+    server = create_engine(f'{dwh_connection_url}?charset=utf8mb4')
+    with server.connect() as connection:
+        connection.exec_driver_sql(f"DROP SCHEMA IF EXISTS `{schema_name}`")
+        for statement in statements(script):
+            connection.exec_driver_sql(statement)
+        connection.commit()
+    server.dispose()
+
+    dwh = create_engine(f'{dwh_connection_url}/{schema_name}?charset=utf8mb4')
+    date_dimension.load(dwh)
+    with dwh.begin() as connection:
+        connection.exec_driver_sql(
+            """
+            INSERT INTO DIM_Origin (id, abbreviation, mongoCollectionName, name, importDate, comment)
+            VALUES (%s, 'PRF', %s, 'Benchmark', CURDATE(), 'Synthetic documents of benchmarks/generate.py')
+            """,
+            (id_origin, collection)
+        )
+    partitions.add_partition(dwh, id_origin)
+    dwh.dispose()
+
+
+# Load environment variables
+load_dotenv(find_dotenv())
+
+# Connection string of the local MySQL server and the benchmark schema
+mysql_url = os.getenv("DATABASE_BENCHMARK", os.getenv("DATABASE_DWH"))
+benchmark_schema_name = 'DWH_BENCHMARK'
+
+# Origin and collection of the benchmark documents, the collection name has at most 15 characters (DIM_Origin)
+benchmark_id_origin = 1
+benchmark_collection = 'KGL_LIN_PRF_BMK'
+
+if __name__ == "__main__":
+    start_time = time.perf_counter()
+    create(mysql_url, benchmark_schema_name, benchmark_id_origin, benchmark_collection)
+    print(f"{benchmark_schema_name} created in {time.perf_counter() - start_time:.1f}s")
@@ -0,0 +1,131 @@
+"""
+This script compares the throughput of the profile import paths against a local MySQL.
+
+The same sample of documents is imported row by row, with batched INSERTs and through the staging
+files loaded with LOAD DATA LOCAL INFILE. The fact and relation tables of the benchmark schema are
+emptied before every run, so never point this script at the production DWH.
+"""
+import os
+import time
+import tempfile
+from dotenv import load_dotenv, find_dotenv
+from pymongo import MongoClient
+from sqlalchemy import create_engine  # Requires pymysql
+from dwh.linkedin_data import staging
+from dwh.linkedin_data.profiles import bulk
+from dwh.linkedin_data.keys import KeyAllocator
+from dwh.linkedin_data.dimensions import DimensionCache
+from dwh.linkedin_data.unit_of_work import UnitOfWork
+from dwh.linkedin_data.import_script_profiles import _insert_document
+
+
+def reset(dwh_engine):
+    """
+    This function empties the fact and relation tables written by the profile import.
+
+    :param dwh_engine: The DWH engine of the benchmark schema.
+    """
+    with dwh_engine.begin() as connection:
+        connection.exec_driver_sql("SET SESSION foreign_key_checks = 0")
+        for table in reversed(bulk.WRITE_ORDER):
+            connection.exec_driver_sql(f"TRUNCATE TABLE {table}")
+        connection.exec_driver_sql("SET SESSION foreign_key_checks = 1")
+
+
+def run_rows(documents: list[dict], id_origin: int, dwh_engine, dimension_cache, commit_interval: int = 100):
+    """
+    This function imports the documents row by row within a unit of work.
+
+    :param documents: The documents to import.
+    :param id_origin: The ID of the DIM_Origin table from the dwh.
+    :param dwh_engine: The DWH engine of the benchmark schema.
+    :param dimension_cache: The dimension cache to use.
+    :param commit_interval: Number of documents per transaction.
+    """
+    with UnitOfWork(dwh_engine, commit_interval) as uow:
+        for doc in documents:
+            if doc.get('experiences'):
+                with uow.document(doc['_id']):
+                    _insert_document(doc, id_origin, uow.connection, dimension_cache)
+
+
+def run_bulk(documents: list[dict], id_origin: int, dwh_engine, dimension_cache, batch_size: int = 500):
+    """
+    This function imports the documents with one multi-row INSERT per table and batch.
+
+    :param documents: The documents to import.
+    :param id_origin: The ID of the DIM_Origin table from the dwh.
+    :param dwh_engine: The DWH engine of the benchmark schema.
+    :param dimension_cache: The dimension cache to use.
+    :param batch_size: Number of documents per batch.
+    """
+    key_allocator = KeyAllocator(dwh_engine)
+    for start in range(0, len(documents), batch_size):
+        bulk.insert_documents(documents[start:start + batch_size], id_origin, dwh_engine, key_allocator, dimension_cache)
+
+
+def run_staging(documents: list[dict], id_origin: int, dwh_engine, dimension_cache, batch_size: int = 500):
+    """
+    This function stages the documents in files per table and loads them with LOAD DATA LOCAL INFILE.
+
+    :param documents: The documents to import.
+    :param id_origin: The ID of the DIM_Origin table from the dwh.
+    :param dwh_engine: The DWH engine of the benchmark schema (with local_infile enabled).
+    :param dimension_cache: The dimension cache to use.
+    :param batch_size: Number of documents per batch.
+    """
+    key_allocator = KeyAllocator(dwh_engine)
+    with tempfile.TemporaryDirectory() as directory:
+        with staging.StagingWriter(directory, bulk.COLUMNS) as writer:
+            for start in range(0, len(documents), batch_size):
+                bulk.stage_documents(
+                    documents[start:start + batch_size], id_origin, dwh_engine, key_allocator, dimension_cache, writer
+                )
+        staging.load_files(dwh_engine, writer.files, bulk.COLUMNS, commit_table='FACT_PRF_Person')
+
+
+# Load environment variables
+load_dotenv(find_dotenv())
+
+# Connection strings, the benchmark schema has to be created with benchmarks/schema.py beforehand
+# (with benchmark_id_origin set to dwh_id_origin)
+mysql_url = os.getenv("DATABASE_DWH")
+mongo_url = os.getenv("MongoClientURI")
+benchmark_schema_name = 'DWH_BENCHMARK'
+
+# Collection and number of documents used for the comparison
+mongo_collection_name = "KGL_LIN_PRF_SNG"
+dwh_id_origin = 4
+sample_size = 5000
+
+if __name__ == "__main__":
+    dwh = create_engine(f'{mysql_url}/{benchmark_schema_name}?charset=utf8mb4', connect_args={'local_infile': True})
+
+    # Read the sample once, so all paths are measured without the MongoDB cursor
+    with MongoClient(mongo_url) as mongo_client:
+        sample = list(mongo_client["raw_data"][mongo_collection_name].find().sort('_id', 1).limit(sample_size))
+    persons = sum(1 for doc in sample if doc.get('experiences'))
+
+    # Insert the dimension members of the sample beforehand, they are kept by reset()
+    setup_cache = DimensionCache(dwh, KeyAllocator(dwh))
+    for doc in sample:
+        for table, keys in bulk.dimension_keys(doc).items():
+            setup_cache.resolve_many(table, keys)
+
+    # Run every path with a warm dimension cache, so only the fact and relation writes are compared
+    results = {}
+    for name, run in (('rows', run_rows), ('bulk', run_bulk), ('staging', run_staging)):
+        reset(dwh)
+        cache = DimensionCache(dwh, KeyAllocator(dwh))
+        cache.warm(bulk.DIMENSION_TABLES)
+
+        start = time.perf_counter()
+        run(sample, dwh_id_origin, dwh, cache)
+        seconds = time.perf_counter() - start
+
+        results[name] = persons / seconds
+        print(f"{name}: {persons} persons in {seconds:.1f}s ({results[name]:.1f} persons/s)")
+
+    # Compare against the row by row path
+    for name, rate in results.items():
+        print(f"{name}: {rate / results['rows']:.1f}x row by row")
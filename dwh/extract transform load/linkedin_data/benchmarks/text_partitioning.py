@@ -0,0 +1,134 @@
+"""
+This script benchmarks a typical aggregation over the profiles with and without the text tables.
+
+The skills per country are counted once over FACT_PRF_Person as written by the importers, whose summary
+is in TXT_PRF_Summary (texts.py), and once over a copy of it holding the summary inline like before the
+text tables. Both queries read the same rows, only the width of the scanned fact rows differs.
+
+The benchmark schema has to be filled with benchmarks/loader_benchmark.py beforehand. The results (query
+times and table sizes) are written as JSON next to the ones of the loader benchmark.
+"""
+import os
+import json
+import time
+import platform
+import statistics
+from dotenv import load_dotenv, find_dotenv
+from sqlalchemy import create_engine  # Requires pymysql
+from dwh.linkedin_data.benchmarks.loader_benchmark import current_commit
+
+# Copy of FACT_PRF_Person with the summary inline
+WIDE_TABLE = 'BENCH_PRF_Person_Wide'
+
+# Skills by country, {person} is replaced by the fact table to scan
+AGGREGATION = """
+SELECT l.countryLetters, t.name, COUNT(*) AS persons
+FROM REL_PRF_Person_Trait r
+JOIN DIM_PRF_Trait t ON r.idTrait = t.id
+JOIN {person} p ON r.idPerson = p.id
+JOIN DIM_PRF_Location l ON p.idLocation = l.id
+WHERE t.type = 'skill'
+GROUP BY l.countryLetters, t.name
+"""
+
+
+def create_wide_table(dwh_engine):
+    """
+    This function (re)creates the copy of FACT_PRF_Person with the summary inline.
+
+    :param dwh_engine: The DWH engine of the benchmark schema.
+    """
+    with dwh_engine.begin() as connection:
+        connection.exec_driver_sql(f"DROP TABLE IF EXISTS {WIDE_TABLE}")
+        connection.exec_driver_sql(
+            f"""
+            CREATE TABLE {WIDE_TABLE} (PRIMARY KEY (id)) ENGINE = InnoDB
+            SELECT p.*, s.text AS summary FROM FACT_PRF_Person p
+            LEFT JOIN TXT_PRF_Summary s ON s.idPerson = p.id
+            """
+        )
+        connection.exec_driver_sql(f"ANALYZE TABLE {WIDE_TABLE}, FACT_PRF_Person, TXT_PRF_Summary")
+
+
+def table_sizes(dwh_engine, tables: tuple) -> dict:
+    """
+    This function returns the rows and the data size in MB of tables as estimated by InnoDB.
+
+    :param dwh_engine: The DWH engine of the benchmark schema.
+    :param tables: The names of the tables.
+    """
+    with dwh_engine.connect() as connection:
+        rows = connection.exec_driver_sql(
+            f"""
+            SELECT table_name, table_rows, data_length FROM information_schema.tables
+            WHERE table_schema = DATABASE() AND table_name IN ({', '.join(['%s'] * len(tables))})
+            """,
+            tables
+        ).all()
+    return {name: {'rows': count, 'data_mb': round(size / 1024 ** 2, 2)} for name, count, size in rows}
+
+
+def time_query(dwh_engine, query: str, repetitions: int) -> dict:
+    """
+    This function runs a query repeatedly after a warm-up run and returns its timings.
+
+    :param dwh_engine: The DWH engine of the benchmark schema.
+    :param query: The query to run.
+    :param repetitions: The number of timed runs.
+    """
+    timings = []
+    with dwh_engine.connect() as connection:
+        groups = len(connection.exec_driver_sql(query).all())  # Warm-up, loads the pages into the buffer pool
+        for _ in range(repetitions):
+            start = time.perf_counter()
+            connection.exec_driver_sql(query).all()
+            timings.append(time.perf_counter() - start)
+
+    return {
+        'groups': groups,
+        'median_seconds': round(statistics.median(timings), 4),
+        'min_seconds': round(min(timings), 4),
+        'max_seconds': round(max(timings), 4)
+    }
+
+
+# Load environment variables
+load_dotenv(find_dotenv())
+
+# Connection string of the local MySQL server and the benchmark schema
+mysql_url = os.getenv("DATABASE_BENCHMARK", os.getenv("DATABASE_DWH"))
+benchmark_schema_name = 'DWH_BENCHMARK'
+
+# Number of timed runs per query
+benchmark_repetitions = 10
+
+# Directory the result files are written to
+output_directory = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+
+if __name__ == "__main__":
+    dwh = create_engine(f'{mysql_url}/{benchmark_schema_name}?charset=utf8mb4')
+    create_wide_table(dwh)
+
+    report = {
+        'commit': current_commit(),
+        'started': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'benchmark': 'text_partitioning',
+        'repetitions': benchmark_repetitions,
+        'sizes': table_sizes(dwh, ('FACT_PRF_Person', 'TXT_PRF_Summary', WIDE_TABLE)),
+        'results': {
+            'inline': time_query(dwh, AGGREGATION.format(person=WIDE_TABLE), benchmark_repetitions),
+            'text_tables': time_query(dwh, AGGREGATION.format(person='FACT_PRF_Person'), benchmark_repetitions)
+        }
+    }
+
+    with dwh.begin() as dwh_connection:
+        dwh_connection.exec_driver_sql(f"DROP TABLE {WIDE_TABLE}")
+
+    # Write the report, named after the commit like the loader benchmark
+    os.makedirs(output_directory, exist_ok=True)
+    path = os.path.join(output_directory, f"{report['commit']}_text_{time.strftime('%Y%m%d_%H%M%S')}.json")
+    with open(path, 'w', encoding='utf-8') as file:
+        json.dump(report, file, indent=2)
+    print(json.dumps(report, indent=2))
+    print(f"Written to {path}")
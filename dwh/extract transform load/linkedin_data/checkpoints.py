@@ -0,0 +1,145 @@
+"""
+This module holds the checkpoint store used to resume interrupted imports.
+"""
+from bson import ObjectId
+
+
+def _shard_key(lower) -> str:
+    """
+    This function returns the key of a shard within its collection (empty for unbounded shards).
+
+    :param lower: The lower _id bound of the shard.
+    """
+    return str(lower) if lower is not None else ''
+
+
+class CheckpointStore:
+    """
+    This class records the last committed _id per collection and shard in the DWH.
+
+    Besides the progress, the store keeps the shard layout of a collection. Split points are
+    sampled randomly, so a resumed import has to reuse the shards of the interrupted run.
+
+    DWH table: ETL_Checkpoint
+    """
+
+    def __init__(self, dwh_engine):
+        """
+        :param dwh_engine: The DWH engine to use.
+        """
+        self._dwh_engine = dwh_engine
+
+    def register(self, shards: list[dict]):
+        """
+        This function stores the layout of new shards, existing shards keep their progress.
+
+        :param shards: The shards to register, as returned by sharding.collection_shards.
+        """
+        if not shards:
+            return
+
+        with self._dwh_engine.begin() as connection:
+            connection.exec_driver_sql(
+                """
+                INSERT IGNORE INTO ETL_Checkpoint (collectionName, shardLower, shardUpper, size, finished, updatedAt)
+                VALUES (%s, %s, %s, %s, 0, NOW())
+                """,
+                [(shard['collection'], _shard_key(shard['lower']),
+                  str(shard['upper']) if shard['upper'] is not None else None, shard['size']) for shard in shards]
+            )
+
+    def shards(self, collection_str: str, id_origin: int) -> list[dict]:
+        """
+        This function returns the registered shards of a collection.
+
+        :param collection_str: The name of the MongoDB collection.
+        :param id_origin: The ID of the DIM_Origin table from the dwh.
+        :return: A list of shards with the collection, origin, bounds, size and finished flag.
+        """
+        with self._dwh_engine.connect() as connection:
+            rows = connection.exec_driver_sql(
+                "SELECT shardLower, shardUpper, size, finished FROM ETL_Checkpoint WHERE collectionName = %s",
+                (collection_str,)
+            ).fetchall()
+
+        return [
+            {
+                'collection': collection_str,
+                'id_origin': id_origin,
+                'lower': ObjectId(lower) if lower else None,
+                'upper': ObjectId(upper) if upper else None,
+                'size': size,
+                'finished': bool(finished)
+            }
+            for lower, upper, size, finished in rows
+        ]
+
+    def last_id(self, collection_str: str, lower=None) -> ObjectId | None:
+        """
+        This function returns the last committed _id of a shard.
+
+        :param collection_str: The name of the MongoDB collection.
+        :param lower: The lower _id bound of the shard, None for the whole collection.
+        :return: The last committed _id or None if nothing was committed yet.
+        """
+        with self._dwh_engine.connect() as connection:
+            last = connection.exec_driver_sql(
+                "SELECT lastId FROM ETL_Checkpoint WHERE collectionName = %s AND shardLower = %s",
+                (collection_str, _shard_key(lower))
+            ).scalar()
+
+        return ObjectId(last) if last else None
+
+    def save(self, connection, collection_str: str, lower, last_id, finished: bool = False):
+        """
+        This function records the progress of a shard.
+        Pass the connection of the batch transaction, so the checkpoint is committed together with the data.
+
+        :param connection: The DWH connection to use.
+        :param collection_str: The name of the MongoDB collection.
+        :param lower: The lower _id bound of the shard, None for the whole collection.
+        :param last_id: The last committed _id.
+        :param finished: Whether the shard has been imported completely.
+        """
+        connection.exec_driver_sql(
+            """
+            INSERT INTO ETL_Checkpoint (collectionName, shardLower, lastId, finished, updatedAt)
+            VALUES (%s, %s, %s, %s, NOW())
+            ON DUPLICATE KEY UPDATE
+                lastId = COALESCE(VALUES(lastId), lastId),
+                finished = VALUES(finished),
+                updatedAt = VALUES(updatedAt)
+            """,
+            (collection_str, _shard_key(lower), str(last_id) if last_id is not None else None, int(finished))
+        )
+
+    def advance(self, collection_str: str, lower, last_id):
+        """
+        This function records the progress of a shard within its own transaction.
+        Use it when the data has been committed by other connections already.
+
+        :param collection_str: The name of the MongoDB collection.
+        :param lower: The lower _id bound of the shard, None for the whole collection.
+        :param last_id: The last committed _id.
+        """
+        with self._dwh_engine.begin() as connection:
+            self.save(connection, collection_str, lower, last_id)
+
+    def finish(self, collection_str: str, lower=None):
+        """
+        This function marks a shard as imported completely.
+
+        :param collection_str: The name of the MongoDB collection.
+        :param lower: The lower _id bound of the shard, None for the whole collection.
+        """
+        with self._dwh_engine.begin() as connection:
+            self.save(connection, collection_str, lower, None, finished=True)
+
+    def clear(self, collection_str: str):
+        """
+        This function removes the checkpoints of a collection, so the next run starts from scratch.
+
+        :param collection_str: The name of the MongoDB collection.
+        """
+        with self._dwh_engine.begin() as connection:
+            connection.exec_driver_sql("DELETE FROM ETL_Checkpoint WHERE collectionName = %s", (collection_str,))
@@ -0,0 +1,208 @@
+"""
+This script compacts the dimension tables by merging duplicate members (offline maintenance job).
+
+Imports before the natural key indexes (migrations/02_natural_key_indexes.sql) looked dimension members
+up with '=', which never matches a NULL column. Locations and durations therefore got a new member for
+almost every profile. For every dimension the duplicates are grouped NULL-safe (GROUP BY/PARTITION BY
+treat NULLs as equal) and case-insensitive like the collation of the columns, the lowest id of a group
+becomes the canonical member, the foreign keys are rewritten to it in chunks and the merged members
+are deleted afterwards.
+
+Run it while no import is running: the dimension cache of a running import and the map files of
+preload.py can still hold the ids of merged members, so write new map files afterwards.
+"""
+import os
+import time
+from dotenv import load_dotenv, find_dotenv
+from sqlalchemy import create_engine  # Requires pymysql
+from dwh.linkedin_data.dimensions import DIMENSIONS
+
+# Columns referencing the members per dimension table, as (table, column, owner column of a relation or None)
+REFERENCES = {
+    'DIM_PRF_Location': [('FACT_PRF_Person', 'idLocation', None)],
+    'DIM_PRF_Language': [('REL_PRF_Person_Language', 'idLanguage', 'idPerson')],
+    'DIM_PRF_Trait': [('REL_PRF_Person_Trait', 'idTrait', 'idPerson')],
+    'DIM_PRF_Group': [('REL_PRF_Person_Group', 'idGroup', 'idPerson')],
+    'DIM_PRF_Duration': [('FACT_PRF_Qualification', 'idDuration', None)],
+    'DIM_LIN_Location': [
+        ('FACT_CMP_Company', 'idHqLocation', None),
+        ('REL_CMP_Company_Location', 'idLocation', 'idCompany')
+    ],
+    'DIM_CMP_Specialty': [('REL_CMP_Company_Specialty', 'idSpecialty', 'idCompany')]
+}
+
+# Number of merged members whose references are rewritten (and which are deleted) per transaction
+COMPACTION_CHUNK_SIZE = 5000
+
+
+def _chunks(connection, chunk_size: int):
+    """
+    This function yields the bounds of consecutive chunks of the merge map as (lower exclusive, upper inclusive).
+
+    :param connection: The connection holding the temporary merge map.
+    :param chunk_size: The number of merged members per chunk.
+    """
+    lower = 0
+    while True:
+        with connection.begin():
+            upper = connection.exec_driver_sql(
+                """
+                SELECT MAX(duplicateId) FROM (
+                    SELECT duplicateId FROM ETL_DimensionMerge WHERE duplicateId > %s ORDER BY duplicateId LIMIT %s
+                ) AS chunk
+                """,
+                (lower, chunk_size)
+            ).scalar()
+        if upper is None:
+            return
+        yield lower, upper
+        lower = upper
+
+
+def compact(dwh_engine, table: str, chunk_size: int = COMPACTION_CHUNK_SIZE, dry_run: bool = False) -> dict:
+    """
+    This function merges the duplicate members of a dimension table.
+
+    :param dwh_engine: The DWH engine to use.
+    :param table: The name of the dimension table.
+    :param chunk_size: Number of merged members handled per transaction.
+    :param dry_run: Only count the duplicates and their references, without changing anything.
+    :return: The counts of the compaction (members before and after, duplicate groups, merged members,
+        rewritten references and removed relation rows per referencing table).
+    """
+    columns = ', '.join(DIMENSIONS[table])
+    stats = {'table': table, 'rewritten': {}, 'removed': {}}
+
+    # A single connection, the merge map is a temporary table
+    with dwh_engine.connect() as connection:
+        with connection.begin():
+            connection.exec_driver_sql("DROP TEMPORARY TABLE IF EXISTS ETL_DimensionMerge")
+            connection.exec_driver_sql(
+                "CREATE TEMPORARY TABLE ETL_DimensionMerge (duplicateId INT NOT NULL PRIMARY KEY, canonicalId INT NOT NULL)"
+            )
+
+            # Map every duplicate to the lowest id of its group
+            connection.exec_driver_sql(
+                f"""
+                INSERT INTO ETL_DimensionMerge (duplicateId, canonicalId)
+                SELECT id, canonicalId FROM (
+                    SELECT id, MIN(id) OVER (PARTITION BY {columns}) AS canonicalId FROM {table}
+                ) AS members
+                WHERE id <> canonicalId
+                """
+            )
+            stats['before'] = connection.exec_driver_sql(f"SELECT COUNT(*) FROM {table}").scalar()
+            stats['merged'], stats['groups'] = connection.exec_driver_sql(
+                "SELECT COUNT(*), COUNT(DISTINCT canonicalId) FROM ETL_DimensionMerge"
+            ).one()
+
+        if dry_run:
+            with connection.begin():
+                for reference, column, _ in REFERENCES[table]:
+                    stats['rewritten'][reference] = connection.exec_driver_sql(
+                        f"SELECT COUNT(*) FROM {reference} JOIN ETL_DimensionMerge ON {column} = duplicateId"
+                    ).scalar()
+            stats['after'] = stats['before'] - stats['merged']
+            return stats
+
+        for lower, upper in _chunks(connection, chunk_size):
+            with connection.begin():
+                for reference, column, owner in REFERENCES[table]:
+                    if owner is not None:
+                        # Remove relations that would exist twice after the rewrite (the owner already has the canonical member)
+                        removed = connection.exec_driver_sql(
+                            f"""
+                            DELETE r FROM {reference} r
+                            JOIN ETL_DimensionMerge m ON r.{column} = m.duplicateId
+                            JOIN {reference} c ON c.{owner} <=> r.{owner} AND c.{column} = m.canonicalId
+                            WHERE m.duplicateId > %s AND m.duplicateId <= %s
+                            """,
+                            (lower, upper)
+                        ).rowcount
+                        stats['removed'][reference] = stats['removed'].get(reference, 0) + removed
+
+                    # IGNORE skips relations conflicting with a unique index (two duplicates of one owner in a chunk)
+                    rewritten = connection.exec_driver_sql(
+                        f"""
+                        UPDATE {'IGNORE ' if owner is not None else ''}{reference} r
+                        JOIN ETL_DimensionMerge m ON r.{column} = m.duplicateId
+                        SET r.{column} = m.canonicalId
+                        WHERE m.duplicateId > %s AND m.duplicateId <= %s
+                        """,
+                        (lower, upper)
+                    ).rowcount
+                    stats['rewritten'][reference] = stats['rewritten'].get(reference, 0) + rewritten
+
+                    if owner is not None:
+                        # The skipped relations exist with the canonical member now
+                        removed = connection.exec_driver_sql(
+                            f"""
+                            DELETE r FROM {reference} r
+                            JOIN ETL_DimensionMerge m ON r.{column} = m.duplicateId
+                            WHERE m.duplicateId > %s AND m.duplicateId <= %s
+                            """,
+                            (lower, upper)
+                        ).rowcount
+                        stats['removed'][reference] += removed
+
+                # Delete the merged members, the foreign keys of the unpartitioned tables reject this if a reference was missed
+                connection.exec_driver_sql(
+                    f"""
+                    DELETE d FROM {table} d
+                    JOIN ETL_DimensionMerge m ON d.id = m.duplicateId
+                    WHERE m.duplicateId > %s AND m.duplicateId <= %s
+                    """,
+                    (lower, upper)
+                )
+
+        with connection.begin():
+            stats['after'] = connection.exec_driver_sql(f"SELECT COUNT(*) FROM {table}").scalar()
+            connection.exec_driver_sql("DROP TEMPORARY TABLE ETL_DimensionMerge")
+
+    return stats
+
+
+def report(results: list[dict]) -> str:
+    """
+    This function returns a printable summary of compactions.
+
+    :param results: The counts of the compactions, as returned by compact.
+    """
+    lines = []
+    for stats in results:
+        reclaimed = stats['before'] - stats['after']
+        share = reclaimed / stats['before'] * 100 if stats['before'] else 0
+        references = ', '.join(
+            f"{reference}: {rewritten} rewritten" + (
+                f", {stats['removed'][reference]} duplicate relations removed" if stats['removed'].get(reference) else ''
+            )
+            for reference, rewritten in stats['rewritten'].items()
+        )
+        lines.append(
+            f"{stats['table']}: {stats['before']} -> {stats['after']} members, {reclaimed} rows reclaimed ({share:.1f}%), "
+            f"{stats['merged']} duplicates in {stats['groups']} groups ({references})"
+        )
+    return '\n'.join(lines)
+
+
+# Load environment variables
+load_dotenv(find_dotenv())
+
+# Connection string
+mysql_url = os.getenv("DATABASE_DWH")
+dwh_schema_name = 'DWH'
+
+# Dimension tables to compact and whether to only report the duplicates
+compaction_tables = list(REFERENCES)
+compaction_dry_run = True
+
+if __name__ == "__main__":
+    dwh = create_engine(f'{mysql_url}/{dwh_schema_name}?charset=utf8mb4')
+
+    compactions = []
+    for dimension_table in compaction_tables:
+        start = time.perf_counter()
+        compactions.append(compact(dwh, dimension_table, dry_run=compaction_dry_run))
+        print(f"{dimension_table} compacted in {time.perf_counter() - start:.1f}s")
+
+    print(("Dry run, nothing changed:\n" if compaction_dry_run else '') + report(compactions))
@@ -0,0 +1,232 @@
+"""
+This module holds the functions used to import whole batches of companies into the DWH at once.
+
+A batch of documents is converted into rows per table first, with the company keys assigned on the
+client side by the key allocator and the dimension members resolved through the dimension cache.
+"""
+from collections import defaultdict
+# Import conversion functions
+from dwh.linkedin_data.companies import convert as conv
+from dwh.linkedin_data import metrics
+from dwh.linkedin_data import texts
+
+# Columns written per table, the rows of a batch are tuples in this order
+# (the converter puts the description at the position of its length column, see texts.TEXTS)
+COLUMNS = {
+    'FACT_CMP_Company': (
+        'id', 'idHqLocation', 'industry', 'type', 'founded', 'name', 'universalName', 'tagline', 'sizeA', 'sizeB',
+        'sizeLinkedIn', 'followers', 'website', 'profilePicture', 'backgroundPicture', 'descriptionLength',
+        'mongoCollectionId', 'idOrigin'
+    ),
+    'TXT_CMP_Company': ('idCompany', 'text'),
+    'FACT_CMP_Update': ('idCompany', 'image', 'postedOn', 'likes', 'text'),
+    'FACT_CMP_Similar': ('idCompany', 'name', 'industry', 'location'),
+    'REL_CMP_Company_Specialty': ('idCompany', 'idSpecialty'),
+    'REL_CMP_Company_Location': ('idCompany', 'idLocation')
+}
+
+# Fact and relation tables in the order they have to be written (referenced tables first)
+WRITE_ORDER = (
+    'FACT_CMP_Company',
+    'TXT_CMP_Company',
+    'FACT_CMP_Update',
+    'FACT_CMP_Similar',
+    'REL_CMP_Company_Specialty',
+    'REL_CMP_Company_Location'
+)
+
+# Dimension tables resolved through the dimension cache
+DIMENSION_TABLES = ('DIM_LIN_Location', 'DIM_CMP_Specialty')
+
+
+def dimension_keys(document: dict) -> dict[str, list[tuple]]:
+    """
+    This function collects the natural keys of all dimension members referenced by a document.
+
+    DWH tables: DIM_LIN_Location, DIM_CMP_Specialty
+
+    :param document: The document to convert.
+    :return: A dictionary mapping the dimension tables to the natural keys.
+    """
+    keys = defaultdict(list)
+    if document.get('hq'):
+        keys['DIM_LIN_Location'].append(conv.location(document.get('hq')))
+    for loc in document.get('locations') or []:
+        keys['DIM_LIN_Location'].append(conv.location(loc))
+    for spec in document.get('specialities') or []:
+        keys['DIM_CMP_Specialty'].append((spec.strip(),))
+
+    return keys
+
+
+def convert_document(document: dict, company_id: int, origin_id: int, dimension_ids: dict, rows: dict):
+    """
+    This function converts a document into rows and appends them to the rows of the batch.
+
+    :param document: The document to convert.
+    :param company_id: The ID reserved for the company.
+    :param origin_id: The ID of the DIM_Origin table from the dwh.
+    :param dimension_ids: The resolved dimension ids per table and natural key.
+    :param rows: The rows of the batch per table.
+    """
+    # Company and its hq location
+    hq_id = dimension_ids['DIM_LIN_Location'][conv.location(document.get('hq'))] if document.get('hq') else None
+    rows['FACT_CMP_Company'].append((company_id, *conv.company(document, hq_id, origin_id)))
+
+    # Updates
+    for update in document.get('updates') or []:
+        rows['FACT_CMP_Update'].append((
+            company_id,
+            1 if update.get('image') else 0,
+            conv.convert_date(update.get('posted_on')),
+            update.get('total_likes'),
+            update.get('text')
+        ))
+
+    # Similar companies
+    for sim_company in document.get('similar_companies') or []:
+        rows['FACT_CMP_Similar'].append((
+            company_id, sim_company.get('name'), sim_company.get('industry'), sim_company.get('location')
+        ))
+
+    # Specialties and locations, every relationship is only added once per company
+    specialty_ids = {dimension_ids['DIM_CMP_Specialty'][(spec.strip(),)] for spec in document.get('specialities') or []}
+    rows['REL_CMP_Company_Specialty'].extend((company_id, specialty_id) for specialty_id in sorted(specialty_ids))
+
+    location_ids = {dimension_ids['DIM_LIN_Location'][conv.location(loc)] for loc in document.get('locations') or []}
+    rows['REL_CMP_Company_Location'].extend((company_id, location_id) for location_id in sorted(location_ids))
+
+
+def write_rows(connection, table: str, rows: list[tuple]):
+    """
+    This function writes rows into a table with a single multi-row INSERT.
+
+    :param connection: The DWH connection to use.
+    :param table: The name of the table.
+    :param rows: The rows to insert, in the column order of the table.
+    """
+    if rows:
+        columns = COLUMNS[table]
+        query = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join(['%s'] * len(columns))})"
+        with metrics.timer(f'write.{table}'):
+            connection.exec_driver_sql(query, rows)
+
+
+def loaded_documents(dwh_engine, document_ids: list) -> set[str]:
+    """
+    This function returns which of the given documents have already been imported.
+
+    DWH table: FACT_CMP_Company
+
+    :param dwh_engine: The DWH engine to use.
+    :param document_ids: The MongoDB _ids of the documents.
+    :return: The _ids (as strings) that already have a company in the DWH.
+    """
+    if not document_ids:
+        return set()
+
+    query = f"SELECT mongoCollectionId FROM FACT_CMP_Company WHERE mongoCollectionId IN ({', '.join(['%s'] * len(document_ids))})"
+    with dwh_engine.connect() as connection:
+        return {row[0] for row in connection.exec_driver_sql(query, tuple(str(doc_id) for doc_id in document_ids))}
+
+
+def convert_documents(
+        documents: list[dict],
+        origin_id: int,
+        dwh_engine,
+        key_allocator,
+        dimension_cache
+       ) -> tuple[int, dict]:
+    """
+    This function converts a batch of documents into rows per table with all keys assigned.
+    Documents that have already been imported are skipped, which makes re-running a batch safe.
+
+    :param documents: The documents to convert.
+    :param origin_id: The ID of the DIM_Origin table from the dwh.
+    :param dwh_engine: The DWH engine to use.
+    :param key_allocator: The key allocator used to assign the keys.
+    :param dimension_cache: The dimension cache used to resolve the dimension members.
+    :return: The number of converted companies and their rows per table.
+    """
+    # Skip documents that have already been imported
+    loaded = loaded_documents(dwh_engine, [doc['_id'] for doc in documents])
+    documents = [doc for doc in documents if str(doc['_id']) not in loaded]
+
+    # Collect the natural keys of all dimension members used by the batch
+    keys = defaultdict(list)
+    for doc in documents:
+        for table, table_keys in dimension_keys(doc).items():
+            keys[table].extend(table_keys)
+
+    # Resolve the dimensions once for the whole batch
+    with metrics.timer('dimensions'):
+        dimension_ids = {table: dimension_cache.resolve_many(table, table_keys) for table, table_keys in keys.items()}
+
+    # Convert the documents into rows
+    with metrics.timer('convert'):
+        rows = defaultdict(list)
+        company_ids = key_allocator.reserve('FACT_CMP_Company', len(documents))
+        for company_id, doc in zip(company_ids, documents):
+            convert_document(doc, company_id, origin_id, dimension_ids, rows)
+
+        # Move the descriptions out of the company rows into their text table
+        rows['FACT_CMP_Company'], rows['TXT_CMP_Company'] = texts.split_rows(
+            'FACT_CMP_Company', COLUMNS['FACT_CMP_Company'], rows['FACT_CMP_Company']
+        )
+
+    return len(documents), rows
+
+
+def insert_documents(
+        documents: list[dict],
+        origin_id: int,
+        dwh_engine,
+        key_allocator,
+        dimension_cache
+       ) -> int:
+    """
+    This function converts a batch of documents and inserts them into the DWH within one transaction.
+    Every table is written with a single statement per batch.
+
+    :param documents: The documents to insert.
+    :param origin_id: The ID of the DIM_Origin table from the dwh.
+    :param dwh_engine: The DWH engine to use.
+    :param key_allocator: The key allocator used to assign the keys.
+    :param dimension_cache: The dimension cache used to resolve the dimension members.
+    :return: The number of companies inserted.
+    """
+    count, rows = convert_documents(documents, origin_id, dwh_engine, key_allocator, dimension_cache)
+
+    with dwh_engine.begin() as connection:
+        for table in WRITE_ORDER:
+            write_rows(connection, table, rows[table])
+
+    return count
+
+
+def stage_documents(
+        documents: list[dict],
+        origin_id: int,
+        dwh_engine,
+        key_allocator,
+        dimension_cache,
+        staging_writer
+       ) -> int:
+    """
+    This function converts a batch of documents and appends the rows to the staging files.
+    The rows reach the DWH once the files are loaded with staging.load_files.
+
+    :param documents: The documents to stage.
+    :param origin_id: The ID of the DIM_Origin table from the dwh.
+    :param dwh_engine: The DWH engine to use.
+    :param key_allocator: The key allocator used to assign the keys.
+    :param dimension_cache: The dimension cache used to resolve the dimension members.
+    :param staging_writer: The staging writer the rows are written to.
+    :return: The number of companies staged.
+    """
+    count, rows = convert_documents(documents, origin_id, dwh_engine, key_allocator, dimension_cache)
+
+    for table in WRITE_ORDER:
+        staging_writer.write(table, rows[table])
+
+    return count
@@ -1,14 +1,63 @@
 """
 This module contains functions to convert document data to DWH tables.
 
+Every converter returns a compact record (a named tuple without per-instance dict) whose fields
+match the column order of the target table. The *_batch variants convert a list of documents
+into column arrays in one pass.
 """
-import pandas as pd
 import datetime
+from typing import NamedTuple
 
 
-def location(location_object: dict) -> pd.DataFrame:
+class Location(NamedTuple):
     """
-    This function converts a location to the FACT_LIN_Location table.
+    A row of the DIM_LIN_Location table (without the id), which is also its natural key.
+    """
+    countryLetters: str | None
+    countryName: str | None
+    state: str | None
+    city: str | None
+
+
+class Company(NamedTuple):
+    """
+    A row of the FACT_CMP_Company table (without the id).
+    """
+    idHqLocation: int | None
+    industry: str | None
+    type: str | None
+    founded: int | None
+    name: str | None
+    universalName: str | None
+    tagline: str | None
+    sizeA: int | None
+    sizeB: int | None
+    sizeLinkedIn: int | None
+    followers: int | None
+    website: int
+    profilePicture: int
+    backgroundPicture: int
+    description: str | None
+    mongoCollectionId: object
+    idOrigin: int
+
+
+def columns(records: list[tuple], fields: tuple) -> dict[str, list]:
+    """
+    This function turns records into column arrays.
+
+    :param records: The records to transpose.
+    :param fields: The names of the columns.
+    :return: A dictionary mapping the column names to lists of values.
+    """
+    if not records:
+        return {field: [] for field in fields}
+    return {field: list(values) for field, values in zip(fields, zip(*records))}
+
+
+def location(location_object: dict) -> Location:
+    """
+    This function converts a location to the DIM_LIN_Location table.
 
     :param location_object: The dictionary to convert.
     """
@@ -27,19 +76,16 @@ def location(location_object: dict) -> pd.DataFrame:
     else:
         loc_state = location_object.get('postal_code')
 
-    # Create and fill the table
-    location_dict = {
-        'countryLetters': country_letters,
-        'countryName': country_name,
-        'state': loc_state,
-        'city': location_object.get('city')
-    }
-
-    # Create and return DataFrame
-    return pd.DataFrame([location_dict])
+    # Create and return the record
+    return Location(
+        countryLetters=country_letters,
+        countryName=country_name,
+        state=loc_state,
+        city=location_object.get('city')
+    )
 
 
-def company(document: dict, dimension_key_hq: int, dimension_key_origin: int) -> pd.DataFrame:
+def company(document: dict, dimension_key_hq: int, dimension_key_origin: int) -> Company:
     """
     This function converts a company to the FACT_CMP_Company table.
 
@@ -56,28 +102,26 @@ def company(document: dict, dimension_key_hq: int, dimension_key_origin: int) ->
         if document.get('company_size')[1]:
             size_b = document.get('company_size')[1]
 
-    # Create and fill the table
-    company_dict = {
-        'idHqLocation': dimension_key_hq,
-        'industry': document.get('industry'),
-        'type': document.get('company_type'),
-        'founded': document.get('founded_year'),
-        'name': document.get('name'),
-        'tagline': document.get('tagline'),
-        'sizeA': size_a,
-        'sizeB': size_b,
-        'sizeLinkedIn': document.get('company_size_on_linkedin'),
-        'followers': document.get('follower_count'),
-        'website': 1 if document.get('website') else 0,
-        'profilePicture': 1 if document.get('profile_pic_url') else 0,
-        'backgroundPicture': 1 if document.get('background_cover_image_url') else 0,
-        'description': document.get('description'),
-        'mongoCollectionId': document.get('_id'),
-        'idOrigin': dimension_key_origin
-    }
-
-    # Create and return DataFrame
-    return pd.DataFrame([company_dict])
+    # Create and return the record
+    return Company(
+        idHqLocation=dimension_key_hq,
+        industry=document.get('industry'),
+        type=document.get('company_type'),
+        founded=document.get('founded_year'),
+        name=document.get('name'),
+        universalName=document.get('universal_name_id'),
+        tagline=document.get('tagline'),
+        sizeA=size_a,
+        sizeB=size_b,
+        sizeLinkedIn=document.get('company_size_on_linkedin'),
+        followers=document.get('follower_count'),
+        website=1 if document.get('website') else 0,
+        profilePicture=1 if document.get('profile_pic_url') else 0,
+        backgroundPicture=1 if document.get('background_cover_image_url') else 0,
+        description=document.get('description'),
+        mongoCollectionId=document.get('_id'),
+        idOrigin=dimension_key_origin
+    )
 
 
 def convert_date(date_object: dict) -> datetime.date | None:
@@ -92,3 +136,37 @@ def convert_date(date_object: dict) -> datetime.date | None:
         return datetime.date(year=date_object['year'], month=date_object['month'], day=date_object['day'])
     else:
         return None
+
+
+def companies_batch(documents: list[dict], location_ids: dict, dimension_key_origin: int) -> dict[str, list]:
+    """
+    This function converts a list of companies to column arrays of the FACT_CMP_Company table.
+
+    :param documents: The documents to convert.
+    :param location_ids: The IDs of the location dimension, mapped by Location record.
+    :param dimension_key_origin: The ID of the origin in the DWH.
+    """
+    return columns(
+        [
+            company(doc, location_ids.get(location(doc.get('hq'))) if doc.get('hq') else None, dimension_key_origin)
+            for doc in documents
+        ],
+        Company._fields
+    )
+
+
+def locations_batch(documents: list[dict]) -> dict[str, list]:
+    """
+    This function converts the locations of a list of companies to column arrays of the DIM_LIN_Location table.
+    The additional 'document' column holds the position of the document each row belongs to.
+
+    :param documents: The documents to convert.
+    """
+    positions = []
+    records = []
+    for position, doc in enumerate(documents):
+        for loc in doc.get('locations') or []:
+            positions.append(position)
+            records.append(location(loc))
+
+    return {'document': positions, **columns(records, Location._fields)}
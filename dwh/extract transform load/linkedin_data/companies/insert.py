@@ -6,6 +6,40 @@ import sqlalchemy  # Requires pymysql
 from datetime import datetime
 # Import conversion functions
 from dwh.linkedin_data.companies import convert as conv
+from dwh.linkedin_data import texts
+
+
+def _dimension_id(table: str, key: dict, dwh_engine) -> int:
+    """
+    This function returns the ID of a dimension member and inserts the member if it does not exist yet.
+    Relies on the unique index of the natural key (migrations/02_natural_key_indexes.sql).
+
+    :param table: The name of the dimension table.
+    :param key: The natural key of the member, mapping the columns to their values.
+    :param dwh_engine: The DWH engine to use.
+    """
+    # Insert the member or, if its natural key exists already, make LAST_INSERT_ID() return the existing id
+    query = (
+        f"INSERT INTO {table} ({', '.join(key)}) VALUES ({', '.join(['%s'] * len(key))}) "
+        f"ON DUPLICATE KEY UPDATE id = LAST_INSERT_ID(id)"
+    )
+    with dwh_engine.begin() as connection:
+        return connection.exec_driver_sql(query, tuple(key.values())).lastrowid
+
+
+def _insert_relations(table: str, columns: tuple, rows: list[tuple], dwh_engine):
+    """
+    This function inserts relationship records, records that exist already are skipped by their unique index.
+
+    :param table: The name of the relation table.
+    :param columns: The columns of the rows.
+    :param rows: The rows to insert.
+    :param dwh_engine: The DWH engine to use.
+    """
+    if rows:
+        query = f"INSERT IGNORE INTO {table} ({', '.join(columns)}) VALUES ({', '.join(['%s'] * len(columns))})"
+        with dwh_engine.begin() as connection:
+            connection.exec_driver_sql(query, rows)
 
 
 def hq_location(document: dict, dwh_engine):
@@ -22,29 +56,10 @@ def hq_location(document: dict, dwh_engine):
 
     # Prepare location data
     if hq_dict:
-        location_df = conv.location(hq_dict)
-
-        # Check if a matching record exists
-        query = """
-            SELECT id
-            FROM DIM_LIN_Location
-            WHERE countryLetters = %(countryLetters)s 
-            AND countryName = %(countryName)s
-            AND city = %(city)s
-            AND state = %(state)s
-        """
-        result = pd.read_sql_query(query, dwh_engine, params=location_df.iloc[0].to_dict())
-
-        if not result.empty:
-            # If matching record found, use existing id
-            location_id = result.iloc[0]['id']
-        else:
-            # If no matching record found, insert a new record and use its id
-            location_df.to_sql('DIM_LIN_Location', dwh_engine, if_exists='append', index=False)
-            location_id = pd.read_sql_query("SELECT LAST_INSERT_ID()", dwh_engine).iloc[0, 0]
-
-        # Return location id
-        return location_id
+        location_row = conv.location(hq_dict)
+
+        # Get the id of a matching record or insert a new one
+        return _dimension_id('DIM_LIN_Location', location_row._asdict(), dwh_engine)
     else:
         # Return None if no location data
         return None
@@ -54,19 +69,21 @@ def company(document: dict, hq_id: int, origin_id: int, dwh_engine) -> int:
     """
     This function inserts a person into the DWH and returns its ID.
 
-    DWH table: FACT_PRF_Person
+    DWH tables: FACT_CMP_Company, TXT_CMP_Company
 
     :param document: The document to convert.
     :param hq_id: The ID of the hq location.
     :param origin_id: The ID of the DIM_Origin table from the dwh.
     :param dwh_engine: The DWH engine to use.
     """
-    # Prepare person data
-    company_df = conv.company(document, hq_id, origin_id)
+    # Prepare person data, the description goes into its text table
+    company_row, description = texts.split_row('FACT_CMP_Company', conv.company(document, hq_id, origin_id)._asdict())
 
     # Insert person data
-    company_df.to_sql('FACT_CMP_Company', dwh_engine, if_exists='append', index=False)
+    pd.DataFrame([company_row]).to_sql('FACT_CMP_Company', dwh_engine, if_exists='append', index=False)
     company_id = pd.read_sql_query("SELECT LAST_INSERT_ID()", dwh_engine).iloc[0, 0]
+    with dwh_engine.begin() as connection:
+        texts.insert_text('FACT_CMP_Company', int(company_id), description, connection)
 
     # Return person id
     return company_id
@@ -150,40 +167,18 @@ def specialties(document: dict, company_id: int, dwh_engine):
     :param dwh_engine: The DWH engine to use.
     """
     if document.get('specialities'):
-        for spec in document.get('specialities'):
-            # Check if a matching record exists
-            query = """
-                SELECT id
-                FROM DIM_CMP_Specialty
-                WHERE name = %(name)s
-            """
-            result = pd.read_sql_query(query, dwh_engine, params={'name': spec.strip()})
-
-            if not result.empty:
-                # If matching record found, use existing id
-                spec_id = result.iloc[0]['id']
-            else:
-                # If no matching record found, insert a new record and use its id
-                pd.DataFrame([{
-                    'name': spec.strip()
-                }]).to_sql('DIM_CMP_Specialty', dwh_engine, if_exists='append', index=False)
-                spec_id = pd.read_sql_query("SELECT LAST_INSERT_ID()", dwh_engine).iloc[0, 0]
-
-            # Check if a relationship record already exists
-            query = """
-                SELECT *
-                FROM REL_CMP_Company_Specialty
-                WHERE idCompany = %(idCompany)s
-                AND idSpecialty = %(idSpecialty)s
-            """
-            result = pd.read_sql_query(query, dwh_engine, params={'idCompany': company_id, 'idSpecialty': spec_id})
-
-            # Insert if relationship record does not exist
-            if result.empty:
-                pd.DataFrame([{
-                    'idCompany': company_id,
-                    'idSpecialty': spec_id
-                }]).to_sql('REL_CMP_Company_Specialty', dwh_engine, if_exists='append', index=False)
+        # Get the ids of matching records or insert new ones
+        spec_ids = [
+            _dimension_id('DIM_CMP_Specialty', {'name': spec.strip()}, dwh_engine)
+            for spec in document.get('specialities')
+        ]
+
+        # Insert the relationship records that do not exist yet
+        _insert_relations(
+            'REL_CMP_Company_Specialty', ('idCompany', 'idSpecialty'),
+            [(company_id, spec_id) for spec_id in spec_ids], dwh_engine
+        )
+
 
 def locations(document: dict, company_id: int, dwh_engine):
     """
@@ -196,41 +191,14 @@ def locations(document: dict, company_id: int, dwh_engine):
     :param dwh_engine: The DWH engine to use.
     """
     if document.get('locations'):
-        for loc in document.get('locations'):
-            # Prepare location data
-            location_df = conv.location(loc)
-
-            # Check if a matching record exists
-            query = """
-                SELECT id
-                FROM DIM_LIN_Location
-                WHERE countryLetters = %(countryLetters)s 
-                AND countryName = %(countryName)s
-                AND city = %(city)s
-                AND state = %(state)s
-            """
-            result = pd.read_sql_query(query, dwh_engine, params=location_df.iloc[0].to_dict())
-
-            if not result.empty:
-                # If matching record found, use existing id
-                location_id = result.iloc[0]['id']
-            else:
-                # If no matching record found, insert a new record and use its id
-                location_df.to_sql('DIM_LIN_Location', dwh_engine, if_exists='append', index=False)
-                location_id = pd.read_sql_query("SELECT LAST_INSERT_ID()", dwh_engine).iloc[0, 0]
-
-            # Check if a relationship record already exists
-            query = """
-                SELECT *
-                FROM REL_CMP_Company_Location
-                WHERE idCompany = %(idCompany)s
-                AND idLocation = %(idLocation)s
-            """
-            result = pd.read_sql_query(query, dwh_engine, params={'idCompany': company_id, 'idLocation': location_id})
-
-            # Insert if relationship record does not exist
-            if result.empty:
-                pd.DataFrame([{
-                    'idCompany': company_id,
-                    'idLocation': location_id
-                }]).to_sql('REL_CMP_Company_Location', dwh_engine, if_exists='append', index=False)
+        # Get the ids of matching records or insert new ones
+        location_ids = [
+            _dimension_id('DIM_LIN_Location', conv.location(loc)._asdict(), dwh_engine)
+            for loc in document.get('locations')
+        ]
+
+        # Insert the relationship records that do not exist yet
+        _insert_relations(
+            'REL_CMP_Company_Location', ('idCompany', 'idLocation'),
+            [(company_id, location_id) for location_id in location_ids], dwh_engine
+        )
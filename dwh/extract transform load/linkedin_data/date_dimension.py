@@ -0,0 +1,122 @@
+"""
+This script loads the DIM_Date table, the date dimension keyed by yyyymmdd integers.
+
+Every year of convert.DATE_RANGE gets a row per day plus a row for the year (yyyy0000) and for each
+of its months (yyyymm00), which the partial dates of the qualifications reference. The keys are
+computed by the importer itself (convert.date_key), so qualifications need no lookup for their dates
+and durations can be queried as integer ranges, e.g. idStartDate BETWEEN 20200000 AND 20201231.
+
+Qualifications imported before DIM_Date reference DIM_PRF_Duration, their keys are filled from it.
+"""
+import os
+import time
+import calendar
+import datetime
+from dotenv import load_dotenv, find_dotenv
+from sqlalchemy import create_engine  # Requires pymysql
+from dwh.linkedin_data.profiles.convert import DATE_RANGE
+
+# Columns of the DIM_Date table, the rows are tuples in this order
+COLUMNS = ('id', 'date', 'year', 'quarter', 'month', 'day', 'weekday', 'granularity')
+
+# Number of rows inserted (or qualifications updated) per statement
+LOAD_CHUNK_SIZE = 10000
+
+
+def date_rows(first_year: int, last_year: int):
+    """
+    This function generates the rows of the date dimension.
+
+    :param first_year: The first year to generate.
+    :param last_year: The last year to generate (inclusive).
+    :return: A generator of tuples in the order of COLUMNS.
+    """
+    for year in range(first_year, last_year + 1):
+        yield year * 10000, None, year, None, None, None, None, 'year'
+        for month in range(1, 13):
+            quarter = (month - 1) // 3 + 1
+            yield year * 10000 + month * 100, None, year, quarter, month, None, None, 'month'
+            for day in range(1, calendar.monthrange(year, month)[1] + 1):
+                date = datetime.date(year, month, day)
+                yield year * 10000 + month * 100 + day, date, year, quarter, month, day, date.isoweekday(), 'day'
+
+
+def load(dwh_engine, first_year: int = DATE_RANGE[0], last_year: int = DATE_RANGE[1], chunk_size: int = LOAD_CHUNK_SIZE) -> int:
+    """
+    This function inserts the missing rows of the date dimension.
+
+    :param dwh_engine: The DWH engine to use.
+    :param first_year: The first year to load.
+    :param last_year: The last year to load (inclusive).
+    :param chunk_size: Number of rows per INSERT statement.
+    :return: The number of inserted rows.
+    """
+    query = f"INSERT IGNORE INTO DIM_Date ({', '.join(COLUMNS)}) VALUES ({', '.join(['%s'] * len(COLUMNS))})"
+    rows = list(date_rows(first_year, last_year))
+    inserted = 0
+
+    with dwh_engine.begin() as connection:
+        for start in range(0, len(rows), chunk_size):
+            inserted += connection.exec_driver_sql(query, rows[start:start + chunk_size]).rowcount
+
+    return inserted
+
+
+def backfill(dwh_engine, chunk_size: int = LOAD_CHUNK_SIZE) -> int:
+    """
+    This function fills the date keys of qualifications that only reference DIM_PRF_Duration.
+    The qualifications are updated in chunks of their ids, every chunk is committed on its own.
+
+    :param dwh_engine: The DWH engine to use.
+    :param chunk_size: Number of qualification ids per UPDATE statement.
+    :return: The number of updated qualifications.
+    """
+    # Key of a DATE column, dates outside of DIM_Date get no key
+    def key(column: str) -> str:
+        return (
+            f"CASE WHEN YEAR({column}) BETWEEN {DATE_RANGE[0]} AND {DATE_RANGE[1]} "
+            f"THEN YEAR({column}) * 10000 + MONTH({column}) * 100 + DAY({column}) END"
+        )
+
+    with dwh_engine.connect() as connection:
+        first_id, last_id = connection.exec_driver_sql(
+            "SELECT MIN(id), MAX(id) FROM FACT_PRF_Qualification WHERE idDuration IS NOT NULL"
+        ).one()
+    if first_id is None:
+        return 0
+
+    updated = 0
+    for start in range(first_id, last_id + 1, chunk_size):
+        with dwh_engine.begin() as connection:
+            updated += connection.exec_driver_sql(
+                f"""
+                UPDATE FACT_PRF_Qualification q
+                JOIN DIM_PRF_Duration d ON q.idDuration = d.id
+                SET q.idStartDate = {key('d.startDate')}, q.idEndDate = {key('d.endDate')}
+                WHERE q.id >= %s AND q.id < %s AND q.idStartDate IS NULL AND q.idEndDate IS NULL
+                """,
+                (start, start + chunk_size)
+            ).rowcount
+
+    return updated
+
+
+# Load environment variables
+load_dotenv(find_dotenv())
+
+# Connection string
+mysql_url = os.getenv("DATABASE_DWH")
+dwh_schema_name = 'DWH'
+
+# Whether to fill the date keys of the qualifications imported before DIM_Date
+backfill_qualifications = True
+
+if __name__ == "__main__":
+    dwh = create_engine(f'{mysql_url}/{dwh_schema_name}?charset=utf8mb4')
+
+    start_time = time.perf_counter()
+    print(f"DIM_Date: {load(dwh)} rows inserted for {DATE_RANGE[0]} - {DATE_RANGE[1]}")
+
+    if backfill_qualifications:
+        print(f"FACT_PRF_Qualification: {backfill(dwh)} date keys filled from DIM_PRF_Duration")
+    print(f"Done in {time.perf_counter() - start_time:.1f}s")
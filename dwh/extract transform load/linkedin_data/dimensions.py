@@ -0,0 +1,290 @@
+"""
+This module holds the dimension cache used to resolve the natural keys of dimension members to their ids.
+"""
+import pickle
+import threading
+from collections import OrderedDict
+from sqlalchemy.exc import IntegrityError
+
+# Natural key columns of the dimension tables
+DIMENSIONS = {
+    'DIM_PRF_Location': ('countryLetters', 'countryName', 'state', 'city'),
+    'DIM_PRF_Language': ('language',),
+    'DIM_PRF_Trait': ('type', 'name'),
+    'DIM_PRF_Group': ('name',),
+    'DIM_PRF_Duration': ('startDate', 'endDate'),
+    'DIM_LIN_Location': ('countryLetters', 'countryName', 'state', 'city'),
+    'DIM_CMP_Specialty': ('name',)
+}
+
+# Maximum number of members kept in memory per dimension (missing tables are not bounded)
+MAX_SIZES = {
+    'DIM_PRF_Location': 250000,
+    'DIM_PRF_Duration': 250000,
+    'DIM_LIN_Location': 250000
+}
+
+# Number of natural keys looked up per SELECT statement
+LOOKUP_CHUNK_SIZE = 500
+
+# Number of times the insert of new members is retried after other processes inserted some of them first
+INSERT_ATTEMPTS = 3
+
+# Names of the counters kept per dimension
+COUNTERS = ('hits', 'misses', 'selects', 'inserts', 'evictions')
+
+
+def normalise(key: tuple) -> tuple:
+    """
+    This function normalises a natural key the way the case-insensitive DWH collation compares it.
+
+    :param key: The natural key to normalise.
+    """
+    return tuple(value.casefold() if isinstance(value, str) else value for value in key)
+
+
+class DimensionCache:
+    """
+    This class resolves natural keys of the dimension tables to their surrogate ids in memory.
+
+    The cache is meant to be shared by all worker threads. Keys that are not cached are looked up
+    and inserted in batches, new members are committed right away with keys from the key allocator.
+    Large dimensions are bounded and evict their least recently used members.
+
+    DWH tables: DIM_PRF_Location, DIM_PRF_Language, DIM_PRF_Trait, DIM_PRF_Group, DIM_PRF_Duration,
+    DIM_LIN_Location, DIM_CMP_Specialty
+    """
+
+    def __init__(self, dwh_engine, key_allocator, max_sizes: dict | None = None):
+        """
+        :param dwh_engine: The DWH engine to use.
+        :param key_allocator: The key allocator used to assign the keys of new members.
+        :param max_sizes: Maximum number of cached members per dimension, defaults to MAX_SIZES.
+        """
+        self._dwh_engine = dwh_engine
+        self._key_allocator = key_allocator
+        self._max_sizes = MAX_SIZES if max_sizes is None else max_sizes
+        self._members = {table: OrderedDict() for table in DIMENSIONS}
+        self._counters = {table: dict.fromkeys(COUNTERS, 0) for table in DIMENSIONS}
+
+        # The member lock guards the cached members, the miss lock serialises the database lookups
+        self._member_locks = {table: threading.Lock() for table in DIMENSIONS}
+        self._miss_locks = {table: threading.Lock() for table in DIMENSIONS}
+
+    def warm(self, tables: list[str] | None = None):
+        """
+        This function loads the members of the dimension tables from the DWH into the cache.
+        Bounded dimensions only load their most recent members.
+
+        :param tables: The dimension tables to load, defaults to all of them.
+        """
+        for table in tables or DIMENSIONS:
+            query = f"SELECT id, {', '.join(DIMENSIONS[table])} FROM {table} ORDER BY id DESC"
+            if self._max_sizes.get(table):
+                query += f" LIMIT {int(self._max_sizes[table])}"
+
+            with self._dwh_engine.connect() as connection:
+                rows = connection.exec_driver_sql(query).fetchall()
+
+            # Store the oldest members first, so they are evicted first
+            self._store(table, {normalise(tuple(row[1:])): row[0] for row in reversed(rows)})
+
+    def save(self, path: str, tables: list[str] | None = None):
+        """
+        This function writes the cached members into a map file, which can be loaded by other processes.
+
+        :param path: The path of the map file.
+        :param tables: The dimension tables to write, defaults to all of them.
+        """
+        snapshot = {}
+        for table in tables or DIMENSIONS:
+            with self._member_locks[table]:
+                snapshot[table] = dict(self._members[table])
+
+        with open(path, 'wb') as file:
+            pickle.dump(snapshot, file, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def load(self, path: str) -> dict[str, int]:
+        """
+        This function loads the members of a map file written by save (e.g. by preload.py) into the cache.
+        Create the cache with max_sizes={} to keep all of them, bounded dimensions keep the last members only.
+
+        :param path: The path of the map file.
+        :return: The number of loaded members per dimension table.
+        """
+        with open(path, 'rb') as file:
+            snapshot = pickle.load(file)
+
+        for table, members in snapshot.items():
+            self._store(table, members)
+        return {table: len(members) for table, members in snapshot.items()}
+
+    def resolve(self, table: str, key: tuple) -> int:
+        """
+        This function resolves a single natural key to its id.
+
+        :param table: The name of the dimension table.
+        :param key: The natural key in the column order of the dimension.
+        :return: The id of the dimension member.
+        """
+        return self.resolve_many(table, [key])[key]
+
+    def resolve_many(self, table: str, keys: list[tuple]) -> dict[tuple, int]:
+        """
+        This function resolves natural keys to their ids.
+        Keys that are not cached are looked up in the DWH and inserted if missing.
+
+        :param table: The name of the dimension table.
+        :param keys: The natural keys to resolve (may contain duplicates).
+        :return: A dictionary mapping every requested natural key to its id.
+        """
+        # Group the requested keys the way the DWH compares them
+        requested = {}
+        for key in keys:
+            requested.setdefault(normalise(key), []).append(key)
+
+        ids = self._lookup(table, requested, count=True)
+
+        # Resolve the misses in one go, other threads missing the same keys wait for the result
+        missing = {normalised: variants[0] for normalised, variants in requested.items() if normalised not in ids}
+        if missing:
+            with self._miss_locks[table]:
+                ids.update(self._lookup(table, missing))
+                missing = {normalised: key for normalised, key in missing.items() if normalised not in ids}
+                if missing:
+                    loaded = self._load(table, missing)
+                    self._store(table, loaded)
+                    ids.update(loaded)
+
+        # Map every spelling of a key to its id
+        return {key: ids[normalised] for normalised, variants in requested.items() for key in variants}
+
+    def counters(self) -> dict[str, dict[str, int]]:
+        """
+        This function returns a copy of the hit and miss counters per dimension.
+        """
+        return {table: dict(counters) for table, counters in self._counters.items()}
+
+    def report(self, since: dict | None = None) -> str:
+        """
+        This function returns a printable summary of the counters.
+
+        :param since: Counters returned by an earlier call of counters(), to report the difference only.
+        """
+        lines = []
+        for table, counters in self.counters().items():
+            if since:
+                counters = {name: value - since[table][name] for name, value in counters.items()}
+            saved = counters['hits'] + counters['misses'] - counters['selects']
+            lines.append(
+                f"{table}: {counters['hits']} hits, {counters['misses']} misses, {counters['selects']} SELECTs, "
+                f"{counters['inserts']} inserted, {counters['evictions']} evicted, {saved} SELECTs saved "
+                f"({len(self._members[table])} cached)"
+            )
+        return '\n'.join(lines)
+
+    def _lookup(self, table: str, keys: dict, count: bool = False) -> dict[tuple, int]:
+        """
+        This function looks up normalised keys in the cache.
+
+        :param table: The name of the dimension table.
+        :param keys: The normalised keys to look up.
+        :param count: Whether to update the hit and miss counters (requires lists of requested spellings as values).
+        :return: A dictionary mapping the cached keys to their ids.
+        """
+        ids = {}
+        with self._member_locks[table]:
+            members = self._members[table]
+            counters = self._counters[table]
+
+            for normalised, variants in keys.items():
+                if normalised in members:
+                    members.move_to_end(normalised)
+                    ids[normalised] = members[normalised]
+                    if count:
+                        counters['hits'] += len(variants)
+                elif count:
+                    counters['misses'] += len(variants)
+
+        return ids
+
+    def _load(self, table: str, keys: dict) -> dict[tuple, int]:
+        """
+        This function looks up natural keys in the DWH and inserts the missing members.
+        A member inserted by another process in the meantime violates the unique index of the natural key
+        (migrations/02_natural_key_indexes.sql), in which case the keys are looked up again.
+
+        :param table: The name of the dimension table.
+        :param keys: The natural keys to load, mapped by their normalised form.
+        :return: A dictionary mapping the normalised keys to their ids.
+        """
+        columns = DIMENSIONS[table]
+
+        with self._dwh_engine.begin() as connection:
+            found = self._select(connection, table, list(keys.values()))
+
+            # Insert the missing members with reserved ids
+            for attempt in range(INSERT_ATTEMPTS):
+                missing = [(normalised, key) for normalised, key in keys.items() if normalised not in found]
+                if not missing:
+                    break
+
+                new_ids = self._key_allocator.reserve(table, len(missing))
+                try:
+                    with connection.begin_nested():
+                        connection.exec_driver_sql(
+                            f"INSERT INTO {table} (id, {', '.join(columns)}) VALUES ({', '.join(['%s'] * (len(columns) + 1))})",
+                            [(new_id, *key) for new_id, (_, key) in zip(new_ids, missing)]
+                        )
+                except IntegrityError:
+                    if attempt == INSERT_ATTEMPTS - 1:
+                        raise
+                    found.update(self._select(connection, table, [key for _, key in missing]))
+                    continue
+
+                found.update((normalised, new_id) for new_id, (normalised, _) in zip(new_ids, missing))
+                self._counters[table]['inserts'] += len(missing)
+                break
+
+        return found
+
+    def _select(self, connection, table: str, keys: list[tuple]) -> dict[tuple, int]:
+        """
+        This function looks up natural keys in the DWH in chunks (NULL-safe comparison).
+
+        :param connection: The DWH connection to use.
+        :param table: The name of the dimension table.
+        :param keys: The natural keys to look up.
+        :return: A dictionary mapping the normalised keys of the existing members to their ids.
+        """
+        columns = DIMENSIONS[table]
+        key_condition = '(' + ' AND '.join(f'{column} <=> %s' for column in columns) + ')'
+        found = {}
+
+        for start in range(0, len(keys), LOOKUP_CHUNK_SIZE):
+            chunk = keys[start:start + LOOKUP_CHUNK_SIZE]
+            query = f"SELECT id, {', '.join(columns)} FROM {table} WHERE {' OR '.join([key_condition] * len(chunk))}"
+            for row in connection.exec_driver_sql(query, tuple(value for key in chunk for value in key)):
+                found.setdefault(normalise(tuple(row[1:])), row[0])
+            self._counters[table]['selects'] += 1
+
+        return found
+
+    def _store(self, table: str, members: dict):
+        """
+        This function stores members in the cache and evicts the least recently used ones.
+
+        :param table: The name of the dimension table.
+        :param members: The members to store, mapped from normalised key to id.
+        """
+        max_size = self._max_sizes.get(table)
+        with self._member_locks[table]:
+            cached = self._members[table]
+            for normalised, member_id in members.items():
+                cached[normalised] = member_id
+                cached.move_to_end(normalised)
+
+            # Evict the least recently used members
+            while max_size and len(cached) > max_size:
+                cached.popitem(last=False)
+                self._counters[table]['evictions'] += 1
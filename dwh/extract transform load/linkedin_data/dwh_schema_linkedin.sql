@@ -26,8 +26,35 @@ CREATE TABLE IF NOT EXISTS `DWH`.`DIM_LIN_Location` (
   `countryName` VARCHAR(43) NULL COMMENT 'country_full_name attribute of person or country attribute of company if more than 2 chars (doesn\'t fit into countryLetters)',
   `state` VARCHAR(56) NULL COMMENT 'state attribute',
   `city` VARCHAR(89) NULL COMMENT 'city attribute',
+  `naturalKeyHash` BINARY(16) AS (UNHEX(MD5(CONCAT_WS(CHAR(31 USING utf8mb4),
+    IFNULL(LOWER(`countryLetters`), CHAR(0 USING utf8mb4)),
+    IFNULL(LOWER(`countryName`), CHAR(0 USING utf8mb4)),
+    IFNULL(LOWER(`state`), CHAR(0 USING utf8mb4)),
+    IFNULL(LOWER(`city`), CHAR(0 USING utf8mb4)))))) STORED COMMENT 'NULL-safe hash of the natural key',
   PRIMARY KEY (`id`),
-  UNIQUE INDEX `idLocation_UNIQUE` (`id` ASC) )
+  UNIQUE INDEX `idLocation_UNIQUE` (`id` ASC) ,
+  UNIQUE INDEX `naturalKeyHash_UNIQUE` (`naturalKeyHash` ASC) ,
+  INDEX `naturalKey_idx` (`countryLetters` ASC, `countryName` ASC, `state` ASC, `city` ASC) )
+ENGINE = InnoDB;
+
+
+-- -----------------------------------------------------
+-- Table `DWH`.`DIM_PRF_Location`
+-- -----------------------------------------------------
+CREATE TABLE IF NOT EXISTS `DWH`.`DIM_PRF_Location` (
+  `id` INT NOT NULL AUTO_INCREMENT,
+  `countryLetters` CHAR(2) NULL COMMENT 'country attribute of person',
+  `countryName` VARCHAR(100) NULL COMMENT 'country_full_name attribute of person',
+  `state` VARCHAR(100) NULL COMMENT 'state attribute of person',
+  `city` VARCHAR(100) NULL COMMENT 'city attribute of person',
+  `naturalKeyHash` BINARY(16) AS (UNHEX(MD5(CONCAT_WS(CHAR(31 USING utf8mb4),
+    IFNULL(LOWER(`countryLetters`), CHAR(0 USING utf8mb4)),
+    IFNULL(LOWER(`countryName`), CHAR(0 USING utf8mb4)),
+    IFNULL(LOWER(`state`), CHAR(0 USING utf8mb4)),
+    IFNULL(LOWER(`city`), CHAR(0 USING utf8mb4)))))) STORED COMMENT 'NULL-safe hash of the natural key',
+  PRIMARY KEY (`id`),
+  UNIQUE INDEX `naturalKeyHash_UNIQUE` (`naturalKeyHash` ASC) ,
+  INDEX `naturalKey_idx` (`countryLetters` ASC, `countryName` ASC, `state` ASC, `city` ASC) )
 ENGINE = InnoDB;
 
 
@@ -53,10 +80,12 @@ ENGINE = InnoDB;
 CREATE TABLE IF NOT EXISTS `DWH`.`FACT_PRF_Person` (
   `id` INT NOT NULL AUTO_INCREMENT COMMENT 'Primary Key',
   `idLocation` INT NULL,
-  `name` VARCHAR(229) NULL COMMENT 'full_name attribute',
+  `firstName` VARCHAR(100) NULL COMMENT 'first_name attribute',
+  `lastName` VARCHAR(130) NULL COMMENT 'last_name attribute',
+  `fullname` VARCHAR(229) NULL COMMENT 'full_name attribute',
   `occupation` VARCHAR(198) NULL COMMENT 'occupation attribute',
   `headline` VARCHAR(220) NULL COMMENT 'headline attribute',
-  `summary` VARCHAR(2762) NULL COMMENT 'summary attribute',
+  `summaryLength` SMALLINT UNSIGNED NULL COMMENT 'length of the summary attribute, the text is in TXT_PRF_Summary',
   `connections` INT NULL COMMENT 'connections attribute',
   `inferredSalaryMin` INT NULL COMMENT 'inferred_salary[\"min\"] attribute',
   `inferredSalaryMax` INT NULL COMMENT 'inferred_salary[\"max\"] attribute',
@@ -65,22 +94,14 @@ CREATE TABLE IF NOT EXISTS `DWH`.`FACT_PRF_Person` (
   `profilePicture` TINYINT NULL COMMENT 'profile_pic_url attribute\n\nBool:\nlink present=1\nno link present=0',
   `backgroundPicture` TINYINT NULL COMMENT 'background_cover_image_url attribute\n\nBool:\nlink present=1\nno link present=0',
   `mongoCollectionId` CHAR(24) NOT NULL COMMENT 'ObjectId for matching mongoDB document',
-  `idOrigin` INT NOT NULL,
-  PRIMARY KEY (`id`),
-  UNIQUE INDEX `idPerson_UNIQUE` (`id` ASC) ,
+  `idOrigin` INT NOT NULL COMMENT 'origin of the person, the partitioning key',
+  PRIMARY KEY (`id`, `idOrigin`),
+  UNIQUE INDEX `mongoCollectionId_UNIQUE` (`mongoCollectionId` ASC, `idOrigin` ASC) ,
   INDEX `fk_FACT_Person_DIM_Country_idx` (`idLocation` ASC) ,
-  INDEX `fk_FACT_Person_DIM_Origin1_idx` (`idOrigin` ASC) ,
-  CONSTRAINT `fk_FACT_Person_DIM_Country`
-    FOREIGN KEY (`idLocation`)
-    REFERENCES `DWH`.`DIM_LIN_Location` (`id`)
-    ON DELETE NO ACTION
-    ON UPDATE NO ACTION,
-  CONSTRAINT `fk_FACT_Person_DIM_Origin1`
-    FOREIGN KEY (`idOrigin`)
-    REFERENCES `DWH`.`DIM_Origin` (`id`)
-    ON DELETE NO ACTION
-    ON UPDATE NO ACTION)
-ENGINE = InnoDB;
+  INDEX `fk_FACT_Person_DIM_Origin1_idx` (`idOrigin` ASC) )
+ENGINE = InnoDB
+PARTITION BY LIST (`idOrigin`) (
+  PARTITION `p0` VALUES IN (0));
 
 
 -- -----------------------------------------------------
@@ -90,8 +111,29 @@ CREATE TABLE IF NOT EXISTS `DWH`.`DIM_PRF_Duration` (
   `id` INT NOT NULL AUTO_INCREMENT,
   `startDate` DATE NULL COMMENT 'start date, mainly comes from persons qualifications',
   `endDate` DATE NULL COMMENT 'end date, mainly comes from persons qualifications',
+  `naturalKeyHash` BINARY(16) AS (UNHEX(MD5(CONCAT_WS(CHAR(31 USING utf8mb4),
+    IFNULL(`startDate`, CHAR(0 USING utf8mb4)),
+    IFNULL(`endDate`, CHAR(0 USING utf8mb4)))))) STORED COMMENT 'NULL-safe hash of the natural key',
   PRIMARY KEY (`id`),
-  UNIQUE INDEX `idDuration_UNIQUE` (`id` ASC) )
+  UNIQUE INDEX `idDuration_UNIQUE` (`id` ASC) ,
+  UNIQUE INDEX `naturalKeyHash_UNIQUE` (`naturalKeyHash` ASC) ,
+  INDEX `naturalKey_idx` (`startDate` ASC, `endDate` ASC) )
+ENGINE = InnoDB;
+
+
+-- -----------------------------------------------------
+-- Table `DWH`.`DIM_Date`
+-- -----------------------------------------------------
+CREATE TABLE IF NOT EXISTS `DWH`.`DIM_Date` (
+  `id` INT NOT NULL COMMENT 'yyyymmdd, yyyymm00 for a month and yyyy0000 for a year',
+  `date` DATE NULL COMMENT 'date of a day, NULL for months and years',
+  `year` SMALLINT NOT NULL,
+  `quarter` TINYINT NULL,
+  `month` TINYINT NULL,
+  `day` TINYINT NULL,
+  `weekday` TINYINT NULL COMMENT 'ISO weekday, Monday = 1',
+  `granularity` CHAR(5) NOT NULL COMMENT 'Can be: \nday\nmonth\nyear',
+  PRIMARY KEY (`id`))
 ENGINE = InnoDB;
 
 
@@ -99,25 +141,26 @@ ENGINE = InnoDB;
 -- Table `DWH`.`FACT_PRF_Qualification`
 -- -----------------------------------------------------
 CREATE TABLE IF NOT EXISTS `DWH`.`FACT_PRF_Qualification` (
-  `idPerson` INT NOT NULL,
+  `id` INT NOT NULL AUTO_INCREMENT,
+  `idPerson` INT NULL COMMENT 'not written by the importers, the person is linked by REL_PRF_Person_Qualification',
   `idDuration` INT NULL,
+  `idStartDate` INT NULL COMMENT 'starts_at as DIM_Date key',
+  `idEndDate` INT NULL COMMENT 'ends_at as DIM_Date key',
   `type` CHAR(13) NOT NULL COMMENT 'Name of attribute type, references multiple attributes of person.\n\nMapping is as follows:\nexperiences = experience\neducation = education\naccomplishment_projects = project\nvolunteer_work = volunteer\ncertifications = certification',
   `name` VARCHAR(255) NULL COMMENT 'Name or Title of the attribute, references a different key depending on type.\n\nMapping is as follows:\nexperiences = title\neducation = degree_name + field_of_study\nvolunteer_work = title\ncertifications = name',
   `institution` VARCHAR(234) NULL COMMENT 'Name of institution, references multiple, values have been taken from different attributes depending on the type of qualification referenced.\n\nMapping is as follows:\nexperiences = company\neducation = school\nvolunteer_work = company\ncertifications = authority',
-  `description` VARCHAR(2500) NULL COMMENT 'References the description, sometimes multipe keys of the object type had to be combined, if not simply references description key.\n\nMapping is as follows:\nvolunteer_work = cause + description\ncertifications = license_number + display_source',
+  `descriptionLength` SMALLINT UNSIGNED NULL COMMENT 'length of the description, the text is in TXT_PRF_Qualification',
+  `idOrigin` INT NOT NULL COMMENT 'origin of the person, the partitioning key',
+  `idCompany` INT NULL COMMENT 'FACT_CMP_Company of an experience, resolved by links.py (no foreign key, the table is partitioned)',
+  PRIMARY KEY (`id`, `idOrigin`),
   INDEX `fk_DIM_Experience_FACT_Person1_idx` (`idPerson` ASC) ,
   INDEX `fk_FACT_Experience_DIM_Duration1_idx` (`idDuration` ASC) ,
-  CONSTRAINT `fk_DIM_Experience_FACT_Person1`
-    FOREIGN KEY (`idPerson`)
-    REFERENCES `DWH`.`FACT_PRF_Person` (`id`)
-    ON DELETE NO ACTION
-    ON UPDATE NO ACTION,
-  CONSTRAINT `fk_FACT_Experience_DIM_Duration1`
-    FOREIGN KEY (`idDuration`)
-    REFERENCES `DWH`.`DIM_PRF_Duration` (`id`)
-    ON DELETE NO ACTION
-    ON UPDATE NO ACTION)
-ENGINE = InnoDB;
+  INDEX `fk_FACT_Qualification_DIM_Date1_idx` (`idStartDate` ASC, `idEndDate` ASC) ,
+  INDEX `fk_FACT_Qualification_DIM_Date2_idx` (`idEndDate` ASC) ,
+  INDEX `fk_FACT_Qualification_FACT_Company1_idx` (`idCompany` ASC) )
+ENGINE = InnoDB
+PARTITION BY LIST (`idOrigin`) (
+  PARTITION `p0` VALUES IN (0));
 
 
 -- -----------------------------------------------------
@@ -127,7 +170,8 @@ CREATE TABLE IF NOT EXISTS `DWH`.`DIM_PRF_Language` (
   `id` INT NOT NULL AUTO_INCREMENT,
   `language` VARCHAR(80) NULL COMMENT 'value of languages list attribute',
   PRIMARY KEY (`id`),
-  UNIQUE INDEX `idLanguages_UNIQUE` (`id` ASC) )
+  UNIQUE INDEX `idLanguages_UNIQUE` (`id` ASC) ,
+  UNIQUE INDEX `language_UNIQUE` (`language` ASC) )
 ENGINE = InnoDB;
 
 
@@ -137,13 +181,13 @@ ENGINE = InnoDB;
 CREATE TABLE IF NOT EXISTS `DWH`.`FACT_PRF_Recommendation` (
   `idPerson` INT NOT NULL,
   `recommendationText` VARCHAR(3122) NOT NULL COMMENT 'value from recommendations list attribute',
-  INDEX `fk_FACT_Recommendations_FACT_Person1_idx` (`idPerson` ASC) ,
-  CONSTRAINT `fk_FACT_Recommendations_FACT_Person1`
-    FOREIGN KEY (`idPerson`)
-    REFERENCES `DWH`.`FACT_PRF_Person` (`id`)
-    ON DELETE NO ACTION
-    ON UPDATE NO ACTION)
-ENGINE = InnoDB;
+  `idOrigin` INT NOT NULL COMMENT 'origin of the person, the partitioning key',
+  INDEX `fk_FACT_Recommendations_FACT_Person1_idx` (`idPerson` ASC) )
+ENGINE = InnoDB
+ROW_FORMAT = COMPRESSED
+KEY_BLOCK_SIZE = 8
+PARTITION BY LIST (`idOrigin`) (
+  PARTITION `p0` VALUES IN (0));
 
 
 -- -----------------------------------------------------
@@ -153,7 +197,8 @@ CREATE TABLE IF NOT EXISTS `DWH`.`DIM_PRF_Group` (
   `id` INT NOT NULL AUTO_INCREMENT,
   `name` VARCHAR(100) NOT NULL COMMENT 'name key',
   PRIMARY KEY (`id`),
-  UNIQUE INDEX `id_UNIQUE` (`id` ASC) )
+  UNIQUE INDEX `id_UNIQUE` (`id` ASC) ,
+  UNIQUE INDEX `name_UNIQUE` (`name` ASC) )
 ENGINE = InnoDB;
 
 
@@ -163,19 +208,12 @@ ENGINE = InnoDB;
 CREATE TABLE IF NOT EXISTS `DWH`.`REL_PRF_Person_Group` (
   `idPerson` INT NOT NULL,
   `idGroup` INT NOT NULL,
+  `idOrigin` INT NOT NULL COMMENT 'origin of the person, the partitioning key',
   INDEX `fk_REL_Person_Group_FACT_Person1_idx` (`idPerson` ASC) ,
-  INDEX `fk_REL_Person_Group_DIM_Group1_idx` (`idGroup` ASC) ,
-  CONSTRAINT `fk_REL_Person_Group_FACT_Person1`
-    FOREIGN KEY (`idPerson`)
-    REFERENCES `DWH`.`FACT_PRF_Person` (`id`)
-    ON DELETE NO ACTION
-    ON UPDATE NO ACTION,
-  CONSTRAINT `fk_REL_Person_Group_DIM_Group1`
-    FOREIGN KEY (`idGroup`)
-    REFERENCES `DWH`.`DIM_PRF_Group` (`id`)
-    ON DELETE NO ACTION
-    ON UPDATE NO ACTION)
-ENGINE = InnoDB;
+  INDEX `fk_REL_Person_Group_DIM_Group1_idx` (`idGroup` ASC) )
+ENGINE = InnoDB
+PARTITION BY LIST (`idOrigin`) (
+  PARTITION `p0` VALUES IN (0));
 
 
 -- -----------------------------------------------------
@@ -187,15 +225,40 @@ CREATE TABLE IF NOT EXISTS `DWH`.`FACT_PRF_Related` (
   `name` VARCHAR(100) NULL COMMENT 'name key',
   `location` VARCHAR(58) NULL COMMENT 'location key',
   `summary` VARCHAR(222) NULL COMMENT 'summary key',
-  INDEX `fk_FACT_Related_FACT_Person1_idx` (`idPerson` ASC) ,
-  CONSTRAINT `fk_FACT_Related_FACT_Person1`
-    FOREIGN KEY (`idPerson`)
-    REFERENCES `DWH`.`FACT_PRF_Person` (`id`)
-    ON DELETE NO ACTION
-    ON UPDATE NO ACTION)
+  INDEX `fk_FACT_Related_FACT_Person1_idx` (`idPerson` ASC) )
 ENGINE = InnoDB;
 
 
+-- -----------------------------------------------------
+-- Table `DWH`.`DIM_PRF_Related`
+-- -----------------------------------------------------
+CREATE TABLE IF NOT EXISTS `DWH`.`DIM_PRF_Related` (
+  `id` INT NOT NULL AUTO_INCREMENT,
+  `relatedKey` BINARY(16) NOT NULL COMMENT 'MD5 hash of name and location',
+  `name` VARCHAR(100) NULL COMMENT 'name key',
+  `location` VARCHAR(58) NULL COMMENT 'location key',
+  `summary` VARCHAR(222) NULL COMMENT 'summary key',
+  PRIMARY KEY (`id`),
+  UNIQUE INDEX `relatedKey_UNIQUE` (`relatedKey` ASC) )
+ENGINE = InnoDB;
+
+
+-- -----------------------------------------------------
+-- Table `DWH`.`REL_PRF_Person_Related`
+-- -----------------------------------------------------
+CREATE TABLE IF NOT EXISTS `DWH`.`REL_PRF_Person_Related` (
+  `idPerson` INT NOT NULL,
+  `idRelated` INT NOT NULL,
+  `type` CHAR(7) NOT NULL COMMENT 'Entry represents either people_also_viewed or similarly_named_profiles attribute.\n\npeople_also_viewed= viewed\nsimilarly_named_profiles= similar',
+  `idOrigin` INT NOT NULL COMMENT 'origin of the person, the partitioning key',
+  INDEX `fk_REL_Person_Related_FACT_Person1_idx` (`idPerson` ASC) ,
+  INDEX `fk_REL_Person_Related_DIM_Related1_idx` (`idRelated` ASC) ,
+  UNIQUE INDEX `personRelated_UNIQUE` (`idPerson` ASC, `idRelated` ASC, `type` ASC, `idOrigin` ASC) )
+ENGINE = InnoDB
+PARTITION BY LIST (`idOrigin`) (
+  PARTITION `p0` VALUES IN (0));
+
+
 -- -----------------------------------------------------
 -- Table `DWH`.`DIM_PRF_Trait`
 -- -----------------------------------------------------
@@ -204,7 +267,8 @@ CREATE TABLE IF NOT EXISTS `DWH`.`DIM_PRF_Trait` (
   `type` CHAR(9) NOT NULL COMMENT 'Can be: \nskill for skills\ninterest for interests attribute',
   `name` VARCHAR(71) NOT NULL COMMENT 'Represents value for either skills or interests attribute, depending on type.',
   PRIMARY KEY (`id`),
-  UNIQUE INDEX `id_UNIQUE` (`id` ASC) )
+  UNIQUE INDEX `id_UNIQUE` (`id` ASC) ,
+  UNIQUE INDEX `typeName_UNIQUE` (`type` ASC, `name` ASC) )
 ENGINE = InnoDB;
 
 
@@ -214,19 +278,12 @@ ENGINE = InnoDB;
 CREATE TABLE IF NOT EXISTS `DWH`.`REL_PRF_Person_Trait` (
   `idPerson` INT NOT NULL,
   `idTrait` INT NOT NULL,
+  `idOrigin` INT NOT NULL COMMENT 'origin of the person, the partitioning key',
   INDEX `fk_REL_Person_Group_FACT_Person1_idx` (`idPerson` ASC) ,
-  INDEX `fk_REL_Person_Group_DIM_Group1_idx` (`idTrait` ASC) ,
-  CONSTRAINT `fk_REL_Person_Group_FACT_Person10`
-    FOREIGN KEY (`idPerson`)
-    REFERENCES `DWH`.`FACT_PRF_Person` (`id`)
-    ON DELETE NO ACTION
-    ON UPDATE NO ACTION,
-  CONSTRAINT `fk_REL_Person_Group_DIM_Group10`
-    FOREIGN KEY (`idTrait`)
-    REFERENCES `DWH`.`DIM_PRF_Trait` (`id`)
-    ON DELETE NO ACTION
-    ON UPDATE NO ACTION)
-ENGINE = InnoDB;
+  INDEX `fk_REL_Person_Group_DIM_Group1_idx` (`idTrait` ASC) )
+ENGINE = InnoDB
+PARTITION BY LIST (`idOrigin`) (
+  PARTITION `p0` VALUES IN (0));
 
 
 -- -----------------------------------------------------
@@ -235,19 +292,12 @@ ENGINE = InnoDB;
 CREATE TABLE IF NOT EXISTS `DWH`.`REL_PRF_Person_Language` (
   `idPerson` INT NOT NULL,
   `idLanguage` INT NOT NULL,
+  `idOrigin` INT NOT NULL COMMENT 'origin of the person, the partitioning key',
   INDEX `fk_REL_Person_Language_DIM_Language1_idx` (`idLanguage` ASC) ,
-  INDEX `fk_REL_Person_Language_FACT_Person1_idx` (`idPerson` ASC) ,
-  CONSTRAINT `fk_REL_Person_Language_DIM_Language1`
-    FOREIGN KEY (`idLanguage`)
-    REFERENCES `DWH`.`DIM_PRF_Language` (`id`)
-    ON DELETE NO ACTION
-    ON UPDATE NO ACTION,
-  CONSTRAINT `fk_REL_Person_Language_FACT_Person1`
-    FOREIGN KEY (`idPerson`)
-    REFERENCES `DWH`.`FACT_PRF_Person` (`id`)
-    ON DELETE NO ACTION
-    ON UPDATE NO ACTION)
-ENGINE = InnoDB;
+  INDEX `fk_REL_Person_Language_FACT_Person1_idx` (`idPerson` ASC) )
+ENGINE = InnoDB
+PARTITION BY LIST (`idOrigin`) (
+  PARTITION `p0` VALUES IN (0));
 
 
 -- -----------------------------------------------------
@@ -272,11 +322,12 @@ CREATE TABLE IF NOT EXISTS `DWH`.`FACT_CMP_Company` (
   `idLocationHQ` INT NULL,
   `idSize` INT NULL COMMENT 'combines company_size list values',
   `mongoCollectionId` CHAR(24) NOT NULL COMMENT 'ObjectId for matching mongoDB document',
-  `description` VARCHAR(3754) NULL COMMENT 'description attribute',
+  `descriptionLength` SMALLINT UNSIGNED NULL COMMENT 'length of the description attribute, the text is in TXT_CMP_Company',
   `industry` VARCHAR(53) NULL COMMENT 'industry attribute',
   `type` VARCHAR(23) NULL COMMENT 'company_type attribute',
   `founded` INT NULL COMMENT 'founded_year attribute (year number as int)',
   `name` VARCHAR(154) NULL COMMENT 'name attribute',
+  `universalName` VARCHAR(100) NULL COMMENT 'universal_name_id attribute, the <universalName> of linkedin.com/company/<universalName> URLs',
   `tagline` VARCHAR(120) NULL COMMENT 'tagline attribute',
   `followers` INT NULL COMMENT 'follower_count attribute',
   `website` TINYINT NULL COMMENT 'website attribute\n\nhas link= 1\nno link= 0',
@@ -287,6 +338,7 @@ CREATE TABLE IF NOT EXISTS `DWH`.`FACT_CMP_Company` (
   INDEX `fk_FACT_LinkedIn_Company_DIM_Origin1_idx` (`idOrigin` ASC) ,
   INDEX `fk_FACT_LinkedIn_Company_DIM_LinkedIn_Location1_idx` (`idLocationHQ` ASC) ,
   INDEX `fk_FACT_LinkedIn_Company_DIM_LinkedIn_CompanySize1_idx` (`idSize` ASC) ,
+  INDEX `universalName_idx` (`universalName` ASC) ,
   CONSTRAINT `fk_FACT_LinkedIn_Company_DIM_Origin1`
     FOREIGN KEY (`idOrigin`)
     REFERENCES `DWH`.`DIM_Origin` (`id`)
@@ -312,7 +364,8 @@ CREATE TABLE IF NOT EXISTS `DWH`.`DIM_CMP_Specialty` (
   `id` INT NOT NULL AUTO_INCREMENT,
   `name` VARCHAR(425) NULL COMMENT 'a value from specialities list attribute',
   PRIMARY KEY (`id`),
-  UNIQUE INDEX `id_UNIQUE` (`id` ASC) )
+  UNIQUE INDEX `id_UNIQUE` (`id` ASC) ,
+  UNIQUE INDEX `name_UNIQUE` (`name` ASC) )
 ENGINE = InnoDB;
 
 
@@ -324,6 +377,7 @@ CREATE TABLE IF NOT EXISTS `DWH`.`REL_CMP_Company_Specialty` (
   `idSpecialty` INT NULL,
   INDEX `fk_REL_LinkedIn_Company_Specialities_FACT_LinkedIn_Company1_idx` (`idCompany` ASC) ,
   INDEX `fk_REL_LinkedIn_Company_Specialities_DIM_LinkedIn_Specialit_idx` (`idSpecialty` ASC) ,
+  UNIQUE INDEX `companySpecialty_UNIQUE` (`idCompany` ASC, `idSpecialty` ASC) ,
   CONSTRAINT `fk_REL_LinkedIn_Company_Specialities_FACT_LinkedIn_Company1`
     FOREIGN KEY (`idCompany`)
     REFERENCES `DWH`.`FACT_CMP_Company` (`id`)
@@ -345,6 +399,7 @@ CREATE TABLE IF NOT EXISTS `DWH`.`REL_CMP_Company_Location` (
   `idLocation` INT NULL,
   INDEX `fk_REL_LinkedIn_Company_Location_FACT_LinkedIn_Company1_idx` (`idCompany` ASC) ,
   INDEX `fk_REL_LinkedIn_Company_Location_DIM_LinkedIn_Location1_idx` (`idLocation` ASC) ,
+  UNIQUE INDEX `companyLocation_UNIQUE` (`idCompany` ASC, `idLocation` ASC) ,
   CONSTRAINT `fk_REL_LinkedIn_Company_Location_FACT_LinkedIn_Company1`
     FOREIGN KEY (`idCompany`)
     REFERENCES `DWH`.`FACT_CMP_Company` (`id`)
@@ -397,21 +452,169 @@ ENGINE = InnoDB;
 -- Table `DWH`.`FACT_PRF_Accomplishment`
 -- -----------------------------------------------------
 CREATE TABLE IF NOT EXISTS `DWH`.`FACT_PRF_Accomplishment` (
-  `idPerson` INT NOT NULL,
+  `id` INT NOT NULL AUTO_INCREMENT,
+  `idPerson` INT NULL COMMENT 'not written by the importers, the person is linked by REL_PRF_Person_Accomplishment',
   `type` CHAR(13) NOT NULL COMMENT 'Name of attribute type, references multiple attributes of person.\n\nMapping is as follows:\naccomplishment_organisations = organisation\naccomplishment_publications = publication\naccomplishment_honors_awards = honor\naccomplishment_patents = patent\naccomplishment_courses = course\naccomplishment_projects = project\naccomplishment_test_scores = test\nactivities = activity\narticles = article',
   `name` VARCHAR(255) NULL COMMENT 'Name or Title of the attribute, references a different key depending on type.\n\nMapping is as follows:\naccomplishment_organisations = title\naccomplishment_publications = name\naccomplishment_honors_awards = title\naccomplishment_patents = title\naccomplishment_courses = name\naccomplishment_test_scores = name\nactivities = title\narticles = title',
   `institution` VARCHAR(255) NULL COMMENT 'Name of institution, references multiple, values have been taken from different attributes depending on the type of qualification referenced.\n\nMapping is as follows:\naccomplishment_organisations = org_name\naccomplishment_publications = publisher\naccomplishment_honors_awards = issuer\naccomplishment_patents = issuer\narticles= author',
   `date` DATETIME NULL COMMENT 'References the start_at or publictation date of the accomplishment.\n\nMapping is as follows:\n',
-  `description` VARCHAR(2500) NULL COMMENT 'References the description, sometimes multipe keys of the object type had to be combined, if not simply references description key.\n\nMapping is as follows:\naccomplishment_patents = application_number + patent_number + description\naccomplishment_courses = number\naccomplishment_test_scores = score + description\nactivities = activity_status\narticles = link\n',
-  INDEX `fk_FACT_PRF_Accomplishment_FACT_PRF_Person1_idx` (`idPerson` ASC) ,
-  CONSTRAINT `fk_FACT_PRF_Accomplishment_FACT_PRF_Person1`
-    FOREIGN KEY (`idPerson`)
-    REFERENCES `DWH`.`FACT_PRF_Person` (`id`)
-    ON DELETE NO ACTION
-    ON UPDATE NO ACTION)
+  `descriptionLength` SMALLINT UNSIGNED NULL COMMENT 'length of the description, the text is in TXT_PRF_Accomplishment',
+  `idOrigin` INT NOT NULL COMMENT 'origin of the person, the partitioning key',
+  PRIMARY KEY (`id`, `idOrigin`),
+  INDEX `fk_FACT_PRF_Accomplishment_FACT_PRF_Person1_idx` (`idPerson` ASC) )
+ENGINE = InnoDB
+PARTITION BY LIST (`idOrigin`) (
+  PARTITION `p0` VALUES IN (0));
+
+
+-- -----------------------------------------------------
+-- Table `DWH`.`REL_PRF_Person_Qualification`
+-- -----------------------------------------------------
+CREATE TABLE IF NOT EXISTS `DWH`.`REL_PRF_Person_Qualification` (
+  `idPerson` INT NOT NULL,
+  `idQualification` INT NOT NULL,
+  `idOrigin` INT NOT NULL COMMENT 'origin of the person, the partitioning key',
+  INDEX `fk_REL_Person_Qualification_FACT_Person1_idx` (`idPerson` ASC) ,
+  INDEX `fk_REL_Person_Qualification_FACT_Qualification1_idx` (`idQualification` ASC) )
+ENGINE = InnoDB
+PARTITION BY LIST (`idOrigin`) (
+  PARTITION `p0` VALUES IN (0));
+
+
+-- -----------------------------------------------------
+-- Table `DWH`.`REL_PRF_Person_Accomplishment`
+-- -----------------------------------------------------
+CREATE TABLE IF NOT EXISTS `DWH`.`REL_PRF_Person_Accomplishment` (
+  `idPerson` INT NOT NULL,
+  `idAccomplishment` INT NOT NULL,
+  `idOrigin` INT NOT NULL COMMENT 'origin of the person, the partitioning key',
+  INDEX `fk_REL_Person_Accomplishment_FACT_Person1_idx` (`idPerson` ASC) ,
+  INDEX `fk_REL_Person_Accomplishment_FACT_Accomplishment1_idx` (`idAccomplishment` ASC) )
+ENGINE = InnoDB
+PARTITION BY LIST (`idOrigin`) (
+  PARTITION `p0` VALUES IN (0));
+
+
+-- -----------------------------------------------------
+-- Table `DWH`.`TXT_PRF_Summary`
+-- -----------------------------------------------------
+CREATE TABLE IF NOT EXISTS `DWH`.`TXT_PRF_Summary` (
+  `idPerson` INT NOT NULL,
+  `text` TEXT NOT NULL COMMENT 'summary attribute of FACT_PRF_Person',
+  `idOrigin` INT NOT NULL COMMENT 'origin of the person, the partitioning key',
+  PRIMARY KEY (`idPerson`, `idOrigin`))
+ENGINE = InnoDB
+ROW_FORMAT = COMPRESSED
+KEY_BLOCK_SIZE = 8
+PARTITION BY LIST (`idOrigin`) (
+  PARTITION `p0` VALUES IN (0));
+
+
+-- -----------------------------------------------------
+-- Table `DWH`.`TXT_PRF_Qualification`
+-- -----------------------------------------------------
+CREATE TABLE IF NOT EXISTS `DWH`.`TXT_PRF_Qualification` (
+  `idQualification` INT NOT NULL,
+  `text` TEXT NOT NULL COMMENT 'References the description, sometimes multipe keys of the object type had to be combined, if not simply references description key.\n\nMapping is as follows:\nvolunteer_work = cause + description\ncertifications = license_number + display_source',
+  `idOrigin` INT NOT NULL COMMENT 'origin of the person, the partitioning key',
+  PRIMARY KEY (`idQualification`, `idOrigin`))
+ENGINE = InnoDB
+ROW_FORMAT = COMPRESSED
+KEY_BLOCK_SIZE = 8
+PARTITION BY LIST (`idOrigin`) (
+  PARTITION `p0` VALUES IN (0));
+
+
+-- -----------------------------------------------------
+-- Table `DWH`.`TXT_PRF_Accomplishment`
+-- -----------------------------------------------------
+CREATE TABLE IF NOT EXISTS `DWH`.`TXT_PRF_Accomplishment` (
+  `idAccomplishment` INT NOT NULL,
+  `text` TEXT NOT NULL COMMENT 'References the description, sometimes multipe keys of the object type had to be combined, if not simply references description key.\n\nMapping is as follows:\naccomplishment_patents = application_number + patent_number + description\naccomplishment_courses = number\naccomplishment_test_scores = score + description\nactivities = activity_status\narticles = link\n',
+  `idOrigin` INT NOT NULL COMMENT 'origin of the person, the partitioning key',
+  PRIMARY KEY (`idAccomplishment`, `idOrigin`))
+ENGINE = InnoDB
+ROW_FORMAT = COMPRESSED
+KEY_BLOCK_SIZE = 8
+PARTITION BY LIST (`idOrigin`) (
+  PARTITION `p0` VALUES IN (0));
+
+
+-- -----------------------------------------------------
+-- Table `DWH`.`TXT_CMP_Company`
+-- -----------------------------------------------------
+CREATE TABLE IF NOT EXISTS `DWH`.`TXT_CMP_Company` (
+  `idCompany` INT NOT NULL,
+  `text` TEXT NOT NULL COMMENT 'description attribute of FACT_CMP_Company',
+  PRIMARY KEY (`idCompany`))
+ENGINE = InnoDB
+ROW_FORMAT = COMPRESSED
+KEY_BLOCK_SIZE = 8;
+
+
+-- -----------------------------------------------------
+-- Table `DWH`.`ETL_KeyRange`
+-- -----------------------------------------------------
+CREATE TABLE IF NOT EXISTS `DWH`.`ETL_KeyRange` (
+  `tableName` VARCHAR(64) NOT NULL COMMENT 'name of the table the keys are reserved for',
+  `nextId` INT NOT NULL COMMENT 'next key that has not been handed out by the importers yet',
+  PRIMARY KEY (`tableName`))
+ENGINE = InnoDB;
+
+
+-- -----------------------------------------------------
+-- Table `DWH`.`ETL_Checkpoint`
+-- -----------------------------------------------------
+CREATE TABLE IF NOT EXISTS `DWH`.`ETL_Checkpoint` (
+  `collectionName` VARCHAR(64) NOT NULL COMMENT 'name of the mongodb collection that is imported',
+  `shardLower` CHAR(24) NOT NULL DEFAULT '' COMMENT 'first ObjectId of the shard (inclusive), empty for no lower bound',
+  `shardUpper` CHAR(24) NULL COMMENT 'end ObjectId of the shard (exclusive), NULL for no upper bound',
+  `size` INT NULL COMMENT 'estimated number of documents in the shard',
+  `lastId` CHAR(24) NULL COMMENT 'ObjectId of the last document committed to the dwh',
+  `finished` TINYINT NOT NULL DEFAULT 0 COMMENT 'shard has been imported completely\n\nBool:\nfinished=1\nunfinished=0',
+  `updatedAt` DATETIME NOT NULL COMMENT 'date the checkpoint has been written',
+  PRIMARY KEY (`collectionName`, `shardLower`))
 ENGINE = InnoDB;
 
 
+-- -----------------------------------------------------
+-- Procedure `DWH`.`ETL_AddOriginPartition`
+-- Adds the partition p<originId> to every table partitioned by idOrigin (the tables with the partition p0),
+-- called by dwh_add_datasource.sql for every new origin.
+-- -----------------------------------------------------
+DROP PROCEDURE IF EXISTS `DWH`.`ETL_AddOriginPartition`;
+
+DELIMITER $$
+CREATE PROCEDURE `DWH`.`ETL_AddOriginPartition` (IN `originId` INT)
+BEGIN
+  DECLARE `done` INT DEFAULT FALSE;
+  DECLARE `partitionedTable` VARCHAR(64);
+  DECLARE `missing` CURSOR FOR
+    SELECT p.`TABLE_NAME` FROM `information_schema`.`PARTITIONS` p
+    WHERE p.`TABLE_SCHEMA` = DATABASE() AND p.`PARTITION_METHOD` = 'LIST' AND p.`PARTITION_NAME` = 'p0'
+      AND NOT EXISTS (
+        SELECT 1 FROM `information_schema`.`PARTITIONS` o
+        WHERE o.`TABLE_SCHEMA` = p.`TABLE_SCHEMA` AND o.`TABLE_NAME` = p.`TABLE_NAME`
+          AND o.`PARTITION_NAME` = CONCAT('p', `originId`));
+  DECLARE CONTINUE HANDLER FOR NOT FOUND SET `done` = TRUE;
+
+  OPEN `missing`;
+  add_partitions: LOOP
+    FETCH `missing` INTO `partitionedTable`;
+    IF `done` THEN
+      LEAVE add_partitions;
+    END IF;
+    SET @statement = CONCAT('ALTER TABLE `', `partitionedTable`, '` ADD PARTITION (PARTITION `p', `originId`,
+      '` VALUES IN (', `originId`, '))');
+    PREPARE statement FROM @statement;
+    EXECUTE statement;
+    DEALLOCATE PREPARE statement;
+  END LOOP;
+  CLOSE `missing`;
+END$$
+DELIMITER ;
+
+
 SET SQL_MODE=@OLD_SQL_MODE;
 SET FOREIGN_KEY_CHECKS=@OLD_FOREIGN_KEY_CHECKS;
 SET UNIQUE_CHECKS=@OLD_UNIQUE_CHECKS;
@@ -0,0 +1,210 @@
+"""
+This module holds the columnar extraction of the profile collections (KGL_LIN_PRF_*) from MongoDB.
+
+The profiles are read with a server-side projection, so MongoDB only sends the fields the converters and
+the tagging pipeline use: no picture URLs (only whether a profile has a picture), no public identifiers,
+e-mails or the unused attributes of the nested objects. PyMongoArrow decodes the raw BSON batches straight
+into Arrow record batches of a fixed schema, the nested lists (experiences, education, ...) become list<struct>
+columns. Columnar consumers work on the batches without a Python object per field, the importers use the
+same projection for the documents they convert one by one.
+
+Requires pymongoarrow, which brings pyarrow.
+"""
+import pyarrow as pa
+from bson import ObjectId
+from pymongoarrow.api import Schema, find_arrow_all
+from pymongoarrow.types import ObjectIdType
+
+# Arrow types of the nested objects
+DATE = pa.struct([('day', pa.int64()), ('month', pa.int64()), ('year', pa.int64())])
+TEXTS = pa.list_(pa.string())
+
+
+def _objects(**fields) -> pa.DataType:
+    """
+    This function returns the Arrow type of a list of nested objects.
+
+    :param fields: The Arrow types of the fields of the objects.
+    """
+    return pa.list_(pa.struct(list(fields.items())))
+
+
+# Fields of the profiles read by the converters (profiles/convert.py, profiles/bulk.py, profiles/related.py)
+PROFILE_FIELDS = {
+    '_id': ObjectIdType(),
+    'first_name': pa.string(),
+    'last_name': pa.string(),
+    'full_name': pa.string(),
+    'occupation': pa.string(),
+    'headline': pa.string(),
+    'summary': pa.string(),
+    'country': pa.string(),
+    'country_full_name': pa.string(),
+    'state': pa.string(),
+    'city': pa.string(),
+    'connections': pa.int64(),
+    'gender': pa.string(),
+    'industry': pa.string(),
+    'inferred_salary': pa.struct([('min', pa.float64()), ('max', pa.float64())]),
+    'profile_pic_url': pa.bool_(),
+    'background_cover_image_url': pa.bool_(),
+    'experiences': _objects(
+        starts_at=DATE, ends_at=DATE, company=pa.string(), company_linkedin_profile_url=pa.string(),
+        title=pa.string(), description=pa.string(), location=pa.string()
+    ),
+    'education': _objects(
+        starts_at=DATE, ends_at=DATE, school=pa.string(), degree_name=pa.string(), field_of_study=pa.string(),
+        description=pa.string()
+    ),
+    'volunteer_work': _objects(
+        starts_at=DATE, ends_at=DATE, title=pa.string(), company=pa.string(), cause=pa.string(), description=pa.string()
+    ),
+    'certifications': _objects(
+        starts_at=DATE, ends_at=DATE, name=pa.string(), authority=pa.string(), license_number=pa.string(),
+        display_source=pa.string()
+    ),
+    'accomplishment_projects': _objects(starts_at=DATE, ends_at=DATE, title=pa.string(), description=pa.string()),
+    'accomplishment_organisations': _objects(
+        starts_at=DATE, title=pa.string(), org_name=pa.string(), description=pa.string()
+    ),
+    'accomplishment_publications': _objects(
+        published_on=DATE, name=pa.string(), publisher=pa.string(), description=pa.string()
+    ),
+    'accomplishment_honors_awards': _objects(
+        issued_on=DATE, title=pa.string(), issuer=pa.string(), description=pa.string()
+    ),
+    'accomplishment_patents': _objects(
+        issued_on=DATE, title=pa.string(), issuer=pa.string(), description=pa.string(),
+        application_number=pa.string(), patent_number=pa.string()
+    ),
+    'accomplishment_test_scores': _objects(
+        date_on=DATE, name=pa.string(), score=pa.string(), description=pa.string()
+    ),
+    'accomplishment_courses': _objects(name=pa.string(), number=pa.string()),
+    'activities': _objects(title=pa.string(), activity_status=pa.string()),
+    'articles': _objects(published_date=DATE, title=pa.string(), author=pa.string(), link=pa.string()),
+    'recommendations': TEXTS,
+    'languages': TEXTS,
+    'skills': TEXTS,
+    'interests': TEXTS,
+    'groups': _objects(name=pa.string()),
+    'people_also_viewed': _objects(name=pa.string(), location=pa.string(), summary=pa.string()),
+    'similarly_named_profiles': _objects(name=pa.string(), location=pa.string(), summary=pa.string())
+}
+
+# Fields read by the tagging pipeline (aggregation/tagging pipeline/preprocess.py)
+TAGGING_FIELDS = ('_id', 'experiences', 'education')
+
+# URL fields only projected to whether they are set, the converters only store that
+FLAG_FIELDS = ('profile_pic_url', 'background_cover_image_url')
+
+# Number of documents decoded per record batch
+BATCH_SIZE = 1000
+
+
+def schema(fields=None) -> Schema:
+    """
+    This function returns the PyMongoArrow schema of profile fields.
+
+    :param fields: The names of the fields, all of PROFILE_FIELDS if None.
+    """
+    return Schema({field: PROFILE_FIELDS[field] for field in fields or PROFILE_FIELDS})
+
+
+def projection(fields=None) -> dict:
+    """
+    This function returns the MongoDB projection of profile fields.
+    Nested objects are projected to the fields of their struct type, URL flags to whether they are set.
+
+    :param fields: The names of the fields, all of PROFILE_FIELDS if None.
+    """
+    result = {}
+    for field in fields or PROFILE_FIELDS:
+        arrow_type = PROFILE_FIELDS[field]
+        if field in FLAG_FIELDS:
+            result[field] = {'$gt': [{'$strLenCP': {'$ifNull': [f'${field}', '']}}, 0]}
+        elif pa.types.is_list(arrow_type) and pa.types.is_struct(arrow_type.value_type):
+            result.update({f'{field}.{nested.name}': 1 for nested in arrow_type.value_type})
+        else:
+            result[field] = 1
+
+    return result
+
+
+def arrow_batches(collection, query: dict | None = None, fields=None, batch_size: int = BATCH_SIZE, after=None):
+    """
+    This function reads profiles in ascending _id order and yields them as Arrow record batches.
+    Every batch is read with its own query continuing after the last _id, so no cursor is kept open.
+
+    :param collection: The MongoDB collection of the profiles.
+    :param query: The filter of the profiles, e.g. sharding.range_filter, all profiles if None.
+    :param fields: The names of the fields to read, all of PROFILE_FIELDS if None.
+    :param batch_size: The number of profiles per record batch.
+    :param after: The last _id already read, the profiles after it are read.
+    """
+    fields = tuple(fields or PROFILE_FIELDS)
+    if '_id' not in fields:
+        fields = ('_id', *fields)
+    profile_schema = schema(fields)
+    profile_projection = projection(fields)
+
+    while True:
+        # Continue after the last _id, combined with the _id bounds of the query
+        batch_query = dict(query or {})
+        if after is not None:
+            batch_query['_id'] = {**batch_query.get('_id', {}), '$gt': after}
+
+        table = find_arrow_all(
+            collection, batch_query, schema=profile_schema, projection=profile_projection,
+            sort=[('_id', 1)], limit=batch_size, allow_invalid=True
+        )
+        if not table.num_rows:
+            return
+
+        yield from table.combine_chunks().to_batches()
+        after = ObjectId(table.column('_id')[-1].as_py())
+        if table.num_rows < batch_size:
+            return
+
+
+def arrow_table(collection, query: dict | None = None, fields=None, skip: int = 0, limit: int = 0) -> pa.Table:
+    """
+    This function reads profiles into one Arrow table.
+
+    :param collection: The MongoDB collection of the profiles.
+    :param query: The filter of the profiles, all profiles if None.
+    :param fields: The names of the fields to read, all of PROFILE_FIELDS if None.
+    :param skip: The number of profiles to skip.
+    :param limit: The maximum number of profiles to read, 0 for no limit.
+    """
+    return find_arrow_all(
+        collection, query or {}, schema=schema(fields), projection=projection(fields),
+        skip=skip, limit=limit, allow_invalid=True
+    )
+
+
+def _without_nulls(value):
+    """
+    This function removes the null fields of nested objects, like the fields missing in the MongoDB documents.
+
+    :param value: A value of a record batch.
+    """
+    if isinstance(value, dict):
+        return {key: _without_nulls(item) for key, item in value.items() if item is not None}
+    if isinstance(value, list):
+        return [_without_nulls(item) for item in value]
+    return value
+
+
+def documents(batches):
+    """
+    This function yields the profiles of record batches as documents for the converters.
+    Null fields are left out and the _id is an ObjectId, like in the documents of a MongoDB cursor.
+
+    :param batches: The record batches, e.g. from arrow_batches.
+    """
+    for batch in batches:
+        for row in batch.to_pylist():
+            document = _without_nulls(row)
+            document['_id'] = ObjectId(document['_id'])
+            yield document
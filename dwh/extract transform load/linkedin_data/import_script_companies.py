@@ -2,55 +2,231 @@
 This script is used to import LinkedIn data from the MongoDB database into the DWH.
 """
 import os
+import time
 from dotenv import load_dotenv, find_dotenv
 from pymongo import MongoClient
 from sqlalchemy import create_engine  # Requires pymysql
 
 # Import insertion functions
 from dwh.linkedin_data.companies import insert
+from dwh.linkedin_data.companies import bulk  # Import batch conversion functions
+from dwh.linkedin_data import staging
+from dwh.linkedin_data import metrics
+from dwh.linkedin_data.keys import KeyAllocator
+from dwh.linkedin_data.dimensions import DimensionCache
 
 
-# Load environment variables
-load_dotenv(find_dotenv())
+def insert_collection_documents(
+        collection_str: str,
+        id_origin: int,
+        dwh_connection_url: str,
+        mongo_connection_url: str,
+        schema_name: str = 'DWH',
+        bulk_batch_size: int | None = 500,
+        staging_dir: str | None = None,
+        dimension_cache: DimensionCache | None = None,
+        mongo_client=None
+       ) -> bool:
+    """
+    This function imports all companies of a collection into the DWH.
+
+    :param collection_str: The name of the MongoDB collection.
+    :param id_origin: The ID of the DIM_Origin table from the dwh.
+    :param dwh_connection_url: The connection string of the DWH.
+    :param mongo_connection_url: The connection string of the MongoDB.
+    :param schema_name: The name of the DWH schema.
+    :param bulk_batch_size: Number of documents written per batch, None inserts row by row.
+    :param staging_dir: Directory to stage the batches in and load them with LOAD DATA LOCAL INFILE, None inserts them.
+                        Only used for bulk imports.
+    :param dimension_cache: The dimension cache to resolve the locations and specialties with, a new one is created if None.
+    :param mongo_client: The MongoDB client to read from, a new one is created from mongo_connection_url if None.
+    :return: Whether all companies have been imported.
+    """
+    # !!!UNENCRYPTED CONNECTION ONLY USE ON LAN!!!
+    # Add charset to connection string to avoid encoding issues, staging requires LOAD DATA LOCAL INFILE
+    dwh = create_engine(
+        f'{dwh_connection_url}/{schema_name}?charset=utf8mb4',
+        connect_args={'local_infile': True} if staging_dir else {}
+    )  # echo=True for debugging
+    metrics.instrument_engine(dwh)  # Count the round trips and written rows
+
+    # Get the collection details
+    if mongo_client is None:
+        mongo_client = MongoClient(mongo_connection_url)
+    collection = mongo_client["raw_data"][collection_str]
+
+    # Initialize the progress, logged at most every few seconds together with an ETA
+    failed = False
+    companies = 0
+    start = time.perf_counter()
+    progress = metrics.Progress(collection_str, collection.count_documents({}))
+
+    # Get the collection cursor
+    cursor = collection.find()
+    if bulk_batch_size:
+        cursor = cursor.batch_size(bulk_batch_size)
+    documents = progress.track(metrics.timed_iter(cursor, 'mongo.read'))
+
+    # Bulk mode, collect the documents and write every table once per batch
+    if bulk_batch_size:
+        key_allocator = KeyAllocator(dwh)
+        if dimension_cache is None:
+            dimension_cache = DimensionCache(dwh, key_allocator)
+            dimension_cache.warm(bulk.DIMENSION_TABLES)
+        batch = []
+
+        # Stage the rows in files per table instead of inserting them
+        staging_writer = staging.StagingWriter(
+            staging_dir, bulk.COLUMNS, prefix=f"{collection_str}."
+        ) if staging_dir else None
+
+        for doc in documents:
+            batch.append(doc)
+
+            if len(batch) >= bulk_batch_size:
+                count = _insert_batch(
+                    collection_str, batch, id_origin, dwh, key_allocator, dimension_cache, staging_writer
+                )
+                failed |= count is None
+                companies += count or 0
+                batch = []
+
+        # Insert the remaining documents
+        if batch:
+            count = _insert_batch(collection_str, batch, id_origin, dwh, key_allocator, dimension_cache, staging_writer)
+            failed |= count is None
+            companies += count or 0
+
+        # Load the staged files in parallel, the companies last. A failed load removes the rows loaded before,
+        # so the collection is staged again by the next run
+        if staging_writer:
+            try:
+                loaded = staging.load_files(dwh, staging_writer.close(), bulk.COLUMNS, commit_table='FACT_CMP_Company')
+                print(f"{collection_str}: loaded {loaded}")
+            except Exception as e:
+                print(f"Error: {collection_str} loading staged files from {staging_dir}")
+                print(e)
+                metrics.inc('errors_total', stage='staging.load')
+                failed = True
+
+    # Row by row mode
+    else:
+        for doc in documents:
+            try:
+                _insert_document(doc, id_origin, dwh)
+                companies += 1
+            except Exception as e:
+                print(f"Error: {doc['_id']}")
+                print(e)
+                metrics.inc('errors_total', stage='document')
+                failed = True
+
+    progress.finish()
 
-# !!!UNENCRYPTED CONNECTION ONLY USE ON LAN!!!
-dwh_connection_url = os.getenv("DATABASE_DWH")
-# Add charset to connection string to avoid encoding issues
-dwh = create_engine(dwh_connection_url + '/DWH?charset=utf8mb4')  # dwh = create_engine(dwh_connection_url,
-# echo=True)
-mongodb = MongoClient(os.getenv("MongoClientURI"))["raw_data"]
+    # Show the throughput, skipped companies (imported before) are not counted
+    seconds = time.perf_counter() - start
+    print(f"{collection_str}: {companies} companies in {seconds:.1f}s ({companies / max(seconds, 1e-9):.1f} companies/s)")
 
-# Get the collection details
-collection = mongodb["KGL_LIN_"]
-id_origin = 0
+    return not failed
 
-# Initialize counter variables
-counter = 0
-total = collection.count_documents({})
 
-# Get the collection cursor
-documents = collection.find()  # collection.find()
+def _insert_batch(
+        collection_str: str,
+        batch: list[dict],
+        id_origin: int,
+        dwh,
+        key_allocator,
+        dimension_cache,
+        staging_writer=None
+       ) -> int | None:
+    """
+    This function inserts a batch of documents and reports errors instead of raising them.
 
-# Main loop
-for doc in documents:
-    # Print progress
-    counter += 1
-    print(f"Document: {counter}/{total}")
+    :param collection_str: The name of the MongoDB collection.
+    :param batch: The documents to insert.
+    :param id_origin: The ID of the DIM_Origin table from the dwh.
+    :param dwh: The DWH engine to use.
+    :param key_allocator: The key allocator used to assign the keys.
+    :param dimension_cache: The dimension cache used to resolve the dimension members.
+    :param staging_writer: Staging writer to append the rows to instead of inserting them (optional).
+    :return: The number of companies inserted, None if the batch failed.
+    """
+    try:
+        if staging_writer is not None:
+            return bulk.stage_documents(batch, id_origin, dwh, key_allocator, dimension_cache, staging_writer)
+        return bulk.insert_documents(batch, id_origin, dwh, key_allocator, dimension_cache)
+    except Exception as e:
+        print(f"Error: {collection_str} batch {batch[0]['_id']} - {batch[-1]['_id']}")
+        print(e)
+        metrics.inc('errors_total', stage='batch')
+        return None
 
+
+def _insert_document(doc: dict, id_origin: int, dwh):
+    """
+    This function inserts a single company row by row.
+
+    :param doc: The document to insert.
+    :param id_origin: The ID of the DIM_Origin table from the dwh.
+    :param dwh: The DWH engine to use.
+    """
     # Insert location and get its ID
-    hq_location_id = insert.hq_location(doc, dwh)
+    with metrics.timer('insert.hq_location'):
+        hq_location_id = insert.hq_location(doc, dwh)
 
     # Insert company and get its ID
-    company_id = insert.company(doc, hq_location_id, id_origin, dwh)
+    with metrics.timer('insert.company'):
+        company_id = insert.company(doc, hq_location_id, id_origin, dwh)
 
     # Insert updates
-    insert.updates(doc, company_id, dwh)
+    with metrics.timer('insert.updates'):
+        insert.updates(doc, company_id, dwh)
 
     # Insert similar_companies
-    insert.similar_companies(doc, company_id, dwh)
+    with metrics.timer('insert.similar_companies'):
+        insert.similar_companies(doc, company_id, dwh)
 
     # Insert specialties
-    insert.specialties(doc, company_id, dwh)
+    with metrics.timer('insert.specialties'):
+        insert.specialties(doc, company_id, dwh)
 
     # Insert locations
-    insert.locations(doc, company_id, dwh)
+    with metrics.timer('insert.locations'):
+        insert.locations(doc, company_id, dwh)
+
+
+# Load environment variables
+load_dotenv(find_dotenv())
+
+# Connection strings
+mysql_url = os.getenv("DATABASE_DWH")
+mongo_url = os.getenv("MongoClientURI")
+
+# Define the schema name, collection name, and the origin ID
+dwh_schema_name = 'DWH'
+mongo_collection_name = "KGL_LIN_"
+dwh_id_origin = 0
+
+# Number of documents written per batch (None inserts the companies row by row)
+bulk_batch_size = 500
+
+# Directory to stage the batches in for LOAD DATA LOCAL INFILE (None inserts the batches), meant for large dumps
+staging_directory = None
+
+# Port of the /metrics endpoint scraped by Prometheus (None disables it)
+metrics_port = 9109
+
+if __name__ == "__main__":
+    # Serve the metrics while the import is running
+    if metrics_port:
+        metrics.serve(metrics_port)
+
+    insert_collection_documents(
+        mongo_collection_name,
+        dwh_id_origin,
+        mysql_url,
+        mongo_url,
+        dwh_schema_name,
+        bulk_batch_size,
+        staging_dir=staging_directory
+    )
@@ -5,9 +5,22 @@ import os
 from dotenv import load_dotenv, find_dotenv
 from pymongo import MongoClient
 from sqlalchemy import create_engine  # Requires pymysql
+import multiprocessing
 import concurrent.futures
+from dwh.linkedin_data import metrics
+from dwh.linkedin_data import sharding
+from dwh.linkedin_data import staging
+from dwh.linkedin_data import extraction
+from dwh.linkedin_data.pipeline import Pipeline
 from dwh.linkedin_data.profiles import insert  # Import insertion functions
-
+from dwh.linkedin_data.profiles import bulk  # Import batch insertion functions
+from dwh.linkedin_data.profiles.related import RelatedCache
+from dwh.linkedin_data.keys import KeyAllocator
+from dwh.linkedin_data.dimensions import DimensionCache
+from dwh.linkedin_data.checkpoints import CheckpointStore
+from dwh.linkedin_data.unit_of_work import UnitOfWork
+from dwh.linkedin_data.sections import SectionWriter
+from dwh.linkedin_data.links import CompanyIndex
 
 # Put the insertion logic into a function, so it can be used with multithreading
 def insert_collection_documents(
@@ -15,61 +28,466 @@ def insert_collection_documents(
         id_origin: int,
         dwh_connection_url: str,
         mongo_connection_url: str,
-        schema_name: str = 'DWH1'
-       ):
-    # Add charset to sql connection string to avoid encoding issues
-    dwh = create_engine(f'{dwh_connection_url}/{schema_name}?charset=utf8mb4')  # echo=True for debugging
+        schema_name: str = 'DWH1',
+        bulk_batch_size: int | None = None,
+        dimension_cache: DimensionCache | None = None,
+        id_range: tuple | None = None,
+        checkpoints: bool = False,
+        resume: bool = False,
+        commit_interval: int = 100,
+        staging_dir: str | None = None,
+        pipeline_settings: dict | None = None,
+        mongo_client=None,
+        related_cache: RelatedCache | None = None,
+        target_tables: dict | None = None,
+        parallel_sections: bool = False,
+        company_index: CompanyIndex | None = None
+       ) -> bool:
+    """
+    This function imports all documents of a collection into the DWH.
+
+    :param collection_str: The name of the MongoDB collection.
+    :param id_origin: The ID of the DIM_Origin table from the dwh.
+    :param dwh_connection_url: The connection string of the DWH.
+    :param mongo_connection_url: The connection string of the MongoDB.
+    :param schema_name: The name of the DWH schema.
+    :param bulk_batch_size: Number of documents written per batch, None inserts row by row.
+    :param dimension_cache: The dimension cache shared by all collections, a new one is created if None.
+    :param id_range: The (lower, upper) _id bounds of the shard to import, None imports the whole collection.
+    :param checkpoints: Whether to record the last committed _id and skip documents that are already imported.
+    :param resume: Whether to continue after the last committed _id of the shard (implies checkpoints).
+    :param commit_interval: Number of documents per transaction when inserting row by row.
+    :param staging_dir: Directory to stage the batches in and load them with LOAD DATA LOCAL INFILE, None inserts them.
+    :param pipeline_settings: Workers and queue sizes of the staged pipeline (see pipeline.DEFAULTS), None inserts
+                              the batches one after another. Only used for bulk imports without staging.
+    :param mongo_client: The MongoDB client to read from (e.g. the in-process stand-in of the benchmarks),
+                         a new one is created from mongo_connection_url if None.
+    :param related_cache: The related cache shared by all collections, a new one is created if None.
+    :param target_tables: The tables written instead of the fact, text and relation tables, mapped by table name
+                          (the exchange tables of partitions.py when reloading a collection). Bulk imports only.
+    :param parallel_sections: Whether to write the sections of every transaction in parallel, one section group per
+                              connection (see sections.py). Row by row imports only (raises a ValueError together
+                              with bulk_batch_size), a failed section fails the whole transaction instead of its
+                              document.
+    :param company_index: The loaded company index used to link the experiences to their companies, None leaves
+                          them unlinked (see links.py).
+    :return: Whether all documents have been imported.
+    """
+    # The row by row import writes the tables named in profiles/insert.py
+    if target_tables and not bulk_batch_size:
+        raise ValueError("target_tables requires a bulk import (bulk_batch_size)")
+    if parallel_sections and bulk_batch_size:
+        raise ValueError("parallel_sections requires a row by row import (bulk_batch_size=None)")
+
+    # Add charset to sql connection string to avoid encoding issues, staging requires LOAD DATA LOCAL INFILE
+    dwh = create_engine(
+        f'{dwh_connection_url}/{schema_name}?charset=utf8mb4',
+        connect_args={'local_infile': True} if staging_dir else {}
+    )  # echo=True for debugging
+    metrics.instrument_engine(dwh)  # Count the round trips and written rows
+
+    # Resolve the dimension members in memory
+    if dimension_cache is None:
+        dimension_cache = DimensionCache(dwh, KeyAllocator(dwh))
+    counters_at_start = dimension_cache.counters()
+    if related_cache is None:
+        related_cache = RelatedCache(dwh)
+    links_at_start = company_index.counters() if company_index is not None else None
 
     # Connect to the MongoDB database
-    mongodb = MongoClient(mongo_connection_url)["raw_data"]
+    if mongo_client is None:
+        mongo_client = MongoClient(mongo_connection_url)
+    mongodb = mongo_client["raw_data"]
     collection = mongodb[collection_str]
 
-    # Initialize counter variables
-    counter = 0
-    total = collection.count_documents({})
-
-    # Get the collection cursor
-    documents = collection.find()
-
-    # Insertion loop
-    for doc in documents:
-        try:
-            # Print progress
-            counter += 1
-            print(f"{collection_str}: {counter}/{total}")
-
-            # Skip documents without experiences
-            if not doc.get('experiences', []):
-                continue
-
-            # Insert the document into the DWH and get the ids
-            key_of_location = insert.location(doc, dwh)  # Insert location
-            key_of_person = insert.person(doc, key_of_location, id_origin, dwh)  # Insert person
-
-            # Insert the rest of the data
-            insert.recommendations(doc, key_of_person, dwh)  # Insert recommendations
-            # insert.people_also_viewed(doc, key_of_person, dwh)  # Insert people_also_viewed
-            # insert.similarly_named_profiles(doc, key_of_person, dwh)  # Insert similarly_named_profiles
-            insert.languages(doc, key_of_person, dwh)  # Insert languages
-            insert.skills(doc, key_of_person, dwh)  # Insert skills
-            insert.interests(doc, key_of_person, dwh)  # Insert interests
-            insert.groups(doc, key_of_person, dwh)  # Insert groups
-            insert.experiences(doc, key_of_person, dwh)  # Insert experiences
-            insert.education(doc, key_of_person, dwh)  # Insert education
-            insert.volunteer_work(doc, key_of_person, dwh)  # Insert volunteer_work
-            insert.certifications(doc, key_of_person, dwh)  # Insert certifications
-            insert.activities(doc, key_of_person, dwh)  # Insert activities
-            insert.articles(doc, key_of_person, dwh)  # Insert articles
-            insert.accomplishment_organisations(doc, key_of_person, dwh)  # Insert accomplishment_organisations
-            insert.accomplishment_publications(doc, key_of_person, dwh)  # Insert accomplishment_publications
-            insert.accomplishment_honors_awards(doc, key_of_person, dwh)  # Insert accomplishment_honors_awards
-            insert.accomplishment_patents(doc, key_of_person, dwh)  # Insert accomplishment_patents
-            insert.accomplishment_test_scores(doc, key_of_person, dwh)  # Insert accomplishment_test_scores
-            insert.accomplishment_courses(doc, key_of_person, dwh)  # Insert accomplishment_courses
-            insert.accomplishment_projects(doc, key_of_person, dwh)  # Insert accomplishment_projects
-        except Exception as e:
-            print(f"Error: {doc['_id']}")
-            print(e)
+    # Continue after the last committed document of the shard when resuming
+    lower, upper = id_range if id_range else (None, None)
+    checkpoint_store = CheckpointStore(dwh) if checkpoints or resume else None
+    last_id = checkpoint_store.last_id(collection_str, lower) if resume else None
+    query = sharding.range_filter(lower, upper, after=last_id)
+
+    # Initialize the progress, logged at most every few seconds together with an ETA
+    failed = False
+    progress = metrics.Progress(collection_str, collection.count_documents(query))
+
+    # Get the collection cursor, sorted by _id so the checkpoints are meaningful, with only the converted fields
+    cursor = collection.find(query, extraction.projection()).sort('_id', 1)
+    if bulk_batch_size:
+        cursor = cursor.batch_size(bulk_batch_size)
+    documents = progress.track(metrics.timed_iter(cursor, 'mongo.read'))
+
+    # Pipeline mode, read, convert and write the batches concurrently
+    if bulk_batch_size and pipeline_settings is not None and not staging_dir:
+        key_allocator = KeyAllocator(dwh)
+        pipeline = Pipeline(
+            lambda batch: bulk.convert_documents(
+                batch, id_origin, dwh, key_allocator, dimension_cache, related_cache, target_tables, company_index
+            ),
+            lambda connection, table, rows: bulk.write_rows(connection, table, rows, target_tables),
+            bulk.WRITE_ORDER,
+            dwh,
+            commit_table='FACT_PRF_Person',
+            on_commit=_pipeline_checkpoint(checkpoint_store, collection_str, lower),
+            settings={**pipeline_settings, 'read_batch_size': bulk_batch_size},
+            delete=lambda connection, table, keys: bulk.delete_rows(connection, table, keys, target_tables)
+        )
+        pipeline.run(documents)
+        failed |= pipeline.failed
+        print(f"{collection_str}: {pipeline.documents} documents in {pipeline.seconds:.1f}s\n{pipeline.report()}")
+
+    # Bulk mode, collect the documents and insert them batch by batch
+    elif bulk_batch_size:
+        key_allocator = KeyAllocator(dwh)
+        batch = []
+
+        # Stage the rows in files per table instead of inserting them (one set of files per shard)
+        staging_writer = staging.StagingWriter(
+            staging_dir, bulk.COLUMNS, prefix=f"{collection_str}.{lower or 'first'}."
+        ) if staging_dir else None
+
+        for doc in documents:
+            batch.append(doc)
+
+            if len(batch) >= bulk_batch_size:
+                failed |= not _insert_batch(
+                    collection_str, batch, id_origin, dwh, key_allocator, dimension_cache,
+                    _checkpoint(checkpoint_store, collection_str, lower, batch[-1]['_id'], failed),
+                    staging_writer, related_cache, target_tables, company_index
+                )
+                batch = []
+
+        # Insert the remaining documents
+        if batch:
+            failed |= not _insert_batch(
+                collection_str, batch, id_origin, dwh, key_allocator, dimension_cache,
+                _checkpoint(checkpoint_store, collection_str, lower, batch[-1]['_id'], failed),
+                staging_writer, related_cache, target_tables, company_index
+            )
+
+        # Load the staged files in parallel, the persons last. A failed load removes the rows loaded before,
+        # so the shard is staged again by the next run
+        if staging_writer:
+            try:
+                loaded = staging.load_files(
+                    dwh, staging_writer.close(), bulk.COLUMNS,
+                    target_tables=target_tables, commit_table='FACT_PRF_Person'
+                )
+                print(f"{collection_str}: loaded {loaded}")
+            except Exception as e:
+                print(f"Error: {collection_str} loading staged files from {staging_dir}")
+                print(e)
+                metrics.inc('errors_total', stage='staging.load')
+                failed = True
+
+    else:
+        # Record the progress within every commit (skipped documents count as well)
+        def before_commit(connection, last_id):
+            checkpoint = _checkpoint(checkpoint_store, collection_str, lower, last_id, failed)
+            if checkpoint:
+                checkpoint(connection)
+
+        # Write the sections of the persons of every transaction on their own connections
+        sections = SectionWriter(
+            dwh, id_origin, dimension_cache, related_cache, company_index
+        ) if parallel_sections else None
+
+        # Insertion loop, insert the documents row by row on one connection
+        with UnitOfWork(dwh, commit_interval, before_commit, sections) as uow:
+            for doc in documents:
+                try:
+                    with uow.document(doc['_id']):
+                        # Skip documents without experiences
+                        if not doc.get('experiences', []):
+                            continue
+
+                        # Skip documents that have already been imported
+                        if checkpoint_store and insert.person_exists(doc, uow.connection):
+                            continue
+
+                        _insert_document(
+                            doc, id_origin, uow.connection, dimension_cache, related_cache, sections, company_index
+                        )
+                except Exception as e:
+                    print(f"Error: {doc['_id']}")
+                    print(e)
+                    metrics.inc('errors_total', stage='document')
+                    failed = True
+
+            # Commit the last documents here, so failed sections are reported like the other transactions
+            try:
+                uow.commit()
+            except Exception as e:
+                print(f"Error: {collection_str} transaction up to {uow.last_key}")
+                print(e)
+                metrics.inc('errors_total', stage='document')
+                failed = True
+
+        if sections is not None:
+            sections.close()
+            print(f"{collection_str}: sections\n{sections.report()}")
+
+    progress.finish()
+
+    # Mark the shard as finished, unless documents failed and have to be imported again
+    if checkpoint_store and not failed:
+        checkpoint_store.finish(collection_str, lower)
+
+    # Show how many lookups the dimension cache answered for this collection
+    print(f"{collection_str}: dimension cache\n{dimension_cache.report(since=counters_at_start)}")
+    if company_index is not None:
+        print(f"{collection_str}: company links, {company_index.report(since=links_at_start)}")
+
+    return not failed
+
+
+def _checkpoint(checkpoint_store: CheckpointStore | None, collection_str: str, lower, last_id, failed: bool):
+    """
+    This function returns the function recording the progress of a shard, or None if nothing is recorded.
+    The progress is no longer recorded after a failure, so a resumed import starts at the failed documents.
+
+    :param checkpoint_store: The checkpoint store to use, None if checkpoints are disabled.
+    :param collection_str: The name of the MongoDB collection.
+    :param lower: The lower _id bound of the shard.
+    :param last_id: The last _id that will be committed.
+    :param failed: Whether documents of the shard have failed before.
+    """
+    if checkpoint_store is None or failed:
+        return None
+
+    return lambda connection: checkpoint_store.save(connection, collection_str, lower, last_id)
+
+
+def _pipeline_checkpoint(checkpoint_store: CheckpointStore | None, collection_str: str, lower):
+    """
+    This function returns the function recording the progress of a shard imported by the pipeline.
+    The pipeline calls it in order for completed batches only, a failed batch stops the progress.
+
+    :param checkpoint_store: The checkpoint store to use, None if checkpoints are disabled.
+    :param collection_str: The name of the MongoDB collection.
+    :param lower: The lower _id bound of the shard.
+    """
+    if checkpoint_store is None:
+        return None
+
+    return lambda last_id: checkpoint_store.advance(collection_str, lower, last_id)
+
+
+def _insert_batch(
+        collection_str: str,
+        batch: list[dict],
+        id_origin: int,
+        dwh,
+        key_allocator,
+        dimension_cache,
+        checkpoint=None,
+        staging_writer=None,
+        related_cache=None,
+        target_tables=None,
+        company_index=None
+       ) -> bool:
+    """
+    This function inserts a batch of documents and reports errors instead of raising them.
+
+    :param collection_str: The name of the MongoDB collection.
+    :param batch: The documents to insert.
+    :param id_origin: The ID of the DIM_Origin table from the dwh.
+    :param dwh: The DWH engine to use.
+    :param key_allocator: The key allocator used to assign the keys.
+    :param dimension_cache: The dimension cache used to resolve the dimension members.
+    :param checkpoint: Function recording the progress within the batch transaction (optional).
+    :param staging_writer: Staging writer to append the rows to instead of inserting them (optional).
+                           Staged batches are not committed yet, so no checkpoint is recorded for them.
+    :param related_cache: The related cache used to resolve the related profiles.
+    :param target_tables: The tables written instead, mapped by table name (optional).
+    :param company_index: The company index used to link the experiences to their companies (optional).
+    :return: Whether the batch has been inserted.
+    """
+    try:
+        if staging_writer is not None:
+            bulk.stage_documents(
+                batch, id_origin, dwh, key_allocator, dimension_cache, staging_writer, related_cache, target_tables,
+                company_index
+            )
+        else:
+            bulk.insert_documents(
+                batch, id_origin, dwh, key_allocator, dimension_cache, checkpoint, related_cache, target_tables,
+                company_index
+            )
+        return True
+    except Exception as e:
+        print(f"Error: {collection_str} batch {batch[0]['_id']} - {batch[-1]['_id']}")
+        print(e)
+        metrics.inc('errors_total', stage='batch')
+        return False
+
+
+def _insert_document(
+        doc: dict,
+        id_origin: int,
+        dwh,
+        dimension_cache,
+        related_cache=None,
+        sections=None,
+        company_index=None
+       ):
+    """
+    This function inserts a single document row by row.
+
+    :param doc: The document to insert.
+    :param id_origin: The ID of the DIM_Origin table from the dwh.
+    :param dwh: The DWH connection of the unit of work.
+    :param dimension_cache: The dimension cache used to resolve the dimension members.
+    :param related_cache: The related cache used to resolve the related profiles.
+    :param sections: The section writer of the unit of work, None inserts the sections on the same connection.
+    :param company_index: The company index used to link the experiences to their companies (optional).
+    """
+    # Insert the document into the DWH and get the ids, every insertion is measured as its own stage
+    key_of_location = _timed(insert.location, doc, dwh, dimension_cache)  # Insert location
+    key_of_person = _timed(insert.person, doc, key_of_location, id_origin, dwh)  # Insert person
+
+    # The section writer inserts the rest of the data in parallel when the transaction is committed
+    if sections is not None:
+        sections.add(doc, key_of_person)
+        return
+
+    # Insert the rest of the data
+    _timed(insert.recommendations, doc, key_of_person, id_origin, dwh)  # Insert recommendations
+    _timed(insert.people_also_viewed, doc, key_of_person, id_origin, dwh, related_cache)  # Insert people_also_viewed
+    _timed(insert.similarly_named_profiles, doc, key_of_person, id_origin, dwh, related_cache)  # Insert similarly_named_profiles
+    _timed(insert.languages, doc, key_of_person, id_origin, dwh, dimension_cache)  # Insert languages
+    _timed(insert.skills, doc, key_of_person, id_origin, dwh, dimension_cache)  # Insert skills
+    _timed(insert.interests, doc, key_of_person, id_origin, dwh, dimension_cache)  # Insert interests
+    _timed(insert.groups, doc, key_of_person, id_origin, dwh, dimension_cache)  # Insert groups
+    _timed(insert.experiences, doc, key_of_person, id_origin, dwh, company_index)  # Insert experiences
+    _timed(insert.education, doc, key_of_person, id_origin, dwh)  # Insert education
+    _timed(insert.volunteer_work, doc, key_of_person, id_origin, dwh)  # Insert volunteer_work
+    _timed(insert.certifications, doc, key_of_person, id_origin, dwh)  # Insert certifications
+    _timed(insert.activities, doc, key_of_person, id_origin, dwh)  # Insert activities
+    _timed(insert.articles, doc, key_of_person, id_origin, dwh)  # Insert articles
+    _timed(insert.accomplishment_organisations, doc, key_of_person, id_origin, dwh)  # Insert accomplishment_organisations
+    _timed(insert.accomplishment_publications, doc, key_of_person, id_origin, dwh)  # Insert accomplishment_publications
+    _timed(insert.accomplishment_honors_awards, doc, key_of_person, id_origin, dwh)  # Insert accomplishment_honors_awards
+    _timed(insert.accomplishment_patents, doc, key_of_person, id_origin, dwh)  # Insert accomplishment_patents
+    _timed(insert.accomplishment_test_scores, doc, key_of_person, id_origin, dwh)  # Insert accomplishment_test_scores
+    _timed(insert.accomplishment_courses, doc, key_of_person, id_origin, dwh)  # Insert accomplishment_courses
+    _timed(insert.accomplishment_projects, doc, key_of_person, id_origin, dwh)  # Insert accomplishment_projects
+
+
+def _timed(function, *args):
+    """
+    This function calls an insertion function and measures its latency as the stage insert.<name>.
+
+    :param function: The insertion function.
+    :param args: The arguments of the function.
+    """
+    with metrics.timer(f'insert.{function.__name__}'):
+        return function(*args)
+
+
+# Dimension cache, related cache, company index and metrics queue of a worker process, set by the process pool initializer
+_worker_dimension_cache = None
+_worker_related_cache = None
+_worker_company_index = None
+_worker_metrics_queue = None
+
+
+def _init_worker(
+        dwh_connection_url: str,
+        schema_name: str,
+        metrics_queue=None,
+        dimension_map: str | None = None,
+        link_companies: bool = False
+       ):
+    """
+    This function prepares a worker process by creating its own caches and warming the dimension cache.
+
+    :param dwh_connection_url: The connection string of the DWH.
+    :param schema_name: The name of the DWH schema.
+    :param metrics_queue: The queue the metrics are forwarded to the main process with, None keeps them in the worker.
+    :param dimension_map: The map file written by preload.py, None warms the cache from the DWH instead.
+    :param link_companies: Whether to load the company index to link the experiences to their companies.
+    """
+    global _worker_dimension_cache, _worker_related_cache, _worker_company_index, _worker_metrics_queue
+    if metrics_queue is not None:
+        _worker_metrics_queue = metrics_queue
+        metrics.forward(metrics_queue)
+
+    dwh = create_engine(f'{dwh_connection_url}/{schema_name}?charset=utf8mb4')
+    metrics.instrument_engine(dwh)
+
+    # The pre-loaded map holds every member, so it is kept completely and no dimension query is needed
+    if dimension_map:
+        _worker_dimension_cache = DimensionCache(dwh, KeyAllocator(dwh), max_sizes={})
+        _worker_dimension_cache.load(dimension_map)
+    else:
+        _worker_dimension_cache = DimensionCache(dwh, KeyAllocator(dwh))
+        _worker_dimension_cache.warm(bulk.DIMENSION_TABLES)
+    _worker_related_cache = RelatedCache(dwh)
+
+    # The companies have to be imported before the profiles to be linked
+    if link_companies:
+        _worker_company_index = CompanyIndex(dwh)
+        _worker_company_index.load()
+
+
+def import_shard(
+        shard: dict,
+        dwh_connection_url: str,
+        mongo_connection_url: str,
+        schema_name: str,
+        bulk_batch_size: int | None,
+        resume: bool = False,
+        commit_interval: int = 100,
+        staging_dir: str | None = None,
+        pipeline_settings: dict | None = None,
+        parallel_sections: bool = False
+       ) -> dict:
+    """
+    This function imports a single shard within a worker process.
+    Every call uses its own MongoDB cursor and DWH engine.
+
+    :param shard: The shard to import, as returned by sharding.collection_shards.
+    :param dwh_connection_url: The connection string of the DWH.
+    :param mongo_connection_url: The connection string of the MongoDB.
+    :param schema_name: The name of the DWH schema.
+    :param bulk_batch_size: Number of documents written per batch, None inserts row by row.
+    :param resume: Whether to continue after the last committed _id of the shard.
+    :param commit_interval: Number of documents per transaction when inserting row by row.
+    :param staging_dir: Directory to stage the batches in and load them with LOAD DATA LOCAL INFILE, None inserts them.
+    :param pipeline_settings: Workers and queue sizes of the staged pipeline, None inserts the batches one after another.
+    :param parallel_sections: Whether to write the sections of every transaction in parallel when inserting row by row
+                              (bulk_batch_size=None).
+    :return: The imported shard.
+    :raises RuntimeError: If documents of the shard failed, so the shard is reported as failed and resumed later.
+    """
+    try:
+        imported = insert_collection_documents(
+            shard['collection'],
+            shard['id_origin'],
+            dwh_connection_url,
+            mongo_connection_url,
+            schema_name,
+            bulk_batch_size,
+            _worker_dimension_cache,
+            (shard['lower'], shard['upper']),
+            checkpoints=True,
+            resume=resume,
+            commit_interval=commit_interval,
+            staging_dir=staging_dir,
+            pipeline_settings=pipeline_settings,
+            related_cache=_worker_related_cache,
+            parallel_sections=parallel_sections,
+            company_index=_worker_company_index
+        )
+    finally:
+        # Forward the metrics of the shard right away, the periodic forward might not run again
+        if _worker_metrics_queue is not None:
+            metrics.flush(_worker_metrics_queue)
+
+    # Its checkpoint is not finished, resume_import continues the shard
+    if not imported:
+        raise RuntimeError(f"{shard['collection']} shard {shard['lower']} - {shard['upper']} failed")
+    return shard
 
 
 # Load environment variables
@@ -86,6 +504,42 @@ dwh_schema_name = 'DWH'
 mongo_collection_name = "KGL_LIN_PRF_USA"
 dwh_id_origin = 1
 
+# Number of documents written per batch (None inserts the documents row by row)
+bulk_batch_size = 500
+
+# Number of documents per transaction when inserting row by row
+commit_interval = 100
+
+# Whether to write the sections of every transaction in parallel, one section group per connection
+# (row by row only, requires bulk_batch_size = None)
+parallel_sections = False
+
+# Workers and queue sizes of the staged import pipeline (None inserts the batches one after another)
+pipeline_settings = {
+    'converters': 2,
+    'writers': {'REL_PRF_Person_Trait': 2, 'FACT_PRF_Qualification': 2},
+    'queue_size': 8
+}
+
+# Directory to stage the batches in for LOAD DATA LOCAL INFILE (None inserts the batches), meant for the initial backfill
+staging_directory = None
+
+# Port of the /metrics endpoint scraped by Prometheus (None disables it)
+metrics_port = 9108
+
+# Natural key -> id map written by preload.py (None warms the dimension caches from the DWH instead)
+dimension_map_path = None
+
+# Whether to link the experiences to the imported companies (import the companies first, see links.py)
+link_companies = True
+
+# Continue the shards of an interrupted import instead of starting from scratch
+resume_import = False
+
+# Number of documents per shard and number of worker processes
+shard_size = 50000
+worker_count = os.cpu_count()
+
 collections = [
     {"name": "KGL_LIN_PRF_USA", "id_origin": 1},
     {"name": "KGL_LIN_PRF_IND", "id_origin": 2},
@@ -104,41 +558,92 @@ insert_collection_documents(
     dwh_id_origin,
     mysql_url,
     mongo_url,
-    dwh_schema_name
+    dwh_schema_name,
+    bulk_batch_size
 )
 """
 
-# Create a ThreadPoolExecutor with 4 worker threads
-with concurrent.futures.ThreadPoolExecutor(max_workers=4) as executor:
-    # Submit the insertion tasks to the executor
-    futures = [
-        executor.submit(
-            insert_collection_documents,
-            collection["name"],
-            collection["id_origin"],
-            mysql_url,
-            mongo_url,
-            dwh_schema_name,
-        )
-        for collection in collections
-    ]
-
-    # Keep track of failed tasks
-    failed_tasks = []
-
-    # Retrieve the results and handle exceptions
-    for future in concurrent.futures.as_completed(futures):
-        try:
-            result = future.result()
-            print(f"Task completed successfully: {result}")
-        except Exception as e:
-            print(f"Task encountered an exception: {e}")
-            failed_tasks.append(future)
-
-# Display a summary of failed tasks
-if failed_tasks:
-    print("\nSummary of failed tasks:")
-    for task in failed_tasks:
-        print(f"- Task: {task}")
-else:
-    print("\nAll tasks completed successfully.")
+# Guard the import, the worker processes import this module as well
+if __name__ == "__main__":
+    # Reuse the shards of the interrupted import or split the collections into new _id range shards
+    checkpoint_store = CheckpointStore(create_engine(f'{mysql_url}/{dwh_schema_name}?charset=utf8mb4'))
+    shards = []
+    with MongoClient(mongo_url) as mongo_client:  # The client is closed before the workers start
+        for collection in collections:
+            collection_shards = checkpoint_store.shards(collection["name"], collection["id_origin"]) \
+                if resume_import else []
+
+            if not collection_shards:
+                collection_shards = sharding.collection_shards(
+                    mongo_client["raw_data"][collection["name"]],
+                    collection["name"],
+                    collection["id_origin"],
+                    shard_size
+                )
+                checkpoint_store.clear(collection["name"])
+                checkpoint_store.register(collection_shards)
+
+            # Skip the shards that have been imported completely
+            shards.extend(shard for shard in collection_shards if not shard.get('finished'))
+
+    # Schedule the largest shards first, so the small ones fill the gaps at the end
+    shards.sort(key=lambda shard: shard['size'], reverse=True)
+    print(f"Importing {len(shards)} shards with {worker_count} worker processes")
+
+    # Serve the metrics of all workers on one endpoint, the workers forward them through a queue
+    metrics_queue = None
+    if metrics_port:
+        metrics.serve(metrics_port)
+        metrics_queue = multiprocessing.Manager().Queue()
+        overall_progress = metrics.Progress('All shards', sum(shard['size'] for shard in shards), 30, publish=True)
+        metrics.collect(metrics_queue, on_merge=lambda: overall_progress.update(
+            int(metrics.REGISTRY.total('documents_total'))
+        ))
+
+    # Create a ProcessPoolExecutor with one worker per core
+    with concurrent.futures.ProcessPoolExecutor(
+            max_workers=worker_count,
+            initializer=_init_worker,
+            initargs=(mysql_url, dwh_schema_name, metrics_queue, dimension_map_path, link_companies)
+    ) as executor:
+        # Submit the insertion tasks to the executor
+        futures = [
+            executor.submit(
+                import_shard,
+                shard,
+                mysql_url,
+                mongo_url,
+                dwh_schema_name,
+                bulk_batch_size,
+                resume_import,
+                commit_interval,
+                staging_directory,
+                pipeline_settings,
+                parallel_sections,
+            )
+            for shard in shards
+        ]
+
+        # Keep track of failed tasks
+        failed_tasks = []
+
+        # Retrieve the results and handle exceptions
+        for future in concurrent.futures.as_completed(futures):
+            try:
+                result = future.result()
+                print(f"Task completed successfully: {result}")
+            except Exception as e:
+                print(f"Task encountered an exception: {e}")
+                failed_tasks.append(future)
+
+    # Stop merging the forwarded metrics
+    if metrics_queue is not None:
+        metrics_queue.put(None)
+
+    # Display a summary of failed tasks
+    if failed_tasks:
+        print("\nSummary of failed tasks:")
+        for task in failed_tasks:
+            print(f"- Task: {task}")
+    else:
+        print("\nAll tasks completed successfully.")
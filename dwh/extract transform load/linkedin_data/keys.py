@@ -0,0 +1,75 @@
+"""
+This module holds the key allocator used to assign surrogate keys on the client side.
+"""
+import threading
+
+
+class KeyAllocator:
+    """
+    This class hands out surrogate keys for the AUTO_INCREMENT tables of the DWH.
+
+    Keys are reserved in blocks from the ETL_KeyRange table, so a whole batch of rows can be
+    given its ids without asking the server for LAST_INSERT_ID() after every single insert.
+    The reservation is atomic, which means multiple threads and processes can share a table.
+    Every reservation starts after the highest key present in the table, so keys assigned by AUTO_INCREMENT
+    (the row-by-row importers) since the last reservation are never handed out again. Keys reserved but not
+    written yet are unknown to AUTO_INCREMENT though, so do not run the row-by-row and the bulk import of the
+    same tables at the same time.
+
+    DWH table: ETL_KeyRange
+    """
+
+    def __init__(self, dwh_engine, block_size: int = 10000):
+        """
+        :param dwh_engine: The DWH engine to use.
+        :param block_size: The minimum number of keys reserved per round trip.
+        """
+        self._dwh_engine = dwh_engine
+        self._block_size = block_size
+        self._lock = threading.Lock()
+        self._ranges = {}  # Table name -> (next free key, end of reserved block)
+
+    def reserve(self, table: str, count: int) -> range:
+        """
+        This function reserves a consecutive range of keys for the given table.
+
+        :param table: The name of the table the keys are used for.
+        :param count: The number of keys to reserve.
+        :return: The range of reserved keys.
+        """
+        with self._lock:
+            next_key, end = self._ranges.get(table, (0, 0))
+
+            # Reserve a new block if the current one is too small (the rest of it is skipped)
+            if end - next_key < count:
+                size = max(count, self._block_size)
+                next_key = self._reserve_block(table, size)
+                end = next_key + size
+
+            self._ranges[table] = (next_key + count, end)
+            return range(next_key, next_key + count)
+
+    def _reserve_block(self, table: str, size: int) -> int:
+        """
+        This function reserves a block of keys in the DWH and returns its first key.
+
+        :param table: The name of the table the keys are used for.
+        :param size: The number of keys to reserve.
+        """
+        with self._dwh_engine.begin() as connection:
+            connection.exec_driver_sql(
+                "INSERT IGNORE INTO ETL_KeyRange (tableName, nextId) VALUES (%s, 1)", (table,)
+            )
+
+            # Move the sequence forward, LAST_INSERT_ID(expr) makes the new value readable on this connection.
+            # The sequence is moved past the highest key of the table first, because the row-by-row importers
+            # (and AUTO_INCREMENT in general) assign keys without going through the sequence
+            connection.exec_driver_sql(
+                f"UPDATE ETL_KeyRange "
+                f"SET nextId = LAST_INSERT_ID(GREATEST(nextId, (SELECT COALESCE(MAX(id), 0) + 1 FROM {table})) + %s) "
+                f"WHERE tableName = %s",
+                (size, table)
+            )
+            end = connection.exec_driver_sql("SELECT LAST_INSERT_ID()").scalar()
+
+        return int(end) - size
@@ -0,0 +1,308 @@
+"""
+This script links the experiences of the profiles to the companies they were made at.
+
+The company index maps the LinkedIn universal names (linkedin.com/company/<universal name>) and the normalised
+names of the imported companies to their ids in memory. The profile importers resolve every experience against
+it, by the company_linkedin_profile_url first and by the company name otherwise, and store the company in
+FACT_PRF_Qualification.idCompany. Profiles are then joined to companies by an index, e.g.
+SELECT ... FROM FACT_PRF_Qualification q JOIN FACT_CMP_Company c ON q.idCompany = c.id WHERE c.industry = ...
+
+Run as a script, it backfills what the importers could not link: the universal names of companies imported
+before migrations/07_company_links.sql and the experiences imported before their companies. The URLs of the
+experiences are not stored in the DWH, so experiences are backfilled by their company name only.
+"""
+import os
+import re
+import time
+from urllib.parse import unquote
+from dotenv import load_dotenv, find_dotenv
+from pymongo import MongoClient
+from sqlalchemy import create_engine  # Requires pymysql
+
+# The universal name of a LinkedIn company URL
+COMPANY_URL = re.compile(r'linkedin\.com/company/([^/?#]+)', re.IGNORECASE)
+
+# Legal forms ignored at the end of company names
+LEGAL_FORMS = {
+    'inc', 'incorporated', 'llc', 'ltd', 'limited', 'corp', 'corporation', 'co', 'plc', 'gmbh', 'ag', 'sa', 'bv',
+    'pvt', 'pte', 'lp', 'llp'
+}
+
+# Number of rows linked (and of companies updated) per transaction of the backfill
+LINK_CHUNK_SIZE = 5000
+
+# Names of the counters kept by the company index
+COUNTERS = ('url', 'name', 'misses')
+
+
+def universal_name(value: str | None) -> str | None:
+    """
+    This function normalises a LinkedIn company URL or universal name to the universal name.
+
+    :param value: The URL (e.g. https://www.linkedin.com/company/example-inc/) or the universal name itself.
+    :return: The universal name, None if there is none.
+    """
+    if not value:
+        return None
+
+    match = COMPANY_URL.search(value)
+    if match:
+        value = match.group(1)
+    elif '/' in value:
+        return None  # A URL, but not the one of a company
+
+    return unquote(value).strip().casefold() or None
+
+
+def normalise_name(name: str | None) -> str | None:
+    """
+    This function normalises a company name, case, punctuation and legal forms at the end are ignored.
+
+    :param name: The name of the company.
+    :return: The normalised name, None if nothing is left.
+    """
+    if not name:
+        return None
+
+    words = re.findall(r'\w+', name.casefold())
+    while len(words) > 1 and words[-1] in LEGAL_FORMS:
+        words.pop()
+
+    return ' '.join(words) or None
+
+
+class CompanyIndex:
+    """
+    This class resolves the LinkedIn URLs and names of companies to the ids of FACT_CMP_Company in memory.
+
+    Names shared by several companies are ambiguous and are not resolved, a wrong link is worse than none.
+    The index is only read while importing, so it can be shared by the threads of an importer.
+
+    DWH table: FACT_CMP_Company
+    """
+
+    def __init__(self, dwh_engine):
+        """
+        :param dwh_engine: The DWH engine to load the companies from.
+        """
+        self._dwh_engine = dwh_engine
+        self._by_universal_name = {}
+        self._by_name = {}
+        self._counters = dict.fromkeys(COUNTERS, 0)
+
+    def __len__(self) -> int:
+        return len(self._by_universal_name) + len(self._by_name)
+
+    def load(self) -> int:
+        """
+        This function loads the companies from the DWH into the index.
+
+        :return: The number of companies.
+        """
+        with self._dwh_engine.connect() as connection:
+            rows = connection.exec_driver_sql("SELECT id, universalName, name FROM FACT_CMP_Company").fetchall()
+
+        for company_id, company_universal_name, name in rows:
+            self.add(company_id, company_universal_name, name)
+        return len(rows)
+
+    def add(self, company_id: int, company_universal_name: str | None, name: str | None):
+        """
+        This function adds a company to the index.
+
+        :param company_id: The id of the company in FACT_CMP_Company.
+        :param company_universal_name: The universal name of the company.
+        :param name: The name of the company.
+        """
+        key = universal_name(company_universal_name)
+        if key:
+            self._by_universal_name.setdefault(key, company_id)
+
+        key = normalise_name(name)
+        if key:
+            # Keep None for names of several companies
+            self._by_name[key] = company_id if self._by_name.get(key, company_id) == company_id else None
+
+    def resolve(self, url: str | None, name: str | None) -> int | None:
+        """
+        This function returns the company of a LinkedIn company URL or, if it is unknown, of a company name.
+
+        :param url: The LinkedIn URL of the company.
+        :param name: The name of the company.
+        :return: The id of the company in FACT_CMP_Company, None if it is unknown or ambiguous.
+        """
+        company_id = self._by_universal_name.get(universal_name(url))
+        if company_id is not None:
+            self._counters['url'] += 1
+            return company_id
+
+        company_id = self._by_name.get(normalise_name(name))
+        self._counters['name' if company_id is not None else 'misses'] += 1
+        return company_id
+
+    def experience(self, experience_object: dict) -> int | None:
+        """
+        This function returns the company of an experience of a profile.
+
+        :param experience_object: The experience object.
+        :return: The id of the company in FACT_CMP_Company, None if it is unknown or ambiguous.
+        """
+        return self.resolve(experience_object.get('company_linkedin_profile_url'), experience_object.get('company'))
+
+    def counters(self) -> dict[str, int]:
+        """
+        This function returns a copy of the counters.
+        """
+        return dict(self._counters)
+
+    def report(self, since: dict | None = None, items: str = 'experiences') -> str:
+        """
+        This function returns a printable summary of the resolved experiences.
+
+        :param since: Counters returned by counters() before, only the difference is reported.
+        :param items: What has been resolved, e.g. 'postings' for the job postings.
+        """
+        counters = {name: value - (since or {}).get(name, 0) for name, value in self._counters.items()}
+        total = sum(counters.values())
+        linked = counters['url'] + counters['name']
+        share = linked / total * 100 if total else 0
+        return (
+            f"{linked} of {total} {items} linked ({share:.1f}%): {counters['url']} by URL, {counters['name']} by name"
+        )
+
+
+def _link(connection, table: str, key_columns: tuple, value_column: str, rows: list[tuple]) -> int:
+    """
+    This function sets a column of many rows with one UPDATE joined to a temporary table of the new values.
+
+    :param connection: The DWH connection to use.
+    :param table: The table to update.
+    :param key_columns: The columns identifying the rows.
+    :param value_column: The column to set.
+    :param rows: The new values, as (*key, value).
+    :return: The number of updated rows.
+    """
+    connection.exec_driver_sql(
+        f"CREATE TEMPORARY TABLE ETL_Link AS SELECT {', '.join(key_columns)}, {value_column} FROM {table} LIMIT 0"
+    )
+    try:
+        columns = (*key_columns, value_column)
+        connection.exec_driver_sql(
+            f"INSERT INTO ETL_Link ({', '.join(columns)}) VALUES ({', '.join(['%s'] * len(columns))})", rows
+        )
+        return connection.exec_driver_sql(
+            f"UPDATE {table} t JOIN ETL_Link l ON {' AND '.join(f't.{c} = l.{c}' for c in key_columns)} "
+            f"SET t.{value_column} = l.{value_column}"
+        ).rowcount
+    finally:
+        connection.exec_driver_sql("DROP TEMPORARY TABLE ETL_Link")
+
+
+def backfill_universal_names(dwh_engine, collection, chunk_size: int = LINK_CHUNK_SIZE) -> int:
+    """
+    This function fills the universal names of the companies imported before they were stored.
+
+    DWH table: FACT_CMP_Company
+
+    :param dwh_engine: The DWH engine to use.
+    :param collection: The MongoDB collection of the companies.
+    :param chunk_size: The number of companies updated per transaction.
+    :return: The number of updated companies.
+    """
+    # The companies are updated by their id, mongoCollectionId is not indexed
+    with dwh_engine.connect() as connection:
+        missing = dict(
+            connection.exec_driver_sql("SELECT mongoCollectionId, id FROM FACT_CMP_Company WHERE universalName IS NULL")
+        )
+
+    updated = 0
+    chunk = []
+    for doc in collection.find({'universal_name_id': {'$ne': None}}, {'universal_name_id': 1}).batch_size(chunk_size):
+        if str(doc['_id']) in missing:
+            chunk.append((missing[str(doc['_id'])], doc['universal_name_id']))
+
+        if len(chunk) >= chunk_size:
+            with dwh_engine.begin() as connection:
+                updated += _link(connection, 'FACT_CMP_Company', ('id',), 'universalName', chunk)
+            chunk = []
+
+    if chunk:
+        with dwh_engine.begin() as connection:
+            updated += _link(connection, 'FACT_CMP_Company', ('id',), 'universalName', chunk)
+
+    return updated
+
+
+def backfill_experiences(dwh_engine, company_index: CompanyIndex, chunk_size: int = LINK_CHUNK_SIZE) -> dict:
+    """
+    This function links the experiences without a company by their company name (institution).
+    The experiences are read in chunks of ascending ids, every chunk is linked within one transaction.
+
+    DWH table: FACT_PRF_Qualification
+
+    :param dwh_engine: The DWH engine to use.
+    :param company_index: The loaded company index.
+    :param chunk_size: The number of experiences read per chunk.
+    :return: The number of experiences read and linked.
+    """
+    stats = {'experiences': 0, 'linked': 0}
+    lower = 0
+    while True:
+        with dwh_engine.connect() as connection:
+            rows = connection.exec_driver_sql(
+                """
+                SELECT id, idOrigin, institution FROM FACT_PRF_Qualification
+                WHERE id > %s AND type = 'experience' AND idCompany IS NULL
+                ORDER BY id LIMIT %s
+                """,
+                (lower, chunk_size)
+            ).fetchall()
+        if not rows:
+            return stats
+        lower = rows[-1][0]
+
+        links = []
+        for qualification_id, id_origin, institution in rows:
+            company_id = company_index.resolve(None, institution)
+            if company_id is not None:
+                links.append((qualification_id, id_origin, company_id))
+
+        # The origin is part of the key, so every row is looked up in its partition
+        if links:
+            with dwh_engine.begin() as connection:
+                _link(connection, 'FACT_PRF_Qualification', ('id', 'idOrigin'), 'idCompany', links)
+
+        stats['experiences'] += len(rows)
+        stats['linked'] += len(links)
+
+
+# Load environment variables
+load_dotenv(find_dotenv())
+
+# Connection strings
+mysql_url = os.getenv("DATABASE_DWH")
+mongo_url = os.getenv("MongoClientURI")
+dwh_schema_name = 'DWH'
+
+# Company collections to read the universal names of companies imported before they were stored from
+company_collections = ["KGL_LIN_"]
+
+if __name__ == "__main__":
+    dwh = create_engine(f'{mysql_url}/{dwh_schema_name}?charset=utf8mb4')
+
+    # Fill the universal names first, the index is built from them
+    with MongoClient(mongo_url) as mongo_client:
+        for collection_name in company_collections:
+            start = time.perf_counter()
+            filled = backfill_universal_names(dwh, mongo_client["raw_data"][collection_name])
+            print(f"{collection_name}: {filled} universal names filled in {time.perf_counter() - start:.1f}s")
+
+    index = CompanyIndex(dwh)
+    print(f"Company index: {index.load()} companies")
+
+    start = time.perf_counter()
+    backfilled = backfill_experiences(dwh, index)
+    print(
+        f"{backfilled['linked']} of {backfilled['experiences']} unlinked experiences linked "
+        f"in {time.perf_counter() - start:.1f}s"
+    )
@@ -0,0 +1,504 @@
+"""
+This module holds the metrics of the importers and serves them in the Prometheus text format.
+
+Every process records into its own registry (REGISTRY). The importers running a process pool forward
+the registries of the workers to the main process through a queue, so Prometheus scrapes a single
+/metrics endpoint per import:
+
+    metrics.serve(port)                        # main process
+    metrics.forward(metrics_queue)             # worker processes (pool initializer)
+    metrics.collect(metrics_queue)             # main process, merges what the workers forward
+
+Recorded metrics (prefixed with linkedin_etl_):
+    documents_total{collection}    Documents read from MongoDB
+    rows_total{table}              Rows written per DWH table (affected rows of INSERT and LOAD DATA)
+    round_trips_total              Statements sent to the DWH
+    errors_total{stage}            Failed documents, batches and statements
+    stage_seconds{stage}           Latency histogram of the stages (mongo read, convert, insert.*, write)
+    progress_documents             Documents imported so far (main process)
+    expected_documents             Documents to import (main process)
+    eta_seconds                    Estimated time until the import is done (main process)
+"""
+import re
+import time
+import threading
+import contextlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from sqlalchemy import event
+
+# Prefix of all metric names
+PREFIX = 'linkedin_etl'
+
+# Upper bounds in seconds of the latency histogram buckets
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Table written by an INSERT or LOAD DATA statement
+_TARGET_TABLE = re.compile(r'^\s*(?:INSERT|LOAD\s+DATA)\b.*?\bINTO\s+(?:TABLE\s+)?`?(\w+)`?', re.IGNORECASE | re.DOTALL)
+
+
+def _key(name: str, labels: dict) -> tuple:
+    """
+    This function returns the key of a metric in the registry.
+
+    :param name: The name of the metric.
+    :param labels: The labels of the metric.
+    """
+    return name, tuple(sorted(labels.items()))
+
+
+def _escape(value) -> str:
+    """
+    This function escapes a label value for the Prometheus text format.
+
+    :param value: The label value.
+    """
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format(name: str, labels: tuple, extra: tuple = ()) -> str:
+    """
+    This function returns a metric name with its labels in the Prometheus text format.
+
+    :param name: The name of the metric.
+    :param labels: The labels of the metric as (name, value) pairs.
+    :param extra: Additional labels, e.g. the bucket bound of a histogram.
+    """
+    pairs = [*labels, *extra]
+    if not pairs:
+        return f'{PREFIX}_{name}'
+    values = ','.join(f'{label}="{_escape(value)}"' for label, value in pairs)
+    return f'{PREFIX}_{name}{{{values}}}'
+
+
+class Metrics:
+    """
+    This class holds the counters, gauges and latency histograms of a process, it is thread-safe.
+
+    Usage:
+        registry.inc('documents_total', collection='KGL_LIN_PRF_USA')
+        with registry.timer('convert'):
+            ...
+        print(registry.render())
+    """
+
+    def __init__(self, buckets: tuple = BUCKETS):
+        """
+        :param buckets: Upper bounds in seconds of the latency histogram buckets.
+        """
+        self._buckets = buckets
+        self._lock = threading.Lock()
+        self._counters = {}  # (name, labels) -> value
+        self._gauges = {}  # (name, labels) -> value
+        self._histograms = {}  # (name, labels) -> [count per bucket..., count, sum]
+
+    def inc(self, name: str, value: float = 1, **labels):
+        """
+        This function increments a counter.
+
+        :param name: The name of the counter.
+        :param value: The value to add.
+        :param labels: The labels of the counter.
+        """
+        key = _key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def set(self, name: str, value: float, **labels):
+        """
+        This function sets a gauge.
+
+        :param name: The name of the gauge.
+        :param value: The value of the gauge.
+        :param labels: The labels of the gauge.
+        """
+        with self._lock:
+            self._gauges[_key(name, labels)] = value
+
+    def observe(self, name: str, seconds: float, **labels):
+        """
+        This function adds an observation to a latency histogram.
+
+        :param name: The name of the histogram.
+        :param seconds: The observed latency.
+        :param labels: The labels of the histogram.
+        """
+        key = _key(name, labels)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = [0] * (len(self._buckets) + 2)
+            for index, bound in enumerate(self._buckets):
+                if seconds <= bound:
+                    histogram[index] += 1
+                    break
+            histogram[-2] += 1
+            histogram[-1] += seconds
+
+    @contextlib.contextmanager
+    def timer(self, stage: str):
+        """
+        This function measures the latency of a stage into the stage_seconds histogram.
+        Failures are counted in errors_total and re-raised.
+
+        :param stage: The name of the stage, e.g. 'convert' or 'insert.person'.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            self.inc('errors_total', stage=stage)
+            raise
+        finally:
+            self.observe('stage_seconds', time.perf_counter() - start, stage=stage)
+
+    def timed(self, function, stage: str | None = None):
+        """
+        This function returns a function that calls the given one within a timer.
+
+        :param function: The function to measure.
+        :param stage: The name of the stage, the name of the function if None.
+        """
+        stage = stage or function.__name__
+
+        def timed_function(*args, **kwargs):
+            with self.timer(stage):
+                return function(*args, **kwargs)
+
+        return timed_function
+
+    def timed_iter(self, iterable, stage: str):
+        """
+        This function yields the items of an iterable and measures how long each item took to produce.
+        Used to measure the MongoDB cursor, which fetches its batches while being iterated.
+
+        :param iterable: The iterable to measure.
+        :param stage: The name of the stage.
+        """
+        iterator = iter(iterable)
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            self.observe('stage_seconds', time.perf_counter() - start, stage=stage)
+            yield item
+
+    def total(self, name: str) -> float:
+        """
+        This function returns the sum of a counter over all its labels.
+
+        :param name: The name of the counter.
+        """
+        with self._lock:
+            return sum(value for (counter, _), value in self._counters.items() if counter == name)
+
+    def drain(self) -> dict:
+        """
+        This function returns the counters and histograms recorded since the last call and resets them.
+        Used by worker processes to forward their metrics.
+        """
+        with self._lock:
+            snapshot = {'counters': self._counters, 'histograms': self._histograms, 'gauges': dict(self._gauges)}
+            self._counters = {}
+            self._histograms = {}
+        return snapshot
+
+    def merge(self, snapshot: dict):
+        """
+        This function adds the metrics drained from another registry.
+
+        :param snapshot: The metrics as returned by drain.
+        """
+        with self._lock:
+            for key, value in snapshot['counters'].items():
+                self._counters[key] = self._counters.get(key, 0) + value
+            for key, values in snapshot['histograms'].items():
+                histogram = self._histograms.setdefault(key, [0] * len(values))
+                for index, value in enumerate(values):
+                    histogram[index] += value
+            self._gauges.update(snapshot['gauges'])
+
+    def render(self) -> str:
+        """
+        This function returns all metrics in the Prometheus text format.
+        """
+        lines = []
+        with self._lock:
+            for kind, metrics in (('counter', self._counters), ('gauge', self._gauges)):
+                for name in sorted({name for name, _ in metrics}):
+                    lines.append(f'# TYPE {PREFIX}_{name} {kind}')
+                    for (metric, labels), value in sorted(metrics.items(), key=str):
+                        if metric == name:
+                            lines.append(f'{_format(name, labels)} {value}')
+
+            for name in sorted({name for name, _ in self._histograms}):
+                lines.append(f'# TYPE {PREFIX}_{name} histogram')
+                for (metric, labels), histogram in sorted(self._histograms.items(), key=str):
+                    if metric != name:
+                        continue
+                    cumulative = 0
+                    for bound, count in zip(self._buckets, histogram):
+                        cumulative += count
+                        lines.append(f"{_format(name + '_bucket', labels, (('le', bound),))} {cumulative}")
+                    lines.append(f"{_format(name + '_bucket', labels, (('le', '+Inf'),))} {histogram[-2]}")
+                    lines.append(f"{_format(name + '_count', labels)} {histogram[-2]}")
+                    lines.append(f"{_format(name + '_sum', labels)} {histogram[-1]}")
+
+        return '\n'.join(lines) + '\n'
+
+
+# Registry of the current process
+REGISTRY = Metrics()
+
+
+def inc(name: str, value: float = 1, **labels):
+    """
+    This function increments a counter of the process registry.
+
+    :param name: The name of the counter.
+    :param value: The value to add.
+    :param labels: The labels of the counter.
+    """
+    REGISTRY.inc(name, value, **labels)
+
+
+def timer(stage: str):
+    """
+    This function measures the latency of a stage with the process registry.
+
+    :param stage: The name of the stage.
+    """
+    return REGISTRY.timer(stage)
+
+
+def timed(function, stage: str | None = None):
+    """
+    This function returns a function that calls the given one within a timer of the process registry.
+
+    :param function: The function to measure.
+    :param stage: The name of the stage, the name of the function if None.
+    """
+    return REGISTRY.timed(function, stage)
+
+
+def timed_iter(iterable, stage: str):
+    """
+    This function yields the items of an iterable and measures them with the process registry.
+
+    :param iterable: The iterable to measure.
+    :param stage: The name of the stage.
+    """
+    return REGISTRY.timed_iter(iterable, stage)
+
+
+def instrument_engine(dwh_engine, registry: Metrics = REGISTRY):
+    """
+    This function counts the round trips, written rows and failed statements of an engine.
+    executemany counts as a single round trip, as the driver sends it as one multi-row INSERT.
+
+    :param dwh_engine: The DWH engine to instrument.
+    :param registry: The registry to record into.
+    """
+    def after_cursor_execute(connection, cursor, statement, parameters, context, executemany):
+        registry.inc('round_trips_total')
+        match = _TARGET_TABLE.match(statement)
+        if match and cursor.rowcount > 0:
+            registry.inc('rows_total', cursor.rowcount, table=match.group(1))
+
+    def handle_error(context):
+        registry.inc('round_trips_total')
+        registry.inc('errors_total', stage='sql')
+
+    event.listen(dwh_engine, 'after_cursor_execute', after_cursor_execute)
+    event.listen(dwh_engine, 'handle_error', handle_error)
+    return dwh_engine
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """
+    This class answers the requests of the metrics endpoint.
+    """
+    registry = REGISTRY
+
+    def do_GET(self):
+        if self.path.split('?')[0] != '/metrics':
+            self.send_error(404)
+            return
+        body = self.registry.render().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Scrapes are not worth a log line
+        pass
+
+
+def serve(port: int, host: str = '127.0.0.1', registry: Metrics = REGISTRY) -> ThreadingHTTPServer:
+    """
+    This function serves a registry on http://host:port/metrics in a background thread.
+
+    :param port: The port to listen on.
+    :param host: The address to listen on, use '0.0.0.0' to be scraped from another machine.
+    :param registry: The registry to serve.
+    :return: The server, call shutdown() to stop it.
+    """
+    handler = type('Handler', (_Handler,), {'registry': registry})
+    server = ThreadingHTTPServer((host, port), handler)
+    threading.Thread(target=server.serve_forever, name='metrics', daemon=True).start()
+    return server
+
+
+def forward(metrics_queue, interval: float = 5.0, registry: Metrics = REGISTRY):
+    """
+    This function forwards a registry to the main process in a background thread.
+
+    :param metrics_queue: The queue read by collect, e.g. a multiprocessing.Manager().Queue().
+    :param interval: Seconds between two forwards.
+    :param registry: The registry to forward.
+    """
+    def run():
+        while True:
+            time.sleep(interval)
+            flush(metrics_queue, registry)
+
+    threading.Thread(target=run, name='metrics-forward', daemon=True).start()
+
+
+def flush(metrics_queue, registry: Metrics = REGISTRY):
+    """
+    This function forwards what a registry recorded since the last forward.
+
+    :param metrics_queue: The queue read by collect.
+    :param registry: The registry to forward.
+    """
+    snapshot = registry.drain()
+    if snapshot['counters'] or snapshot['histograms']:
+        metrics_queue.put(snapshot)
+
+
+def collect(metrics_queue, registry: Metrics = REGISTRY, on_merge=None) -> threading.Thread:
+    """
+    This function merges the metrics forwarded by the worker processes in a background thread.
+    Put None into the queue to stop the thread.
+
+    :param metrics_queue: The queue the workers forward to.
+    :param registry: The registry to merge into.
+    :param on_merge: Function called after every merge (optional), e.g. to update the progress.
+    :return: The thread.
+    """
+    def run():
+        while (snapshot := metrics_queue.get()) is not None:
+            registry.merge(snapshot)
+            if on_merge is not None:
+                on_merge()
+
+    thread = threading.Thread(target=run, name='metrics-collect', daemon=True)
+    thread.start()
+    return thread
+
+
+class Progress:
+    """
+    This class logs the progress of an import at most once per interval, together with the rate and an ETA.
+
+    Usage:
+        progress = Progress('KGL_LIN_PRF_USA', total)
+        for doc in progress.track(documents):
+            ...
+        progress.finish()
+    """
+
+    def __init__(
+            self,
+            name: str,
+            total: int,
+            interval: float = 10.0,
+            registry: Metrics | None = REGISTRY,
+            publish: bool = False
+           ):
+        """
+        :param name: The name shown in the log lines, e.g. the collection.
+        :param total: The number of documents to import.
+        :param interval: Minimum number of seconds between two log lines.
+        :param registry: The registry the documents are counted in (documents_total{collection=name}), None to only log.
+        :param publish: Whether to set the progress_documents, expected_documents and eta_seconds gauges,
+                        meant for the progress of the whole import in the main process.
+        """
+        self.name = name
+        self.publish = publish
+        self.total = total
+        self.done = 0
+        self._interval = interval
+        self._registry = registry
+        self._start = time.perf_counter()
+        self._logged = self._start
+
+    def advance(self, count: int = 1):
+        """
+        This function adds imported documents and logs the progress if the interval has passed.
+
+        :param count: The number of documents.
+        """
+        self.done += count
+        if self._registry is not None:
+            self._registry.inc('documents_total', count, collection=self.name)
+        self._log()
+
+    def track(self, iterable):
+        """
+        This function yields the items of an iterable and advances the progress by one per item.
+
+        :param iterable: The documents to import.
+        """
+        for item in iterable:
+            self.advance()
+            yield item
+
+    def update(self, done: int):
+        """
+        This function sets the number of imported documents and logs the progress if the interval has passed.
+
+        :param done: The number of documents imported so far.
+        """
+        self.done = done
+        self._log()
+
+    def finish(self):
+        """
+        This function logs the final progress.
+        """
+        self._log(force=True)
+
+    def eta(self) -> float | None:
+        """
+        This function returns the estimated number of seconds until the import is done.
+        """
+        elapsed = time.perf_counter() - self._start
+        if not self.done or not elapsed:
+            return None
+        return max(self.total - self.done, 0) / (self.done / elapsed)
+
+    def _log(self, force: bool = False):
+        """
+        This function prints the progress line.
+
+        :param force: Whether to print even if the interval has not passed.
+        """
+        if self.publish and self._registry is not None:
+            self._registry.set('progress_documents', self.done)
+            self._registry.set('expected_documents', self.total)
+            self._registry.set('eta_seconds', self.eta() or 0)
+
+        now = time.perf_counter()
+        if not force and now - self._logged < self._interval:
+            return
+        self._logged = now
+
+        rate = self.done / (now - self._start) if now > self._start else 0.0
+        eta = self.eta()
+        eta_str = time.strftime('%H:%M:%S', time.gmtime(eta)) if eta is not None else '?'
+        print(f"{self.name}: {self.done}/{self.total} ({rate:.1f} docs/s, ETA {eta_str})")
@@ -0,0 +1,69 @@
+-- Migration for existing DWH schemas, new schemas get these changes from dwh_schema_linkedin.sql.
+-- Run it before the other migrations, they expect these columns and tables.
+-- Gives the qualifications and accomplishments their surrogate keys and adds the relation tables the importers
+-- write them to the persons with (REL_PRF_Person_Qualification, REL_PRF_Person_Accomplishment). Schemas created
+-- from an earlier dwh_schema_linkedin.sql only linked them by FACT_PRF_Qualification.idPerson and
+-- FACT_PRF_Accomplishment.idPerson, the relations of the existing rows are taken from there. The importers do not
+-- write idPerson, so it becomes nullable. Those schemas also kept the full name of a person in FACT_PRF_Person.name,
+-- the importers write firstName, lastName and fullname, and they had no DIM_PRF_Location table for the locations of
+-- the persons. The table is created without its naturalKeyHash, migration 02 adds it.
+USE `DWH` ;
+
+-- -----------------------------------------------------
+-- Name columns of the persons
+-- -----------------------------------------------------
+ALTER TABLE `DWH`.`FACT_PRF_Person`
+  CHANGE COLUMN `name` `fullname` VARCHAR(229) NULL COMMENT 'full_name attribute',
+  ADD COLUMN `firstName` VARCHAR(100) NULL COMMENT 'first_name attribute' AFTER `idLocation`,
+  ADD COLUMN `lastName` VARCHAR(130) NULL COMMENT 'last_name attribute' AFTER `firstName` ;
+
+-- -----------------------------------------------------
+-- Table `DWH`.`DIM_PRF_Location`
+-- -----------------------------------------------------
+CREATE TABLE IF NOT EXISTS `DWH`.`DIM_PRF_Location` (
+  `id` INT NOT NULL AUTO_INCREMENT,
+  `countryLetters` CHAR(2) NULL COMMENT 'country attribute of person',
+  `countryName` VARCHAR(100) NULL COMMENT 'country_full_name attribute of person',
+  `state` VARCHAR(100) NULL COMMENT 'state attribute of person',
+  `city` VARCHAR(100) NULL COMMENT 'city attribute of person',
+  PRIMARY KEY (`id`) )
+ENGINE = InnoDB;
+
+-- -----------------------------------------------------
+-- Keys of the qualifications and accomplishments
+-- -----------------------------------------------------
+ALTER TABLE `DWH`.`FACT_PRF_Qualification`
+  MODIFY COLUMN `idPerson` INT NULL COMMENT 'not written by the importers, the person is linked by REL_PRF_Person_Qualification',
+  ADD COLUMN `id` INT NOT NULL AUTO_INCREMENT FIRST,
+  ADD PRIMARY KEY (`id`) ;
+
+ALTER TABLE `DWH`.`FACT_PRF_Accomplishment`
+  MODIFY COLUMN `idPerson` INT NULL COMMENT 'not written by the importers, the person is linked by REL_PRF_Person_Accomplishment',
+  ADD COLUMN `id` INT NOT NULL AUTO_INCREMENT FIRST,
+  ADD PRIMARY KEY (`id`) ;
+
+-- -----------------------------------------------------
+-- Table `DWH`.`REL_PRF_Person_Qualification`
+-- -----------------------------------------------------
+CREATE TABLE IF NOT EXISTS `DWH`.`REL_PRF_Person_Qualification` (
+  `idPerson` INT NOT NULL,
+  `idQualification` INT NOT NULL,
+  INDEX `fk_REL_Person_Qualification_FACT_Person1_idx` (`idPerson` ASC) ,
+  INDEX `fk_REL_Person_Qualification_FACT_Qualification1_idx` (`idQualification` ASC) )
+ENGINE = InnoDB;
+
+INSERT INTO `DWH`.`REL_PRF_Person_Qualification` (`idPerson`, `idQualification`)
+SELECT `idPerson`, `id` FROM `DWH`.`FACT_PRF_Qualification` ;
+
+-- -----------------------------------------------------
+-- Table `DWH`.`REL_PRF_Person_Accomplishment`
+-- -----------------------------------------------------
+CREATE TABLE IF NOT EXISTS `DWH`.`REL_PRF_Person_Accomplishment` (
+  `idPerson` INT NOT NULL,
+  `idAccomplishment` INT NOT NULL,
+  INDEX `fk_REL_Person_Accomplishment_FACT_Person1_idx` (`idPerson` ASC) ,
+  INDEX `fk_REL_Person_Accomplishment_FACT_Accomplishment1_idx` (`idAccomplishment` ASC) )
+ENGINE = InnoDB;
+
+INSERT INTO `DWH`.`REL_PRF_Person_Accomplishment` (`idPerson`, `idAccomplishment`)
+SELECT `idPerson`, `id` FROM `DWH`.`FACT_PRF_Accomplishment` ;
@@ -0,0 +1,22 @@
+-- Migration for existing DWH schemas, new schemas get these changes from dwh_schema_linkedin.sql.
+-- Adds the checkpoint table of the resumable import and the index used to skip imported documents.
+USE `DWH` ;
+
+-- -----------------------------------------------------
+-- Table `DWH`.`ETL_Checkpoint`
+-- -----------------------------------------------------
+CREATE TABLE IF NOT EXISTS `DWH`.`ETL_Checkpoint` (
+  `collectionName` VARCHAR(64) NOT NULL COMMENT 'name of the mongodb collection that is imported',
+  `shardLower` CHAR(24) NOT NULL DEFAULT '' COMMENT 'first ObjectId of the shard (inclusive), empty for no lower bound',
+  `shardUpper` CHAR(24) NULL COMMENT 'end ObjectId of the shard (exclusive), NULL for no upper bound',
+  `size` INT NULL COMMENT 'estimated number of documents in the shard',
+  `lastId` CHAR(24) NULL COMMENT 'ObjectId of the last document committed to the dwh',
+  `finished` TINYINT NOT NULL DEFAULT 0 COMMENT 'shard has been imported completely\n\nBool:\nfinished=1\nunfinished=0',
+  `updatedAt` DATETIME NOT NULL COMMENT 'date the checkpoint has been written',
+  PRIMARY KEY (`collectionName`, `shardLower`))
+ENGINE = InnoDB;
+
+-- Duplicates created by earlier re-runs have to be removed before the index can be added, you can find them with:
+-- SELECT mongoCollectionId, COUNT(*) FROM DWH.FACT_PRF_Person GROUP BY mongoCollectionId HAVING COUNT(*) > 1;
+ALTER TABLE `DWH`.`FACT_PRF_Person`
+  ADD UNIQUE INDEX `mongoCollectionId_UNIQUE` (`mongoCollectionId` ASC) ;
@@ -0,0 +1,68 @@
+-- Migration for existing DWH schemas, new schemas get these changes from dwh_schema_linkedin.sql.
+-- Adds unique indexes on the natural keys of the dimension and relation tables, so a dimension member is resolved
+-- with a single indexed INSERT ... ON DUPLICATE KEY UPDATE id = LAST_INSERT_ID(id) instead of a scanning SELECT
+-- plus an INSERT, and relations are added with INSERT IGNORE instead of checking for them first.
+--
+-- Unique indexes do not treat NULLs as equal, so the tables with nullable natural keys (locations and durations)
+-- get a stored hash of the key in which NULL is a value of its own. The hash compares case-insensitively like
+-- the collation of the columns. Its expression has to be the same in dwh_schema_linkedin.sql.
+--
+-- Duplicates created by earlier imports have to be merged before the indexes can be added (compact.py merges them and
+-- rewrites the foreign keys), you can find them with e.g.:
+-- SELECT type, name, COUNT(*) FROM DWH.DIM_PRF_Trait GROUP BY type, name HAVING COUNT(*) > 1;
+-- SELECT countryLetters, countryName, state, city, COUNT(*) FROM DWH.DIM_LIN_Location
+--   GROUP BY countryLetters, countryName, state, city HAVING COUNT(*) > 1;
+-- SELECT idCompany, idSpecialty, COUNT(*) FROM DWH.REL_CMP_Company_Specialty GROUP BY idCompany, idSpecialty HAVING COUNT(*) > 1;
+USE `DWH` ;
+
+-- -----------------------------------------------------
+-- Dimensions with non-nullable natural keys
+-- -----------------------------------------------------
+ALTER TABLE `DWH`.`DIM_PRF_Trait`
+  ADD UNIQUE INDEX `typeName_UNIQUE` (`type` ASC, `name` ASC) ;
+
+ALTER TABLE `DWH`.`DIM_PRF_Language`
+  ADD UNIQUE INDEX `language_UNIQUE` (`language` ASC) ;
+
+ALTER TABLE `DWH`.`DIM_PRF_Group`
+  ADD UNIQUE INDEX `name_UNIQUE` (`name` ASC) ;
+
+ALTER TABLE `DWH`.`DIM_CMP_Specialty`
+  ADD UNIQUE INDEX `name_UNIQUE` (`name` ASC) ;
+
+-- -----------------------------------------------------
+-- Dimensions with nullable natural keys (NULL-safe hash)
+-- -----------------------------------------------------
+ALTER TABLE `DWH`.`DIM_LIN_Location`
+  ADD COLUMN `naturalKeyHash` BINARY(16) AS (UNHEX(MD5(CONCAT_WS(CHAR(31 USING utf8mb4),
+    IFNULL(LOWER(`countryLetters`), CHAR(0 USING utf8mb4)),
+    IFNULL(LOWER(`countryName`), CHAR(0 USING utf8mb4)),
+    IFNULL(LOWER(`state`), CHAR(0 USING utf8mb4)),
+    IFNULL(LOWER(`city`), CHAR(0 USING utf8mb4)))))) STORED COMMENT 'NULL-safe hash of the natural key',
+  ADD UNIQUE INDEX `naturalKeyHash_UNIQUE` (`naturalKeyHash` ASC) ,
+  ADD INDEX `naturalKey_idx` (`countryLetters` ASC, `countryName` ASC, `state` ASC, `city` ASC) ;
+
+ALTER TABLE `DWH`.`DIM_PRF_Location`
+  ADD COLUMN `naturalKeyHash` BINARY(16) AS (UNHEX(MD5(CONCAT_WS(CHAR(31 USING utf8mb4),
+    IFNULL(LOWER(`countryLetters`), CHAR(0 USING utf8mb4)),
+    IFNULL(LOWER(`countryName`), CHAR(0 USING utf8mb4)),
+    IFNULL(LOWER(`state`), CHAR(0 USING utf8mb4)),
+    IFNULL(LOWER(`city`), CHAR(0 USING utf8mb4)))))) STORED COMMENT 'NULL-safe hash of the natural key',
+  ADD UNIQUE INDEX `naturalKeyHash_UNIQUE` (`naturalKeyHash` ASC) ,
+  ADD INDEX `naturalKey_idx` (`countryLetters` ASC, `countryName` ASC, `state` ASC, `city` ASC) ;
+
+ALTER TABLE `DWH`.`DIM_PRF_Duration`
+  ADD COLUMN `naturalKeyHash` BINARY(16) AS (UNHEX(MD5(CONCAT_WS(CHAR(31 USING utf8mb4),
+    IFNULL(`startDate`, CHAR(0 USING utf8mb4)),
+    IFNULL(`endDate`, CHAR(0 USING utf8mb4)))))) STORED COMMENT 'NULL-safe hash of the natural key',
+  ADD UNIQUE INDEX `naturalKeyHash_UNIQUE` (`naturalKeyHash` ASC) ,
+  ADD INDEX `naturalKey_idx` (`startDate` ASC, `endDate` ASC) ;
+
+-- -----------------------------------------------------
+-- Relations of the companies
+-- -----------------------------------------------------
+ALTER TABLE `DWH`.`REL_CMP_Company_Specialty`
+  ADD UNIQUE INDEX `companySpecialty_UNIQUE` (`idCompany` ASC, `idSpecialty` ASC) ;
+
+ALTER TABLE `DWH`.`REL_CMP_Company_Location`
+  ADD UNIQUE INDEX `companyLocation_UNIQUE` (`idCompany` ASC, `idLocation` ASC) ;
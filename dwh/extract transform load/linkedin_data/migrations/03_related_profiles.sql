@@ -0,0 +1,88 @@
+-- Migration for existing DWH schemas, new schemas get these changes from dwh_schema_linkedin.sql.
+-- Adds the fixed-width key of the related people and the composite key of their edges, so the related
+-- profiles (profiles/related.py) are resolved with indexed lookups and written with INSERT IGNORE.
+--
+-- relatedKey is the MD5 hash of the lower case name and location, NULL replaced by CHAR(0) and the values
+-- separated by CHAR(31). The importer computes it on the client (related.related_key), this migration
+-- only fills it for the existing rows. Duplicates created by earlier imports are merged before the unique
+-- indexes are added.
+USE `DWH` ;
+
+-- -----------------------------------------------------
+-- Tables of the related profiles
+-- -----------------------------------------------------
+CREATE TABLE IF NOT EXISTS `DWH`.`DIM_PRF_Related` (
+  `id` INT NOT NULL AUTO_INCREMENT,
+  `name` VARCHAR(100) NULL COMMENT 'name key',
+  `location` VARCHAR(58) NULL COMMENT 'location key',
+  `summary` VARCHAR(222) NULL COMMENT 'summary key',
+  PRIMARY KEY (`id`))
+ENGINE = InnoDB;
+
+CREATE TABLE IF NOT EXISTS `DWH`.`REL_PRF_Person_Related` (
+  `idPerson` INT NOT NULL,
+  `idRelated` INT NOT NULL,
+  `type` CHAR(7) NOT NULL COMMENT 'Entry represents either people_also_viewed or similarly_named_profiles attribute.\n\npeople_also_viewed= viewed\nsimilarly_named_profiles= similar',
+  INDEX `fk_REL_Person_Related_FACT_Person1_idx` (`idPerson` ASC) ,
+  INDEX `fk_REL_Person_Related_DIM_Related1_idx` (`idRelated` ASC) ,
+  CONSTRAINT `fk_REL_Person_Related_FACT_Person1`
+    FOREIGN KEY (`idPerson`)
+    REFERENCES `DWH`.`FACT_PRF_Person` (`id`)
+    ON DELETE NO ACTION
+    ON UPDATE NO ACTION,
+  CONSTRAINT `fk_REL_Person_Related_DIM_Related1`
+    FOREIGN KEY (`idRelated`)
+    REFERENCES `DWH`.`DIM_PRF_Related` (`id`)
+    ON DELETE NO ACTION
+    ON UPDATE NO ACTION)
+ENGINE = InnoDB;
+
+-- -----------------------------------------------------
+-- Key of the related people
+-- -----------------------------------------------------
+ALTER TABLE `DWH`.`DIM_PRF_Related`
+  ADD COLUMN `relatedKey` BINARY(16) NULL COMMENT 'MD5 hash of name and location' AFTER `id` ;
+
+UPDATE `DWH`.`DIM_PRF_Related`
+  SET `relatedKey` = UNHEX(MD5(CONCAT_WS(CHAR(31 USING utf8mb4),
+    IFNULL(LOWER(`name`), CHAR(0 USING utf8mb4)),
+    IFNULL(LOWER(`location`), CHAR(0 USING utf8mb4))))) ;
+
+-- Point the edges of duplicate people to the lowest id and delete the duplicates
+CREATE TEMPORARY TABLE `DWH`.`ETL_RelatedMerge` (
+  `duplicateId` INT NOT NULL PRIMARY KEY,
+  `canonicalId` INT NOT NULL)
+SELECT `id` AS `duplicateId`, `canonicalId` FROM (
+  SELECT `id`, MIN(`id`) OVER (PARTITION BY `relatedKey`) AS `canonicalId` FROM `DWH`.`DIM_PRF_Related`
+) AS `members`
+WHERE `id` <> `canonicalId` ;
+
+UPDATE `DWH`.`REL_PRF_Person_Related` r
+  JOIN `DWH`.`ETL_RelatedMerge` m ON r.`idRelated` = m.`duplicateId`
+  SET r.`idRelated` = m.`canonicalId` ;
+
+DELETE d FROM `DWH`.`DIM_PRF_Related` d
+  JOIN `DWH`.`ETL_RelatedMerge` m ON d.`id` = m.`duplicateId` ;
+
+-- Keep one of every duplicate edge
+CREATE TEMPORARY TABLE `DWH`.`ETL_RelatedEdge`
+SELECT `idPerson`, `idRelated`, `type` FROM `DWH`.`REL_PRF_Person_Related`
+GROUP BY `idPerson`, `idRelated`, `type` HAVING COUNT(*) > 1 ;
+
+DELETE r FROM `DWH`.`REL_PRF_Person_Related` r
+  JOIN `DWH`.`ETL_RelatedEdge` e ON r.`idPerson` = e.`idPerson` AND r.`idRelated` = e.`idRelated` AND r.`type` = e.`type` ;
+
+INSERT INTO `DWH`.`REL_PRF_Person_Related` (`idPerson`, `idRelated`, `type`)
+SELECT `idPerson`, `idRelated`, `type` FROM `DWH`.`ETL_RelatedEdge` ;
+
+DROP TEMPORARY TABLE `DWH`.`ETL_RelatedMerge`, `DWH`.`ETL_RelatedEdge` ;
+
+-- -----------------------------------------------------
+-- Unique keys
+-- -----------------------------------------------------
+ALTER TABLE `DWH`.`DIM_PRF_Related`
+  MODIFY COLUMN `relatedKey` BINARY(16) NOT NULL COMMENT 'MD5 hash of name and location',
+  ADD UNIQUE INDEX `relatedKey_UNIQUE` (`relatedKey` ASC) ;
+
+ALTER TABLE `DWH`.`REL_PRF_Person_Related`
+  ADD UNIQUE INDEX `personRelated_UNIQUE` (`idPerson` ASC, `idRelated` ASC, `type` ASC) ;
@@ -0,0 +1,42 @@
+-- Migration for existing DWH schemas, new schemas get these changes from dwh_schema_linkedin.sql.
+-- Adds the date dimension keyed by yyyymmdd integers and the start and end date keys of the qualifications,
+-- which replace the DIM_PRF_Duration lookups of the import. Partial dates reference the rows of their
+-- year (yyyy0000) or month (yyyymm00).
+--
+-- Run date_dimension.py afterwards, it loads DIM_Date and fills the keys of the existing qualifications
+-- from DIM_PRF_Duration. idDuration and DIM_PRF_Duration are kept for the qualifications imported before.
+USE `DWH` ;
+
+-- -----------------------------------------------------
+-- Table `DWH`.`DIM_Date`
+-- -----------------------------------------------------
+CREATE TABLE IF NOT EXISTS `DWH`.`DIM_Date` (
+  `id` INT NOT NULL COMMENT 'yyyymmdd, yyyymm00 for a month and yyyy0000 for a year',
+  `date` DATE NULL COMMENT 'date of a day, NULL for months and years',
+  `year` SMALLINT NOT NULL,
+  `quarter` TINYINT NULL,
+  `month` TINYINT NULL,
+  `day` TINYINT NULL,
+  `weekday` TINYINT NULL COMMENT 'ISO weekday, Monday = 1',
+  `granularity` CHAR(5) NOT NULL COMMENT 'Can be: \nday\nmonth\nyear',
+  PRIMARY KEY (`id`))
+ENGINE = InnoDB;
+
+-- -----------------------------------------------------
+-- Date keys of the qualifications
+-- -----------------------------------------------------
+ALTER TABLE `DWH`.`FACT_PRF_Qualification`
+  ADD COLUMN `idStartDate` INT NULL COMMENT 'starts_at as DIM_Date key' AFTER `idDuration`,
+  ADD COLUMN `idEndDate` INT NULL COMMENT 'ends_at as DIM_Date key' AFTER `idStartDate`,
+  ADD INDEX `fk_FACT_Qualification_DIM_Date1_idx` (`idStartDate` ASC, `idEndDate` ASC) ,
+  ADD INDEX `fk_FACT_Qualification_DIM_Date2_idx` (`idEndDate` ASC) ,
+  ADD CONSTRAINT `fk_FACT_Qualification_DIM_Date1`
+    FOREIGN KEY (`idStartDate`)
+    REFERENCES `DWH`.`DIM_Date` (`id`)
+    ON DELETE NO ACTION
+    ON UPDATE NO ACTION,
+  ADD CONSTRAINT `fk_FACT_Qualification_DIM_Date2`
+    FOREIGN KEY (`idEndDate`)
+    REFERENCES `DWH`.`DIM_Date` (`id`)
+    ON DELETE NO ACTION
+    ON UPDATE NO ACTION ;
@@ -0,0 +1,84 @@
+-- Migration for existing DWH schemas, new schemas get these changes from dwh_schema_linkedin.sql.
+-- Moves the long free-text columns of the fact tables into compressed text tables (texts.py), the fact
+-- rows only keep the length of their text. Aggregations over the facts scan narrow rows that way, the
+-- text tables are only read when a text is actually selected.
+--
+-- The text tables are keyed by the id of their fact row. The texts are copied before the columns are
+-- dropped, run the migration while no import is running.
+USE `DWH` ;
+
+-- -----------------------------------------------------
+-- Text tables
+-- -----------------------------------------------------
+CREATE TABLE IF NOT EXISTS `DWH`.`TXT_PRF_Summary` (
+  `idPerson` INT NOT NULL,
+  `text` TEXT NOT NULL COMMENT 'summary attribute of FACT_PRF_Person',
+  PRIMARY KEY (`idPerson`))
+ENGINE = InnoDB
+ROW_FORMAT = COMPRESSED
+KEY_BLOCK_SIZE = 8;
+
+CREATE TABLE IF NOT EXISTS `DWH`.`TXT_PRF_Qualification` (
+  `idQualification` INT NOT NULL,
+  `text` TEXT NOT NULL COMMENT 'description of FACT_PRF_Qualification',
+  PRIMARY KEY (`idQualification`))
+ENGINE = InnoDB
+ROW_FORMAT = COMPRESSED
+KEY_BLOCK_SIZE = 8;
+
+CREATE TABLE IF NOT EXISTS `DWH`.`TXT_PRF_Accomplishment` (
+  `idAccomplishment` INT NOT NULL,
+  `text` TEXT NOT NULL COMMENT 'description of FACT_PRF_Accomplishment',
+  PRIMARY KEY (`idAccomplishment`))
+ENGINE = InnoDB
+ROW_FORMAT = COMPRESSED
+KEY_BLOCK_SIZE = 8;
+
+CREATE TABLE IF NOT EXISTS `DWH`.`TXT_CMP_Company` (
+  `idCompany` INT NOT NULL,
+  `text` TEXT NOT NULL COMMENT 'description attribute of FACT_CMP_Company',
+  PRIMARY KEY (`idCompany`))
+ENGINE = InnoDB
+ROW_FORMAT = COMPRESSED
+KEY_BLOCK_SIZE = 8;
+
+-- -----------------------------------------------------
+-- Copy the texts
+-- -----------------------------------------------------
+INSERT IGNORE INTO `DWH`.`TXT_PRF_Summary` (`idPerson`, `text`)
+SELECT `id`, `summary` FROM `DWH`.`FACT_PRF_Person` WHERE `summary` IS NOT NULL ;
+
+INSERT IGNORE INTO `DWH`.`TXT_PRF_Qualification` (`idQualification`, `text`)
+SELECT `id`, `description` FROM `DWH`.`FACT_PRF_Qualification` WHERE `description` IS NOT NULL ;
+
+INSERT IGNORE INTO `DWH`.`TXT_PRF_Accomplishment` (`idAccomplishment`, `text`)
+SELECT `id`, `description` FROM `DWH`.`FACT_PRF_Accomplishment` WHERE `description` IS NOT NULL ;
+
+INSERT IGNORE INTO `DWH`.`TXT_CMP_Company` (`idCompany`, `text`)
+SELECT `id`, `description` FROM `DWH`.`FACT_CMP_Company` WHERE `description` IS NOT NULL ;
+
+-- -----------------------------------------------------
+-- Replace the texts of the fact rows by their length
+-- -----------------------------------------------------
+ALTER TABLE `DWH`.`FACT_PRF_Person`
+  ADD COLUMN `summaryLength` SMALLINT UNSIGNED NULL COMMENT 'length of the summary attribute, the text is in TXT_PRF_Summary' AFTER `summary` ;
+UPDATE `DWH`.`FACT_PRF_Person` SET `summaryLength` = CHAR_LENGTH(`summary`) ;
+ALTER TABLE `DWH`.`FACT_PRF_Person` DROP COLUMN `summary` ;
+
+ALTER TABLE `DWH`.`FACT_PRF_Qualification`
+  ADD COLUMN `descriptionLength` SMALLINT UNSIGNED NULL COMMENT 'length of the description, the text is in TXT_PRF_Qualification' AFTER `description` ;
+UPDATE `DWH`.`FACT_PRF_Qualification` SET `descriptionLength` = CHAR_LENGTH(`description`) ;
+ALTER TABLE `DWH`.`FACT_PRF_Qualification` DROP COLUMN `description` ;
+
+ALTER TABLE `DWH`.`FACT_PRF_Accomplishment`
+  ADD COLUMN `descriptionLength` SMALLINT UNSIGNED NULL COMMENT 'length of the description, the text is in TXT_PRF_Accomplishment' AFTER `description` ;
+UPDATE `DWH`.`FACT_PRF_Accomplishment` SET `descriptionLength` = CHAR_LENGTH(`description`) ;
+ALTER TABLE `DWH`.`FACT_PRF_Accomplishment` DROP COLUMN `description` ;
+
+ALTER TABLE `DWH`.`FACT_CMP_Company`
+  ADD COLUMN `descriptionLength` SMALLINT UNSIGNED NULL COMMENT 'length of the description attribute, the text is in TXT_CMP_Company' AFTER `description` ;
+UPDATE `DWH`.`FACT_CMP_Company` SET `descriptionLength` = CHAR_LENGTH(`description`) ;
+ALTER TABLE `DWH`.`FACT_CMP_Company` DROP COLUMN `description` ;
+
+-- The recommendations are texts only, they stay in their own table which is compressed as well
+ALTER TABLE `DWH`.`FACT_PRF_Recommendation` ROW_FORMAT = COMPRESSED KEY_BLOCK_SIZE = 8 ;
@@ -0,0 +1,267 @@
+-- Migration for existing DWH schemas, new schemas get these changes from dwh_schema_linkedin.sql.
+-- Partitions the fact, text and relation tables of the profiles by idOrigin (LIST partitioning), so a collection
+-- is reloaded by exchanging the partitions of its origin (partitions.py) instead of deleting its rows, and
+-- queries filtering by origin only read its partitions.
+--
+-- Every table gets the idOrigin of its person. Partitioned InnoDB tables support no foreign keys and the
+-- partitioning key has to be part of every unique key, so the foreign keys from and to these tables are dropped
+-- and idOrigin is added to their primary and unique keys. The keys are still assigned by the importers
+-- (AUTO_INCREMENT and the key allocator) and do not repeat across origins.
+--
+-- Every origin of DIM_Origin gets the partition p<idOrigin>, rows without a person end up in the partition p0.
+-- Origins added later get their partitions from dwh_add_datasource.sql (ETL_AddOriginPartition).
+-- The migration rewrites every table, run it while no import is running.
+USE `DWH` ;
+
+-- -----------------------------------------------------
+-- Drop the foreign keys from and to the tables
+-- -----------------------------------------------------
+DROP PROCEDURE IF EXISTS `DWH`.`ETL_DropForeignKeys`;
+
+DELIMITER $$
+CREATE PROCEDURE `DWH`.`ETL_DropForeignKeys` ()
+BEGIN
+  DECLARE `done` INT DEFAULT FALSE;
+  DECLARE `constrainedTable` VARCHAR(64);
+  DECLARE `constraintName` VARCHAR(64);
+  DECLARE `foreignKeys` CURSOR FOR
+    SELECT `TABLE_NAME`, `CONSTRAINT_NAME` FROM `information_schema`.`REFERENTIAL_CONSTRAINTS`
+    WHERE `CONSTRAINT_SCHEMA` = DATABASE() AND (`TABLE_NAME` IN (
+        'FACT_PRF_Person', 'FACT_PRF_Recommendation', 'FACT_PRF_Qualification',
+        'FACT_PRF_Accomplishment', 'TXT_PRF_Summary', 'TXT_PRF_Qualification',
+        'TXT_PRF_Accomplishment', 'REL_PRF_Person_Language', 'REL_PRF_Person_Trait',
+        'REL_PRF_Person_Group', 'REL_PRF_Person_Qualification', 'REL_PRF_Person_Accomplishment',
+        'REL_PRF_Person_Related'
+      ) OR `REFERENCED_TABLE_NAME` IN (
+        'FACT_PRF_Person', 'FACT_PRF_Recommendation', 'FACT_PRF_Qualification',
+        'FACT_PRF_Accomplishment', 'TXT_PRF_Summary', 'TXT_PRF_Qualification',
+        'TXT_PRF_Accomplishment', 'REL_PRF_Person_Language', 'REL_PRF_Person_Trait',
+        'REL_PRF_Person_Group', 'REL_PRF_Person_Qualification', 'REL_PRF_Person_Accomplishment',
+        'REL_PRF_Person_Related'
+      ));
+  DECLARE CONTINUE HANDLER FOR NOT FOUND SET `done` = TRUE;
+
+  OPEN `foreignKeys`;
+  drop_foreign_keys: LOOP
+    FETCH `foreignKeys` INTO `constrainedTable`, `constraintName`;
+    IF `done` THEN
+      LEAVE drop_foreign_keys;
+    END IF;
+    SET @statement = CONCAT('ALTER TABLE `', `constrainedTable`, '` DROP FOREIGN KEY `', `constraintName`, '`');
+    PREPARE statement FROM @statement;
+    EXECUTE statement;
+    DEALLOCATE PREPARE statement;
+  END LOOP;
+  CLOSE `foreignKeys`;
+END$$
+DELIMITER ;
+
+CALL `DWH`.`ETL_DropForeignKeys`();
+DROP PROCEDURE `DWH`.`ETL_DropForeignKeys`;
+
+-- -----------------------------------------------------
+-- Origin of the rows, taken from their person
+-- -----------------------------------------------------
+ALTER TABLE `DWH`.`FACT_PRF_Recommendation`
+  ADD COLUMN `idOrigin` INT NOT NULL DEFAULT 0 COMMENT 'origin of the person, the partitioning key' ;
+ALTER TABLE `DWH`.`FACT_PRF_Qualification`
+  ADD COLUMN `idOrigin` INT NOT NULL DEFAULT 0 COMMENT 'origin of the person, the partitioning key' ;
+ALTER TABLE `DWH`.`FACT_PRF_Accomplishment`
+  ADD COLUMN `idOrigin` INT NOT NULL DEFAULT 0 COMMENT 'origin of the person, the partitioning key' ;
+ALTER TABLE `DWH`.`TXT_PRF_Summary`
+  ADD COLUMN `idOrigin` INT NOT NULL DEFAULT 0 COMMENT 'origin of the person, the partitioning key' ;
+ALTER TABLE `DWH`.`TXT_PRF_Qualification`
+  ADD COLUMN `idOrigin` INT NOT NULL DEFAULT 0 COMMENT 'origin of the person, the partitioning key' ;
+ALTER TABLE `DWH`.`TXT_PRF_Accomplishment`
+  ADD COLUMN `idOrigin` INT NOT NULL DEFAULT 0 COMMENT 'origin of the person, the partitioning key' ;
+ALTER TABLE `DWH`.`REL_PRF_Person_Language`
+  ADD COLUMN `idOrigin` INT NOT NULL DEFAULT 0 COMMENT 'origin of the person, the partitioning key' ;
+ALTER TABLE `DWH`.`REL_PRF_Person_Trait`
+  ADD COLUMN `idOrigin` INT NOT NULL DEFAULT 0 COMMENT 'origin of the person, the partitioning key' ;
+ALTER TABLE `DWH`.`REL_PRF_Person_Group`
+  ADD COLUMN `idOrigin` INT NOT NULL DEFAULT 0 COMMENT 'origin of the person, the partitioning key' ;
+ALTER TABLE `DWH`.`REL_PRF_Person_Qualification`
+  ADD COLUMN `idOrigin` INT NOT NULL DEFAULT 0 COMMENT 'origin of the person, the partitioning key' ;
+ALTER TABLE `DWH`.`REL_PRF_Person_Accomplishment`
+  ADD COLUMN `idOrigin` INT NOT NULL DEFAULT 0 COMMENT 'origin of the person, the partitioning key' ;
+ALTER TABLE `DWH`.`REL_PRF_Person_Related`
+  ADD COLUMN `idOrigin` INT NOT NULL DEFAULT 0 COMMENT 'origin of the person, the partitioning key' ;
+
+UPDATE `DWH`.`FACT_PRF_Recommendation` r
+  JOIN `DWH`.`FACT_PRF_Person` p ON r.`idPerson` = p.`id`
+  SET r.`idOrigin` = p.`idOrigin` ;
+
+UPDATE `DWH`.`REL_PRF_Person_Language` r
+  JOIN `DWH`.`FACT_PRF_Person` p ON r.`idPerson` = p.`id`
+  SET r.`idOrigin` = p.`idOrigin` ;
+
+UPDATE `DWH`.`REL_PRF_Person_Trait` r
+  JOIN `DWH`.`FACT_PRF_Person` p ON r.`idPerson` = p.`id`
+  SET r.`idOrigin` = p.`idOrigin` ;
+
+UPDATE `DWH`.`REL_PRF_Person_Group` r
+  JOIN `DWH`.`FACT_PRF_Person` p ON r.`idPerson` = p.`id`
+  SET r.`idOrigin` = p.`idOrigin` ;
+
+UPDATE `DWH`.`REL_PRF_Person_Qualification` r
+  JOIN `DWH`.`FACT_PRF_Person` p ON r.`idPerson` = p.`id`
+  SET r.`idOrigin` = p.`idOrigin` ;
+
+UPDATE `DWH`.`REL_PRF_Person_Accomplishment` r
+  JOIN `DWH`.`FACT_PRF_Person` p ON r.`idPerson` = p.`id`
+  SET r.`idOrigin` = p.`idOrigin` ;
+
+UPDATE `DWH`.`REL_PRF_Person_Related` r
+  JOIN `DWH`.`FACT_PRF_Person` p ON r.`idPerson` = p.`id`
+  SET r.`idOrigin` = p.`idOrigin` ;
+
+UPDATE `DWH`.`TXT_PRF_Summary` t
+  JOIN `DWH`.`FACT_PRF_Person` p ON t.`idPerson` = p.`id`
+  SET t.`idOrigin` = p.`idOrigin` ;
+
+-- Qualifications and accomplishments belong to the person of their relation
+UPDATE `DWH`.`FACT_PRF_Qualification` q
+  JOIN `DWH`.`REL_PRF_Person_Qualification` r ON r.`idQualification` = q.`id`
+  SET q.`idOrigin` = r.`idOrigin` ;
+
+UPDATE `DWH`.`FACT_PRF_Accomplishment` a
+  JOIN `DWH`.`REL_PRF_Person_Accomplishment` r ON r.`idAccomplishment` = a.`id`
+  SET a.`idOrigin` = r.`idOrigin` ;
+
+UPDATE `DWH`.`TXT_PRF_Qualification` t
+  JOIN `DWH`.`FACT_PRF_Qualification` q ON t.`idQualification` = q.`id`
+  SET t.`idOrigin` = q.`idOrigin` ;
+
+UPDATE `DWH`.`TXT_PRF_Accomplishment` t
+  JOIN `DWH`.`FACT_PRF_Accomplishment` a ON t.`idAccomplishment` = a.`id`
+  SET t.`idOrigin` = a.`idOrigin` ;
+
+-- -----------------------------------------------------
+-- Keys including the origin
+-- -----------------------------------------------------
+ALTER TABLE `DWH`.`FACT_PRF_Person`
+  MODIFY COLUMN `idOrigin` INT NOT NULL COMMENT 'origin of the person, the partitioning key',
+  DROP PRIMARY KEY,
+  ADD PRIMARY KEY (`id`, `idOrigin`),
+  DROP INDEX `idPerson_UNIQUE`,
+  DROP INDEX `mongoCollectionId_UNIQUE`,
+  ADD UNIQUE INDEX `mongoCollectionId_UNIQUE` (`mongoCollectionId` ASC, `idOrigin` ASC) ;
+
+ALTER TABLE `DWH`.`FACT_PRF_Recommendation`
+  MODIFY COLUMN `idOrigin` INT NOT NULL COMMENT 'origin of the person, the partitioning key' ;
+
+ALTER TABLE `DWH`.`FACT_PRF_Qualification`
+  MODIFY COLUMN `idOrigin` INT NOT NULL COMMENT 'origin of the person, the partitioning key',
+  DROP PRIMARY KEY,
+  ADD PRIMARY KEY (`id`, `idOrigin`) ;
+
+ALTER TABLE `DWH`.`FACT_PRF_Accomplishment`
+  MODIFY COLUMN `idOrigin` INT NOT NULL COMMENT 'origin of the person, the partitioning key',
+  DROP PRIMARY KEY,
+  ADD PRIMARY KEY (`id`, `idOrigin`) ;
+
+ALTER TABLE `DWH`.`TXT_PRF_Summary`
+  MODIFY COLUMN `idOrigin` INT NOT NULL COMMENT 'origin of the person, the partitioning key',
+  DROP PRIMARY KEY,
+  ADD PRIMARY KEY (`idPerson`, `idOrigin`) ;
+
+ALTER TABLE `DWH`.`TXT_PRF_Qualification`
+  MODIFY COLUMN `idOrigin` INT NOT NULL COMMENT 'origin of the person, the partitioning key',
+  DROP PRIMARY KEY,
+  ADD PRIMARY KEY (`idQualification`, `idOrigin`) ;
+
+ALTER TABLE `DWH`.`TXT_PRF_Accomplishment`
+  MODIFY COLUMN `idOrigin` INT NOT NULL COMMENT 'origin of the person, the partitioning key',
+  DROP PRIMARY KEY,
+  ADD PRIMARY KEY (`idAccomplishment`, `idOrigin`) ;
+
+ALTER TABLE `DWH`.`REL_PRF_Person_Language`
+  MODIFY COLUMN `idOrigin` INT NOT NULL COMMENT 'origin of the person, the partitioning key' ;
+
+ALTER TABLE `DWH`.`REL_PRF_Person_Trait`
+  MODIFY COLUMN `idOrigin` INT NOT NULL COMMENT 'origin of the person, the partitioning key' ;
+
+ALTER TABLE `DWH`.`REL_PRF_Person_Group`
+  MODIFY COLUMN `idOrigin` INT NOT NULL COMMENT 'origin of the person, the partitioning key' ;
+
+ALTER TABLE `DWH`.`REL_PRF_Person_Qualification`
+  MODIFY COLUMN `idOrigin` INT NOT NULL COMMENT 'origin of the person, the partitioning key' ;
+
+ALTER TABLE `DWH`.`REL_PRF_Person_Accomplishment`
+  MODIFY COLUMN `idOrigin` INT NOT NULL COMMENT 'origin of the person, the partitioning key' ;
+
+ALTER TABLE `DWH`.`REL_PRF_Person_Related`
+  MODIFY COLUMN `idOrigin` INT NOT NULL COMMENT 'origin of the person, the partitioning key',
+  DROP INDEX `personRelated_UNIQUE`,
+  ADD UNIQUE INDEX `personRelated_UNIQUE` (`idPerson` ASC, `idRelated` ASC, `type` ASC, `idOrigin` ASC) ;
+
+-- -----------------------------------------------------
+-- Partitions of the existing origins
+-- -----------------------------------------------------
+DROP PROCEDURE IF EXISTS `DWH`.`ETL_PartitionByOrigin`;
+
+DELIMITER $$
+CREATE PROCEDURE `DWH`.`ETL_PartitionByOrigin` (IN `partitionedTable` VARCHAR(64))
+BEGIN
+  SELECT CONCAT('ALTER TABLE `', `partitionedTable`, '` PARTITION BY LIST (`idOrigin`) (PARTITION `p0` VALUES IN (0)',
+    IFNULL(CONCAT(', ', GROUP_CONCAT(CONCAT('PARTITION `p', `id`, '` VALUES IN (', `id`, ')') ORDER BY `id` SEPARATOR ', ')), ''),
+    ')')
+  INTO @statement
+  FROM `DWH`.`DIM_Origin` WHERE `id` <> 0;
+  PREPARE statement FROM @statement;
+  EXECUTE statement;
+  DEALLOCATE PREPARE statement;
+END$$
+DELIMITER ;
+
+CALL `DWH`.`ETL_PartitionByOrigin`('FACT_PRF_Person');
+CALL `DWH`.`ETL_PartitionByOrigin`('FACT_PRF_Recommendation');
+CALL `DWH`.`ETL_PartitionByOrigin`('FACT_PRF_Qualification');
+CALL `DWH`.`ETL_PartitionByOrigin`('FACT_PRF_Accomplishment');
+CALL `DWH`.`ETL_PartitionByOrigin`('TXT_PRF_Summary');
+CALL `DWH`.`ETL_PartitionByOrigin`('TXT_PRF_Qualification');
+CALL `DWH`.`ETL_PartitionByOrigin`('TXT_PRF_Accomplishment');
+CALL `DWH`.`ETL_PartitionByOrigin`('REL_PRF_Person_Language');
+CALL `DWH`.`ETL_PartitionByOrigin`('REL_PRF_Person_Trait');
+CALL `DWH`.`ETL_PartitionByOrigin`('REL_PRF_Person_Group');
+CALL `DWH`.`ETL_PartitionByOrigin`('REL_PRF_Person_Qualification');
+CALL `DWH`.`ETL_PartitionByOrigin`('REL_PRF_Person_Accomplishment');
+CALL `DWH`.`ETL_PartitionByOrigin`('REL_PRF_Person_Related');
+DROP PROCEDURE `DWH`.`ETL_PartitionByOrigin`;
+
+-- -----------------------------------------------------
+-- Procedure `DWH`.`ETL_AddOriginPartition`
+-- Adds the partition p<originId> to every table partitioned by idOrigin (the tables with the partition p0),
+-- called by dwh_add_datasource.sql for every new origin.
+-- -----------------------------------------------------
+DROP PROCEDURE IF EXISTS `DWH`.`ETL_AddOriginPartition`;
+
+DELIMITER $$
+CREATE PROCEDURE `DWH`.`ETL_AddOriginPartition` (IN `originId` INT)
+BEGIN
+  DECLARE `done` INT DEFAULT FALSE;
+  DECLARE `partitionedTable` VARCHAR(64);
+  DECLARE `missing` CURSOR FOR
+    SELECT p.`TABLE_NAME` FROM `information_schema`.`PARTITIONS` p
+    WHERE p.`TABLE_SCHEMA` = DATABASE() AND p.`PARTITION_METHOD` = 'LIST' AND p.`PARTITION_NAME` = 'p0'
+      AND NOT EXISTS (
+        SELECT 1 FROM `information_schema`.`PARTITIONS` o
+        WHERE o.`TABLE_SCHEMA` = p.`TABLE_SCHEMA` AND o.`TABLE_NAME` = p.`TABLE_NAME`
+          AND o.`PARTITION_NAME` = CONCAT('p', `originId`));
+  DECLARE CONTINUE HANDLER FOR NOT FOUND SET `done` = TRUE;
+
+  OPEN `missing`;
+  add_partitions: LOOP
+    FETCH `missing` INTO `partitionedTable`;
+    IF `done` THEN
+      LEAVE add_partitions;
+    END IF;
+    SET @statement = CONCAT('ALTER TABLE `', `partitionedTable`, '` ADD PARTITION (PARTITION `p', `originId`,
+      '` VALUES IN (', `originId`, '))');
+    PREPARE statement FROM @statement;
+    EXECUTE statement;
+    DEALLOCATE PREPARE statement;
+  END LOOP;
+  CLOSE `missing`;
+END$$
+DELIMITER ;
@@ -0,0 +1,24 @@
+-- Migration for existing DWH schemas, new schemas get these changes from dwh_schema_linkedin.sql.
+-- Links the experiences to the companies they were made at (links.py). The profile importers resolve the
+-- LinkedIn company URL (company_linkedin_profile_url) and the name of every experience against the imported
+-- companies and store the company in FACT_PRF_Qualification.idCompany, so people are joined to companies by
+-- an index instead of comparing names.
+--
+-- FACT_PRF_Qualification is partitioned, so idCompany cannot be a declared foreign key.
+-- The companies imported before this migration have no universalName yet, run links.py afterwards to fill it
+-- from the company collections and to link the experiences imported before.
+USE `DWH` ;
+
+-- -----------------------------------------------------
+-- LinkedIn universal name of the companies
+-- -----------------------------------------------------
+ALTER TABLE `DWH`.`FACT_CMP_Company`
+  ADD COLUMN `universalName` VARCHAR(100) NULL COMMENT 'universal_name_id attribute, the <universalName> of linkedin.com/company/<universalName> URLs' AFTER `name`,
+  ADD INDEX `universalName_idx` (`universalName` ASC) ;
+
+-- -----------------------------------------------------
+-- Company of the experiences
+-- -----------------------------------------------------
+ALTER TABLE `DWH`.`FACT_PRF_Qualification`
+  ADD COLUMN `idCompany` INT NULL COMMENT 'FACT_CMP_Company of an experience, resolved by links.py (no foreign key, the table is partitioned)',
+  ADD INDEX `fk_FACT_Qualification_FACT_Company1_idx` (`idCompany` ASC) ;
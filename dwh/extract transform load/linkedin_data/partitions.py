@@ -0,0 +1,239 @@
+"""
+This script reloads whole collections into the partitions of their origin.
+
+The fact, text and relation tables of the profiles are partitioned by idOrigin (LIST partitioning, see
+migrations/06_origin_partitions.sql), every origin of DIM_Origin has its own partition p<idOrigin>.
+A collection is reloaded without deleting a single row: the documents are imported into empty exchange
+tables of the same structure, which are swapped with the partitions of the origin by EXCHANGE PARTITION.
+Every swap only changes metadata, so the tables are locked for a moment instead of the whole delete.
+The previous rows end up in the exchange tables, which are dropped afterwards.
+
+Queries filtering by origin only read its partitions, join the relations on idOrigin as well to prune them, e.g.
+SELECT ... FROM FACT_PRF_Person p JOIN REL_PRF_Person_Trait r ON r.idPerson = p.id AND r.idOrigin = p.idOrigin
+WHERE p.idOrigin = 2
+"""
+import os
+import time
+from dotenv import load_dotenv, find_dotenv
+from sqlalchemy import create_engine  # Requires pymysql
+from dwh.linkedin_data.profiles import bulk
+from dwh.linkedin_data.links import CompanyIndex
+
+# Tables partitioned by idOrigin, all of them are written by the profile importers
+PARTITIONED_TABLES = bulk.WRITE_ORDER
+
+
+def partition_name(id_origin: int) -> str:
+    """
+    This function returns the name of the partition of an origin.
+
+    :param id_origin: The ID of the DIM_Origin table from the dwh.
+    """
+    return f"p{id_origin}"
+
+
+def exchange_tables(id_origin: int, tables: tuple = PARTITIONED_TABLES) -> dict[str, str]:
+    """
+    This function returns the names of the exchange tables of an origin.
+
+    :param id_origin: The ID of the DIM_Origin table from the dwh.
+    :param tables: The partitioned tables.
+    :return: A dictionary mapping the partitioned tables to their exchange tables.
+    """
+    return {table: f"{table}_{partition_name(id_origin)}" for table in tables}
+
+
+def add_partition(dwh_engine, id_origin: int):
+    """
+    This function adds the partition of an origin to every partitioned table that does not have it yet.
+
+    :param dwh_engine: The DWH engine to use.
+    :param id_origin: The ID of the DIM_Origin table from the dwh.
+    """
+    with dwh_engine.begin() as connection:
+        connection.exec_driver_sql("CALL ETL_AddOriginPartition(%s)", (id_origin,))
+
+
+def foreign_keys(dwh_engine, tables: tuple = PARTITIONED_TABLES) -> list[tuple[str, str]]:
+    """
+    This function returns the foreign keys from and to the partitioned tables.
+    EXCHANGE PARTITION (and partitioning in general) requires that there are none.
+
+    :param dwh_engine: The DWH engine to use.
+    :param tables: The partitioned tables.
+    :return: The (table, constraint name) of the foreign keys.
+    """
+    placeholders = ', '.join(['%s'] * len(tables))
+    query = f"""
+        SELECT TABLE_NAME, CONSTRAINT_NAME
+        FROM information_schema.REFERENTIAL_CONSTRAINTS
+        WHERE CONSTRAINT_SCHEMA = DATABASE()
+        AND (TABLE_NAME IN ({placeholders}) OR REFERENCED_TABLE_NAME IN ({placeholders}))
+    """
+    with dwh_engine.connect() as connection:
+        return [tuple(row) for row in connection.exec_driver_sql(query, (*tables, *tables))]
+
+
+def create_exchange_tables(dwh_engine, id_origin: int, tables: tuple = PARTITIONED_TABLES) -> dict[str, str]:
+    """
+    This function (re)creates the empty exchange tables of an origin.
+    The exchange tables have the structure of their partitioned tables, without the partitioning.
+    Raises a ValueError if foreign keys from or to the partitioned tables would prevent the exchange.
+
+    :param dwh_engine: The DWH engine to use.
+    :param id_origin: The ID of the DIM_Origin table from the dwh.
+    :param tables: The partitioned tables.
+    :return: A dictionary mapping the partitioned tables to their exchange tables.
+    """
+    # Fail before importing anything if a partition could not be exchanged
+    constraints = foreign_keys(dwh_engine, tables)
+    if constraints:
+        raise ValueError(
+            f"Foreign keys prevent the partition exchange (see migrations/06_origin_partitions.sql): {constraints}"
+        )
+
+    exchanges = exchange_tables(id_origin, tables)
+    with dwh_engine.begin() as connection:
+        for table, exchange_table in exchanges.items():
+            connection.exec_driver_sql(f"DROP TABLE IF EXISTS {exchange_table}")
+            connection.exec_driver_sql(f"CREATE TABLE {exchange_table} LIKE {table}")
+            connection.exec_driver_sql(f"ALTER TABLE {exchange_table} REMOVE PARTITIONING")
+
+    return exchanges
+
+
+def exchange(dwh_engine, id_origin: int, exchanges: dict[str, str]) -> dict[str, int]:
+    """
+    This function swaps the partitions of an origin with the exchange tables.
+    MySQL validates that every row of an exchange table belongs to the partition.
+
+    :param dwh_engine: The DWH engine to use.
+    :param id_origin: The ID of the DIM_Origin table from the dwh.
+    :param exchanges: The exchange tables, mapped by partitioned table.
+    :return: The number of rows of the new partitions per table.
+    """
+    rows = {}
+    with dwh_engine.begin() as connection:
+        for table, exchange_table in exchanges.items():
+            rows[table] = connection.exec_driver_sql(f"SELECT COUNT(*) FROM {exchange_table}").scalar()
+            connection.exec_driver_sql(
+                f"ALTER TABLE {table} EXCHANGE PARTITION {partition_name(id_origin)} WITH TABLE {exchange_table}"
+            )
+
+    return rows
+
+
+def drop_exchange_tables(dwh_engine, exchanges: dict[str, str]):
+    """
+    This function drops exchange tables, after the exchange they hold the previous rows of the partitions.
+
+    :param dwh_engine: The DWH engine to use.
+    :param exchanges: The exchange tables, mapped by partitioned table.
+    """
+    with dwh_engine.begin() as connection:
+        for exchange_table in exchanges.values():
+            connection.exec_driver_sql(f"DROP TABLE IF EXISTS {exchange_table}")
+
+
+def reload_collection(
+        collection_str: str,
+        id_origin: int,
+        dwh_connection_url: str,
+        mongo_connection_url: str,
+        schema_name: str = 'DWH',
+        bulk_batch_size: int = 500,
+        staging_dir: str | None = None,
+        pipeline_settings: dict | None = None,
+        keep_previous: bool = False,
+        link_companies: bool = True
+       ) -> bool:
+    """
+    This function imports a collection into the exchange tables of its origin and swaps them in.
+    Nothing is swapped if documents failed, the exchange tables are kept to inspect them.
+
+    :param collection_str: The name of the MongoDB collection.
+    :param id_origin: The ID of the DIM_Origin table from the dwh.
+    :param dwh_connection_url: The connection string of the DWH.
+    :param mongo_connection_url: The connection string of the MongoDB.
+    :param schema_name: The name of the DWH schema.
+    :param bulk_batch_size: Number of documents written per batch.
+    :param staging_dir: Directory to stage the batches in and load them with LOAD DATA LOCAL INFILE, None inserts them.
+    :param pipeline_settings: Workers and queue sizes of the staged pipeline, None inserts the batches one after another.
+    :param keep_previous: Whether to keep the previous rows in the exchange tables instead of dropping them.
+    :param link_companies: Whether to link the experiences to the imported companies (see links.py).
+    :return: Whether the collection has been swapped in.
+    """
+    # Imported here, the import script reads its configuration when it is loaded
+    from dwh.linkedin_data.import_script_profiles import insert_collection_documents
+
+    dwh = create_engine(f'{dwh_connection_url}/{schema_name}?charset=utf8mb4')
+    company_index = None
+    if link_companies:
+        company_index = CompanyIndex(dwh)
+        company_index.load()
+
+    # Make sure the origin has its partitions and start with empty exchange tables
+    add_partition(dwh, id_origin)
+    exchanges = create_exchange_tables(dwh, id_origin)
+
+    # Import the collection into the exchange tables, the partitioned tables are not touched
+    imported = insert_collection_documents(
+        collection_str,
+        id_origin,
+        dwh_connection_url,
+        mongo_connection_url,
+        schema_name,
+        bulk_batch_size,
+        staging_dir=staging_dir,
+        pipeline_settings=pipeline_settings,
+        target_tables=exchanges,
+        company_index=company_index
+    )
+    if not imported:
+        print(f"Error: {collection_str} not swapped in, the imported rows are kept in the exchange tables")
+        return False
+
+    # Swap the partitions, the exchange tables hold the previous rows afterwards
+    start = time.perf_counter()
+    rows = exchange(dwh, id_origin, exchanges)
+    print(f"{collection_str}: partition {partition_name(id_origin)} exchanged in {time.perf_counter() - start:.1f}s {rows}")
+
+    if not keep_previous:
+        drop_exchange_tables(dwh, exchanges)
+    return True
+
+
+# Load environment variables
+load_dotenv(find_dotenv())
+
+# Connection strings
+mysql_url = os.getenv("DATABASE_DWH")
+mongo_url = os.getenv("MongoClientURI")
+dwh_schema_name = 'DWH'
+
+# Collections to reload
+reload_collections = [
+    {"name": "KGL_LIN_PRF_IND", "id_origin": 2}
+]
+
+# Number of documents written per batch and directory to stage the batches in (None inserts the batches)
+bulk_batch_size = 500
+staging_directory = None
+
+# Whether to keep the previous rows of the partitions in the exchange tables (<table>_p<idOrigin>)
+keep_previous_rows = False
+
+if __name__ == "__main__":
+    for collection in reload_collections:
+        reload_start = time.perf_counter()
+        reloaded = reload_collection(
+            collection["name"],
+            collection["id_origin"],
+            mysql_url,
+            mongo_url,
+            dwh_schema_name,
+            bulk_batch_size,
+            staging_dir=staging_directory,
+            keep_previous=keep_previous_rows
+        )
+        print(f"{collection['name']}: {'reloaded' if reloaded else 'failed'} in {time.perf_counter() - reload_start:.1f}s")
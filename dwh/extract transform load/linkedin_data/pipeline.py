@@ -0,0 +1,504 @@
+"""
+This module holds the staged import pipeline used to overlap reading, converting and writing.
+
+The stages run in their own threads and are connected by bounded queues, so a slow stage blocks the
+stages in front of it instead of piling up documents in memory (backpressure):
+
+    reader -> documents queue -> converters -> one queue per table -> writers
+
+Every stage records how long it worked, waited for input and was blocked by a full output queue,
+together with the depth of its input queue. The stage that is busy while the others wait limits
+the throughput and is the one worth giving more workers.
+"""
+import queue
+import threading
+import time
+
+# Marks the end of a queue
+_DONE = object()
+
+# Default number of workers and queue sizes
+DEFAULTS = {
+    'read_batch_size': 500,  # Documents per batch handed to the converters
+    'converters': 2,  # Converter threads
+    'writers': 1,  # Writer threads per table (or a dict mapping tables to counts)
+    'queue_size': 8,  # Maximum number of batches waiting in front of a stage
+    'flush_rows': 5000  # Maximum number of rows a writer combines into a single INSERT
+}
+
+
+class StageMetrics:
+    """
+    This class collects the counters of a pipeline stage, shared by all workers of the stage.
+    """
+
+    def __init__(self, name: str, workers: int):
+        """
+        :param name: The name of the stage.
+        :param workers: The number of workers of the stage.
+        """
+        self.name = name
+        self.workers = workers
+        self.items = 0  # Batches processed
+        self.rows = 0  # Documents or rows processed
+        self.busy = 0.0  # Seconds spent working
+        self.waiting = 0.0  # Seconds spent waiting for input
+        self.blocked = 0.0  # Seconds spent blocked by a full output queue
+        self.depth_sum = 0  # Sum of the sampled input queue depths
+        self.depth_max = 0  # Maximum sampled input queue depth
+        self.samples = 0  # Number of sampled input queue depths
+        self._lock = threading.Lock()
+
+    def add(self, **values):
+        """
+        This function adds values to the counters.
+
+        :param values: The values to add, by counter name.
+        """
+        with self._lock:
+            for name, value in values.items():
+                setattr(self, name, getattr(self, name) + value)
+
+    def sample(self, depth: int):
+        """
+        This function records the depth of the input queue.
+
+        :param depth: The number of batches waiting in the queue.
+        """
+        with self._lock:
+            self.depth_sum += depth
+            self.depth_max = max(self.depth_max, depth)
+            self.samples += 1
+
+    def as_dict(self) -> dict:
+        """
+        This function returns the counters as a dictionary.
+        """
+        with self._lock:
+            return {
+                'workers': self.workers,
+                'items': self.items,
+                'rows': self.rows,
+                'busy': round(self.busy, 3),
+                'waiting': round(self.waiting, 3),
+                'blocked': round(self.blocked, 3),
+                'depth_avg': round(self.depth_sum / self.samples, 2) if self.samples else 0,
+                'depth_max': self.depth_max
+            }
+
+
+class Pipeline:
+    """
+    This class imports documents through a reader, a pool of converters and writers per table.
+
+    Keys are assigned while converting, so the tables can be written independently of each other.
+    The rows of the commit table (e.g. FACT_PRF_Person) of a batch are only written after all other
+    tables of the batch, which means a document whose commit row exists has been imported completely.
+    The checkpoint only advances over batches that have been written completely and in order.
+    When a batch fails, its rows already written to the other tables are deleted again by the keys in their
+    first column (the keys assigned while converting), so a rerun of the batch does not duplicate them.
+
+    The writers disable foreign key checks for their sessions, as the tables are not written in order.
+
+    Usage:
+        pipeline = Pipeline(
+            convert, bulk.write_rows, bulk.WRITE_ORDER, dwh_engine, 'FACT_PRF_Person', delete=bulk.delete_rows
+        )
+        pipeline.run(collection.find(query).sort('_id', 1))
+        print(pipeline.report())
+    """
+
+    def __init__(
+            self,
+            convert,
+            write,
+            tables: tuple,
+            dwh_engine,
+            commit_table: str | None = None,
+            on_commit=None,
+            settings: dict | None = None,
+            delete=None
+           ):
+        """
+        :param convert: Function converting a list of documents into (count, rows per table).
+        :param write: Function writing rows into a table, called with (connection, table, rows).
+        :param tables: The tables written by the pipeline.
+        :param dwh_engine: The DWH engine to use.
+        :param commit_table: The table written last per batch (optional).
+        :param on_commit: Function called with the last key of every completed batch, in order (optional).
+        :param settings: Number of workers and queue sizes, missing values are taken from DEFAULTS.
+        :param delete: Function deleting the rows of a failed batch from a table again, called with
+            (connection, table, keys of the first column), None keeps them (optional).
+        """
+        self._convert = convert
+        self._write = write
+        self._tables = tables
+        self._dwh_engine = dwh_engine
+        self._commit_table = commit_table
+        self._on_commit = on_commit
+        self._delete = delete
+        self._settings = {**DEFAULTS, **(settings or {})}
+
+        writers = self._settings['writers']
+        self._writer_counts = {
+            table: writers.get(table, 1) if isinstance(writers, dict) else writers for table in tables
+        }
+
+        # Queues between the stages
+        self._documents = queue.Queue(maxsize=self._settings['queue_size'])
+        self._table_queues = {table: queue.Queue(maxsize=self._settings['queue_size']) for table in tables}
+
+        # Metrics per stage
+        self.stages = {
+            'read': StageMetrics('read', 1),
+            'convert': StageMetrics('convert', self._settings['converters']),
+            **{f'write:{table}': StageMetrics(f'write:{table}', self._writer_counts[table]) for table in tables}
+        }
+
+        # Batches in progress: sequence number -> state
+        self._lock = threading.Lock()
+        self._batches = {}
+        self._next_commit = 0
+        self._running = {'convert': self._settings['converters'], 'write': 0}
+
+        self.documents = 0
+        self.seconds = 0.0
+        self.failed = False
+
+    def run(self, documents):
+        """
+        This function imports the documents and returns when all stages are done.
+
+        :param documents: An iterable of documents, e.g. a MongoDB cursor sorted by _id.
+        """
+        start = time.perf_counter()
+
+        # Writers of the commit table only stop after all other writers are done
+        other_tables = [table for table in self._tables if table != self._commit_table]
+        self._running['write'] = sum(self._writer_counts[table] for table in other_tables)
+
+        threads = [threading.Thread(target=self._read, args=(documents,), name='read')]
+        threads += [
+            threading.Thread(target=self._converter, name=f'convert-{i}')
+            for i in range(self._settings['converters'])
+        ]
+        threads += [
+            threading.Thread(target=self._writer, args=(table,), name=f'write-{table}-{i}')
+            for table in self._tables for i in range(self._writer_counts[table])
+        ]
+
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.seconds = time.perf_counter() - start
+
+        # Batches that are left have failed in one of the stages
+        if self._batches:
+            self.failed = True
+
+    def metrics(self) -> dict:
+        """
+        This function returns the metrics of all stages together with the current queue depths.
+        """
+        return {
+            'documents': self.documents,
+            'queues': {
+                'documents': self._documents.qsize(),
+                **{table: table_queue.qsize() for table, table_queue in self._table_queues.items()}
+            },
+            'stages': {name: stage.as_dict() for name, stage in self.stages.items()}
+        }
+
+    def report(self) -> str:
+        """
+        This function returns a printable summary of the stages.
+        """
+        lines = []
+        for name, stage in self.metrics()['stages'].items():
+            lines.append(
+                f"{name} ({stage['workers']} workers): {stage['items']} batches, {stage['rows']} rows, "
+                f"busy {stage['busy']}s, waiting {stage['waiting']}s, blocked {stage['blocked']}s, "
+                f"queue depth avg {stage['depth_avg']} max {stage['depth_max']}"
+            )
+        return '\n'.join(lines)
+
+    def _put(self, target: queue.Queue, item, stage: StageMetrics):
+        """
+        This function puts an item into a queue and records the time blocked by a full queue.
+
+        :param target: The queue to put the item into.
+        :param item: The item.
+        :param stage: The metrics of the stage that produces the item.
+        """
+        start = time.perf_counter()
+        target.put(item)
+        stage.add(blocked=time.perf_counter() - start)
+
+    def _get(self, source: queue.Queue, stage: StageMetrics):
+        """
+        This function takes an item from a queue and records the time waited for it.
+
+        :param source: The queue to take the item from.
+        :param stage: The metrics of the stage that consumes the item.
+        """
+        stage.sample(source.qsize())
+        start = time.perf_counter()
+        item = source.get()
+        stage.add(waiting=time.perf_counter() - start)
+        return item
+
+    def _read(self, documents):
+        """
+        This function reads the documents in batches and hands them to the converters.
+
+        :param documents: An iterable of documents.
+        """
+        stage = self.stages['read']
+        sequence = 0
+        batch = []
+        start = time.perf_counter()
+
+        for doc in documents:
+            batch.append(doc)
+            if len(batch) >= self._settings['read_batch_size']:
+                stage.add(items=1, rows=len(batch), busy=time.perf_counter() - start)
+                self._put(self._documents, (sequence, batch), stage)
+                sequence += 1
+                batch = []
+                start = time.perf_counter()
+
+        if batch:
+            stage.add(items=1, rows=len(batch), busy=time.perf_counter() - start)
+            self._put(self._documents, (sequence, batch), stage)
+
+        # Stop the converters
+        for _ in range(self._settings['converters']):
+            self._documents.put(_DONE)
+
+    def _converter(self):
+        """
+        This function converts batches of documents into rows and hands them to the writers.
+        """
+        stage = self.stages['convert']
+
+        while (item := self._get(self._documents, stage)) is not _DONE:
+            sequence, batch = item
+            start = time.perf_counter()
+            try:
+                count, rows = self._convert(batch)
+            except Exception as e:
+                print(f"Error: converting batch {batch[0]['_id']} - {batch[-1]['_id']}")
+                print(e)
+                self._fail(sequence, batch[-1]['_id'])
+                continue
+            stage.add(items=1, rows=len(batch), busy=time.perf_counter() - start)
+
+            # Register the batch before its rows are handed out
+            pending = [table for table in self._tables if rows.get(table) and table != self._commit_table]
+            with self._lock:
+                self._batches[sequence] = {
+                    'key': batch[-1]['_id'],
+                    'count': count,
+                    'pending': set(pending),
+                    'commit_rows': rows.get(self._commit_table) if self._commit_table else None,
+                    'written': {},
+                    'failed': False
+                }
+
+            for table in pending:
+                self._put(self._table_queues[table], (sequence, rows[table]), stage)
+            if not pending:
+                self._tables_written(sequence, stage)
+
+        # The last converter stops the writers (except the ones of the commit table)
+        with self._lock:
+            self._running['convert'] -= 1
+            last = self._running['convert'] == 0
+        if last:
+            for table in self._tables:
+                if table != self._commit_table:
+                    for _ in range(self._writer_counts[table]):
+                        self._table_queues[table].put(_DONE)
+
+    def _writer(self, table: str):
+        """
+        This function writes the rows of a table, combining waiting batches into a single INSERT.
+
+        :param table: The name of the table.
+        """
+        stage = self.stages[f'write:{table}']
+        table_queue = self._table_queues[table]
+        done = False
+
+        try:
+            with self._dwh_engine.connect() as connection:
+                connection.exec_driver_sql("SET SESSION foreign_key_checks = 0")
+
+                while not done:
+                    # Wait for a batch, then take the batches that are already waiting as well
+                    items = [self._get(table_queue, stage)]
+                    rows = len(items[0][1]) if items[0] is not _DONE else 0
+                    while items[-1] is not _DONE and rows < self._settings['flush_rows']:
+                        try:
+                            items.append(table_queue.get_nowait())
+                        except queue.Empty:
+                            break
+                        rows += len(items[-1][1]) if items[-1] is not _DONE else 0
+
+                    if items[-1] is _DONE:
+                        done = True
+                        items.pop()
+                    if items:
+                        self._flush(connection, table, items, rows, stage)
+
+                connection.exec_driver_sql("SET SESSION foreign_key_checks = 1")
+        except Exception as e:
+            print(f"Error: writer of {table} stopped")
+            print(e)
+            self.failed = True
+
+            # Keep consuming the queue, so the other stages are not blocked
+            while not done:
+                item = table_queue.get()
+                if item is _DONE:
+                    done = True
+                else:
+                    self._fail(item[0])
+
+        # The last writer of the other tables stops the writers of the commit table
+        if table != self._commit_table and self._commit_table:
+            with self._lock:
+                self._running['write'] -= 1
+                last = self._running['write'] == 0
+            if last:
+                for _ in range(self._writer_counts[self._commit_table]):
+                    self._table_queues[self._commit_table].put(_DONE)
+
+    def _flush(self, connection, table: str, items: list[tuple], rows: int, stage: StageMetrics):
+        """
+        This function writes the rows of several batches with a single INSERT.
+
+        :param connection: The DWH connection of the writer.
+        :param table: The name of the table.
+        :param items: The (sequence number, rows) of the batches.
+        :param rows: The total number of rows.
+        :param stage: The metrics of the writer stage.
+        """
+        start = time.perf_counter()
+        try:
+            with connection.begin():
+                self._write(connection, table, [row for _, batch_rows in items for row in batch_rows])
+        except Exception as e:
+            print(f"Error: writing {table}")
+            print(e)
+            for sequence, _ in items:
+                self._fail(sequence)
+            return
+        stage.add(items=len(items), rows=rows, busy=time.perf_counter() - start)
+
+        for sequence, batch_rows in items:
+            if table == self._commit_table:
+                self._committed(sequence)
+            else:
+                self._table_written(sequence, table, stage, {row[0] for row in batch_rows})
+
+    def _table_written(self, sequence: int, table: str, stage: StageMetrics, keys: set):
+        """
+        This function marks a table of a batch as written, or deletes its rows again if the batch has failed.
+
+        :param sequence: The sequence number of the batch.
+        :param table: The name of the table.
+        :param stage: The metrics of the calling stage.
+        :param keys: The keys in the first column of the written rows.
+        """
+        with self._lock:
+            batch = self._batches[sequence]
+            failed = batch['failed']
+            if not failed:
+                batch['written'][table] = keys
+                batch['pending'].discard(table)
+            complete = not batch['pending']
+
+        if failed:
+            self._undo({table: keys})
+        elif complete:
+            self._tables_written(sequence, stage)
+
+    def _tables_written(self, sequence: int, stage: StageMetrics):
+        """
+        This function hands the commit rows of a batch to their writers once all other tables are written.
+
+        :param sequence: The sequence number of the batch.
+        :param stage: The metrics of the calling stage, blocked while the commit table queue is full.
+        """
+        with self._lock:
+            batch = self._batches[sequence]
+            commit_rows = batch['commit_rows']
+            if batch['failed']:
+                return
+
+        if commit_rows:
+            self._put(self._table_queues[self._commit_table], (sequence, commit_rows), stage)
+        else:
+            self._committed(sequence)
+
+    def _committed(self, sequence: int):
+        """
+        This function marks a batch as written completely and advances the checkpoint over completed batches.
+
+        :param sequence: The sequence number of the batch.
+        """
+        keys = []
+        with self._lock:
+            self._batches[sequence]['done'] = True
+
+            # Only advance over batches that are complete and in order
+            while self._batches.get(self._next_commit, {}).get('done'):
+                batch = self._batches.pop(self._next_commit)
+                self.documents += batch['count']
+                keys.append(batch['key'])
+                self._next_commit += 1
+
+        if keys and self._on_commit is not None:
+            self._on_commit(keys[-1])
+
+    def _fail(self, sequence: int, key=None):
+        """
+        This function marks a batch as failed, the checkpoint no longer advances past it.
+
+        :param sequence: The sequence number of the batch.
+        :param key: The last key of the batch, if it has not been registered yet.
+        """
+        with self._lock:
+            self.failed = True
+            batch = self._batches.setdefault(sequence, {'key': key, 'count': 0, 'pending': set(), 'commit_rows': None})
+            batch['failed'] = True
+            written = batch.get('written') or {}
+            batch['written'] = {}
+
+        # Tables of the batch that are still being written are deleted once they are done (see _table_written)
+        self._undo(written)
+
+    def _undo(self, written: dict):
+        """
+        This function deletes the rows of a failed batch from the tables they have been written to.
+        Errors are reported instead of raised, the batch has failed already.
+
+        :param written: The keys in the first column of the written rows per table.
+        """
+        if not written or self._delete is None:
+            return
+
+        try:
+            with self._dwh_engine.begin() as connection:
+                connection.exec_driver_sql("SET SESSION foreign_key_checks = 0")
+                try:
+                    for table, keys in written.items():
+                        self._delete(connection, table, sorted(keys))
+                finally:
+                    connection.exec_driver_sql("SET SESSION foreign_key_checks = 1")
+        except Exception as e:
+            print(f"Error: removing the rows of a failed batch from {', '.join(written)}, delete them before a rerun")
+            print(e)
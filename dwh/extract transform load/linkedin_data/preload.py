@@ -0,0 +1,134 @@
+"""
+This script pre-loads the profile dimensions before the facts are imported (first phase of a two-phase import).
+
+The distinct skills, interests, languages, groups and locations are collected with $unwind/$group
+aggregations over all profile collections, so MongoDB does the de-duplication instead of the importer
+discovering the members one document at a time. The missing members are inserted in bulk and the
+natural key -> id map of all members is written into a map file.
+
+The profile import (import_script_profiles.py, dimension_map_path) then loads the map file into the
+dimension cache of every worker and resolves all dimension members in memory, without a dimension query.
+"""
+import os
+import re
+import time
+from collections import defaultdict
+from dotenv import load_dotenv, find_dotenv
+from pymongo import MongoClient
+from sqlalchemy import create_engine  # Requires pymysql
+from dwh.linkedin_data.profiles import bulk
+from dwh.linkedin_data.profiles import convert as conv
+from dwh.linkedin_data.keys import KeyAllocator
+from dwh.linkedin_data.dimensions import DimensionCache, normalise
+
+# Only documents the import converts (profiles with experiences) reference dimension members
+_IMPORTED = {'$match': {'experiences.0': {'$exists': True}}}
+
+# Aggregations per dimension table, as (table, pipeline, function building the natural key from a group _id)
+AGGREGATIONS = [
+    (
+        'DIM_PRF_Location',
+        [_IMPORTED, {'$group': {'_id': {
+            'country': '$country', 'country_full_name': '$country_full_name', 'state': '$state', 'city': '$city'
+        }}}],
+        lambda group: tuple(conv.location(group))
+    ),
+    (
+        'DIM_PRF_Language',
+        [_IMPORTED, {'$unwind': '$languages'}, {'$group': {'_id': '$languages'}}],
+        lambda language: (language,)
+    ),
+    (
+        'DIM_PRF_Trait',
+        [_IMPORTED, {'$unwind': '$skills'}, {'$group': {'_id': '$skills'}}],
+        lambda skill: ('skill', skill)
+    ),
+    (
+        'DIM_PRF_Trait',
+        [_IMPORTED, {'$unwind': '$interests'}, {'$group': {'_id': '$interests'}}],
+        lambda interest: ('interest', interest)
+    ),
+    (
+        'DIM_PRF_Group',
+        [_IMPORTED, {'$unwind': '$groups'}, {'$match': {'groups.name': {'$nin': [None, '']}}}, {'$group': {'_id': '$groups.name'}}],
+        lambda name: (name,)
+    )
+]
+
+# Number of natural keys resolved (looked up and inserted) per transaction
+RESOLVE_CHUNK_SIZE = 10000
+
+
+def collect_keys(mongodb, collection_names: list[str]) -> dict[str, dict[tuple, tuple]]:
+    """
+    This function collects the distinct natural keys of the profile dimensions from the collections.
+
+    :param mongodb: The MongoDB database holding the collections.
+    :param collection_names: The names of the profile collections.
+    :return: The natural keys per dimension table, mapped by their normalised form (distinct the way the DWH compares them).
+    """
+    keys = defaultdict(dict)
+    for collection_str in collection_names:
+        for table, pipeline, natural_key in AGGREGATIONS:
+            start = time.perf_counter()
+            groups = 0
+            for group in mongodb[collection_str].aggregate(pipeline, allowDiskUse=True):
+                groups += 1
+                key = natural_key(group['_id'])
+                if key is not None:
+                    keys[table].setdefault(normalise(key), key)
+            print(f"{collection_str}: {groups} groups for {table} in {time.perf_counter() - start:.1f}s")
+
+    return keys
+
+
+def preload(dwh_engine, keys: dict[str, dict[tuple, tuple]], chunk_size: int = RESOLVE_CHUNK_SIZE) -> DimensionCache:
+    """
+    This function inserts the missing dimension members in bulk and returns a cache holding all of them.
+
+    :param dwh_engine: The DWH engine to use.
+    :param keys: The natural keys per dimension table, as returned by collect_keys.
+    :param chunk_size: Number of natural keys resolved per transaction.
+    :return: An unbounded dimension cache holding the members of the dimensions.
+    """
+    dimension_cache = DimensionCache(dwh_engine, KeyAllocator(dwh_engine), max_sizes={})
+
+    # Load the existing members first, so only the new ones are looked up and inserted
+    dimension_cache.warm(bulk.DIMENSION_TABLES)
+
+    for table, table_keys in keys.items():
+        unique_keys = list(table_keys.values())
+        for start in range(0, len(unique_keys), chunk_size):
+            dimension_cache.resolve_many(table, unique_keys[start:start + chunk_size])
+
+    return dimension_cache
+
+
+# Load environment variables
+load_dotenv(find_dotenv())
+
+# Connection strings
+mysql_url = os.getenv("DATABASE_DWH")
+mongo_url = os.getenv("MongoClientURI")
+dwh_schema_name = 'DWH'
+
+# Collections aggregated by the pre-pass
+collection_pattern = r'^KGL_LIN_PRF_'
+
+# Path of the natural key -> id map file, used as dimension_map_path of import_script_profiles.py
+dimension_map_path = 'dimension_map.pickle'
+
+if __name__ == "__main__":
+    dwh = create_engine(f'{mysql_url}/{dwh_schema_name}?charset=utf8mb4')
+
+    # Phase one: collect the distinct natural keys from all profile collections
+    with MongoClient(mongo_url) as mongo_client:
+        mongodb = mongo_client["raw_data"]
+        names = sorted(name for name in mongodb.list_collection_names() if re.match(collection_pattern, name))
+        print(f"Aggregating {len(names)} collections: {', '.join(names)}")
+        natural_keys = collect_keys(mongodb, names)
+
+    # Insert the missing members and write the map file for the fact import
+    cache = preload(dwh, natural_keys)
+    cache.save(dimension_map_path, bulk.DIMENSION_TABLES)
+    print(f"Dimension map written to {dimension_map_path}\n{cache.report()}")
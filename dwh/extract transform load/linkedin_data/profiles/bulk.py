@@ -0,0 +1,372 @@
+"""
+This module holds the functions used to import whole batches of profiles into the DWH at once.
+
+Instead of inserting every attribute with its own statement, a batch of documents is converted
+into rows per table first. Every table is then written with a single multi-row INSERT and all
+keys are assigned on the client side by the key allocator, while the dimension members are
+resolved through the shared dimension cache.
+"""
+from collections import defaultdict
+# Import conversion functions
+from dwh.linkedin_data.profiles import convert as conv
+from dwh.linkedin_data.profiles import related
+from dwh.linkedin_data import metrics
+from dwh.linkedin_data import texts
+
+# Columns written per table, the rows of a batch are tuples in this order
+# (the converters put the long texts at the position of their length column, see texts.TEXTS).
+# Every table is partitioned by idOrigin, so every row carries the origin of its person (see partitions.py)
+COLUMNS = {
+    'FACT_PRF_Person': (
+        'id', 'idLocation', 'firstName', 'lastName', 'fullname', 'occupation', 'headline', 'summaryLength',
+        'connections', 'inferredSalaryMin', 'inferredSalaryMax', 'gender', 'industry', 'profilePicture',
+        'backgroundPicture', 'mongoCollectionId', 'idOrigin'
+    ),
+    'FACT_PRF_Recommendation': ('idPerson', 'recommendationText', 'idOrigin'),
+    'FACT_PRF_Qualification': (
+        'id', 'idStartDate', 'idEndDate', 'type', 'name', 'institution', 'descriptionLength', 'idOrigin', 'idCompany'
+    ),
+    'FACT_PRF_Accomplishment': ('id', 'type', 'name', 'institution', 'date', 'descriptionLength', 'idOrigin'),
+    'TXT_PRF_Summary': ('idPerson', 'text', 'idOrigin'),
+    'TXT_PRF_Qualification': ('idQualification', 'text', 'idOrigin'),
+    'TXT_PRF_Accomplishment': ('idAccomplishment', 'text', 'idOrigin'),
+    'REL_PRF_Person_Language': ('idPerson', 'idLanguage', 'idOrigin'),
+    'REL_PRF_Person_Trait': ('idPerson', 'idTrait', 'idOrigin'),
+    'REL_PRF_Person_Group': ('idPerson', 'idGroup', 'idOrigin'),
+    'REL_PRF_Person_Qualification': ('idPerson', 'idQualification', 'idOrigin'),
+    'REL_PRF_Person_Accomplishment': ('idPerson', 'idAccomplishment', 'idOrigin'),
+    'REL_PRF_Person_Related': ('idPerson', 'idRelated', 'type', 'idOrigin')
+}
+
+# Fact and relation tables in the order they have to be written (referenced tables first)
+WRITE_ORDER = (
+    'FACT_PRF_Person',
+    'FACT_PRF_Recommendation',
+    'FACT_PRF_Qualification',
+    'FACT_PRF_Accomplishment',
+    'TXT_PRF_Summary',
+    'TXT_PRF_Qualification',
+    'TXT_PRF_Accomplishment',
+    'REL_PRF_Person_Language',
+    'REL_PRF_Person_Trait',
+    'REL_PRF_Person_Group',
+    'REL_PRF_Person_Qualification',
+    'REL_PRF_Person_Accomplishment',
+    'REL_PRF_Person_Related'
+)
+
+# Dimension tables resolved through the dimension cache
+DIMENSION_TABLES = ('DIM_PRF_Location', 'DIM_PRF_Language', 'DIM_PRF_Trait', 'DIM_PRF_Group')
+
+# Qualification attributes and the functions used to convert them
+QUALIFICATIONS = {
+    'experiences': conv.experience,
+    'education': conv.education,
+    'volunteer_work': conv.volunteer_work,
+    'certifications': conv.certification,
+    'accomplishment_projects': conv.accomplishment_projects
+}
+
+
+def dimension_keys(document: dict) -> dict[str, list[tuple]]:
+    """
+    This function collects the natural keys of all dimension members referenced by a document.
+
+    DWH tables: DIM_PRF_Location, DIM_PRF_Language, DIM_PRF_Trait, DIM_PRF_Group
+
+    :param document: The document to convert.
+    :return: A dictionary mapping the dimension tables to the natural keys.
+    """
+    keys = defaultdict(list)
+    keys['DIM_PRF_Location'].append(conv.location(document))
+
+    for lang in document.get('languages') or []:
+        keys['DIM_PRF_Language'].append((lang,))
+    for skill in document.get('skills') or []:
+        keys['DIM_PRF_Trait'].append(('skill', skill))
+    for interest in document.get('interests') or []:
+        keys['DIM_PRF_Trait'].append(('interest', interest))
+    for group in document.get('groups') or []:
+        if group.get('name'):
+            keys['DIM_PRF_Group'].append((group.get('name'),))
+
+    return keys
+
+
+def accomplishments(document: dict):
+    """
+    This function converts the accomplishments, activities and articles of a document.
+
+    DWH table: FACT_PRF_Accomplishment
+
+    :param document: The document to convert.
+    :return: A generator of (type, name, institution, date, description) tuples.
+    """
+    for act in document.get('activities') or []:
+        yield 'activity', act.get('title'), None, None, act.get('activity_status')
+    for art in document.get('articles') or []:
+        yield 'article', art.get('title'), art.get('author'), conv.convert_date(art.get('published_date')), art.get('link')
+    for org in document.get('accomplishment_organisations') or []:
+        yield 'organisation', org.get('title'), org.get('org_name'), conv.convert_date(org.get('starts_at')), org.get('description')
+    for pub in document.get('accomplishment_publications') or []:
+        yield 'publication', pub.get('name'), pub.get('publisher'), conv.convert_date(pub.get('published_on')), pub.get('description')
+    for hon in document.get('accomplishment_honors_awards') or []:
+        yield 'honor', hon.get('title'), hon.get('issuer'), conv.convert_date(hon.get('issued_on')), hon.get('description')
+    for pat in document.get('accomplishment_patents') or []:
+        yield 'patent', pat.get('title'), pat.get('issuer'), conv.convert_date(pat.get('issued_on')), conv.patent_description(pat)
+    for tst in document.get('accomplishment_test_scores') or []:
+        yield 'test', tst.get('name'), tst.get('score'), conv.convert_date(tst.get('date_on')), tst.get('description')
+    for crs in document.get('accomplishment_courses') or []:
+        yield 'course', crs.get('name'), crs.get('number'), None, None
+
+
+def convert_document(
+        document: dict,
+        person_id: int,
+        origin_id: int,
+        dimension_ids: dict,
+        key_allocator,
+        rows: dict,
+        company_index=None
+       ):
+    """
+    This function converts a document into rows and appends them to the rows of the batch.
+
+    :param document: The document to convert.
+    :param person_id: The ID reserved for the person.
+    :param origin_id: The ID of the DIM_Origin table from the dwh.
+    :param dimension_ids: The resolved dimension ids per table and natural key.
+    :param key_allocator: The key allocator used to assign the fact keys.
+    :param rows: The rows of the batch per table.
+    :param company_index: The company index used to link the experiences to their companies, None skips them.
+    """
+    # Person and its location
+    location_id = dimension_ids['DIM_PRF_Location'][conv.location(document)]
+    rows['FACT_PRF_Person'].append((person_id, *conv.person(document, location_id, origin_id)))
+
+    # Recommendations
+    for rec in document.get('recommendations') or []:
+        rows['FACT_PRF_Recommendation'].append((person_id, rec, origin_id))
+
+    # Languages, skills, interests and groups
+    for lang in document.get('languages') or []:
+        rows['REL_PRF_Person_Language'].append((person_id, dimension_ids['DIM_PRF_Language'][(lang,)], origin_id))
+    for skill in document.get('skills') or []:
+        rows['REL_PRF_Person_Trait'].append((person_id, dimension_ids['DIM_PRF_Trait'][('skill', skill)], origin_id))
+    for interest in document.get('interests') or []:
+        rows['REL_PRF_Person_Trait'].append((person_id, dimension_ids['DIM_PRF_Trait'][('interest', interest)], origin_id))
+    for group in document.get('groups') or []:
+        if group.get('name'):
+            rows['REL_PRF_Person_Group'].append((person_id, dimension_ids['DIM_PRF_Group'][(group.get('name'),)], origin_id))
+
+    # Experiences, education, volunteer work, certifications and projects, their dates are keys of DIM_Date already
+    # and the experiences are linked to their companies
+    qualifications = [(attribute, q) for attribute in QUALIFICATIONS for q in document.get(attribute) or []]
+    qualification_ids = key_allocator.reserve('FACT_PRF_Qualification', len(qualifications))
+    for qualification_id, (attribute, qualification) in zip(qualification_ids, qualifications):
+        qualification_row = QUALIFICATIONS[attribute](qualification)
+        company_id = company_index.experience(qualification) \
+            if company_index is not None and attribute == 'experiences' else None
+        rows['FACT_PRF_Qualification'].append((qualification_id, *qualification_row, origin_id, company_id))
+        rows['REL_PRF_Person_Qualification'].append((person_id, qualification_id, origin_id))
+
+    # Activities, articles and accomplishments
+    accomplishment_rows = list(accomplishments(document))
+    accomplishment_ids = key_allocator.reserve('FACT_PRF_Accomplishment', len(accomplishment_rows))
+    for accomplishment_id, accomplishment_row in zip(accomplishment_ids, accomplishment_rows):
+        rows['FACT_PRF_Accomplishment'].append((accomplishment_id, *accomplishment_row, origin_id))
+        rows['REL_PRF_Person_Accomplishment'].append((person_id, accomplishment_id, origin_id))
+
+
+def write_rows(connection, table: str, rows: list[tuple], target_tables: dict | None = None):
+    """
+    This function writes rows into a table with a single multi-row INSERT.
+
+    :param connection: The DWH connection to use.
+    :param table: The name of the table.
+    :param rows: The rows to insert, in the column order of the table.
+    :param target_tables: The tables written instead, mapped by table name (e.g. the exchange tables of a reload).
+    """
+    if rows:
+        columns = COLUMNS[table]
+        target = (target_tables or {}).get(table, table)
+        query = f"INSERT INTO {target} ({', '.join(columns)}) VALUES ({', '.join(['%s'] * len(columns))})"
+        with metrics.timer(f'write.{table}'):
+            connection.exec_driver_sql(query, rows)
+
+
+def delete_rows(connection, table: str, keys: list, target_tables: dict | None = None, batch_size: int = 10000):
+    """
+    This function deletes rows from a table again by the key in their first column (see COLUMNS).
+    The keys are assigned by the key allocator, so only the rows of the given persons, qualifications or
+    accomplishments are deleted, e.g. the rows of a batch that could not be written completely.
+
+    :param connection: The DWH connection to use.
+    :param table: The name of the table.
+    :param keys: The keys of the rows, values of the first column of the table.
+    :param target_tables: The tables written instead, mapped by table name (see write_rows).
+    :param batch_size: Number of keys deleted per statement.
+    """
+    column = COLUMNS[table][0]
+    target = (target_tables or {}).get(table, table)
+    for start in range(0, len(keys), batch_size):
+        batch = keys[start:start + batch_size]
+        query = f"DELETE FROM {target} WHERE {column} IN ({', '.join(['%s'] * len(batch))})"
+        connection.exec_driver_sql(query, tuple(batch))
+
+
+def loaded_documents(dwh_engine, document_ids: list, table: str = 'FACT_PRF_Person') -> set[str]:
+    """
+    This function returns which of the given documents have already been imported.
+
+    DWH table: FACT_PRF_Person
+
+    :param dwh_engine: The DWH engine to use.
+    :param document_ids: The MongoDB _ids of the documents.
+    :param table: The person table to look in (e.g. the exchange table of a reload).
+    :return: The _ids (as strings) that already have a person in the DWH.
+    """
+    if not document_ids:
+        return set()
+
+    query = f"SELECT mongoCollectionId FROM {table} WHERE mongoCollectionId IN ({', '.join(['%s'] * len(document_ids))})"
+    with dwh_engine.connect() as connection:
+        return {row[0] for row in connection.exec_driver_sql(query, tuple(str(doc_id) for doc_id in document_ids))}
+
+
+def convert_documents(
+        documents: list[dict],
+        origin_id: int,
+        dwh_engine,
+        key_allocator,
+        dimension_cache,
+        related_cache=None,
+        target_tables: dict | None = None,
+        company_index=None
+       ) -> tuple[int, dict]:
+    """
+    This function converts a batch of documents into rows per table with all keys assigned.
+    Documents without experiences are skipped, like in the row by row import, and so are documents
+    that have already been imported, which makes re-running a batch safe.
+
+    :param documents: The documents to convert.
+    :param origin_id: The ID of the DIM_Origin table from the dwh.
+    :param dwh_engine: The DWH engine to use.
+    :param key_allocator: The key allocator used to assign the keys.
+    :param dimension_cache: The dimension cache used to resolve the dimension members.
+    :param related_cache: The related cache used to resolve the related profiles, None skips them.
+    :param target_tables: The tables the rows are written to instead, mapped by table name (see write_rows).
+    :param company_index: The company index used to link the experiences to their companies, None skips them.
+    :return: The number of converted persons and their rows per table.
+    """
+    # Skip documents without experiences and documents that have already been imported
+    documents = [doc for doc in documents if doc.get('experiences')]
+    person_table = (target_tables or {}).get('FACT_PRF_Person', 'FACT_PRF_Person')
+    loaded = loaded_documents(dwh_engine, [doc['_id'] for doc in documents], person_table)
+    documents = [doc for doc in documents if str(doc['_id']) not in loaded]
+
+    # Collect the natural keys of all dimension members used by the batch
+    keys = defaultdict(list)
+    for doc in documents:
+        for table, table_keys in dimension_keys(doc).items():
+            keys[table].extend(table_keys)
+
+    # Resolve the dimensions once for the whole batch
+    with metrics.timer('dimensions'):
+        dimension_ids = {table: dimension_cache.resolve_many(table, table_keys) for table, table_keys in keys.items()}
+
+    # Convert the documents into rows
+    with metrics.timer('convert'):
+        rows = defaultdict(list)
+        person_ids = key_allocator.reserve('FACT_PRF_Person', len(documents))
+        for person_id, doc in zip(person_ids, documents):
+            convert_document(doc, person_id, origin_id, dimension_ids, key_allocator, rows, company_index)
+
+        # Move the long texts out of the fact rows into their text tables
+        for table in ('FACT_PRF_Person', 'FACT_PRF_Qualification', 'FACT_PRF_Accomplishment'):
+            rows[table], rows[texts.TEXTS[table][2]] = texts.split_rows(table, COLUMNS[table], rows[table], origin_id)
+
+    # Resolve the related profiles of the whole batch at once, the persons are new so every edge is too
+    if related_cache is not None:
+        with metrics.timer('related'):
+            rows['REL_PRF_Person_Related'] = related.edge_rows(zip(person_ids, documents), related_cache, origin_id)
+
+    return len(documents), rows
+
+
+def insert_documents(
+        documents: list[dict],
+        origin_id: int,
+        dwh_engine,
+        key_allocator,
+        dimension_cache,
+        checkpoint=None,
+        related_cache=None,
+        target_tables: dict | None = None,
+        company_index=None
+       ) -> int:
+    """
+    This function converts a batch of documents and inserts them into the DWH within one transaction.
+
+    :param documents: The documents to insert.
+    :param origin_id: The ID of the DIM_Origin table from the dwh.
+    :param dwh_engine: The DWH engine to use.
+    :param key_allocator: The key allocator used to assign the keys.
+    :param dimension_cache: The dimension cache used to resolve the dimension members.
+    :param checkpoint: Function called with the connection before the batch is committed (optional).
+    :param related_cache: The related cache used to resolve the related profiles, None skips them.
+    :param target_tables: The tables written instead, mapped by table name (see write_rows).
+    :param company_index: The company index used to link the experiences to their companies, None skips them.
+    :return: The number of persons inserted.
+    """
+    count, rows = convert_documents(
+        documents, origin_id, dwh_engine, key_allocator, dimension_cache, related_cache, target_tables, company_index
+    )
+
+    with dwh_engine.begin() as connection:
+        # Write every table with a single statement
+        for table in WRITE_ORDER:
+            write_rows(connection, table, rows[table], target_tables)
+
+        # Record the progress within the same transaction
+        if checkpoint is not None:
+            checkpoint(connection)
+
+    return count
+
+
+def stage_documents(
+        documents: list[dict],
+        origin_id: int,
+        dwh_engine,
+        key_allocator,
+        dimension_cache,
+        staging_writer,
+        related_cache=None,
+        target_tables: dict | None = None,
+        company_index=None
+       ) -> int:
+    """
+    This function converts a batch of documents and appends the rows to the staging files.
+    The rows reach the DWH once the files are loaded with staging.load_files.
+
+    :param documents: The documents to stage.
+    :param origin_id: The ID of the DIM_Origin table from the dwh.
+    :param dwh_engine: The DWH engine to use.
+    :param key_allocator: The key allocator used to assign the keys.
+    :param dimension_cache: The dimension cache used to resolve the dimension members.
+    :param staging_writer: The staging writer the rows are written to.
+    :param related_cache: The related cache used to resolve the related profiles, None skips them.
+    :param target_tables: The tables the staged files are loaded into instead, mapped by table name
+                          (passed to staging.load_files as well).
+    :param company_index: The company index used to link the experiences to their companies, None skips them.
+    :return: The number of persons staged.
+    """
+    count, rows = convert_documents(
+        documents, origin_id, dwh_engine, key_allocator, dimension_cache, related_cache, target_tables, company_index
+    )
+
+    for table in WRITE_ORDER:
+        staging_writer.write(table, rows[table])
+
+    return count
@@ -1,12 +1,75 @@
 """
 This module contains functions to convert document data to DWH tables.
 
+Every converter returns a compact record (a named tuple without per-instance dict) whose fields
+match the column order of the target table. The *_batch variants convert a list of documents
+into column arrays in one pass.
 """
-import pandas as pd
 import datetime
+from typing import NamedTuple
 
+# Years covered by the DIM_Date table (date_dimension.py), dates outside of them get no key
+DATE_RANGE = (1900, 2099)
 
-def person(document: dict, dimension_key_location: int, dimension_key_origin: int) -> pd.DataFrame:
+
+class Person(NamedTuple):
+    """
+    A row of the FACT_PRF_Person table (without the id).
+    """
+    idLocation: int | None
+    firstName: str | None
+    lastName: str | None
+    fullname: str | None
+    occupation: str | None
+    headline: str | None
+    summary: str | None
+    connections: int | None
+    inferredSalaryMin: int | None
+    inferredSalaryMax: int | None
+    gender: int | None
+    industry: str | None
+    profilePicture: int
+    backgroundPicture: int
+    mongoCollectionId: object
+    idOrigin: int
+
+
+class Location(NamedTuple):
+    """
+    A row of the DIM_PRF_Location table (without the id), which is also its natural key.
+    """
+    countryLetters: str | None
+    countryName: str | None
+    state: str | None
+    city: str | None
+
+
+class Qualification(NamedTuple):
+    """
+    A row of the FACT_PRF_Qualification table (without the id).
+    """
+    idStartDate: int | None
+    idEndDate: int | None
+    type: str
+    name: str | None
+    institution: str | None
+    description: str | None
+
+
+def columns(records: list[tuple], fields: tuple) -> dict[str, list]:
+    """
+    This function turns records into column arrays.
+
+    :param records: The records to transpose.
+    :param fields: The names of the columns.
+    :return: A dictionary mapping the column names to lists of values.
+    """
+    if not records:
+        return {field: [] for field in fields}
+    return {field: list(values) for field, values in zip(fields, zip(*records))}
+
+
+def person(document: dict, dimension_key_location: int, dimension_key_origin: int) -> Person:
     """
     This function converts a profile to the FACT_PRF_Person table.
 
@@ -25,47 +88,41 @@ def person(document: dict, dimension_key_location: int, dimension_key_origin: in
         except Exception as e:
             print(f"Unknown sex - Error: {e}")
 
-        # Create and fill the table
-    person_dict = {
-        'idLocation': dimension_key_location,
-        'firstName': document.get('first_name'),
-        'lastName': document.get('last_name'),
-        'fullname': document.get('full_name'),
-        'occupation': document.get('occupation'),
-        'headline': document.get('headline'),
-        'summary': document.get('summary'),
-        'connections': document.get('connections'),
-        'inferredSalaryMin': document.get('inferred_salary').get('min') if document.get('inferred_salary') else None,
-        'inferredSalaryMax': document.get('inferred_salary').get('max') if document.get('inferred_salary') else None,
-        'gender': person_gender,
-        'industry': document.get('industry'),
-        'profilePicture': 1 if document.get('profile_pic_url') else 0,
-        'backgroundPicture': 1 if document.get('background_cover_image_url') else 0,
-        'mongoCollectionId': document.get('_id'),
-        'idOrigin': dimension_key_origin
-    }
-
-    # Create and return DataFrame
-    return pd.DataFrame([person_dict])
-
-
-def location(document: dict) -> pd.DataFrame:
-    """
-    This function converts a location to the FACT_LIN_Location table.
+    # Create and return the record
+    inferred_salary = document.get('inferred_salary')
+    return Person(
+        idLocation=dimension_key_location,
+        firstName=document.get('first_name'),
+        lastName=document.get('last_name'),
+        fullname=document.get('full_name'),
+        occupation=document.get('occupation'),
+        headline=document.get('headline'),
+        summary=document.get('summary'),
+        connections=document.get('connections'),
+        inferredSalaryMin=inferred_salary.get('min') if inferred_salary else None,
+        inferredSalaryMax=inferred_salary.get('max') if inferred_salary else None,
+        gender=person_gender,
+        industry=document.get('industry'),
+        profilePicture=1 if document.get('profile_pic_url') else 0,
+        backgroundPicture=1 if document.get('background_cover_image_url') else 0,
+        mongoCollectionId=document.get('_id'),
+        idOrigin=dimension_key_origin
+    )
+
+
+def location(document: dict) -> Location:
+    """
+    This function converts a location to the DIM_PRF_Location table.
 
     :param document: The document to convert.
     """
-
-    # Create and fill the table
-    location_dict = {
-        'countryLetters': document.get('country'),
-        'countryName': document.get('country_full_name'),
-        'state': document.get('state'),
-        'city': document.get('city')
-    }
-
-    # Create and return DataFrame
-    return pd.DataFrame([location_dict])
+    # Create and return the record
+    return Location(
+        countryLetters=document.get('country'),
+        countryName=document.get('country_full_name'),
+        state=document.get('state'),
+        city=document.get('city')
+    )
 
 
 def convert_date(date_object: dict) -> datetime.date | None:
@@ -82,33 +139,60 @@ def convert_date(date_object: dict) -> datetime.date | None:
         return None
 
 
-def experience(experience_object: dict, key_duration: int):
+def date_key(date_object: dict) -> int | None:
+    """
+    This function converts a date dictionary from MongoDB to the yyyymmdd key of the DIM_Date table.
+    Partial dates keep their precision with the missing parts set to 0 (yyyy0000 for a year, yyyymm00 for
+    a month), so the key of a year or month sorts before the keys of its days.
+
+    Impossible parts of dirty source dates are dropped instead of raised: an invalid day (e.g. 2020-02-30)
+    falls back to the month key, an invalid month to the year key.
+
+    :param date_object: The date dictionary to convert.
+    :return: The key or None if the date has no valid year or is outside of DATE_RANGE.
+    """
+    if not date_object or not date_object.get('year'):
+        return None
+
+    year, month, day = date_object['year'], date_object.get('month'), date_object.get('day')
+    if not isinstance(year, int) or not DATE_RANGE[0] <= year <= DATE_RANGE[1]:
+        return None
+
+    # Validate the known parts, a day without a month is ignored
+    if not isinstance(month, int) or not 1 <= month <= 12:
+        return year * 10000
+    if not isinstance(day, int) or not day:
+        return year * 10000 + month * 100
+    try:
+        datetime.date(year=year, month=month, day=day)
+    except ValueError:
+        return year * 10000 + month * 100
+    return year * 10000 + month * 100 + day
+
+
+def experience(experience_object: dict) -> Qualification:
     """
     This function converts qualifications to the FACT_PRF_Qualification table.
 
     :param experience_object: The experience object to convert.
-    :param key_duration: The ID of the duration entry in the DWH.
     """
 
-    # Create and fill the table
-    experience_dict = {
-        'idDuration': key_duration,
-        'type': 'experience',
-        'name': experience_object.get('title'),
-        'institution': experience_object.get('company'),
-        'description': experience_object.get('description')
-    }
-
-    # Create and return DataFrame
-    return pd.DataFrame([experience_dict])
+    # Create and return the record
+    return Qualification(
+        idStartDate=date_key(experience_object.get('starts_at')),
+        idEndDate=date_key(experience_object.get('ends_at')),
+        type='experience',
+        name=experience_object.get('title'),
+        institution=experience_object.get('company'),
+        description=experience_object.get('description')
+    )
 
 
-def education(education_object: dict, key_duration: int):
+def education(education_object: dict) -> Qualification:
     """
     This function converts qualifications to the FACT_PRF_Qualification table.
 
     :param education_object: The education object to convert.
-    :param key_duration: The ID of the duration entry in the DWH.
     """
 
     degree_name = education_object.get('degree_name', None)
@@ -125,25 +209,22 @@ def education(education_object: dict, key_duration: int):
         case _:
             name = f"{degree_name} in {field_of_study}"
 
-    # Create and fill the table
-    experience_dict = {
-        'idDuration': key_duration,
-        'type': 'education',
-        'name': name,
-        'institution': education_object.get('school'),
-        'description': education_object.get('description')
-    }
+    # Create and return the record
+    return Qualification(
+        idStartDate=date_key(education_object.get('starts_at')),
+        idEndDate=date_key(education_object.get('ends_at')),
+        type='education',
+        name=name,
+        institution=education_object.get('school'),
+        description=education_object.get('description')
+    )
 
-    # Create and return DataFrame
-    return pd.DataFrame([experience_dict])
 
-
-def volunteer_work(volunteer_object: dict, key_duration: int):
+def volunteer_work(volunteer_object: dict) -> Qualification:
     """
     This function converts qualifications to the FACT_PRF_Qualification table.
 
     :param volunteer_object: The volunteer object to convert.
-    :param key_duration: The ID of the duration entry in the DWH.
     """
 
     # Get the cause and description
@@ -161,25 +242,22 @@ def volunteer_work(volunteer_object: dict, key_duration: int):
         case _:
             comb_description = f"Cause: {cause} | Description:{description}"
 
-    # Create and fill the table
-    experience_dict = {
-        'idDuration': key_duration,
-        'type': 'volunteer',
-        'name': volunteer_object.get('title'),
-        'institution': volunteer_object.get('company'),
-        'description': comb_description
-    }
-
-    # Create and return DataFrame
-    return pd.DataFrame([experience_dict])
+    # Create and return the record
+    return Qualification(
+        idStartDate=date_key(volunteer_object.get('starts_at')),
+        idEndDate=date_key(volunteer_object.get('ends_at')),
+        type='volunteer',
+        name=volunteer_object.get('title'),
+        institution=volunteer_object.get('company'),
+        description=comb_description
+    )
 
 
-def certification(certification_object: dict, key_duration: int):
+def certification(certification_object: dict) -> Qualification:
     """
     This function converts qualifications to the FACT_PRF_Qualification table.
 
     :param certification_object: The certification object to convert.
-    :param key_duration: The ID of the duration entry in the DWH.
     """
 
     # Get the license number and display source
@@ -197,35 +275,153 @@ def certification(certification_object: dict, key_duration: int):
         case _:
             comb_description = f"Cause: {license_number} | Description:{display_source}"
 
-    # Create and fill the table
-    experience_dict = {
-        'idDuration': key_duration,
-        'type': 'certification',
-        'name': certification_object.get('name'),
-        'institution': certification_object.get('authority'),
-        'description': comb_description
-    }
+    # Create and return the record
+    return Qualification(
+        idStartDate=date_key(certification_object.get('starts_at')),
+        idEndDate=date_key(certification_object.get('ends_at')),
+        type='certification',
+        name=certification_object.get('name'),
+        institution=certification_object.get('authority'),
+        description=comb_description
+    )
+
+
+def patent_description(patent_object: dict) -> str | None:
+    """
+    This function combines the numbers and the description of a patent into a single description.
+
+    :param patent_object: The patent object to convert.
+    """
+    # Get the variables
+    application_number = patent_object.get('application_number', None)
+    patent_number = patent_object.get('patent_number', None)
+    patent_description = patent_object.get('description', None)
 
-    # Create and return DataFrame
-    return pd.DataFrame([experience_dict])
+    # Use match case to determine the description
+    match (application_number, patent_number, patent_description):
+        case (None, None, None):
+            # If all are None, set the combined description to None
+            return None
+        case (None, _, None):
+            # If only patent_number is available, use it as the description
+            return patent_number
+        case (None, _, _):
+            # If patent_number and description are available, combine them
+            return f"{patent_number} | {patent_description}"
+        case (_, None, None):
+            # If only application_number is available, use it as the description
+            return application_number
+        case (_, None, _):
+            # If application_number and description are available, combine them
+            return f"{application_number} | {patent_description}"
+        case (_, _, None):
+            # If application_number and patent_number are available, combine them
+            return f"{application_number} | {patent_number}"
+        case _:
+            # If all are available, combine all three
+            return f"{application_number} | {patent_number} | {patent_description}"
 
 
-def accomplishment_projects(accomplishment_object: dict, key_duration: int):
+def accomplishment_projects(accomplishment_object: dict) -> Qualification:
     """
     This function converts qualifications to the FACT_PRF_Qualification table.
 
     :param accomplishment_object: The accomplishment object to convert.
-    :param key_duration: The ID of the duration entry in the DWH.
     """
 
-    # Create and fill the table
-    experience_dict = {
-        'idDuration': key_duration,
-        'type': 'project',
-        'name': accomplishment_object.get('title'),
-        'institution': None,
-        'description': accomplishment_object.get('description')
-    }
+    # Create and return the record
+    return Qualification(
+        idStartDate=date_key(accomplishment_object.get('starts_at')),
+        idEndDate=date_key(accomplishment_object.get('ends_at')),
+        type='project',
+        name=accomplishment_object.get('title'),
+        institution=None,
+        description=accomplishment_object.get('description')
+    )
+
+
+def persons_batch(documents: list[dict], location_ids: dict, dimension_key_origin: int) -> dict[str, list]:
+    """
+    This function converts a list of profiles to column arrays of the FACT_PRF_Person table.
+
+    :param documents: The documents to convert.
+    :param location_ids: The IDs of the location dimension, mapped by Location record.
+    :param dimension_key_origin: The ID of the origin in the DWH.
+    """
+    return columns(
+        [person(doc, location_ids.get(location(doc)), dimension_key_origin) for doc in documents],
+        Person._fields
+    )
+
+
+def locations_batch(documents: list[dict]) -> dict[str, list]:
+    """
+    This function converts the locations of a list of profiles to column arrays of the DIM_PRF_Location table.
+
+    :param documents: The documents to convert.
+    """
+    return columns([location(doc) for doc in documents], Location._fields)
+
+
+def _qualifications_batch(documents: list[dict], attribute: str, convert) -> dict[str, list]:
+    """
+    This function converts a qualification attribute of a list of profiles to column arrays.
+    The additional 'document' column holds the position of the document each row belongs to.
+
+    :param documents: The documents to convert.
+    :param attribute: The attribute holding the qualifications.
+    :param convert: The function converting a single qualification.
+    """
+    positions = []
+    records = []
+    for position, doc in enumerate(documents):
+        for qualification in doc.get(attribute) or []:
+            positions.append(position)
+            records.append(convert(qualification))
+
+    return {'document': positions, **columns(records, Qualification._fields)}
+
+
+def experiences_batch(documents: list[dict]) -> dict[str, list]:
+    """
+    This function converts the experiences of a list of profiles to column arrays of the FACT_PRF_Qualification table.
+
+    :param documents: The documents to convert.
+    """
+    return _qualifications_batch(documents, 'experiences', experience)
+
+
+def education_batch(documents: list[dict]) -> dict[str, list]:
+    """
+    This function converts the education of a list of profiles to column arrays of the FACT_PRF_Qualification table.
+
+    :param documents: The documents to convert.
+    """
+    return _qualifications_batch(documents, 'education', education)
+
+
+def volunteer_work_batch(documents: list[dict]) -> dict[str, list]:
+    """
+    This function converts the volunteer work of a list of profiles to column arrays of the FACT_PRF_Qualification table.
+
+    :param documents: The documents to convert.
+    """
+    return _qualifications_batch(documents, 'volunteer_work', volunteer_work)
+
+
+def certifications_batch(documents: list[dict]) -> dict[str, list]:
+    """
+    This function converts the certifications of a list of profiles to column arrays of the FACT_PRF_Qualification table.
+
+    :param documents: The documents to convert.
+    """
+    return _qualifications_batch(documents, 'certifications', certification)
+
 
-    # Create and return DataFrame
-    return pd.DataFrame([experience_dict])
+def accomplishment_projects_batch(documents: list[dict]) -> dict[str, list]:
+    """
+    This function converts the projects of a list of profiles to column arrays of the FACT_PRF_Qualification table.
+
+    :param documents: The documents to convert.
+    """
+    return _qualifications_batch(documents, 'accomplishment_projects', accomplishment_projects)
@@ -1,69 +1,134 @@
 """
 This module holds the functions used to import the individual attributes into the DWH.
 """
-import pandas as pd
 # Import conversion functions
 from dwh.linkedin_data.profiles import convert as conv
+from dwh.linkedin_data.profiles import related
+from dwh.linkedin_data import texts
 
 
-def location(document: dict, dwh_engine) -> int:
+def _insert_row(table: str, row: dict, dwh_connection) -> int:
+    """
+    This function inserts a single row and returns the key generated for it.
+    The key is taken from the cursor of the insert, so it always belongs to this row.
+
+    :param table: The name of the table.
+    :param row: The row to insert, mapping the columns to their values.
+    :param dwh_connection: The DWH connection to use.
+    """
+    query = f"INSERT INTO {table} ({', '.join(row)}) VALUES ({', '.join(['%s'] * len(row))})"
+    return dwh_connection.exec_driver_sql(query, tuple(row.values())).lastrowid
+
+
+def _insert_fact(table: str, row: dict, dwh_connection) -> int:
+    """
+    This function inserts a fact row, whose long text goes into its text table, and returns its key.
+    The text row is written into the partition of the origin of the fact row.
+
+    :param table: The name of the fact table (see texts.TEXTS).
+    :param row: The row to insert, mapping the columns to their values.
+    :param dwh_connection: The DWH connection to use.
+    """
+    row, text = texts.split_row(table, row)
+    row_id = _insert_row(table, row, dwh_connection)
+    texts.insert_text(table, row_id, text, dwh_connection, row['idOrigin'])
+    return row_id
+
+
+def _insert_rows(table: str, rows: list[dict], dwh_connection):
+    """
+    This function inserts rows with a single multi-row INSERT.
+
+    :param table: The name of the table.
+    :param rows: The rows to insert, all mapping the same columns to their values.
+    :param dwh_connection: The DWH connection to use.
+    """
+    if rows:
+        query = f"INSERT INTO {table} ({', '.join(rows[0])}) VALUES ({', '.join(['%s'] * len(rows[0]))})"
+        dwh_connection.exec_driver_sql(query, [tuple(row.values()) for row in rows])
+
+
+def _dimension_id(table: str, key: dict, dwh_connection, dimension_cache=None) -> int:
+    """
+    This function returns the ID of a dimension member and inserts the member if it does not exist yet.
+    Relies on the unique index of the natural key (migrations/02_natural_key_indexes.sql).
+
+    :param table: The name of the dimension table.
+    :param key: The natural key of the member, mapping the columns to their values.
+    :param dwh_connection: The DWH connection to use.
+    :param dimension_cache: The dimension cache used to resolve the member in memory (optional).
+    """
+    # Resolve the member in memory if a cache is available
+    if dimension_cache is not None:
+        return dimension_cache.resolve(table, tuple(key.values()))
+
+    # Insert the member or, if its natural key exists already, make LAST_INSERT_ID() return the existing id
+    query = (
+        f"INSERT INTO {table} ({', '.join(key)}) VALUES ({', '.join(['%s'] * len(key))}) "
+        f"ON DUPLICATE KEY UPDATE id = LAST_INSERT_ID(id)"
+    )
+    return dwh_connection.exec_driver_sql(query, tuple(key.values())).lastrowid
+
+
+def location(document: dict, dwh_connection, dimension_cache=None) -> int:
     """
     This function inserts a location into the DWH and returns its ID.
 
     DWH table: DIM_PRF_Location
 
     :param document: The document to convert.
-    :param dwh_engine: The DWH engine to use.
+    :param dwh_connection: The DWH connection of the unit of work.
+    :param dimension_cache: The dimension cache used to resolve the location in memory (optional).
     """
     # Prepare location data
-    location_df = conv.location(document)
-
-    # Check if a matching record exists
-    query = """
-        SELECT id
-        FROM DIM_PRF_Location
-        WHERE countryLetters = %(countryLetters)s 
-        AND countryName = %(countryName)s
-        AND city = %(city)s
-        AND state = %(state)s
-    """
-    result = pd.read_sql_query(query, dwh_engine, params=location_df.iloc[0].to_dict())
-
-    if not result.empty:
-        # If matching record found, use existing id
-        location_id = result.iloc[0]['id']
-    else:
-        # If no matching record found, insert a new record and use its id
-        location_df.to_sql('DIM_PRF_Location', dwh_engine, if_exists='append', index=False)
-        location_id = pd.read_sql_query("SELECT LAST_INSERT_ID()", dwh_engine).iloc[0, 0]
+    location_row = conv.location(document)
 
-    # Return location id
-    return location_id
+    # Get the id of a matching record or insert a new one
+    return _dimension_id('DIM_PRF_Location', location_row._asdict(), dwh_connection, dimension_cache)
 
 
-def person(document: dict, location_id: int, origin_id: int, dwh_engine) -> int:
+def person(document: dict, location_id: int, origin_id: int, dwh_connection) -> int:
     """
     This function inserts a person into the DWH and returns its ID.
 
-    DWH table: FACT_PRF_Person
+    DWH tables: FACT_PRF_Person, TXT_PRF_Summary
 
     :param document: The document to convert.
     :param location_id: The ID of the location dimension.
     :param origin_id: The ID of the DIM_Origin table from the dwh.
-    :param dwh_engine: The DWH engine to use.
+    :param dwh_connection: The DWH connection of the unit of work.
     """
     # Prepare person data
-    person_df = conv.person(document, location_id, origin_id)
+    person_row = conv.person(document, location_id, origin_id)
 
     # Insert person data
-    person_df.to_sql('DIM_PRF_Person', dwh_engine, if_exists='append', index=False)
-    person_id = pd.read_sql_query("SELECT LAST_INSERT_ID()", dwh_engine).iloc[0, 0]
+    person_id = _insert_fact('FACT_PRF_Person', person_row._asdict(), dwh_connection)
 
     # Return person id
     return person_id
 
 
-def recommendations(document: dict, person_id: int, dwh_engine):
+def person_exists(document: dict, dwh_connection) -> bool:
+    """
+    This function checks whether a document has already been imported as a person.
+
+    DWH table: FACT_PRF_Person
+
+    :param document: The document to check.
+    :param dwh_connection: The DWH connection of the unit of work.
+    """
+    query = """
+        SELECT id
+        FROM FACT_PRF_Person
+        WHERE mongoCollectionId = %s
+    """
+    result = dwh_connection.exec_driver_sql(query, (str(document.get('_id')),)).first()
+
+    # Return whether a matching record exists
+    return result is not None
+
+
+def recommendations(document: dict, person_id: int, origin_id: int, dwh_connection):
     """
     This function inserts recommendations into the DWH.
 
@@ -71,7 +136,8 @@ def recommendations(document: dict, person_id: int, dwh_engine):
 
     :param document: The document to convert.
     :param person_id: The ID of the person in the DWH.
-    :param dwh_engine: The DWH engine to use.
+    :param origin_id: The ID of the DIM_Origin table from the dwh.
+    :param dwh_connection: The DWH connection of the unit of work.
     """
     if document.get('recommendations'):
         df_to_add = document.get('recommendations', [])
@@ -81,59 +147,61 @@ def recommendations(document: dict, person_id: int, dwh_engine):
         for rec in df_to_add:
             data.append({
                 'idPerson': person_id,
-                'recommendationText': rec
+                'recommendationText': rec,
+                'idOrigin': origin_id
             })
 
-        # Create and insert DataFrame
-        if data:
-            pd.DataFrame(data).to_sql('FACT_PRF_Recommendation', dwh_engine, if_exists='append', index=False)
+        # Insert all recommendations at once
+        _insert_rows('FACT_PRF_Recommendation', data, dwh_connection)
 
 
-def people_also_viewed(document: dict, person_id: int, dwh_engine):
+def _related(document: dict, attribute: str, person_id: int, origin_id: int, dwh_connection, related_cache=None):
     """
-    This function inserts people also viewed into the DWH.
+    This function inserts the related profiles of an attribute into the DWH.
 
-    DWH table: DIM_PRF_Related, REL_PRF_Person_Related
+    DWH tables: DIM_PRF_Related, REL_PRF_Person_Related
 
     :param document: The document to convert.
+    :param attribute: The attribute holding the related profiles.
     :param person_id: The ID of the person in the DWH.
-    :param dwh_engine: The DWH engine to use.
-    """
-    if document.get('people_also_viewed'):
-        for ppl in document.get('people_also_viewed'):
-            # Check if a matching record exists
-            query = """
-                SELECT id
-                FROM DIM_PRF_Related
-                WHERE name = %(name)s
-                AND location = %(location)s
-            """  # AND summary = %(summary)s  'summary': ppl.get('summary')
-            result = pd.read_sql_query(query, dwh_engine, params={
-                'name': ppl.get('name'),
-                'location': ppl.get('location')
-            })
+    :param origin_id: The ID of the DIM_Origin table from the dwh.
+    :param dwh_connection: The DWH connection of the unit of work.
+    :param related_cache: The related cache used to resolve the related people in memory (optional).
+    """
+    if related_cache is not None:
+        rows = related.edge_rows([(person_id, document)], related_cache, origin_id, (attribute,))
+    else:
+        # Resolve every related person with a single upsert on its key
+        rows = list(dict.fromkeys(
+            (
+                person_id,
+                _dimension_id('DIM_PRF_Related', dict(zip(related.COLUMNS, (key, *person))), dwh_connection),
+                relation,
+                origin_id
+            )
+            for relation, key, person in related.related_people(document, (attribute,))
+        ))
 
-            if not result.empty:
-                # If matching record found, use existing id
-                related_id = result.iloc[0]['id']
-            else:
-                # If no matching record found, insert a new record and use its id
-                pd.DataFrame([{
-                    'name': ppl.get('name'),
-                    'location': ppl.get('location'),
-                    'summary': ppl.get('summary')
-                }]).to_sql('DIM_PRF_Related', dwh_engine, if_exists='append', index=False)
-                related_id = pd.read_sql_query("SELECT LAST_INSERT_ID()", dwh_engine).iloc[0, 0]
+    # Insert the relationship records, existing ones are skipped
+    related.write_edges(dwh_connection, rows)
 
-            # Insert relationship record
-            pd.DataFrame([{
-                'idPerson': person_id,
-                'idRelated': related_id,
-                'type': 'viewed'
-            }]).to_sql('REL_PRF_Person_Related', dwh_engine, if_exists='append', index=False)
+
+def people_also_viewed(document: dict, person_id: int, origin_id: int, dwh_connection, related_cache=None):
+    """
+    This function inserts people also viewed into the DWH.
+
+    DWH table: DIM_PRF_Related, REL_PRF_Person_Related
+
+    :param document: The document to convert.
+    :param person_id: The ID of the person in the DWH.
+    :param origin_id: The ID of the DIM_Origin table from the dwh.
+    :param dwh_connection: The DWH connection of the unit of work.
+    :param related_cache: The related cache used to resolve the related people in memory (optional).
+    """
+    _related(document, 'people_also_viewed', person_id, origin_id, dwh_connection, related_cache)
 
 
-def similarly_named_profiles(document: dict, person_id: int, dwh_engine):
+def similarly_named_profiles(document: dict, person_id: int, origin_id: int, dwh_connection, related_cache=None):
     """
     This function inserts similarly named profiles into the DWH.
 
@@ -141,54 +209,14 @@ def similarly_named_profiles(document: dict, person_id: int, dwh_engine):
 
     :param document: The document to convert.
     :param person_id: The ID of the person in the DWH.
-    :param dwh_engine: The DWH engine to use.
-    """
-    if document.get('similarly_named_profiles'):
-        for ppl in document.get('similarly_named_profiles'):
-            # Check if a matching record exists
-            query = """
-                SELECT id
-                FROM DIM_PRF_Related
-                WHERE name = %(name)s
-                AND location = %(location)s
-            """  # AND summary = %(summary)s  'summary': ppl.get('summary')
-            result = pd.read_sql_query(query, dwh_engine, params={
-                'name': ppl.get('name'), 'location': ppl.get('location')
-            })
-
-            if not result.empty:
-                # If matching record found, use existing id
-                related_id = result.iloc[0]['id']
-            else:
-                # If no matching record found, insert a new record and use its id
-                pd.DataFrame([{
-                    'name': ppl.get('name'),
-                    'location': ppl.get('location'),
-                    'summary': ppl.get('summary')
-                }]).to_sql('DIM_PRF_Related', dwh_engine, if_exists='append', index=False)
-                related_id = pd.read_sql_query("SELECT LAST_INSERT_ID()", dwh_engine).iloc[0, 0]
-
-            # Check if a relationship record already exists
-            query = """
-                SELECT *
-                FROM REL_PRF_Person_Related
-                WHERE idPerson = %(idPerson)s
-                AND idRelated = %(idRelated)s
-                AND type = %(type)s
-            """
-            result = pd.read_sql_query(query, dwh_engine, params={
-                'idPerson': person_id, 'idRelated': related_id, 'type': 'similar'})
-
-            # Insert if relationship record does not exist
-            if result.empty:
-                pd.DataFrame([{
-                    'idPerson': person_id,
-                    'idRelated': related_id,
-                    'type': 'similar'
-                }]).to_sql('REL_PRF_Person_Related', dwh_engine, if_exists='append', index=False)
+    :param origin_id: The ID of the DIM_Origin table from the dwh.
+    :param dwh_connection: The DWH connection of the unit of work.
+    :param related_cache: The related cache used to resolve the related people in memory (optional).
+    """
+    _related(document, 'similarly_named_profiles', person_id, origin_id, dwh_connection, related_cache)
 
 
-def languages(document: dict, person_id: int, dwh_engine):
+def languages(document: dict, person_id: int, origin_id: int, dwh_connection, dimension_cache=None):
     """
     This function inserts languages into the DWH.
 
@@ -196,36 +224,24 @@ def languages(document: dict, person_id: int, dwh_engine):
 
     :param document: The document to convert.
     :param person_id: The ID of the person in the DWH.
-    :param dwh_engine: The DWH engine to use.
+    :param origin_id: The ID of the DIM_Origin table from the dwh.
+    :param dwh_connection: The DWH connection of the unit of work.
+    :param dimension_cache: The dimension cache used to resolve the dimension members in memory (optional).
     """
     if document.get('languages') and len(document.get('languages')) > 0:
         for lang in document.get('languages'):
-            # Check if a matching record exists
-            query = """
-                SELECT id
-                FROM DIM_PRF_Language
-                WHERE language = %(language)s
-            """
-            result = pd.read_sql_query(query, dwh_engine, params={'language': lang})
-
-            if not result.empty:
-                # If matching record found, use existing id
-                lang_id = result.iloc[0]['id']
-            else:
-                # If no matching record found, insert a new record and use its id
-                pd.DataFrame({
-                    'language': [lang]
-                }).to_sql('DIM_PRF_Language', dwh_engine, if_exists='append', index=False)
-                lang_id = pd.read_sql_query("SELECT LAST_INSERT_ID()", dwh_engine).iloc[0, 0]
+            # Get the id of a matching record or insert a new one
+            lang_id = _dimension_id('DIM_PRF_Language', {'language': lang}, dwh_connection, dimension_cache)
 
             # Insert relationship record
-            pd.DataFrame([{
+            _insert_row('REL_PRF_Person_Language', {
                 'idPerson': person_id,
-                'idLanguage': lang_id
-            }]).to_sql('REL_PRF_Person_Language', dwh_engine, if_exists='append', index=False)
+                'idLanguage': lang_id,
+                'idOrigin': origin_id
+            }, dwh_connection)
 
 
-def skills(document: dict, person_id: int, dwh_engine):
+def skills(document: dict, person_id: int, origin_id: int, dwh_connection, dimension_cache=None):
     """
     This function inserts skills into the DWH.
 
@@ -233,38 +249,24 @@ def skills(document: dict, person_id: int, dwh_engine):
 
     :param document: The document to convert.
     :param person_id: The ID of the person in the DWH.
-    :param dwh_engine: The DWH engine to use.
+    :param origin_id: The ID of the DIM_Origin table from the dwh.
+    :param dwh_connection: The DWH connection of the unit of work.
+    :param dimension_cache: The dimension cache used to resolve the dimension members in memory (optional).
     """
     if document.get('skills') and len(document.get('skills')) > 0:
         for skill in document.get('skills'):
-            # Check if a matching record exists
-            query = """
-                SELECT id
-                FROM DIM_PRF_Trait
-                WHERE type = %(type)s
-                AND name = %(name)s
-            """
-            result = pd.read_sql_query(query, dwh_engine, params={'type': 'skill', 'name': skill})
-
-            if not result.empty:
-                # If matching record found, use existing id
-                skill_id = result.iloc[0]['id']
-            else:
-                # If no matching record found, insert a new record and use its id
-                pd.DataFrame([{
-                    'type': 'skill',
-                    'name': skill
-                }]).to_sql('DIM_PRF_Trait', dwh_engine, if_exists='append', index=False)
-                skill_id = pd.read_sql_query("SELECT LAST_INSERT_ID()", dwh_engine).iloc[0, 0]
+            # Get the id of a matching record or insert a new one
+            skill_id = _dimension_id('DIM_PRF_Trait', {'type': 'skill', 'name': skill}, dwh_connection, dimension_cache)
 
             # Insert relationship record
-            pd.DataFrame([{
+            _insert_row('REL_PRF_Person_Trait', {
                 'idPerson': person_id,
-                'idTrait': skill_id
-            }]).to_sql('REL_PRF_Person_Trait', dwh_engine, if_exists='append', index=False)
+                'idTrait': skill_id,
+                'idOrigin': origin_id
+            }, dwh_connection)
 
 
-def interests(document: dict, person_id: int, dwh_engine):
+def interests(document: dict, person_id: int, origin_id: int, dwh_connection, dimension_cache=None):
     """
     This function inserts interests into the DWH.
 
@@ -272,38 +274,24 @@ def interests(document: dict, person_id: int, dwh_engine):
 
     :param document: The document to convert.
     :param person_id: The ID of the person in the DWH.
-    :param dwh_engine: The DWH engine to use.
+    :param origin_id: The ID of the DIM_Origin table from the dwh.
+    :param dwh_connection: The DWH connection of the unit of work.
+    :param dimension_cache: The dimension cache used to resolve the dimension members in memory (optional).
     """
     if document.get('interests') and len(document.get('interests')) > 0:
         for interest in document.get('interests'):
-            # Check if a matching record exists
-            query = """
-                SELECT id
-                FROM DIM_PRF_Trait
-                WHERE type = %(type)s
-                AND name = %(name)s
-            """
-            result = pd.read_sql_query(query, dwh_engine, params={'type': 'interest', 'name': interest})
-
-            if not result.empty:
-                # If matching record found, use existing id
-                interest_id = result.iloc[0]['id']
-            else:
-                # If no matching record found, insert a new record and use its id
-                pd.DataFrame([{
-                    'type': 'interest',
-                    'name': interest
-                }]).to_sql('DIM_PRF_Trait', dwh_engine, if_exists='append', index=False)
-                interest_id = pd.read_sql_query("SELECT LAST_INSERT_ID()", dwh_engine).iloc[0, 0]
+            # Get the id of a matching record or insert a new one
+            interest_id = _dimension_id('DIM_PRF_Trait', {'type': 'interest', 'name': interest}, dwh_connection, dimension_cache)
 
             # Insert relationship record
-            pd.DataFrame([{
+            _insert_row('REL_PRF_Person_Trait', {
                 'idPerson': person_id,
-                'idTrait': interest_id
-            }]).to_sql('REL_PRF_Person_Trait', dwh_engine, if_exists='append', index=False)
+                'idTrait': interest_id,
+                'idOrigin': origin_id
+            }, dwh_connection)
 
 
-def groups(document: dict, person_id: int, dwh_engine):
+def groups(document: dict, person_id: int, origin_id: int, dwh_connection, dimension_cache=None):
     """
     This function inserts groups into the DWH.
 
@@ -311,596 +299,405 @@ def groups(document: dict, person_id: int, dwh_engine):
 
     :param document: The document to convert.
     :param person_id: The ID of the person in the DWH.
-    :param dwh_engine: The DWH engine to use.
+    :param origin_id: The ID of the DIM_Origin table from the dwh.
+    :param dwh_connection: The DWH connection of the unit of work.
+    :param dimension_cache: The dimension cache used to resolve the dimension members in memory (optional).
     """
     if document.get('groups') and len(document.get('groups')) > 0:
         for group in document.get('groups'):
             if group.get('name'):
-                # Check if a matching record exists
-                query = """
-                    SELECT id
-                    FROM DIM_PRF_Group
-                    WHERE name = %(name)s
-                """
-                result = pd.read_sql_query(query, dwh_engine, params={'name': group.get('name')})
-
-                if not result.empty:
-                    # If matching record found, use existing id
-                    group_id = result.iloc[0]['id']
-                else:
-                    # If no matching record found, insert a new record and use its id
-                    pd.DataFrame([{
-                        'name': group.get('name')
-                    }]).to_sql('DIM_PRF_Group', dwh_engine, if_exists='append', index=False)
-                    group_id = pd.read_sql_query("SELECT LAST_INSERT_ID()", dwh_engine).iloc[0, 0]
+                # Get the id of a matching record or insert a new one
+                group_id = _dimension_id('DIM_PRF_Group', {'name': group.get('name')}, dwh_connection, dimension_cache)
 
                 # Insert relationship record
-                pd.DataFrame([{
+                _insert_row('REL_PRF_Person_Group', {
                     'idPerson': person_id,
-                    'idGroup': group_id
-                }]).to_sql('REL_PRF_Person_Group', dwh_engine, if_exists='append', index=False)
+                    'idGroup': group_id,
+                    'idOrigin': origin_id
+                }, dwh_connection)
 
 
-def experiences(document: dict, person_id: int, dwh_engine):
+def experiences(document: dict, person_id: int, origin_id: int, dwh_connection, company_index=None):
     """
     This function inserts experiences into the DWH.
 
-    DWH tables: DIM_PRF_Duration, FACT_PRF_Qualification, REL_PRF_Person_Qualification
+    DWH tables: FACT_PRF_Qualification, TXT_PRF_Qualification, REL_PRF_Person_Qualification
 
     :param document: The document to convert.
     :param person_id: The ID of the person in the DWH.
-    :param dwh_engine: The DWH engine to use.
+    :param origin_id: The ID of the DIM_Origin table from the dwh.
+    :param dwh_connection: The DWH connection of the unit of work.
+    :param company_index: The company index used to link the experiences to their companies (optional).
     """
     for experience in document.get('experiences'):
-        # Create and fill the duration dimension table
-        if experience.get('starts_at') or experience.get('ends_at'):
-            duration_df = pd.DataFrame([{
-                'startDate': conv.convert_date(experience.get('starts_at')),
-                'endDate': conv.convert_date(experience.get('ends_at'))
-            }])
-            # Check if matching records exist
-            query = """
-                SELECT id
-                FROM DIM_PRF_Duration
-                WHERE startDate = %(startDate)s
-                AND endDate = %(endDate)s
-            """
-            result = pd.read_sql_query(query, dwh_engine, params=duration_df.iloc[0].to_dict())
-
-            # If matching records found, use existing id
-            if not result.empty:
-                duration_id = result.iloc[0]['id']
-            else:
-                # If no matching records found, insert a new record and use its id
-                duration_df.to_sql('DIM_PRF_Duration', dwh_engine, if_exists='append', index=False)
-                duration_id = pd.read_sql_query("SELECT LAST_INSERT_ID()", dwh_engine).iloc[0, 0]
-        else:
-            duration_id = None
-
-        # Convert experience to FACT_PRF_Qualification table
-        experience_df = conv.experience(experience, duration_id)
+        # Convert experience to a FACT_PRF_Qualification row and link it to its company
+        experience_row = conv.experience(experience)
+        company_id = company_index.experience(experience) if company_index is not None else None
 
         # Insert experience data
-        experience_df.to_sql('FACT_PRF_Qualification', dwh_engine, if_exists='append', index=False)
-
-        # Create a relationship record
-        rel_df = pd.DataFrame([{
-            'idPerson': person_id,
-            'idQualification': pd.read_sql_query("SELECT LAST_INSERT_ID()", dwh_engine).iloc[0, 0]
-        }])
+        qualification_id = _insert_fact('FACT_PRF_Qualification', {
+            **experience_row._asdict(), 'idOrigin': origin_id, 'idCompany': company_id
+        }, dwh_connection)
 
         # Add the relationship record
-        rel_df.to_sql('REL_PRF_Person_Qualification', dwh_engine, if_exists='append', index=False)
+        _insert_row('REL_PRF_Person_Qualification', {
+            'idPerson': person_id,
+            'idQualification': qualification_id,
+            'idOrigin': origin_id
+        }, dwh_connection)
 
 
-def education(document: dict, person_id: int, dwh_engine):
+def education(document: dict, person_id: int, origin_id: int, dwh_connection):
     """
     This function inserts education into the DWH.
 
-    DWH tables: FACT_PRF_Qualification, DIM_PRF_Duration, REL_PRF_Person_Qualification
+    DWH tables: FACT_PRF_Qualification, TXT_PRF_Qualification, REL_PRF_Person_Qualification
 
     :param document: The document to convert.
     :param person_id: The ID of the person in the DWH.
-    :param dwh_engine: The DWH engine to use.
+    :param origin_id: The ID of the DIM_Origin table from the dwh.
+    :param dwh_connection: The DWH connection of the unit of work.
     """
     if document.get('education') and len(document.get('education')) > 0:
         for education in document.get('education'):
-            # Create and fill the duration dimension table
-            if education.get('starts_at') or education.get('ends_at'):
-                duration_df = pd.DataFrame([{
-                    'startDate': conv.convert_date(education.get('starts_at')),
-                    'endDate': conv.convert_date(education.get('ends_at'))
-                }])
-                # Check if matching records exist
-                query = """
-                        SELECT id
-                        FROM DIM_PRF_Duration
-                        WHERE startDate = %(startDate)s
-                        AND endDate = %(endDate)s
-                    """
-                result = pd.read_sql_query(query, dwh_engine, params=duration_df.iloc[0].to_dict())
-
-                # If matching records found, use existing id
-                if not result.empty:
-                    duration_id = result.iloc[0]['id']
-                else:
-                    # If no matching records found, insert a new record and use its id
-                    duration_df.to_sql('DIM_PRF_Duration', dwh_engine, if_exists='append', index=False)
-                    duration_id = pd.read_sql_query("SELECT LAST_INSERT_ID()", dwh_engine).iloc[0, 0]
-            else:
-                duration_id = None
-
-            # Convert education to FACT_PRF_Qualification table
-            education_df = conv.education(education, duration_id)
+            # Convert education to a FACT_PRF_Qualification row
+            education_row = conv.education(education)
 
             # Insert education data
-            education_df.to_sql('FACT_PRF_Qualification', dwh_engine, if_exists='append', index=False)
-
-            # Create a relationship record
-            rel_df = pd.DataFrame([{
-                'idPerson': person_id,
-                'idQualification': pd.read_sql_query("SELECT LAST_INSERT_ID()", dwh_engine).iloc[0, 0]
-            }])
+            qualification_id = _insert_fact('FACT_PRF_Qualification', {**education_row._asdict(), 'idOrigin': origin_id}, dwh_connection)
 
             # Add the relationship record
-            rel_df.to_sql('REL_PRF_Person_Qualification', dwh_engine, if_exists='append', index=False)
+            _insert_row('REL_PRF_Person_Qualification', {
+                'idPerson': person_id,
+                'idQualification': qualification_id,
+                'idOrigin': origin_id
+            }, dwh_connection)
 
 
-def volunteer_work(document: dict, person_id: int, dwh_engine):
+def volunteer_work(document: dict, person_id: int, origin_id: int, dwh_connection):
     """
     This function inserts volunteer work into the DWH.
 
-    DWH tables: FACT_PRF_Qualification, DIM_PRF_Duration, REL_PRF_Person_Qualification
+    DWH tables: FACT_PRF_Qualification, TXT_PRF_Qualification, REL_PRF_Person_Qualification
 
     :param document: The document to convert.
     :param person_id: The ID of the person in the DWH.
-    :param dwh_engine: The DWH engine to use.
+    :param origin_id: The ID of the DIM_Origin table from the dwh.
+    :param dwh_connection: The DWH connection of the unit of work.
     """
     if document.get('volunteer_work') and len(document.get('volunteer_work')) > 0:
         for volunteer in document.get('volunteer_work'):
-            # Create and fill the duration dimension table
-            if volunteer.get('starts_at') or volunteer.get('ends_at'):
-                duration_df = pd.DataFrame([{
-                    'startDate': conv.convert_date(volunteer.get('starts_at')),
-                    'endDate': conv.convert_date(volunteer.get('ends_at'))
-                }])
-                # Check if matching records exist
-                query = """
-                    SELECT id
-                    FROM DIM_PRF_Duration
-                    WHERE startDate = %(startDate)s
-                    AND endDate = %(endDate)s
-                """
-                result = pd.read_sql_query(query, dwh_engine, params=duration_df.iloc[0].to_dict())
-
-                # If matching records found, use existing id
-                if not result.empty:
-                    duration_id = result.iloc[0]['id']
-                else:
-                    # If no matching records found, insert a new record and use its id
-                    duration_df.to_sql('DIM_PRF_Duration', dwh_engine, if_exists='append', index=False)
-                    duration_id = pd.read_sql_query("SELECT LAST_INSERT_ID()", dwh_engine).iloc[0, 0]
-            else:
-                duration_id = None
-
-            # Convert volunteer to FACT_PRF_Qualification table
-            volunteer_df = conv.volunteer_work(volunteer, duration_id)
+            # Convert volunteer to a FACT_PRF_Qualification row
+            volunteer_row = conv.volunteer_work(volunteer)
 
             # Insert volunteer data
-            volunteer_df.to_sql('FACT_PRF_Qualification', dwh_engine, if_exists='append', index=False)
-
-            # Create a relationship record
-            rel_df = pd.DataFrame([{
-                'idPerson': person_id,
-                'idQualification': pd.read_sql_query("SELECT LAST_INSERT_ID()", dwh_engine).iloc[0, 0]
-            }])
+            qualification_id = _insert_fact('FACT_PRF_Qualification', {**volunteer_row._asdict(), 'idOrigin': origin_id}, dwh_connection)
 
             # Add the relationship record
-            rel_df.to_sql('REL_PRF_Person_Qualification', dwh_engine, if_exists='append', index=False)
+            _insert_row('REL_PRF_Person_Qualification', {
+                'idPerson': person_id,
+                'idQualification': qualification_id,
+                'idOrigin': origin_id
+            }, dwh_connection)
 
 
-def certifications(document: dict, person_id: int, dwh_engine):
+def certifications(document: dict, person_id: int, origin_id: int, dwh_connection):
     """
     This function inserts certifications into the DWH.
 
-    DWH tables: FACT_PRF_Qualification, DIM_PRF_Duration, REL_PRF_Person_Qualification
+    DWH tables: FACT_PRF_Qualification, TXT_PRF_Qualification, REL_PRF_Person_Qualification
 
     :param document: The document to convert.
     :param person_id: The ID of the person in the DWH.
-    :param dwh_engine: The DWH engine to use.
+    :param origin_id: The ID of the DIM_Origin table from the dwh.
+    :param dwh_connection: The DWH connection of the unit of work.
     """
     if document.get('certifications') and len(document.get('certifications')) > 0:
         for certification in document.get('certifications'):
-            # Create and fill the duration dimension table
-            if certification.get('starts_at') or certification.get('ends_at'):
-                duration_df = pd.DataFrame([{
-                    'startDate': conv.convert_date(certification.get('starts_at')),
-                    'endDate': conv.convert_date(certification.get('ends_at'))
-                }])
-                # Check if matching records exist
-                query = """
-                    SELECT id
-                    FROM DIM_PRF_Duration
-                    WHERE startDate = %(startDate)s
-                    AND endDate = %(endDate)s
-                """
-                result = pd.read_sql_query(query, dwh_engine, params=duration_df.iloc[0].to_dict())
-
-                # If matching records found, use existing id
-                if not result.empty:
-                    duration_id = result.iloc[0]['id']
-                else:
-                    # If no matching records found, insert a new record and use its id
-                    duration_df.to_sql('DIM_PRF_Duration', dwh_engine, if_exists='append', index=False)
-                    duration_id = pd.read_sql_query("SELECT LAST_INSERT_ID()", dwh_engine).iloc[0, 0]
-            else:
-                duration_id = None
-
-            # Convert certification to FACT_PRF_Qualification table
-            certification_df = conv.certification(certification, duration_id)
+            # Convert certification to a FACT_PRF_Qualification row
+            certification_row = conv.certification(certification)
 
             # Insert certification data
-            certification_df.to_sql('FACT_PRF_Qualification', dwh_engine, if_exists='append', index=False)
-
-            # Create a relationship record
-            rel_df = pd.DataFrame([{
-                'idPerson': person_id,
-                'idQualification': pd.read_sql_query("SELECT LAST_INSERT_ID()", dwh_engine).iloc[0, 0]
-            }])
+            qualification_id = _insert_fact('FACT_PRF_Qualification', {**certification_row._asdict(), 'idOrigin': origin_id}, dwh_connection)
 
             # Add the relationship record
-            rel_df.to_sql('REL_PRF_Person_Qualification', dwh_engine, if_exists='append', index=False)
+            _insert_row('REL_PRF_Person_Qualification', {
+                'idPerson': person_id,
+                'idQualification': qualification_id,
+                'idOrigin': origin_id
+            }, dwh_connection)
 
 
-def activities(document: dict, person_id: int, dwh_engine):
+def activities(document: dict, person_id: int, origin_id: int, dwh_connection):
     """
     This function inserts activities into the DWH.
 
-    DWH tables: FACT_PRF_Accomplishment, REL_PRF_Person_Accomplishment
+    DWH tables: FACT_PRF_Accomplishment, TXT_PRF_Accomplishment, REL_PRF_Person_Accomplishment
 
     :param document: The document to convert.
     :param person_id: The ID of the person in the DWH.
-    :param dwh_engine: The DWH engine to use.
+    :param origin_id: The ID of the DIM_Origin table from the dwh.
+    :param dwh_connection: The DWH connection of the unit of work.
     """
     if document.get('activities'):
         for act in document.get('activities'):
-            # Create and fill the table
-            activity_df = pd.DataFrame([{
+            # Insert the accomplishment
+            accomplishment_id = _insert_fact('FACT_PRF_Accomplishment', {
                 'type': 'activity',
                 'name': act.get('title'),
                 'institution': None,
                 'date': None,
-                'description': act.get('activity_status')
-            }])
-
-            # Insert DataFrame
-            activity_df.to_sql('FACT_PRF_Accomplishment', dwh_engine, if_exists='append', index=False)
-
-            # Create a relationship record
-            rel_df = pd.DataFrame([{
-                'idPerson': person_id,
-                'idAccomplishment': pd.read_sql_query("SELECT LAST_INSERT_ID()", dwh_engine).iloc[0, 0]
-            }])
+                'description': act.get('activity_status'),
+                'idOrigin': origin_id
+            }, dwh_connection)
 
             # Add the relationship record
-            rel_df.to_sql('REL_PRF_Person_Accomplishment', dwh_engine, if_exists='append', index=False)
+            _insert_row('REL_PRF_Person_Accomplishment', {
+                'idPerson': person_id,
+                'idAccomplishment': accomplishment_id,
+                'idOrigin': origin_id
+            }, dwh_connection)
 
 
-def articles(document: dict, person_id: int, dwh_engine):
+def articles(document: dict, person_id: int, origin_id: int, dwh_connection):
     """
     This function inserts articles into the DWH.
 
-    DWH tables: FACT_PRF_Accomplishment, REL_PRF_Person_Accomplishment
+    DWH tables: FACT_PRF_Accomplishment, TXT_PRF_Accomplishment, REL_PRF_Person_Accomplishment
 
     :param document: The document to convert.
     :param person_id: The ID of the person in the DWH.
-    :param dwh_engine: The DWH engine to use.
+    :param origin_id: The ID of the DIM_Origin table from the dwh.
+    :param dwh_connection: The DWH connection of the unit of work.
     """
     if document.get('articles'):
         for art in document.get('articles'):
-            # Create and fill the table
-            article_df = pd.DataFrame([{
+            # Insert the accomplishment
+            accomplishment_id = _insert_fact('FACT_PRF_Accomplishment', {
                 'type': 'article',
                 'name': art.get('title'),
                 'institution': art.get('author'),
                 'date': conv.convert_date(art.get('published_date')),
-                'description': art.get('link')
-            }])
-
-            # Insert DataFrame
-            article_df.to_sql('FACT_PRF_Accomplishment', dwh_engine, if_exists='append', index=False)
-
-            # Create a relationship record
-            rel_df = pd.DataFrame([{
-                'idPerson': person_id,
-                'idAccomplishment': pd.read_sql_query("SELECT LAST_INSERT_ID()", dwh_engine).iloc[0, 0]
-            }])
+                'description': art.get('link'),
+                'idOrigin': origin_id
+            }, dwh_connection)
 
             # Add the relationship record
-            rel_df.to_sql('REL_PRF_Person_Accomplishment', dwh_engine, if_exists='append', index=False)
+            _insert_row('REL_PRF_Person_Accomplishment', {
+                'idPerson': person_id,
+                'idAccomplishment': accomplishment_id,
+                'idOrigin': origin_id
+            }, dwh_connection)
 
 
-def accomplishment_organisations(document: dict, person_id: int, dwh_engine):
+def accomplishment_organisations(document: dict, person_id: int, origin_id: int, dwh_connection):
     """
     This function inserts accomplishment organisations into the DWH.
 
-    DWH tables: FACT_PRF_Accomplishment, REL_PRF_Person_Accomplishment
+    DWH tables: FACT_PRF_Accomplishment, TXT_PRF_Accomplishment, REL_PRF_Person_Accomplishment
 
     :param document: The document to convert.
     :param person_id: The ID of the person in the DWH.
-    :param dwh_engine: The DWH engine to use.
+    :param origin_id: The ID of the DIM_Origin table from the dwh.
+    :param dwh_connection: The DWH connection of the unit of work.
     """
     if document.get('accomplishment_organisations'):
         for org in document.get('accomplishment_organisations'):
-            # Create and fill the table
-            org_df = pd.DataFrame([{
+            # Insert the accomplishment
+            accomplishment_id = _insert_fact('FACT_PRF_Accomplishment', {
                 'type': 'organisation',
                 'name': org.get('title'),
                 'institution': org.get('org_name'),
                 'date': conv.convert_date(org.get('starts_at')),
-                'description': org.get('description')
-            }])
-
-            # Insert DataFrame
-            org_df.to_sql('FACT_PRF_Accomplishment', dwh_engine, if_exists='append', index=False)
-
-            # Create a relationship record
-            rel_df = pd.DataFrame([{
-                'idPerson': person_id,
-                'idAccomplishment': pd.read_sql_query("SELECT LAST_INSERT_ID()", dwh_engine).iloc[0, 0]
-            }])
+                'description': org.get('description'),
+                'idOrigin': origin_id
+            }, dwh_connection)
 
             # Add the relationship record
-            rel_df.to_sql('REL_PRF_Person_Accomplishment', dwh_engine, if_exists='append', index=False)
+            _insert_row('REL_PRF_Person_Accomplishment', {
+                'idPerson': person_id,
+                'idAccomplishment': accomplishment_id,
+                'idOrigin': origin_id
+            }, dwh_connection)
 
 
-def accomplishment_publications(document: dict, person_id: int, dwh_engine):
+def accomplishment_publications(document: dict, person_id: int, origin_id: int, dwh_connection):
     """
     This function inserts accomplishment publications into the DWH.
 
-    DWH tables: FACT_PRF_Accomplishment, REL_PRF_Person_Accomplishment
+    DWH tables: FACT_PRF_Accomplishment, TXT_PRF_Accomplishment, REL_PRF_Person_Accomplishment
 
     :param document: The document to convert.
     :param person_id: The ID of the person in the DWH.
-    :param dwh_engine: The DWH engine to use.
+    :param origin_id: The ID of the DIM_Origin table from the dwh.
+    :param dwh_connection: The DWH connection of the unit of work.
     """
     if document.get('accomplishment_publications'):
         for pub in document.get('accomplishment_publications'):
-            # Create and fill the table
-            pub_df = pd.DataFrame([{
+            # Insert the accomplishment
+            accomplishment_id = _insert_fact('FACT_PRF_Accomplishment', {
                 'type': 'publication',
                 'name': pub.get('name'),
                 'institution': pub.get('publisher'),
                 'date': conv.convert_date(pub.get('published_on')),
-                'description': pub.get('description')
-            }])
-
-            # Insert DataFrame
-            pub_df.to_sql('FACT_PRF_Accomplishment', dwh_engine, if_exists='append', index=False)
-
-            # Create a relationship record
-            rel_df = pd.DataFrame([{
-                'idPerson': person_id,
-                'idAccomplishment': pd.read_sql_query("SELECT LAST_INSERT_ID()", dwh_engine).iloc[0, 0]
-            }])
+                'description': pub.get('description'),
+                'idOrigin': origin_id
+            }, dwh_connection)
 
             # Add the relationship record
-            rel_df.to_sql('REL_PRF_Person_Accomplishment', dwh_engine, if_exists='append', index=False)
+            _insert_row('REL_PRF_Person_Accomplishment', {
+                'idPerson': person_id,
+                'idAccomplishment': accomplishment_id,
+                'idOrigin': origin_id
+            }, dwh_connection)
 
 
-def accomplishment_honors_awards(document: dict, person_id: int, dwh_engine):
+def accomplishment_honors_awards(document: dict, person_id: int, origin_id: int, dwh_connection):
     """
     This function inserts accomplishment honor awards into the DWH.
 
-    DWH tables: FACT_PRF_Accomplishment, REL_PRF_Person_Accomplishment
+    DWH tables: FACT_PRF_Accomplishment, TXT_PRF_Accomplishment, REL_PRF_Person_Accomplishment
 
     :param document: The document to convert.
     :param person_id: The ID of the person in the DWH.
-    :param dwh_engine: The DWH engine to use.
+    :param origin_id: The ID of the DIM_Origin table from the dwh.
+    :param dwh_connection: The DWH connection of the unit of work.
     """
     if document.get('accomplishment_honors_awards'):
         for hon in document.get('accomplishment_honors_awards'):
-            # Create and fill the table
-            hon_df = pd.DataFrame([{
+            # Insert the accomplishment
+            accomplishment_id = _insert_fact('FACT_PRF_Accomplishment', {
                 'type': 'honor',
                 'name': hon.get('title'),
                 'institution': hon.get('issuer'),
                 'date': conv.convert_date(hon.get('issued_on')),
-                'description': hon.get('description')
-            }])
-
-            # Insert DataFrame
-            hon_df.to_sql('FACT_PRF_Accomplishment', dwh_engine, if_exists='append', index=False)
-
-            # Create a relationship record
-            rel_df = pd.DataFrame([{
-                'idPerson': person_id,
-                'idAccomplishment': pd.read_sql_query("SELECT LAST_INSERT_ID()", dwh_engine).iloc[0, 0]
-            }])
+                'description': hon.get('description'),
+                'idOrigin': origin_id
+            }, dwh_connection)
 
             # Add the relationship record
-            rel_df.to_sql('REL_PRF_Person_Accomplishment', dwh_engine, if_exists='append', index=False)
+            _insert_row('REL_PRF_Person_Accomplishment', {
+                'idPerson': person_id,
+                'idAccomplishment': accomplishment_id,
+                'idOrigin': origin_id
+            }, dwh_connection)
 
 
-def accomplishment_patents(document: dict, person_id: int, dwh_engine):
+def accomplishment_patents(document: dict, person_id: int, origin_id: int, dwh_connection):
     """
     This function inserts accomplishment patents into the DWH.
 
-    DWH tables: FACT_PRF_Accomplishment, REL_PRF_Person_Accomplishment
+    DWH tables: FACT_PRF_Accomplishment, TXT_PRF_Accomplishment, REL_PRF_Person_Accomplishment
 
     :param document: The document to convert.
     :param person_id: The ID of the person in the DWH.
-    :param dwh_engine: The DWH engine to use.
+    :param origin_id: The ID of the DIM_Origin table from the dwh.
+    :param dwh_connection: The DWH connection of the unit of work.
     """
     if document.get('accomplishment_patents'):
         for pat in document.get('accomplishment_patents'):
-            # Get the variables
-            application_number = pat.get('application_number', None)
-            patent_number = pat.get('patent_number', None)
-            patent_description = pat.get('description', None)
-
-            # Use match case to determine the description
-            match (application_number, patent_number, patent_description):
-                case (None, None, None):
-                    # If all are None, set the combined description to None
-                    comb_description = None
-                case (None, _, None):
-                    # If only patent_number is available, use it as the description
-                    comb_description = patent_number
-                case (None, _, _):
-                    # If patent_number and description are available, combine them
-                    comb_description = f"{patent_number} | {patent_description}"
-                case (_, None, None):
-                    # If only application_number is available, use it as the description
-                    comb_description = application_number
-                case (_, None, _):
-                    # If application_number and description are available, combine them
-                    comb_description = f"{application_number} | {patent_description}"
-                case (_, _, None):
-                    # If application_number and patent_number are available, combine them
-                    comb_description = f"{application_number} | {patent_number}"
-                case _:
-                    # If all are available, combine all three
-                    comb_description = f"{application_number} | {patent_number} | {patent_description}"
-
-            # Create and fill the table
-            pat_df = pd.DataFrame([{
+            # Insert the accomplishment
+            accomplishment_id = _insert_fact('FACT_PRF_Accomplishment', {
                 'type': 'patent',
                 'name': pat.get('title'),
                 'institution': pat.get('issuer'),
                 'date': conv.convert_date(pat.get('issued_on')),
-                'description': comb_description
-            }])
-
-            # Insert DataFrame
-            pat_df.to_sql('FACT_PRF_Accomplishment', dwh_engine, if_exists='append', index=False)
-
-            # Create a relationship record
-            rel_df = pd.DataFrame([{
-                'idPerson': person_id,
-                'idAccomplishment': pd.read_sql_query("SELECT LAST_INSERT_ID()", dwh_engine).iloc[0, 0]
-            }])
+                'description': conv.patent_description(pat),
+                'idOrigin': origin_id
+            }, dwh_connection)
 
             # Add the relationship record
-            rel_df.to_sql('REL_PRF_Person_Accomplishment', dwh_engine, if_exists='append', index=False)
+            _insert_row('REL_PRF_Person_Accomplishment', {
+                'idPerson': person_id,
+                'idAccomplishment': accomplishment_id,
+                'idOrigin': origin_id
+            }, dwh_connection)
 
 
-def accomplishment_test_scores(document: dict, person_id: int, dwh_engine):
+def accomplishment_test_scores(document: dict, person_id: int, origin_id: int, dwh_connection):
     """
     This function inserts accomplishment test scores into the DWH.
 
-    DWH tables: FACT_PRF_Accomplishment, REL_PRF_Person_Accomplishment
+    DWH tables: FACT_PRF_Accomplishment, TXT_PRF_Accomplishment, REL_PRF_Person_Accomplishment
 
     :param document: The document to convert.
     :param person_id: The ID of the person in the DWH.
-    :param dwh_engine: The DWH engine to use.
+    :param origin_id: The ID of the DIM_Origin table from the dwh.
+    :param dwh_connection: The DWH connection of the unit of work.
     """
     if document.get('accomplishment_test_scores'):
         for tst in document.get('accomplishment_test_scores'):
-            # Create and fill the table
-            tst_df = pd.DataFrame([{
+            # Insert the accomplishment
+            accomplishment_id = _insert_fact('FACT_PRF_Accomplishment', {
                 'type': 'test',
                 'name': tst.get('name'),
                 'institution': tst.get('score'),
                 'date': conv.convert_date(tst.get('date_on')),
-                'description': tst.get('description')
-            }])
-
-            # Insert DataFrame
-            tst_df.to_sql('FACT_PRF_Accomplishment', dwh_engine, if_exists='append', index=False)
-
-            # Create a relationship record
-            rel_df = pd.DataFrame([{
-                'idPerson': person_id,
-                'idAccomplishment': pd.read_sql_query("SELECT LAST_INSERT_ID()", dwh_engine).iloc[0, 0]
-            }])
+                'description': tst.get('description'),
+                'idOrigin': origin_id
+            }, dwh_connection)
 
             # Add the relationship record
-            rel_df.to_sql('REL_PRF_Person_Accomplishment', dwh_engine, if_exists='append', index=False)
+            _insert_row('REL_PRF_Person_Accomplishment', {
+                'idPerson': person_id,
+                'idAccomplishment': accomplishment_id,
+                'idOrigin': origin_id
+            }, dwh_connection)
 
 
-def accomplishment_courses(document: dict, person_id: int, dwh_engine):
+def accomplishment_courses(document: dict, person_id: int, origin_id: int, dwh_connection):
     """
     This function inserts accomplishment courses into the DWH.
 
-    DWH tables: FACT_PRF_Accomplishment, REL_PRF_Person_Accomplishment
+    DWH tables: FACT_PRF_Accomplishment, TXT_PRF_Accomplishment, REL_PRF_Person_Accomplishment
 
     :param document: The document to convert.
     :param person_id: The ID of the person in the DWH.
-    :param dwh_engine: The DWH engine to use.
+    :param origin_id: The ID of the DIM_Origin table from the dwh.
+    :param dwh_connection: The DWH connection of the unit of work.
     """
     if document.get('accomplishment_courses'):
         for crs in document.get('accomplishment_courses'):
-            # Create and fill the table
-            crs_df = pd.DataFrame([{
+            # Insert the accomplishment
+            accomplishment_id = _insert_fact('FACT_PRF_Accomplishment', {
                 'type': 'course',
                 'name': crs.get('name'),
                 'institution': crs.get('number'),
                 'date': None,
-                'description': None
-            }])
-
-            # Insert DataFrame
-            crs_df.to_sql('FACT_PRF_Accomplishment', dwh_engine, if_exists='append', index=False)
-
-            # Create a relationship record
-            rel_df = pd.DataFrame([{
-                'idPerson': person_id,
-                'idAccomplishment': pd.read_sql_query("SELECT LAST_INSERT_ID()", dwh_engine).iloc[0, 0]
-            }])
+                'description': None,
+                'idOrigin': origin_id
+            }, dwh_connection)
 
             # Add the relationship record
-            rel_df.to_sql('REL_PRF_Person_Accomplishment', dwh_engine, if_exists='append', index=False)
+            _insert_row('REL_PRF_Person_Accomplishment', {
+                'idPerson': person_id,
+                'idAccomplishment': accomplishment_id,
+                'idOrigin': origin_id
+            }, dwh_connection)
 
 
-def accomplishment_projects(document: dict, person_id: int, dwh_engine):
+def accomplishment_projects(document: dict, person_id: int, origin_id: int, dwh_connection):
     """
     This function inserts accomplishment projects into the DWH.
 
-    DWH tables: FACT_PRF_Qualification, DIM_PRF_Duration, REL_PRF_Person_Qualification
+    DWH tables: FACT_PRF_Qualification, TXT_PRF_Qualification, REL_PRF_Person_Qualification
 
     :param document: The document to convert.
     :param person_id: The ID of the person in the DWH.
-    :param dwh_engine: The DWH engine to use.
+    :param origin_id: The ID of the DIM_Origin table from the dwh.
+    :param dwh_connection: The DWH connection of the unit of work.
     """
     if document.get('accomplishment_projects') and len(document.get('accomplishment_projects')) > 0:
         for project in document.get('accomplishment_projects'):
-            # Create and fill the duration dimension table
-            if project.get('starts_at') or project.get('ends_at'):
-                duration_df = pd.DataFrame([{
-                    'startDate': conv.convert_date(project.get('starts_at')),
-                    'endDate': conv.convert_date(project.get('ends_at'))
-                }])
-                # Check if matching records exist
-                query = """
-                    SELECT id
-                    FROM DIM_PRF_Duration
-                    WHERE startDate = %(startDate)s
-                    AND endDate = %(endDate)s
-                """
-                result = pd.read_sql_query(query, dwh_engine, params=duration_df.iloc[0].to_dict())
-
-                # If matching records found, use existing id
-                if not result.empty:
-                    duration_id = result.iloc[0]['id']
-                else:
-                    # If no matching records found, insert a new record and use its id
-                    duration_df.to_sql('DIM_PRF_Duration', dwh_engine, if_exists='append', index=False)
-                    duration_id = pd.read_sql_query("SELECT LAST_INSERT_ID()", dwh_engine).iloc[0, 0]
-            else:
-                duration_id = None
-
-            # Convert accomplishment_projects to FACT_PRF_Qualification table
-            project_df = conv.accomplishment_projects(project, duration_id)
+            # Convert accomplishment_projects to a FACT_PRF_Qualification row
+            project_row = conv.accomplishment_projects(project)
 
             # Insert certification data
-            project_df.to_sql('FACT_PRF_Qualification', dwh_engine, if_exists='append', index=False)
-
-            # Create a relationship record
-            rel_df = pd.DataFrame([{
-                'idPerson': person_id,
-                'idQualification': pd.read_sql_query("SELECT LAST_INSERT_ID()", dwh_engine).iloc[0, 0]
-            }])
+            qualification_id = _insert_fact('FACT_PRF_Qualification', {**project_row._asdict(), 'idOrigin': origin_id}, dwh_connection)
 
             # Add the relationship record
-            rel_df.to_sql('REL_PRF_Person_Qualification', dwh_engine, if_exists='append', index=False)
+            _insert_row('REL_PRF_Person_Qualification', {
+                'idPerson': person_id,
+                'idQualification': qualification_id,
+                'idOrigin': origin_id
+            }, dwh_connection)
@@ -0,0 +1,178 @@
+"""
+This module holds the loader of the related profiles (people_also_viewed and similarly_named_profiles).
+
+A related person is identified by a fixed-width key, the MD5 hash of its name and location, which is
+unique in DIM_PRF_Related (migrations/03_related_profiles.sql). The related people of a whole batch
+are de-duplicated in memory and resolved with one indexed SELECT per chunk, the new ones are inserted
+with a single multi-row INSERT IGNORE. The edges are written with INSERT IGNORE on their composite key.
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+from dwh.linkedin_data import metrics
+
+# Attributes holding related profiles and the type of their edges
+RELATIONS = {
+    'people_also_viewed': 'viewed',
+    'similarly_named_profiles': 'similar'
+}
+
+# Columns of the related people, the rows of new members are tuples in this order
+COLUMNS = ('relatedKey', 'name', 'location', 'summary')
+
+# Maximum number of related people kept in memory
+MAX_SIZE = 500000
+
+# Number of keys looked up per SELECT statement
+LOOKUP_CHUNK_SIZE = 1000
+
+
+def related_key(name: str | None, location: str | None) -> bytes:
+    """
+    This function returns the fixed-width key of a related person.
+    The key is compared case-insensitively and NULL-safe, like the expression filling it in the migration.
+
+    :param name: The name of the related person.
+    :param location: The location of the related person.
+    """
+    parts = ('\0' if value is None else str(value).lower() for value in (name, location))
+    return hashlib.md5('\x1f'.join(parts).encode('utf-8')).digest()
+
+
+def related_people(document: dict, attributes=tuple(RELATIONS)):
+    """
+    This function converts the related profiles of a document.
+
+    :param document: The document to convert.
+    :param attributes: The attributes to convert.
+    :return: A generator of (type, key, (name, location, summary)) tuples.
+    """
+    for attribute in attributes:
+        for ppl in document.get(attribute) or []:
+            yield (
+                RELATIONS[attribute],
+                related_key(ppl.get('name'), ppl.get('location')),
+                (ppl.get('name'), ppl.get('location'), ppl.get('summary'))
+            )
+
+
+class RelatedCache:
+    """
+    This class resolves the keys of related people to the ids of their DIM_PRF_Related rows.
+
+    Like the dimension cache, it is shared by all worker threads and keeps the most recently used
+    members in memory. New members are committed right away, concurrent inserts of the same person
+    are absorbed by the unique key.
+
+    DWH table: DIM_PRF_Related
+    """
+
+    def __init__(self, dwh_engine, max_size: int | None = MAX_SIZE):
+        """
+        :param dwh_engine: The DWH engine to use.
+        :param max_size: Maximum number of related people kept in memory, None for no limit.
+        """
+        self._dwh_engine = dwh_engine
+        self._max_size = max_size
+        self._lock = threading.Lock()
+        self._members = OrderedDict()  # Key -> id, least recently used first
+
+    def resolve_many(self, people: dict[bytes, tuple]) -> dict[bytes, int]:
+        """
+        This function resolves related people to their ids and inserts the missing ones.
+
+        :param people: The related people as (name, location, summary), mapped by their key.
+        :return: A dictionary mapping the keys to the ids.
+        """
+        ids = {}
+        with self._lock:
+            for key in people:
+                if key in self._members:
+                    self._members.move_to_end(key)
+                    ids[key] = self._members[key]
+        metrics.inc('related_hits_total', len(ids))
+
+        missing = {key: person for key, person in people.items() if key not in ids}
+        if missing:
+            loaded = self._load(missing)
+            ids.update(loaded)
+            with self._lock:
+                self._members.update(loaded)
+                while self._max_size is not None and len(self._members) > self._max_size:
+                    self._members.popitem(last=False)
+
+        return ids
+
+    def _load(self, people: dict[bytes, tuple]) -> dict[bytes, int]:
+        """
+        This function looks up related people in the DWH and inserts the missing ones.
+
+        :param people: The related people as (name, location, summary), mapped by their key.
+        :return: A dictionary mapping the keys to the ids.
+        """
+        with self._dwh_engine.begin() as connection:
+            found = self._select(connection, list(people))
+
+            # Insert the new people at once, people inserted by another process in the meantime are skipped
+            new = [(key, *person) for key, person in people.items() if key not in found]
+            if new:
+                connection.exec_driver_sql(
+                    f"INSERT IGNORE INTO DIM_PRF_Related ({', '.join(COLUMNS)}) VALUES ({', '.join(['%s'] * len(COLUMNS))})",
+                    new
+                )
+                found.update(self._select(connection, [row[0] for row in new]))
+                metrics.inc('related_inserts_total', len(new))
+
+        return found
+
+    @staticmethod
+    def _select(connection, keys: list[bytes]) -> dict[bytes, int]:
+        """
+        This function looks up the ids of related people in chunks.
+
+        :param connection: The DWH connection to use.
+        :param keys: The keys of the related people.
+        :return: A dictionary mapping the keys of the existing people to their ids.
+        """
+        found = {}
+        for start in range(0, len(keys), LOOKUP_CHUNK_SIZE):
+            chunk = keys[start:start + LOOKUP_CHUNK_SIZE]
+            query = f"SELECT relatedKey, id FROM DIM_PRF_Related WHERE relatedKey IN ({', '.join(['%s'] * len(chunk))})"
+            found.update((bytes(key), related_id) for key, related_id in connection.exec_driver_sql(query, tuple(chunk)))
+        return found
+
+
+def edge_rows(persons, related_cache: RelatedCache, origin_id: int, attributes=tuple(RELATIONS)) -> list[tuple]:
+    """
+    This function converts the related profiles of a batch into the rows of REL_PRF_Person_Related.
+    The related people of all documents are resolved at once and every edge is returned only once.
+
+    :param persons: The (person ID, document) pairs of the batch.
+    :param related_cache: The related cache used to resolve the related people.
+    :param origin_id: The ID of the DIM_Origin table from the dwh.
+    :param attributes: The attributes to convert.
+    :return: The (idPerson, idRelated, type, idOrigin) rows.
+    """
+    people = {}
+    edges = []
+    for person_id, document in persons:
+        for relation, key, person in related_people(document, attributes):
+            people.setdefault(key, person)
+            edges.append((person_id, key, relation))
+
+    ids = related_cache.resolve_many(people) if people else {}
+    return list(dict.fromkeys((person_id, ids[key], relation, origin_id) for person_id, key, relation in edges))
+
+
+def write_edges(connection, rows: list[tuple]):
+    """
+    This function writes edges into REL_PRF_Person_Related, existing edges are skipped.
+
+    :param connection: The DWH connection to use.
+    :param rows: The (idPerson, idRelated, type, idOrigin) rows.
+    """
+    if rows:
+        connection.exec_driver_sql(
+            "INSERT IGNORE INTO REL_PRF_Person_Related (idPerson, idRelated, type, idOrigin) VALUES (%s, %s, %s, %s)",
+            rows
+        )
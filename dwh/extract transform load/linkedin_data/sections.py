@@ -0,0 +1,224 @@
+"""
+This module holds the section writer, which writes the sections of the profiles of a transaction in parallel.
+
+The row by row import inserts the location and the person of every document on the connection of the unit
+of work. The sections of the profiles (recommendations, related profiles, traits, qualifications and
+accomplishments) write disjoint tables without foreign keys, so they do not have to wait for each other:
+the writer collects the persons of a transaction and writes every section group on its own connection
+when the transaction is committed. The slowest section group decides the latency of the transaction
+instead of the sum of all sections.
+
+The section connections run XA transactions. They are all prepared before any of them is committed, and the
+unit of work commits the persons and the checkpoint only after all sections have been committed, so a failed
+section rolls back the persons and the checkpoint of its transaction. Only if committing an already prepared
+section fails (e.g. the server is lost in between), the section groups committed before it keep the rows of
+persons that are rolled back. These rows reference no person and are written again with the new persons.
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dwh.linkedin_data import metrics
+from dwh.linkedin_data.profiles import insert
+
+# Section inserters grouped by the tables they write, as (inserter, cache passed to it)
+SECTION_GROUPS = {
+    # FACT_PRF_Recommendation
+    'recommendations': (
+        (insert.recommendations, None),
+    ),
+    # REL_PRF_Person_Related
+    'related': (
+        (insert.people_also_viewed, 'related_cache'),
+        (insert.similarly_named_profiles, 'related_cache')
+    ),
+    # REL_PRF_Person_Language, REL_PRF_Person_Trait, REL_PRF_Person_Group
+    'traits': (
+        (insert.languages, 'dimension_cache'),
+        (insert.skills, 'dimension_cache'),
+        (insert.interests, 'dimension_cache'),
+        (insert.groups, 'dimension_cache')
+    ),
+    # FACT_PRF_Qualification, TXT_PRF_Qualification, REL_PRF_Person_Qualification
+    'qualifications': (
+        (insert.experiences, 'company_index'),
+        (insert.education, None),
+        (insert.volunteer_work, None),
+        (insert.certifications, None),
+        (insert.accomplishment_projects, None)
+    ),
+    # FACT_PRF_Accomplishment, TXT_PRF_Accomplishment, REL_PRF_Person_Accomplishment
+    'accomplishments': (
+        (insert.activities, None),
+        (insert.articles, None),
+        (insert.accomplishment_organisations, None),
+        (insert.accomplishment_publications, None),
+        (insert.accomplishment_honors_awards, None),
+        (insert.accomplishment_patents, None),
+        (insert.accomplishment_test_scores, None),
+        (insert.accomplishment_courses, None)
+    )
+}
+
+
+class SectionWriter:
+    """
+    This class writes the sections of the persons of a transaction, one section group per connection.
+
+    Every cache is only used by one section group, so the groups do not share any state but the metrics.
+    A failed section group rolls back the sections of all groups, the unit of work rolls back the persons.
+    The unit of work commits the sections (prepare, then commit) before it commits the persons.
+
+    Usage:
+        sections = SectionWriter(dwh_engine, origin_id, dimension_cache, related_cache)
+        with UnitOfWork(dwh_engine, commit_interval=100, sections=sections) as uow:
+            for doc in documents:
+                with uow.document(doc['_id']):
+                    person_id = insert.person(doc, location_id, origin_id, uow.connection)
+                    sections.add(doc, person_id)
+        sections.close()
+    """
+
+    def __init__(
+            self,
+            dwh_engine,
+            origin_id: int,
+            dimension_cache,
+            related_cache=None,
+            company_index=None,
+            groups: dict = SECTION_GROUPS
+           ):
+        """
+        :param dwh_engine: The DWH engine to use, its pool has to hold a connection per section group.
+        :param origin_id: The ID of the DIM_Origin table from the dwh.
+        :param dimension_cache: The dimension cache used to resolve the dimension members.
+        :param related_cache: The related cache used to resolve the related profiles.
+        :param company_index: The company index used to link the experiences to their companies.
+        :param groups: The section inserters grouped by connection.
+        """
+        self._dwh_engine = dwh_engine
+        self._origin_id = origin_id
+        self._caches = {
+            None: (),
+            'dimension_cache': (dimension_cache,),
+            'related_cache': (related_cache,),
+            'company_index': (company_index,)
+        }
+        self._groups = groups
+        self._executor = ThreadPoolExecutor(max_workers=len(groups), thread_name_prefix='section')
+
+        # Documents of the current transaction as (document, person id) and the prepared section transactions
+        self.pending = []
+        self._prepared = []
+
+        # Seconds spent per section group and waited for all of them
+        self.seconds = {name: 0.0 for name in groups}
+        self.waited = 0.0
+
+    def add(self, document: dict, person_id: int):
+        """
+        This function adds a person, whose sections are written with the current transaction.
+
+        :param document: The document of the person.
+        :param person_id: The id of the person in FACT_PRF_Person.
+        """
+        self.pending.append((document, person_id))
+
+    def prepare(self):
+        """
+        This function writes the sections of the pending persons in parallel and prepares their transactions.
+        The first error is raised after the sections of all groups have been rolled back.
+        """
+        if not self.pending:
+            return
+
+        start = time.perf_counter()
+        futures = [
+            self._executor.submit(self._write_group, name, inserters, self.pending)
+            for name, inserters in self._groups.items()
+        ]
+
+        # Wait for all groups, a failed group must not leave the others running
+        error = None
+        for future in futures:
+            try:
+                self._prepared.append(future.result())
+            except Exception as e:
+                error = error or e
+        self.waited += time.perf_counter() - start
+        self.pending = []
+
+        if error is not None:
+            self.rollback()
+            raise error
+
+    def commit(self):
+        """
+        This function commits the prepared section transactions, before the unit of work is committed.
+        The first error is raised after the section transactions not committed yet have been rolled back.
+        """
+        while self._prepared:
+            connection, transaction = self._prepared[0]
+            try:
+                transaction.commit()
+            except Exception:
+                self.rollback()
+                raise
+            self._prepared.pop(0)
+            connection.close()
+
+    def rollback(self):
+        """
+        This function rolls back the pending and prepared sections, e.g. if the unit of work failed to commit.
+        """
+        for connection, transaction in self._prepared:
+            try:
+                transaction.rollback()
+            finally:
+                connection.close()
+        self._prepared = []
+        self.pending = []
+
+    def close(self):
+        """
+        This function rolls back what has not been committed and stops the threads of the section groups.
+        """
+        self.rollback()
+        self._executor.shutdown()
+
+    def report(self) -> str:
+        """
+        This function returns a printable summary of the time spent per section group.
+        """
+        lines = [f"{name}: {seconds:.1f}s" for name, seconds in self.seconds.items()]
+        lines.append(f"sum of the sections {sum(self.seconds.values()):.1f}s, waited {self.waited:.1f}s")
+        return '\n'.join(lines)
+
+    def _write_group(self, name: str, inserters: tuple, documents: list[tuple]) -> tuple:
+        """
+        This function writes one section group of the documents on its own connection within an XA transaction.
+
+        :param name: The name of the section group.
+        :param inserters: The section inserters of the group, as (inserter, cache passed to it).
+        :param documents: The documents to write, as (document, person id).
+        :return: The connection and its prepared transaction.
+        """
+        start = time.perf_counter()
+        connection = self._dwh_engine.connect()
+        try:
+            transaction = connection.begin_twophase()
+            try:
+                with metrics.timer(f'section.{name}'):
+                    for document, person_id in documents:
+                        for inserter, cache in inserters:
+                            with metrics.timer(f'insert.{inserter.__name__}'):
+                                inserter(document, person_id, self._origin_id, connection, *self._caches[cache])
+                    transaction.prepare()
+            except Exception:
+                transaction.rollback()
+                raise
+        except Exception:
+            connection.close()
+            raise
+        finally:
+            self.seconds[name] += time.perf_counter() - start
+
+        return connection, transaction
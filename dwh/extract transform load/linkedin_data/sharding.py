@@ -0,0 +1,78 @@
+"""
+This module holds the functions used to split the MongoDB collections into _id range shards.
+
+The split points are taken from a random sample of the _id values, so every shard holds roughly
+the same number of documents and can be imported independently by its own worker process.
+"""
+import math
+
+# Number of sampled _id values per shard used to estimate the split points
+SAMPLES_PER_SHARD = 20
+
+
+def range_filter(lower=None, upper=None, after=None) -> dict:
+    """
+    This function returns the MongoDB filter selecting the documents of an _id range.
+
+    :param lower: The first _id of the range (inclusive), None for no lower bound.
+    :param upper: The end of the range (exclusive), None for no upper bound.
+    :param after: The last _id already imported, replaces the lower bound to resume a range.
+    """
+    id_filter = {}
+    if after is not None:
+        id_filter['$gt'] = after
+    elif lower is not None:
+        id_filter['$gte'] = lower
+    if upper is not None:
+        id_filter['$lt'] = upper
+
+    return {'_id': id_filter} if id_filter else {}
+
+
+def split_points(collection, shard_count: int) -> list:
+    """
+    This function estimates the _id values that split a collection into shards of equal size.
+
+    :param collection: The MongoDB collection to split.
+    :param shard_count: The number of shards to create.
+    :return: The sorted split points (at most shard_count - 1 values).
+    """
+    if shard_count <= 1:
+        return []
+
+    # Sample the _id values and take the quantiles as split points
+    sample = collection.aggregate([
+        {'$sample': {'size': shard_count * SAMPLES_PER_SHARD}},
+        {'$project': {'_id': 1}}
+    ])
+    ids = sorted(doc['_id'] for doc in sample)
+    points = [ids[i * len(ids) // shard_count] for i in range(1, shard_count) if ids]
+
+    # Remove duplicates that occur with small samples
+    return sorted(set(points))
+
+
+def collection_shards(collection, collection_str: str, id_origin: int, shard_size: int) -> list[dict]:
+    """
+    This function splits a collection into _id range shards.
+
+    :param collection: The MongoDB collection to split.
+    :param collection_str: The name of the MongoDB collection.
+    :param id_origin: The ID of the DIM_Origin table from the dwh.
+    :param shard_size: The desired number of documents per shard.
+    :return: A list of shards with the collection, origin, bounds and estimated size.
+    """
+    total = collection.estimated_document_count()
+    points = split_points(collection, math.ceil(total / shard_size))
+    bounds = [None, *points, None]
+
+    return [
+        {
+            'collection': collection_str,
+            'id_origin': id_origin,
+            'lower': lower,
+            'upper': upper,
+            'size': total // (len(bounds) - 1)
+        }
+        for lower, upper in zip(bounds[:-1], bounds[1:])
+    ]
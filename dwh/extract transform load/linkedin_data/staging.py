@@ -0,0 +1,272 @@
+"""
+This module holds the functions used to stage converted rows on disk and bulk load them into the DWH.
+
+Rows are written into tab separated files per table, in the format expected by MySQL's
+LOAD DATA LOCAL INFILE. All keys are assigned on the client side before the rows are staged,
+so the files do not depend on each other and can be loaded in parallel. Only the files of the commit table
+(e.g. FACT_PRF_Person, whose rows mark a document as imported) are loaded last, once all other files have
+been loaded, and a failed load removes the rows of the files loaded before it. A failed shard therefore
+leaves no rows behind and is staged and loaded again completely by the next run.
+
+The DWH engine used for loading needs local_infile enabled, e.g.:
+    create_engine(url, connect_args={'local_infile': True})
+"""
+import os
+import threading
+import concurrent.futures
+import datetime
+
+# Size in bytes after which a staging file is closed and a new one is started
+MAX_FILE_SIZE = 256 * 1024 * 1024
+
+# Characters escaped within a field, as expected by LOAD DATA with its default ESCAPED BY '\\'
+ESCAPES = str.maketrans({'\\': '\\\\', '\t': '\\t', '\n': '\\n', '\r': '\\r', '\0': '\\0'})
+
+
+def escape(value) -> str:
+    """
+    This function converts a value into a field of a staging file.
+
+    :param value: The value to convert.
+    """
+    if value is None:
+        return '\\N'
+    if isinstance(value, bool):
+        return '1' if value else '0'
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat(sep=' ') if isinstance(value, datetime.datetime) else value.isoformat()
+    return str(value).translate(ESCAPES)
+
+
+class StagingWriter:
+    """
+    This class streams rows into tab separated files per table, rotated by size.
+
+    Usage:
+        with StagingWriter(directory, bulk.COLUMNS) as writer:
+            writer.write('FACT_PRF_Person', rows)
+        staging.load_files(dwh_engine, writer.files, bulk.COLUMNS, commit_table='FACT_PRF_Person')
+    """
+
+    def __init__(self, directory: str, columns: dict, prefix: str = '', max_file_size: int = MAX_FILE_SIZE):
+        """
+        :param directory: The directory the files are written to.
+        :param columns: The columns written per table, the rows are tuples in this order.
+        :param prefix: Prefix of the file names, use a different one per writer sharing a directory.
+        :param max_file_size: Size in bytes after which a file is rotated.
+        """
+        self._directory = directory
+        self._columns = columns
+        self._prefix = prefix
+        self._max_file_size = max_file_size
+        self._lock = threading.Lock()
+        self._open = {}  # Table name -> (file, path)
+        self._sequence = {}  # Table name -> number of files started
+        self.files = []  # (table, path) of all closed files
+        self.rows = {}  # Table name -> number of staged rows
+
+        os.makedirs(directory, exist_ok=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def write(self, table: str, rows: list[tuple]):
+        """
+        This function appends rows to the current file of a table.
+
+        :param table: The name of the table.
+        :param rows: The rows to stage, in the column order of the table.
+        """
+        if not rows:
+            return
+
+        data = ''.join('\t'.join(escape(value) for value in row) + '\n' for row in rows)
+        with self._lock:
+            file, path = self._open.get(table) or self._start(table)
+            file.write(data)
+            self.rows[table] = self.rows.get(table, 0) + len(rows)
+
+            # Rotate the file once it is large enough
+            if file.tell() >= self._max_file_size:
+                self._rotate(table)
+
+    def close(self) -> list[tuple[str, str]]:
+        """
+        This function closes all open files.
+
+        :return: The (table, path) of all staged files.
+        """
+        with self._lock:
+            for table in list(self._open):
+                self._rotate(table)
+        return self.files
+
+    def _start(self, table: str) -> tuple:
+        """
+        This function opens the next file of a table.
+
+        :param table: The name of the table.
+        """
+        sequence = self._sequence.get(table, 0)
+        self._sequence[table] = sequence + 1
+        path = os.path.join(self._directory, f"{table}.{self._prefix}{sequence:05d}.tsv")
+        self._open[table] = open(path, 'w', encoding='utf-8', newline='\n'), path
+        return self._open[table]
+
+    def _rotate(self, table: str):
+        """
+        This function closes the current file of a table, the next write starts a new one.
+
+        :param table: The name of the table.
+        """
+        file, path = self._open.pop(table)
+        file.close()
+        self.files.append((table, path))
+
+
+def load_file(dwh_engine, table: str, columns: tuple, path: str) -> int:
+    """
+    This function loads a staging file into its table with LOAD DATA LOCAL INFILE.
+    Foreign key checks are disabled for the session, the keys are consistent by construction.
+
+    With LOCAL, MySQL cannot abort a load on a duplicate key, it skips the row (IGNORE) and turns errors like
+    too long values into warnings. The load therefore says IGNORE explicitly and fails if it left any warning,
+    which rolls back the rows of the file. A duplicate means a document was loaded twice (the batches skip the
+    documents that are already imported before they are staged) or a key collision, never a row to skip.
+
+    :param dwh_engine: The DWH engine to use (with local_infile enabled).
+    :param table: The name of the table.
+    :param columns: The columns of the file.
+    :param path: The path of the file.
+    :return: The number of loaded rows.
+    """
+    query = f"""
+        LOAD DATA LOCAL INFILE %s
+        IGNORE INTO TABLE {table}
+        CHARACTER SET utf8mb4
+        FIELDS TERMINATED BY '\\t' ESCAPED BY '\\\\'
+        LINES TERMINATED BY '\\n'
+        ({', '.join(columns)})
+    """
+    with dwh_engine.begin() as connection:
+        connection.exec_driver_sql("SET SESSION foreign_key_checks = 0")
+        try:
+            count = connection.exec_driver_sql(query, (os.path.abspath(path),)).rowcount
+
+            # Skipped or changed rows, raising rolls back the load of the file
+            warnings = connection.exec_driver_sql("SHOW COUNT(*) WARNINGS").scalar()
+            if warnings:
+                examples = [row[2] for row in connection.exec_driver_sql("SHOW WARNINGS LIMIT 3")]
+                raise RuntimeError(f"{warnings} rows of {path} were skipped or changed loading {table}: {examples}")
+            return count
+        finally:
+            connection.exec_driver_sql("SET SESSION foreign_key_checks = 1")
+
+
+def unload_file(dwh_engine, table: str, column: str, path: str, batch_size: int = 10000) -> int:
+    """
+    This function deletes the rows of a loaded staging file from its table again.
+    The rows are found by the key in their first column, which is assigned by the key allocator when the
+    rows are staged (the id of the row or of its person or company), so only the rows of the file are deleted.
+
+    :param dwh_engine: The DWH engine to use.
+    :param table: The name of the table.
+    :param column: The first column of the file.
+    :param path: The path of the file.
+    :param batch_size: Number of keys deleted per statement.
+    :return: The number of deleted rows.
+    """
+    with open(path, encoding='utf-8', newline='\n') as file:
+        keys = sorted({int(line.split('\t', 1)[0]) for line in file if line.strip()})
+
+    deleted = 0
+    with dwh_engine.begin() as connection:
+        for start in range(0, len(keys), batch_size):
+            batch = keys[start:start + batch_size]
+            query = f"DELETE FROM {table} WHERE {column} IN ({', '.join(['%s'] * len(batch))})"
+            deleted += connection.exec_driver_sql(query, tuple(batch)).rowcount
+    return deleted
+
+
+def load_files(
+        dwh_engine,
+        files: list[tuple[str, str]],
+        columns: dict,
+        worker_count: int = 4,
+        remove: bool = True,
+        target_tables: dict | None = None,
+        commit_table: str | None = None
+       ) -> dict[str, int]:
+    """
+    This function loads staging files in parallel, each file on its own connection.
+
+    The files of the commit table are loaded after all other files have been loaded. If a file fails (including
+    a file with duplicate keys, see load_file), the rows of the files loaded so far are deleted again and the
+    first error is raised. The files are kept on disk
+    until all of them have been loaded.
+
+    :param dwh_engine: The DWH engine to use (with local_infile enabled).
+    :param files: The (table, path) of the files to load.
+    :param columns: The columns written per table.
+    :param worker_count: Number of files loaded at the same time.
+    :param remove: Whether to delete the files after all of them have been loaded.
+    :param target_tables: The tables loaded instead, mapped by table name (e.g. the exchange tables of a reload).
+    :param commit_table: The table whose rows mark the documents as imported (e.g. FACT_PRF_Person), loaded last.
+    :return: The number of loaded rows per table.
+    """
+    target_tables = target_tables or {}
+    loaded = {}
+    loaded_files = []
+    phases = (
+        [(table, path) for table, path in files if table != commit_table],
+        [(table, path) for table, path in files if table == commit_table]
+    )
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=worker_count) as executor:
+        for phase in phases:
+            futures = {
+                executor.submit(load_file, dwh_engine, target_tables.get(table, table), columns[table], path):
+                    (table, path)
+                for table, path in phase
+            }
+
+            # Wait for all files of the phase, so the rows of every loaded file are known
+            error = None
+            for future in concurrent.futures.as_completed(futures):
+                table, path = futures[future]
+                try:
+                    loaded[table] = loaded.get(table, 0) + future.result()
+                    loaded_files.append((table, path))
+                except Exception as e:
+                    error = error or e
+
+            if error is not None:
+                _unload_files(dwh_engine, loaded_files, columns, target_tables)
+                raise error
+
+    if remove:
+        for _, path in files:
+            os.remove(path)
+
+    return loaded
+
+
+def _unload_files(dwh_engine, files: list[tuple[str, str]], columns: dict, target_tables: dict):
+    """
+    This function deletes the rows of loaded staging files again, after another file has failed to load.
+    Errors are reported instead of raised, the error of the failed file is raised by the caller.
+
+    :param dwh_engine: The DWH engine to use.
+    :param files: The (table, path) of the loaded files.
+    :param columns: The columns written per table.
+    :param target_tables: The tables loaded instead, mapped by table name.
+    """
+    for table, path in files:
+        try:
+            unload_file(dwh_engine, target_tables.get(table, table), columns[table][0], path)
+        except Exception as e:
+            print(f"Error: removing the rows of {path} from {table}, delete them before loading the shard again")
+            print(e)
@@ -0,0 +1,153 @@
+"""
+Tests of the conversion of profile batches into rows per table (profiles/bulk.py).
+
+Run from the repository root, conftest.py registers the dwh package:
+    python -m pytest "dwh/extract transform load"
+"""
+import unittest
+from dwh.linkedin_data.profiles import bulk
+from dwh.linkedin_data.profiles import convert as conv
+
+# Origin of the converted documents
+ORIGIN = 7
+
+
+class FakeEngine:
+    """
+    This class stands in for the DWH engine, the given documents have already been imported.
+    """
+
+    def __init__(self, loaded: set):
+        """
+        :param loaded: The _ids of the imported documents.
+        """
+        self.loaded = loaded
+        self.queried = []
+
+    def connect(self):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+    def exec_driver_sql(self, query: str, parameters: tuple):
+        self.queried.extend(parameters)
+        return [(doc_id,) for doc_id in parameters if doc_id in self.loaded]
+
+
+class FakeKeyAllocator:
+    """
+    This class stands in for the key allocator, the keys of every table start at 1.
+    """
+
+    def __init__(self):
+        self.next_keys = {}
+
+    def reserve(self, table: str, count: int) -> range:
+        first = self.next_keys.get(table, 1)
+        self.next_keys[table] = first + count
+        return range(first, first + count)
+
+
+class FakeDimensionCache:
+    """
+    This class stands in for the dimension cache, the members of every table are numbered from 1 in their order.
+    """
+
+    def __init__(self):
+        self.members = {}
+
+    def resolve_many(self, table: str, keys: list) -> dict:
+        members = self.members.setdefault(table, {})
+        for key in keys:
+            members.setdefault(key, len(members) + 1)
+        return dict(members)
+
+
+def profile(doc_id: str, **attributes) -> dict:
+    """
+    This function returns a profile document with a single experience, overridden by the given attributes.
+
+    :param doc_id: The _id of the document.
+    :param attributes: The attributes of the document.
+    """
+    return {
+        '_id': doc_id,
+        'first_name': 'Ada',
+        'last_name': 'Lovelace',
+        'full_name': 'Ada Lovelace',
+        'country': 'GB',
+        'country_full_name': 'United Kingdom',
+        'city': 'London',
+        'experiences': [{'title': 'Analyst', 'company': 'Engines', 'starts_at': {'year': 1985, 'month': 9}}],
+        **attributes
+    }
+
+
+class ConvertDocumentsTest(unittest.TestCase):
+    """
+    This class tests converting a batch of documents into rows with all keys assigned.
+    """
+
+    def convert(self, documents: list[dict], loaded: set = frozenset()):
+        self.engine = FakeEngine(loaded)
+        self.dimension_cache = FakeDimensionCache()
+        return bulk.convert_documents(documents, ORIGIN, self.engine, FakeKeyAllocator(), self.dimension_cache)
+
+    def test_person_row(self):
+        count, rows = self.convert([profile('a1', summary='Poet', connections=500)])
+        self.assertEqual(count, 1)
+        self.assertEqual(rows['FACT_PRF_Person'], [(
+            1, 1, 'Ada', 'Lovelace', 'Ada Lovelace', None, None, 4, 500, None, None, None, None, 0, 0, 'a1', ORIGIN
+        )])
+        self.assertEqual(len(rows['FACT_PRF_Person'][0]), len(bulk.COLUMNS['FACT_PRF_Person']))
+        self.assertEqual(rows['TXT_PRF_Summary'], [(1, 'Poet', ORIGIN)])
+        self.assertEqual(
+            self.dimension_cache.members['DIM_PRF_Location'], {conv.Location('GB', 'United Kingdom', None, 'London'): 1}
+        )
+
+    def test_qualifications_are_linked_to_their_person(self):
+        _, rows = self.convert([
+            profile('a1', education=[{'school': 'Home', 'degree_name': 'Mathematics', 'description': 'Tutored'}]),
+            profile('a2')
+        ])
+        self.assertEqual(rows['FACT_PRF_Qualification'], [
+            (1, 19850900, None, 'experience', 'Analyst', 'Engines', None, ORIGIN, None),
+            (2, None, None, 'education', 'Mathematics', 'Home', 7, ORIGIN, None),
+            (3, 19850900, None, 'experience', 'Analyst', 'Engines', None, ORIGIN, None)
+        ])
+        self.assertEqual(rows['REL_PRF_Person_Qualification'], [(1, 1, ORIGIN), (1, 2, ORIGIN), (2, 3, ORIGIN)])
+        self.assertEqual(rows['TXT_PRF_Qualification'], [(2, 'Tutored', ORIGIN)])
+
+    def test_dimension_members_are_shared(self):
+        _, rows = self.convert([
+            profile('a1', skills=['Python'], interests=['Python'], languages=['English']),
+            profile('a2', skills=['Python'], languages=['English', 'French'])
+        ])
+        self.assertEqual(rows['REL_PRF_Person_Trait'], [(1, 1, ORIGIN), (1, 2, ORIGIN), (2, 1, ORIGIN)])
+        self.assertEqual(rows['REL_PRF_Person_Language'], [(1, 1, ORIGIN), (2, 1, ORIGIN), (2, 2, ORIGIN)])
+
+    def test_accomplishments(self):
+        _, rows = self.convert([profile('a1', activities=[{'title': 'Notes', 'activity_status': 'Shared by'}])])
+        self.assertEqual(rows['FACT_PRF_Accomplishment'], [(1, 'activity', 'Notes', None, None, 9, ORIGIN)])
+        self.assertEqual(rows['TXT_PRF_Accomplishment'], [(1, 'Shared by', ORIGIN)])
+        self.assertEqual(rows['REL_PRF_Person_Accomplishment'], [(1, 1, ORIGIN)])
+
+    def test_skipped_documents(self):
+        count, rows = self.convert([profile('a1'), profile('a2', experiences=[]), profile('a3')], loaded={'a1'})
+        self.assertEqual(count, 1)
+        self.assertEqual([row[-2] for row in rows['FACT_PRF_Person']], ['a3'])
+        self.assertEqual(self.engine.queried, ['a1', 'a3'])
+
+    def test_rows_match_the_columns(self):
+        _, rows = self.convert([profile('a1', skills=['Python'], summary='Poet')])
+        for table, table_rows in rows.items():
+            for row in table_rows:
+                self.assertEqual(len(row), len(bulk.COLUMNS[table]), table)
+
+
+if __name__ == '__main__':
+    unittest.main()
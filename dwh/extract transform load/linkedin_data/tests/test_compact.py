@@ -0,0 +1,51 @@
+"""
+Tests of the summary of the dimension compactions (compact.py).
+
+Run from the repository root, conftest.py registers the dwh package:
+    python -m pytest "dwh/extract transform load"
+"""
+import unittest
+from dwh.linkedin_data import compact
+
+
+class ReportTest(unittest.TestCase):
+    """
+    This class tests the printable summary of compactions.
+    """
+
+    def test_summary_per_table(self):
+        results = [
+            {
+                'table': 'DIM_PRF_Trait', 'before': 200, 'after': 150, 'merged': 50, 'groups': 20,
+                'rewritten': {'REL_PRF_Person_Trait': 70}, 'removed': {'REL_PRF_Person_Trait': 5}
+            },
+            {
+                'table': 'DIM_PRF_Location', 'before': 10, 'after': 10, 'merged': 0, 'groups': 0,
+                'rewritten': {'FACT_PRF_Person': 0}, 'removed': {}
+            }
+        ]
+        self.assertEqual(compact.report(results).splitlines(), [
+            'DIM_PRF_Trait: 200 -> 150 members, 50 rows reclaimed (25.0%), 50 duplicates in 20 groups '
+            '(REL_PRF_Person_Trait: 70 rewritten, 5 duplicate relations removed)',
+            'DIM_PRF_Location: 10 -> 10 members, 0 rows reclaimed (0.0%), 0 duplicates in 0 groups '
+            '(FACT_PRF_Person: 0 rewritten)'
+        ])
+
+    def test_empty_table(self):
+        results = [
+            {
+                'table': 'DIM_PRF_Group', 'before': 0, 'after': 0, 'merged': 0, 'groups': 0,
+                'rewritten': {}, 'removed': {}
+            }
+        ]
+        self.assertEqual(
+            compact.report(results),
+            'DIM_PRF_Group: 0 -> 0 members, 0 rows reclaimed (0.0%), 0 duplicates in 0 groups ()'
+        )
+
+    def test_no_compactions(self):
+        self.assertEqual(compact.report([]), '')
+
+
+if __name__ == '__main__':
+    unittest.main()
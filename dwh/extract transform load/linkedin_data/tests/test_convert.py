@@ -0,0 +1,41 @@
+"""
+Tests of the conversion of the profile documents (profiles/convert.py).
+
+Run from the repository root, conftest.py registers the dwh package:
+    python -m pytest "dwh/extract transform load"
+"""
+import unittest
+from dwh.linkedin_data.profiles.convert import date_key
+
+
+class DateKeyTest(unittest.TestCase):
+    """
+    This class tests the DIM_Date keys of the qualification dates.
+    """
+
+    def test_day(self):
+        self.assertEqual(date_key({'year': 2020, 'month': 2, 'day': 29}), 20200229)
+
+    def test_partial_dates(self):
+        self.assertEqual(date_key({'year': 2020, 'month': 2}), 20200200)
+        self.assertEqual(date_key({'year': 2020}), 20200000)
+        self.assertEqual(date_key({'year': 2020, 'day': 3}), 20200000)
+
+    def test_impossible_day_falls_back_to_month(self):
+        self.assertEqual(date_key({'year': 2020, 'month': 2, 'day': 30}), 20200200)
+        self.assertEqual(date_key({'year': 2021, 'month': 4, 'day': 31}), 20210400)
+        self.assertEqual(date_key({'year': 2021, 'month': 4, 'day': -1}), 20210400)
+
+    def test_impossible_month_falls_back_to_year(self):
+        self.assertEqual(date_key({'year': 2020, 'month': 13, 'day': 1}), 20200000)
+        self.assertEqual(date_key({'year': 2020, 'month': 0, 'day': 1}), 20200000)
+
+    def test_no_key(self):
+        self.assertIsNone(date_key(None))
+        self.assertIsNone(date_key({}))
+        self.assertIsNone(date_key({'month': 2, 'day': 3}))
+        self.assertIsNone(date_key({'year': 1800, 'month': 2, 'day': 3}))
+
+
+if __name__ == '__main__':
+    unittest.main()
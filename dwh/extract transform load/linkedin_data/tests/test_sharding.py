@@ -0,0 +1,89 @@
+"""
+Tests of the _id range shards of the collections (sharding.py).
+
+Run from the repository root, conftest.py registers the dwh package:
+    python -m pytest "dwh/extract transform load"
+"""
+import unittest
+from dwh.linkedin_data import sharding
+
+
+class FakeCollection:
+    """
+    This class stands in for a MongoDB collection whose $sample returns the given _ids.
+    """
+
+    def __init__(self, ids: list, total: int | None = None):
+        """
+        :param ids: The _ids returned by the sample.
+        :param total: The estimated number of documents, the number of _ids by default.
+        """
+        self.ids = ids
+        self.total = len(ids) if total is None else total
+        self.pipelines = []
+
+    def aggregate(self, pipeline: list):
+        self.pipelines.append(pipeline)
+        return [{'_id': doc_id} for doc_id in self.ids]
+
+    def estimated_document_count(self) -> int:
+        return self.total
+
+
+class RangeFilterTest(unittest.TestCase):
+    """
+    This class tests the MongoDB filters of the _id ranges.
+    """
+
+    def test_bounds(self):
+        self.assertEqual(sharding.range_filter(), {})
+        self.assertEqual(sharding.range_filter(10, 20), {'_id': {'$gte': 10, '$lt': 20}})
+        self.assertEqual(sharding.range_filter(upper=20), {'_id': {'$lt': 20}})
+
+    def test_resume_replaces_the_lower_bound(self):
+        self.assertEqual(sharding.range_filter(10, 20, after=15), {'_id': {'$gt': 15, '$lt': 20}})
+
+
+class SplitPointsTest(unittest.TestCase):
+    """
+    This class tests the split points estimated from a sample of the _ids.
+    """
+
+    def test_quantiles_of_the_sample(self):
+        collection = FakeCollection(list(reversed(range(100))))
+        self.assertEqual(sharding.split_points(collection, 4), [25, 50, 75])
+        self.assertEqual(collection.pipelines[0][0], {'$sample': {'size': 4 * sharding.SAMPLES_PER_SHARD}})
+
+    def test_single_shard_needs_no_sample(self):
+        collection = FakeCollection(list(range(100)))
+        self.assertEqual(sharding.split_points(collection, 1), [])
+        self.assertEqual(collection.pipelines, [])
+
+    def test_duplicates_of_small_samples_are_removed(self):
+        self.assertEqual(sharding.split_points(FakeCollection([1, 1, 1, 2]), 4), [1, 2])
+
+    def test_empty_sample(self):
+        self.assertEqual(sharding.split_points(FakeCollection([]), 4), [])
+
+
+class CollectionShardsTest(unittest.TestCase):
+    """
+    This class tests splitting a collection into shards covering all of its _ids.
+    """
+
+    def test_shards_cover_the_collection(self):
+        shards = sharding.collection_shards(FakeCollection(list(range(100))), 'KGL_LIN_PRF_USA', 3, 25)
+        self.assertEqual([(shard['lower'], shard['upper']) for shard in shards], [
+            (None, 25), (25, 50), (50, 75), (75, None)
+        ])
+        self.assertTrue(all(shard['size'] == 25 and shard['id_origin'] == 3 for shard in shards))
+
+    def test_small_collection_is_one_shard(self):
+        shards = sharding.collection_shards(FakeCollection(list(range(10))), 'KGL_LIN_PRF_USA', 3, 25)
+        self.assertEqual(shards, [
+            {'collection': 'KGL_LIN_PRF_USA', 'id_origin': 3, 'lower': None, 'upper': None, 'size': 10}
+        ])
+
+
+if __name__ == '__main__':
+    unittest.main()
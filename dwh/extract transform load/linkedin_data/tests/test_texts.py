@@ -0,0 +1,54 @@
+"""
+Tests of the text tables the long texts of the fact rows are moved into (texts.py).
+
+Run from the repository root, conftest.py registers the dwh package:
+    python -m pytest "dwh/extract transform load"
+"""
+import unittest
+from dwh.linkedin_data import texts
+
+# Columns of a fact table with its text at the position of the length column
+COLUMNS = ('id', 'name', 'descriptionLength', 'idOrigin')
+
+
+class SplitRowsTest(unittest.TestCase):
+    """
+    This class tests moving the texts of fact rows into rows of their text table.
+    """
+
+    def test_texts_are_replaced_by_their_length(self):
+        fact_rows, text_rows = texts.split_rows(
+            'FACT_PRF_Qualification', COLUMNS, [(1, 'a', 'four', 7), (2, 'b', '', 7)], 7
+        )
+        self.assertEqual(fact_rows, [(1, 'a', 4, 7), (2, 'b', 0, 7)])
+        self.assertEqual(text_rows, [(1, 'four', 7), (2, '', 7)])
+
+    def test_missing_texts_get_no_text_row(self):
+        fact_rows, text_rows = texts.split_rows('FACT_PRF_Qualification', COLUMNS, [(1, 'a', None, 7)], 7)
+        self.assertEqual(fact_rows, [(1, 'a', None, 7)])
+        self.assertEqual(text_rows, [])
+
+    def test_text_rows_without_origin(self):
+        _, text_rows = texts.split_rows('FACT_PRF_Qualification', COLUMNS, [(1, 'a', 'text', 7)])
+        self.assertEqual(text_rows, [(1, 'text')])
+
+    def test_no_rows(self):
+        self.assertEqual(texts.split_rows('FACT_PRF_Qualification', COLUMNS, [], 7), ([], []))
+
+
+class SplitRowTest(unittest.TestCase):
+    """
+    This class tests replacing the text of a single fact row by its length.
+    """
+
+    def test_text_is_replaced_by_its_length(self):
+        row = {'id': 1, 'summary': 'text'}
+        self.assertEqual(texts.split_row('FACT_PRF_Person', row), ({'id': 1, 'summaryLength': 4}, 'text'))
+        self.assertEqual(row, {'id': 1, 'summary': 'text'})
+
+    def test_missing_text(self):
+        self.assertEqual(texts.split_row('FACT_PRF_Person', {'summary': None}), ({'summaryLength': None}, None))
+
+
+if __name__ == '__main__':
+    unittest.main()
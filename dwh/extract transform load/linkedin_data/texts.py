@@ -0,0 +1,84 @@
+"""
+This module holds the text tables the long free-text columns of the fact tables are moved into.
+
+A fact row only keeps the length of its text, the text itself is written into a TXT_ table keyed by
+the id of the fact row. The analytical joins scan narrow, fixed-width fact rows that way, while the
+compressed text tables (ROW_FORMAT=COMPRESSED) are only read when a text is actually needed.
+"""
+
+# Long text columns per fact table, as (text column, length column, text table, key column of the text table)
+TEXTS = {
+    'FACT_PRF_Person': ('summary', 'summaryLength', 'TXT_PRF_Summary', 'idPerson'),
+    'FACT_PRF_Qualification': ('description', 'descriptionLength', 'TXT_PRF_Qualification', 'idQualification'),
+    'FACT_PRF_Accomplishment': ('description', 'descriptionLength', 'TXT_PRF_Accomplishment', 'idAccomplishment'),
+    'FACT_CMP_Company': ('description', 'descriptionLength', 'TXT_CMP_Company', 'idCompany'),
+    'FACT_JPS_Posting': ('text', 'textLength', 'TXT_JPS_Posting', 'idPosting')
+}
+
+
+def text_length(text: str | None) -> int | None:
+    """
+    This function returns the length of a text as stored in the length column, None for no text.
+
+    :param text: The text.
+    """
+    return len(text) if text is not None else None
+
+
+def split_rows(table: str, columns: tuple, rows: list[tuple], origin_id: int | None = None) -> tuple[list[tuple], list[tuple]]:
+    """
+    This function moves the long texts of fact rows into rows of their text table.
+    The fact rows start with their id and hold the text at the position of the length column.
+
+    :param table: The name of the fact table.
+    :param columns: The columns of the fact table.
+    :param rows: The fact rows.
+    :param origin_id: The origin of the rows for text tables partitioned by origin, None for the others.
+    :return: The fact rows with the length instead of the text and the (key, text[, idOrigin]) rows of the text table.
+    """
+    position = columns.index(TEXTS[table][1])
+    origin = () if origin_id is None else (origin_id,)
+    fact_rows = []
+    text_rows = []
+    for row in rows:
+        text = row[position]
+        fact_rows.append((*row[:position], text_length(text), *row[position + 1:]))
+        if text is not None:
+            text_rows.append((row[0], text, *origin))
+
+    return fact_rows, text_rows
+
+
+def split_row(table: str, row: dict) -> tuple[dict, str | None]:
+    """
+    This function replaces the long text of a fact row by its length.
+
+    :param table: The name of the fact table.
+    :param row: The fact row, mapping the columns to their values.
+    :return: The fact row with the length column and the text.
+    """
+    text_column, length_column, _, _ = TEXTS[table]
+    row = dict(row)
+    text = row.pop(text_column)
+    row[length_column] = text_length(text)
+    return row, text
+
+
+def insert_text(table: str, row_id: int, text: str | None, dwh_connection, origin_id: int | None = None):
+    """
+    This function inserts the text of a fact row into its text table.
+
+    :param table: The name of the fact table.
+    :param row_id: The id of the fact row.
+    :param text: The text, nothing is inserted for None.
+    :param dwh_connection: The DWH connection to use.
+    :param origin_id: The origin of the row for text tables partitioned by origin, None for the others.
+    """
+    if text is not None:
+        _, _, text_table, key_column = TEXTS[table]
+        row = {key_column: row_id, 'text': text}
+        if origin_id is not None:
+            row['idOrigin'] = origin_id
+        dwh_connection.exec_driver_sql(
+            f"INSERT INTO {text_table} ({', '.join(row)}) VALUES ({', '.join(['%s'] * len(row))})", tuple(row.values())
+        )
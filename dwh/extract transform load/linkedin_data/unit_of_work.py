@@ -0,0 +1,113 @@
+"""
+This module holds the unit of work used to import a batch of documents on a single DWH connection.
+"""
+from contextlib import contextmanager
+
+
+class UnitOfWork:
+    """
+    This class runs the inserts of many documents on one connection and commits them together.
+
+    All statements of a unit of work share the same connection, so generated keys can be taken from
+    the cursor (lastrowid) of the insert itself. The transaction is committed every commit_interval
+    documents instead of after every single statement. Each document runs within a savepoint, a failed
+    document is rolled back on its own while the other documents of the transaction are kept.
+
+    Usage:
+        with UnitOfWork(dwh_engine, commit_interval=100) as uow:
+            for doc in documents:
+                with uow.document(doc['_id']):
+                    insert.person(doc, location_id, origin_id, uow.connection)
+    """
+
+    def __init__(self, dwh_engine, commit_interval: int = 100, before_commit=None, sections=None):
+        """
+        :param dwh_engine: The DWH engine to use.
+        :param commit_interval: Number of documents per transaction.
+        :param before_commit: Function called with the connection and the last document key before every commit (optional).
+        :param sections: The section writer (see sections.py) writing the sections of the persons of every transaction
+                         on its own connections, committed right before the transaction (optional).
+        """
+        self._dwh_engine = dwh_engine
+        self._commit_interval = max(1, commit_interval)
+        self._before_commit = before_commit
+        self._sections = sections
+        self._transaction = None
+        self.connection = None
+
+        # Documents within the current transaction and the key of the last one
+        self.pending = 0
+        self.last_key = None
+
+        # Number of committed transactions and documents
+        self.commits = 0
+        self.committed = 0
+
+    def __enter__(self):
+        self.connection = self._dwh_engine.connect()
+        self._transaction = self.connection.begin()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        try:
+            if exc_type is None:
+                self.commit()
+            else:
+                self._transaction.rollback()
+                if self._sections is not None:
+                    self._sections.rollback()
+        finally:
+            self.connection.close()
+            self.connection = None
+
+    @contextmanager
+    def document(self, key=None):
+        """
+        This function wraps the inserts of a single document in a savepoint.
+        Errors are raised after the savepoint has been rolled back, the transaction stays usable.
+
+        :param key: The key of the document (e.g. its MongoDB _id), passed to before_commit.
+        """
+        savepoint = self.connection.begin_nested()
+        try:
+            yield self.connection
+            savepoint.commit()
+        except Exception:
+            savepoint.rollback()
+            raise
+        finally:
+            # Failed documents count as processed as well
+            self.pending += 1
+            self.last_key = key
+            if self.pending >= self._commit_interval:
+                self.commit()
+
+    def commit(self):
+        """
+        This function commits the current transaction and starts a new one.
+
+        With a section writer, the sections are written, prepared and committed first, the transaction with the
+        persons and the checkpoint (before_commit) is committed last. If the sections fail, the whole transaction
+        is rolled back (not only a document) and the error is raised, so the checkpoint never advances past
+        persons without their sections. The next transaction is usable again.
+        """
+        try:
+            if self._sections is not None:
+                self._sections.prepare()
+                self._sections.commit()
+            if self.pending and self._before_commit is not None:
+                self._before_commit(self.connection, self.last_key)
+            self._transaction.commit()
+        except Exception:
+            if self._sections is not None:
+                self._sections.rollback()
+            if self._transaction.is_active:
+                self._transaction.rollback()
+            self.pending = 0
+            self._transaction = self.connection.begin()
+            raise
+
+        self.commits += 1
+        self.committed += self.pending
+        self.pending = 0
+        self._transaction = self.connection.begin()
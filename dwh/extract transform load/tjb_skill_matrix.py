@@ -0,0 +1,445 @@
+"""
+This script builds the employee x skill matrix of the TechJobs skill dataset and answers similarity queries on it.
+
+The skills of the employees (Fact_TJB_EmployeeSkills, or the 0/1 columns of techjobs_skill.csv) are kept as a
+SciPy CSR matrix with one row per employee (sorted by EmployeeID) and one column per skill. The queries are
+sparse matrix products instead of self-joins in MySQL:
+    similar_employees     top-k employees by cosine or Jaccard similarity of their skills to a profile
+    cooccurrence          number of employees having both skills, for all pairs of skills
+    related_skills        top-k skills co-occurring with a skill
+    frequency_by_country  number (or share) of the employees of every country having a skill
+
+The matrix is saved as an uncompressed .npz file, whose arrays are memory-mapped when it is loaded, so a saved
+matrix is ready in milliseconds and shared through the page cache by all processes reading it. Employees loaded
+into the DWH later are appended with append(SkillMatrix.from_dwh(dwh, after=matrix.last_employee_id())).
+"""
+import os
+import time
+import zipfile
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from dotenv import load_dotenv, find_dotenv
+from sqlalchemy import create_engine  # Requires pymysql
+
+# Import the CSV parsing of the loader
+from Dataset_TJB_Import import EMPLOYEE_COLUMNS, CHUNK_SIZE, read_header, byte_ranges, parse_range
+
+# Supported similarity metrics
+METRICS = ('cosine', 'jaccard')
+
+# Position of the country in the employee rows of parse_range (after the EmployeeID)
+_COUNTRY = EMPLOYEE_COLUMNS.index('Country') + 1
+
+
+def _mmap_npz(path: str) -> dict[str, np.ndarray]:
+    """
+    This function memory-maps the arrays of an uncompressed .npz file (as written by np.savez).
+    np.load ignores mmap_mode for .npz files, so the arrays are mapped at their offsets within the archive.
+
+    :param path: The path of the .npz file.
+    :return: The read-only arrays by name.
+    """
+    arrays = {}
+    with zipfile.ZipFile(path) as archive, open(path, 'rb') as file:
+        for info in archive.infolist():
+            name = info.filename.removesuffix('.npy')
+            if info.compress_type != zipfile.ZIP_STORED:
+                arrays[name] = np.load(archive.open(info))
+                continue
+
+            # Skip the local file header of the member, then the header of the .npy file
+            file.seek(info.header_offset + 26)
+            name_length, extra_length = np.frombuffer(file.read(4), dtype='<u2')
+            file.seek(info.header_offset + 30 + int(name_length) + int(extra_length))
+            version = np.lib.format.read_magic(file)
+            if version == (1, 0):
+                shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(file)
+            else:
+                shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(file)
+
+            if not np.prod(shape):
+                arrays[name] = np.empty(shape, dtype=dtype)
+            else:
+                arrays[name] = np.memmap(
+                    path, dtype=dtype, mode='r', offset=file.tell(), shape=shape, order='F' if fortran_order else 'C'
+                )
+
+    return arrays
+
+
+class SkillMatrix:
+    """
+    This class holds the skills of the employees as a sparse binary matrix, one row per employee.
+
+    The rows are sorted by EmployeeID and the columns are the skill names (DIM_TJB_Skills.SkillName), so
+    matrices built from the DWH and from the CSV can be appended to each other.
+
+    Usage:
+        matrix = SkillMatrix.from_dwh(dwh_engine)
+        matrix.save('tjb_skill_matrix.npz')
+        matrix = SkillMatrix.load('tjb_skill_matrix.npz')
+        matrix.similar_employees(['Python', 'SQL'], k=10, metric='jaccard')
+    """
+
+    def __init__(
+            self,
+            matrix,
+            employee_ids: np.ndarray,
+            skills: np.ndarray,
+            country_codes: np.ndarray,
+            countries: np.ndarray
+           ):
+        """
+        :param matrix: The CSR matrix of the employees x skills, 1 if an employee has a skill.
+        :param employee_ids: The EmployeeID of every row, sorted.
+        :param skills: The name of every column.
+        :param country_codes: The position of the country of every row in countries.
+        :param countries: The names of the countries ('' for employees without a country).
+        """
+        self.matrix = matrix
+        self.employee_ids = employee_ids
+        self.skills = skills
+        self.country_codes = country_codes
+        self.countries = countries
+        self._skill_columns = {skill: column for column, skill in enumerate(skills.tolist())}
+        self._row_sizes = None
+
+    def __len__(self) -> int:
+        return self.matrix.shape[0]
+
+    @classmethod
+    def from_pairs(
+            cls,
+            employee_ids: np.ndarray,
+            employee_countries: np.ndarray,
+            pair_employee_ids: np.ndarray,
+            pair_columns: np.ndarray,
+            skills
+           ) -> 'SkillMatrix':
+        """
+        This function builds a matrix from (EmployeeID, skill column) pairs.
+
+        :param employee_ids: The EmployeeIDs of all employees, also of the ones without skills.
+        :param employee_countries: The country of every employee, None for no country.
+        :param pair_employee_ids: The EmployeeID of every pair.
+        :param pair_columns: The position of the skill of every pair in skills.
+        :param skills: The names of the skills.
+        """
+        # Sort the employees, the last row of an EmployeeID wins
+        employee_ids, first = np.unique(np.asarray(employee_ids, dtype=np.int64)[::-1], return_index=True)
+        employee_countries = np.asarray(employee_countries, dtype=object)[::-1][first]
+        countries, country_codes = np.unique(
+            np.array(['' if country is None else str(country) for country in employee_countries], dtype=str),
+            return_inverse=True
+        )
+
+        # Binary matrix of the pairs, duplicate pairs count once
+        rows = np.searchsorted(employee_ids, pair_employee_ids)
+        matrix = sp.csr_matrix(
+            (np.ones(len(rows), dtype=np.float32), (rows, np.asarray(pair_columns))),
+            shape=(len(employee_ids), len(skills))
+        )
+        matrix.sum_duplicates()
+        matrix.data[:] = 1
+
+        return cls(
+            matrix, employee_ids, np.array(list(skills), dtype=str), country_codes.astype(np.int32),
+            countries.astype(str)
+        )
+
+    @classmethod
+    def from_dwh(cls, dwh_engine, after: int | None = None) -> 'SkillMatrix':
+        """
+        This function builds the matrix of the employees in the DWH.
+
+        DWH tables: DIM_TJB_Employee, DIM_TJB_Skills, Fact_TJB_EmployeeSkills
+
+        :param dwh_engine: The DWH engine to use.
+        :param after: Only the employees with a larger EmployeeID are read, e.g. to append the new employees.
+        """
+        condition = "WHERE EmployeeID > %s" if after is not None else ""
+        parameters = (after,) if after is not None else ()
+        with dwh_engine.connect() as connection:
+            skills = connection.exec_driver_sql(
+                "SELECT SkillID, SkillName FROM DIM_TJB_Skills ORDER BY SkillID"
+            ).fetchall()
+            employees = connection.exec_driver_sql(
+                f"SELECT EmployeeID, Country FROM DIM_TJB_Employee {condition}", parameters
+            ).fetchall()
+            pairs = np.array(
+                connection.exec_driver_sql(
+                    f"SELECT EmployeeID, SkillID FROM Fact_TJB_EmployeeSkills {condition}", parameters
+                ).fetchall(),
+                dtype=np.int64
+            ).reshape(-1, 2)
+
+        # Map the SkillIDs to the columns
+        skill_ids = np.array([skill_id for skill_id, _ in skills], dtype=np.int64)
+        return cls.from_pairs(
+            [employee_id for employee_id, _ in employees],
+            [country for _, country in employees],
+            pairs[:, 0],
+            np.searchsorted(skill_ids, pairs[:, 1]),
+            [name for _, name in skills]
+        )
+
+    @classmethod
+    def from_csv(cls, file_name: str, processes: int | None = None, chunk_size: int = CHUNK_SIZE) -> 'SkillMatrix':
+        """
+        This function builds the matrix directly from the TechJobs skill CSV, parsed in parallel like by the loader.
+
+        :param file_name: The path of the CSV, its first column is the EmployeeID.
+        :param processes: The number of processes parsing the CSV, the number of CPUs if None.
+        :param chunk_size: The number of bytes of the CSV parsed per task.
+        """
+        header_end, columns, skill_columns = read_header(file_name)
+        ranges = byte_ranges(file_name, header_end, chunk_size)
+
+        employee_ids, countries, pair_employee_ids, pair_columns = [], [], [], []
+        with ProcessPoolExecutor(processes) as pool:
+            results = pool.map(
+                parse_range,
+                repeat(file_name),
+                [start for start, _ in ranges],
+                [end for _, end in ranges],
+                repeat(columns),
+                repeat(skill_columns)
+            )
+            for employees, range_employee_ids, positions, _ in results:
+                employee_ids.extend(row[0] for row in employees)
+                countries.extend(row[_COUNTRY] for row in employees)
+                pair_employee_ids.append(range_employee_ids)
+                pair_columns.append(positions)
+
+        return cls.from_pairs(
+            employee_ids,
+            countries,
+            np.concatenate(pair_employee_ids) if pair_employee_ids else np.empty(0, dtype=np.int64),
+            np.concatenate(pair_columns) if pair_columns else np.empty(0, dtype=np.int32),
+            skill_columns
+        )
+
+    def save(self, path: str):
+        """
+        This function saves the matrix as an uncompressed .npz file, which load memory-maps.
+
+        :param path: The path of the .npz file.
+        """
+        np.savez(
+            path,
+            data=self.matrix.data,
+            indices=self.matrix.indices,
+            indptr=self.matrix.indptr,
+            shape=np.array(self.matrix.shape, dtype=np.int64),
+            employee_ids=self.employee_ids,
+            skills=self.skills,
+            country_codes=self.country_codes,
+            countries=self.countries
+        )
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True) -> 'SkillMatrix':
+        """
+        This function loads a matrix saved with save.
+
+        :param path: The path of the .npz file.
+        :param mmap: Whether to memory-map the arrays (read-only) instead of reading them into memory.
+        """
+        arrays = _mmap_npz(path) if mmap else dict(np.load(path))
+        matrix = sp.csr_matrix(
+            (arrays['data'], arrays['indices'], arrays['indptr']), shape=tuple(int(size) for size in arrays['shape']),
+            copy=False
+        )
+        return cls(matrix, arrays['employee_ids'], arrays['skills'], arrays['country_codes'], arrays['countries'])
+
+    def last_employee_id(self) -> int | None:
+        """
+        This function returns the largest EmployeeID of the matrix, None if it is empty.
+        """
+        return int(self.employee_ids[-1]) if len(self.employee_ids) else None
+
+    def append(self, other: 'SkillMatrix') -> 'SkillMatrix':
+        """
+        This function returns the matrix with the employees and skills of another matrix added.
+        The skills of employees in both matrices are combined, their country is taken from the other matrix.
+
+        :param other: The matrix to add, e.g. of the employees loaded since this matrix was built.
+        """
+        # Columns of the skills of the other matrix, new skills are added at the end
+        skills = list(self.skills.tolist())
+        for skill in other.skills.tolist():
+            if skill not in self._skill_columns:
+                skills.append(skill)
+        skill_columns = {skill: column for column, skill in enumerate(skills)}
+        column_map = np.array([skill_columns[skill] for skill in other.skills.tolist()], dtype=np.int64)
+
+        # Combine the pairs and the countries of both matrices
+        own = self.matrix.tocoo()
+        added = other.matrix.tocoo()
+        return SkillMatrix.from_pairs(
+            np.concatenate((self.employee_ids, other.employee_ids)),
+            np.concatenate((self.countries[self.country_codes], other.countries[other.country_codes])).astype(object),
+            np.concatenate((self.employee_ids[own.row], other.employee_ids[added.row])),
+            np.concatenate((own.col, column_map[added.col])),
+            skills
+        )
+
+    def profile(self, skills) -> sp.csr_matrix:
+        """
+        This function returns the binary row vector of a set of skills, unknown skills are ignored.
+
+        :param skills: The names of the skills.
+        """
+        columns = sorted({self._skill_columns[skill] for skill in skills if skill in self._skill_columns})
+        return sp.csr_matrix(
+            (np.ones(len(columns), dtype=np.float32), np.array(columns, dtype=np.int32), np.array([0, len(columns)])),
+            shape=(1, len(self.skills))
+        )
+
+    def similar_employees(self, profile, k: int = 10, metric: str = 'cosine') -> list[tuple[int, float]]:
+        """
+        This function returns the employees whose skills are most similar to a profile.
+
+        :param profile: An EmployeeID (the employee itself is not returned) or the names of the skills of a profile.
+        :param k: The number of employees to return.
+        :param metric: The similarity metric, one of METRICS.
+        :return: The EmployeeIDs and similarities, most similar first.
+        """
+        if metric not in METRICS:
+            raise ValueError(f"Unknown metric {metric}, expected one of {METRICS}")
+
+        row = None
+        if isinstance(profile, (int, np.integer)):
+            row = self._row(profile)
+            vector = self.matrix[row]
+        else:
+            vector = self.profile(profile)
+        size = vector.nnz
+        if not size:
+            return []
+
+        # Number of shared skills of every employee with the profile
+        shared = (self.matrix @ vector.T).toarray().ravel()
+        sizes = self._sizes()
+        if metric == 'cosine':
+            scores = shared / np.sqrt(np.maximum(sizes * size, 1))
+        else:
+            scores = shared / np.maximum(sizes + size - shared, 1)
+        if row is not None:
+            scores[row] = -1
+
+        # Top k without sorting all employees
+        k = min(k, len(scores) - (row is not None))
+        if k <= 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind='stable')]
+        return [(int(self.employee_ids[i]), float(scores[i])) for i in top if scores[i] > 0]
+
+    def cooccurrence(self) -> sp.csr_matrix:
+        """
+        This function returns the number of employees having both skills for all pairs of skills.
+        The diagonal holds the number of employees per skill.
+        """
+        return (self.matrix.T @ self.matrix).tocsr()
+
+    def related_skills(self, skill: str, k: int = 10) -> list[tuple[str, int]]:
+        """
+        This function returns the skills most employees with a skill have as well.
+
+        :param skill: The name of the skill.
+        :param k: The number of skills to return.
+        :return: The names of the skills and the number of employees having both skills, most frequent first.
+        """
+        column = self._skill_columns[skill]
+        counts = (self.matrix.T @ self.matrix[:, [column]]).toarray().ravel()
+        counts[column] = 0
+
+        k = min(k, len(counts))
+        top = np.argpartition(-counts, k - 1)[:k] if k else np.empty(0, dtype=np.int64)
+        top = top[np.argsort(-counts[top], kind='stable')]
+        return [(str(self.skills[i]), int(counts[i])) for i in top if counts[i] > 0]
+
+    def frequency_by_country(self, share: bool = False) -> pd.DataFrame:
+        """
+        This function returns how many employees of every country have every skill.
+
+        :param share: Whether to return the share of the employees of a country instead of their number.
+        :return: A data frame with one row per country and one column per skill.
+        """
+        # Sparse indicator matrix of the countries x employees
+        employees = len(self.country_codes)
+        indicator = sp.csr_matrix(
+            (np.ones(employees, dtype=np.float32), (self.country_codes, np.arange(employees))),
+            shape=(len(self.countries), employees)
+        )
+        counts = (indicator @ self.matrix).toarray()
+        if share:
+            sizes = np.bincount(self.country_codes, minlength=len(self.countries))
+            counts = counts / np.maximum(sizes, 1)[:, None]
+
+        return pd.DataFrame(counts, index=pd.Index(self.countries, name='Country'), columns=self.skills)
+
+    def _row(self, employee_id: int) -> int:
+        """
+        This function returns the row of an employee.
+
+        :param employee_id: The EmployeeID.
+        """
+        row = int(np.searchsorted(self.employee_ids, employee_id))
+        if row == len(self.employee_ids) or self.employee_ids[row] != employee_id:
+            raise KeyError(f"Unknown employee {employee_id}")
+        return row
+
+    def _sizes(self) -> np.ndarray:
+        """
+        This function returns the number of skills of every employee, computed once.
+        """
+        if self._row_sizes is None:
+            self._row_sizes = np.diff(self.matrix.indptr).astype(np.float64)
+        return self._row_sizes
+
+
+# Load environment variables
+load_dotenv(find_dotenv())
+
+# Connection string
+mysql_url = os.getenv("DATABASE_DWH")
+dwh_schema_name = 'DWH2'
+
+# Connection with DW
+ssl_config = {
+    'ca': './Datasets/ca.pem',
+    'cert': './Datasets/client-cert.pem',
+    'key': './Datasets/client-key.pem'
+}
+
+# Path of the saved matrix, the new employees of the DWH are appended if it exists
+matrix_path = './Datasets/tjb_skill_matrix.npz'
+
+if __name__ == "__main__":
+    dwh = create_engine(f'{mysql_url}/{dwh_schema_name}?charset=utf8mb4', connect_args={'ssl': ssl_config})
+
+    start = time.perf_counter()
+    if os.path.exists(matrix_path):
+        skill_matrix = SkillMatrix.load(matrix_path)
+        skill_matrix = skill_matrix.append(SkillMatrix.from_dwh(dwh, after=skill_matrix.last_employee_id()))
+    else:
+        skill_matrix = SkillMatrix.from_dwh(dwh)
+    skill_matrix.save(matrix_path)
+    print(
+        f"{len(skill_matrix)} employees x {len(skill_matrix.skills)} skills ({skill_matrix.matrix.nnz} skills set) "
+        f"in {time.perf_counter() - start:.1f}s"
+    )
+
+    # Example queries
+    if len(skill_matrix):
+        start = time.perf_counter()
+        employee = int(skill_matrix.employee_ids[0])
+        print(f"Similar to {employee}: {skill_matrix.similar_employees(employee, k=5)}")
+        skill = str(skill_matrix.skills[0])
+        print(f"Related to {skill}: {skill_matrix.related_skills(skill, k=5)}")
+        print(f"Queries in {(time.perf_counter() - start) * 1000:.1f}ms")